@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+브라우저 없는 Apollo State 수집기
+- m.search.naver.com 검색 결과를 HTTP로 직접 다운로드
+- 커넥션 풀을 재사용하는 requests 세션 (keep-alive)
+- 페이지에서 __APOLLO_STATE__ JSON을 바로 추출 (Chrome 부팅 불필요)
+"""
+import random
+import logging
+import urllib.parse
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from apollo_state import ApolloListSummaries, extract_list_summaries, parse_apollo_state
+
+
+class ApolloHttpFetcher:
+    """m.search.naver.com 페이지를 HTTP로 받아 Apollo State를 추출"""
+
+    SEARCH_URL = "https://m.search.naver.com/search.naver?where=m&sm=top_sly.hst&fbm=0&acr=1&ie=utf8&query={query}"
+    CAPTCHA_URL_KEYWORDS = ['captcha', 'block', 'verify', 'robot']
+    CAPTCHA_PAGE_KEYWORDS = ['captcha', '보안문자', '자동입력 방지']
+
+    # 상태 코드
+    STATUS_OK = "ok"
+    STATUS_CAPTCHA = "captcha"
+    STATUS_MISSING = "missing"
+    STATUS_HTTP_ERROR = "http_error"
+
+    def __init__(self, user_agents: List[str], timeout: int = 15, pool_size: int = 10, proxy: Optional[str] = None):
+        self.logger = logging.getLogger("ApolloHttpFetcher")
+        self.user_agents = user_agents
+        self.timeout = timeout
+
+        # 커넥션 풀을 유지하는 세션 (요청마다 TCP/TLS 핸드셰이크 반복 방지)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': random.choice(self.user_agents),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+            'Referer': 'https://m.naver.com/',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        })
+
+        self.set_proxy(proxy)
+        # 마지막 요청의 HTTP 상태 코드 (연결 오류면 None, 속도 제어 신호로 사용)
+        self.last_status_code: Optional[int] = None
+
+        self.stats = {
+            'requests': 0,
+            'apollo_found': 0,
+            'captcha': 0,
+            'missing': 0,
+            'http_errors': 0
+        }
+
+    def set_proxy(self, proxy: Optional[str]):
+        """프록시 변경 (세션과 커넥션 풀은 유지)"""
+        if proxy:
+            self.session.proxies = {'http': proxy, 'https': proxy}
+        else:
+            self.session.proxies = {}
+
+    def build_search_url(self, keyword: str) -> str:
+        """검색 URL 생성"""
+        return self.SEARCH_URL.format(query=urllib.parse.quote(keyword))
+
+    def fetch_page(self, keyword: str) -> Tuple[Optional[str], Optional[str]]:
+        """검색 페이지 HTML 다운로드 (html, 최종 URL) 반환"""
+        url = self.build_search_url(keyword)
+        self.stats['requests'] += 1
+        self.last_status_code = None
+
+        response = self.session.get(url, timeout=self.timeout)
+        self.last_status_code = response.status_code
+
+        if response.status_code != 200:
+            self.stats['http_errors'] += 1
+            self.logger.warning(f"HTTP fetch failed: status {response.status_code}")
+            return None, response.url
+
+        return response.text, response.url
+
+    def extract_apollo_state(self, page_source: str) -> Optional[Dict]:
+        """페이지에서 __APOLLO_STATE__ JSON 추출"""
+        return parse_apollo_state(page_source)
+
+    def is_captcha_page(self, page_source: str, final_url: Optional[str]) -> bool:
+        """CAPTCHA/차단 페이지 여부"""
+        current_url = (final_url or '').lower()
+        if any(keyword in current_url for keyword in self.CAPTCHA_URL_KEYWORDS):
+            return True
+
+        page_text = page_source.lower()
+        return any(keyword in page_text for keyword in self.CAPTCHA_PAGE_KEYWORDS)
+
+    def fetch_apollo_state(self, keyword: str) -> Tuple[Optional[Dict], str]:
+        """
+        키워드 검색 결과의 Apollo State 수집 (전체 디코딩)
+
+        Returns:
+            (apollo_data, status): status는 ok / captcha / missing / http_error
+        """
+        return self._fetch_and_extract(keyword, self.extract_apollo_state)
+
+    def fetch_list_summaries(self, keyword: str) -> Tuple[Optional[ApolloListSummaries], str]:
+        """
+        키워드 검색 결과에서 목록 엔티티와 ROOT_QUERY 순서만 선택적으로 디코딩
+
+        Returns:
+            (summaries, status): status는 ok / captcha / missing / http_error
+        """
+        return self._fetch_and_extract(keyword, extract_list_summaries)
+
+    def _fetch_and_extract(self, keyword: str, extractor: Callable[[str], Optional[object]]) -> Tuple[Optional[object], str]:
+        """페이지 다운로드 후 extractor로 추출, 실패 시 차단 여부 판별"""
+        try:
+            page_source, final_url = self.fetch_page(keyword)
+        except requests.exceptions.RequestException as e:
+            self.stats['http_errors'] += 1
+            self.logger.warning(f"HTTP fetch error: {e}")
+            return None, self.STATUS_HTTP_ERROR
+
+        if page_source is None:
+            return None, self.STATUS_HTTP_ERROR
+
+        extracted = extractor(page_source)
+        if extracted:
+            self.stats['apollo_found'] += 1
+            return extracted, self.STATUS_OK
+
+        # Apollo State가 없을 때만 차단 여부 확인
+        if self.is_captcha_page(page_source, final_url):
+            self.stats['captcha'] += 1
+            return None, self.STATUS_CAPTCHA
+
+        self.stats['missing'] += 1
+        return None, self.STATUS_MISSING
+
+    def close(self):
+        """세션 정리"""
+        self.session.close()
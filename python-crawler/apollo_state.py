@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Apollo State 추출기
+- 페이지에서 __APOLLO_STATE__ 마커를 찾아 JSON 객체 범위를 한 번의 스캔으로 계산
+- 중괄호 깊이와 문자열/이스케이프를 추적하므로 문자열 안의 '};'에 잘리지 않음
+- 정규식 `{.*?};` 방식 대비 빠르고, 페이지 나머지는 복사하지 않음
+- 선택적 디코딩: 목록 엔티티(RestaurantListSummary)와 ROOT_QUERY 순서만 dict로 변환
+- 브라우저 모드: 같은 부분만 JS 런타임에서 직접 읽는 execute_script 스크립트 제공
+"""
+import re
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("ApolloState")
+
+APOLLO_MARKER = 'naver.search.ext.nmb.salt.__APOLLO_STATE__'
+
+# 다음 구조적 중괄호까지 한 번에 건너뛰는 패턴
+# (중괄호/따옴표가 아닌 문자와 완결된 문자열 리터럴을 소비하므로 문자열 안의 '{', '}', '};'는 무시됨)
+_NEXT_BRACE_PATTERN = re.compile(r'[^{}"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^{}"]*)*([{}])')
+_ASSIGN_PATTERN = re.compile(r'\s*=\s*')
+
+
+def find_json_object_span(page_source: str, start: int) -> Optional[Tuple[int, int]]:
+    """
+    start 위치의 '{'부터 짝이 맞는 '}'까지의 범위 계산
+
+    Returns:
+        (시작, 끝) 인덱스 (끝은 slice용 exclusive), 객체가 닫히지 않으면 None
+    """
+    if start >= len(page_source) or page_source[start] != '{':
+        return None
+
+    # 매 위치에서 앵커 매칭하므로 닫히지 않은 문자열을 만나면 재동기화하지 않고 중단
+    depth = 0
+    position = start
+    while True:
+        token = _NEXT_BRACE_PATTERN.match(page_source, position)
+        if token is None:
+            return None
+
+        position = token.end()
+        if token.group(1) == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return start, position
+
+
+def extract_apollo_json(page_source: str, marker: str = APOLLO_MARKER) -> Optional[str]:
+    """
+    페이지에서 marker 뒤에 할당된 JSON 문자열만 잘라서 반환
+
+    Args:
+        page_source: 검색 결과 HTML
+        marker: 할당 대상 변수명 (기본: nmb.salt.__APOLLO_STATE__)
+
+    Returns:
+        JSON 문자열 또는 None (마커가 없거나 객체가 닫히지 않은 경우)
+    """
+    marker_index = page_source.find(marker)
+    if marker_index < 0:
+        return None
+
+    assign = _ASSIGN_PATTERN.match(page_source, marker_index + len(marker))
+    if not assign:
+        return None
+
+    span = find_json_object_span(page_source, assign.end())
+    if span is None:
+        logger.warning("Apollo state object is not closed")
+        return None
+
+    return page_source[span[0]:span[1]]
+
+
+def parse_apollo_state(page_source: str, marker: str = APOLLO_MARKER) -> Optional[Dict]:
+    """페이지에서 Apollo State를 추출해 dict로 변환 (실패 시 None)"""
+    json_str = extract_apollo_json(page_source, marker)
+    if json_str is None:
+        return None
+
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON parsing error: {e}")
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 선택적 디코딩: RestaurantListSummary 엔티티와 ROOT_QUERY 순서 정보만 디코딩
+# ---------------------------------------------------------------------------
+
+LIST_SUMMARY_PREFIX = 'RestaurantListSummary:'
+ROOT_QUERY_KEY = 'ROOT_QUERY'
+LIST_QUERY_PREFIX = 'restaurantList('
+AD_QUERY_PREFIX = 'adBusinesses('
+
+_STRING_PATTERN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_decoder = json.JSONDecoder()
+
+
+@dataclass
+class ApolloListSummaries:
+    """선택적으로 디코딩된 Apollo State 일부"""
+    # (apollo_key, 엔티티) 페이지 등장 순서
+    restaurants: List[Tuple[str, Dict]] = field(default_factory=list)
+    # ROOT_QUERY restaurantList(...) items의 __ref 순서 (실제 목록 순서)
+    list_refs: List[str] = field(default_factory=list)
+    # ROOT_QUERY adBusinesses(...) items의 __ref 순서 (광고 영역)
+    ad_refs: List[str] = field(default_factory=list)
+
+    def list_position(self, apollo_key: str) -> int:
+        """ROOT_QUERY 기준 목록 위치 (1부터, 없으면 -1)"""
+        try:
+            return self.list_refs.index(apollo_key) + 1
+        except ValueError:
+            return -1
+
+
+def iter_keyed_values(json_str: str, key_prefix: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, object, int]]:
+    """
+    key_prefix로 시작하는 키를 찾아 해당 값만 디코딩
+
+    문자열 내부의 따옴표는 항상 '\\"'로 이스케이프되므로, 바로 앞 문자가 '{' 또는 ','인
+    따옴표는 구조적인 키의 시작이다. 키 탐색은 str.find(C 구현)로 하고, 값은
+    raw_decode로 해당 범위만 디코딩한 뒤 그 뒤부터 다시 탐색한다.
+
+    Yields:
+        (키, 디코딩된 값, 값 끝 위치)
+    """
+    end = len(json_str) if end is None else end
+    needle = '"' + key_prefix
+    position = start
+
+    while True:
+        key_start = json_str.find(needle, position, end)
+        if key_start < 0:
+            return
+
+        key_match = _STRING_PATTERN.match(json_str, key_start)
+        if (key_start == 0 or json_str[key_start - 1] not in '{,' or key_match is None
+                or not json_str.startswith(':', key_match.end())):
+            position = key_start + 1
+            continue
+
+        value, value_end = _decoder.raw_decode(json_str, key_match.end() + 1)
+        yield json.loads(key_match.group()), value, value_end
+        position = value_end
+
+
+def _item_refs(result) -> List[str]:
+    items = result.get('items') if isinstance(result, dict) else None
+    return [item['__ref'] for item in items or [] if isinstance(item, dict) and '__ref' in item]
+
+
+def _first_query_refs(json_str: str, query_prefix: str, start: int) -> List[str]:
+    for _, value, _ in iter_keyed_values(json_str, query_prefix, start):
+        return _item_refs(value)
+    return []
+
+
+def decode_list_summaries(json_str: str) -> ApolloListSummaries:
+    """
+    Apollo State JSON에서 RestaurantListSummary 엔티티와 목록/광고 순서만 디코딩
+
+    Apollo 정규화 캐시는 엔티티 ID 키(RestaurantListSummary:...)를 최상위에만 두므로
+    키 위치만 찾아 해당 엔티티를 디코딩하고, VisitorImages/Panorama/필터 목록 등
+    나머지 엔티티는 dict로 만들지 않는다.
+    """
+    summaries = ApolloListSummaries()
+
+    for key, value, _ in iter_keyed_values(json_str, LIST_SUMMARY_PREFIX):
+        if isinstance(value, dict):
+            summaries.restaurants.append((key, value))
+
+    # 목록/광고 쿼리 필드는 ROOT_QUERY에만 존재하므로 ROOT_QUERY 시작 이후 첫 결과만 디코딩
+    root_start = json_str.find('"%s":{' % ROOT_QUERY_KEY)
+    if root_start >= 0:
+        summaries.list_refs = _first_query_refs(json_str, LIST_QUERY_PREFIX, root_start)
+        summaries.ad_refs = _first_query_refs(json_str, AD_QUERY_PREFIX, root_start)
+
+    return summaries
+
+
+def extract_list_summaries(page_source: str, marker: str = APOLLO_MARKER) -> Optional[ApolloListSummaries]:
+    """페이지에서 Apollo State를 찾아 목록 엔티티만 선택적으로 디코딩 (실패 시 None)"""
+    json_str = extract_apollo_json(page_source, marker)
+    if json_str is None:
+        return None
+
+    try:
+        return decode_list_summaries(json_str)
+    except json.JSONDecodeError as e:
+        logger.error(f"Selective Apollo decoding error: {e}")
+        return None
+
+
+# execute_script용: 페이지 JS 런타임의 Apollo State에서 목록 엔티티/순서만 반환 (page_source 전송 없음)
+# naver.search.ext.nmb.salt는 통합검색, window.__APOLLO_STATE__는 m.place 목록 페이지
+APOLLO_LIST_SUMMARIES_JS = """
+function apolloListSummaries() {
+    let state = window.__APOLLO_STATE__;
+    try { state = window.naver.search.ext.nmb.salt.__APOLLO_STATE__ || state; } catch (e) {}
+    if (!state || typeof state !== 'object') return null;
+
+    const restaurants = [];
+    for (const key of Object.keys(state)) {
+        const value = state[key];
+        if (key.startsWith('%(summary_prefix)s') && value && typeof value === 'object') restaurants.push([key, value]);
+    }
+
+    const root = state['%(root_key)s'] || {};
+    const refs = prefix => {
+        const key = Object.keys(root).find(name => name.startsWith(prefix));
+        const items = key && root[key] && root[key].items || [];
+        return items.filter(item => item && item.__ref).map(item => item.__ref);
+    };
+    return {restaurants: restaurants, list_refs: refs('%(list_prefix)s'), ad_refs: refs('%(ad_prefix)s')};
+}
+""" % {
+    'summary_prefix': LIST_SUMMARY_PREFIX,
+    'root_key': ROOT_QUERY_KEY,
+    'list_prefix': LIST_QUERY_PREFIX,
+    'ad_prefix': AD_QUERY_PREFIX
+}
+
+APOLLO_LIST_SUMMARIES_SCRIPT = APOLLO_LIST_SUMMARIES_JS + "\nreturn apolloListSummaries();\n"
+
+
+def list_summaries_from_script(result: Optional[Dict]) -> Optional[ApolloListSummaries]:
+    """APOLLO_LIST_SUMMARIES_SCRIPT 반환값을 ApolloListSummaries로 변환 (상태가 없으면 None)"""
+    if not result:
+        return None
+
+    return ApolloListSummaries(
+        restaurants=[(key, value) for key, value in result.get('restaurants') or [] if isinstance(value, dict)],
+        list_refs=list(result.get('list_refs') or []),
+        ad_refs=list(result.get('ad_refs') or [])
+    )
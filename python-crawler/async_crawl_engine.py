@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+asyncio 기반 HTTP 크롤 엔진 (requests/BeautifulSoup 크롤러용)
+- 프록시별/직접 연결별 httpx.AsyncClient를 재사용 (keep-alive 커넥션 풀, PROXY_HTTP2=true면 HTTP/2 다중화)
+- 요청마다 새 TCP 연결(핸드셰이크)이 있었는지 기록해 커넥션 재사용률과 절감 시간 보고
+- 동시 실행 제한 3단계: 전체 작업 수, 호스트별, 프록시별
+- 전역 요청 간격(초당 요청 수)으로 네이버 요청 속도 제한
+- 처리량은 sleep이 아니라 프록시 풀 크기(활성 프록시 수 x 프록시별 동시 요청)에 비례
+- 이벤트 루프와 클라이언트는 run() 호출 사이에도 유지하고 close()에서 한 번에 종료
+  (순차 검색마다 run()을 불러도 커넥션을 다시 맺지 않음)
+- URL 변형은 앞 요청이 실패하면 다음 변형으로 넘어감. 헤지(CRAWL_HEDGE=1, 기본 꺼짐)를 켜면 선호 URL이
+  지연 분위(p95) 안에 응답하지 않을 때 다음 변형을 동시에 시작하고 먼저 도착한 응답을 채택
+  (헤지 요청은 추가 트래픽이므로 요청 예산과 CAPTCHA 부담을 감안해 켤 것)
+"""
+import os
+import time
+import asyncio
+import logging
+import urllib.parse
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from proxy_scheduler import proxy_weight
+from rolling_stats import LatencyHistogram
+
+
+class AsyncCrawlEngine:
+    """여러 검색을 동시에 실행하는 비동기 요청 엔진"""
+
+    # 자체 관측 응답 시간으로 헤지 지연을 정하기 위한 최소 표본 수
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_MIN_DELAY = 0.25
+
+    def __init__(self, proxy_manager=None, headers: Optional[Dict[str, str]] = None,
+                 max_concurrency: int = 8, per_host_limit: int = 4, per_proxy_limit: int = 2,
+                 requests_per_second: float = 2.0, timeout: float = 15.0,
+                 request_logger: Optional[Callable] = None, hedge: bool = False,
+                 hedge_quantile: float = 0.95, hedge_default: float = 3.0,
+                 latency_source: Optional[Callable[[float], float]] = None, http2: bool = False,
+                 logger_name: str = "AsyncCrawlEngine"):
+        """
+        Args:
+            proxy_manager: BrightDataProxyManager (None이면 직접 연결만 사용)
+            headers: 모든 요청에 붙일 기본 헤더
+            max_concurrency: 동시에 진행하는 작업(검색) 수
+            per_host_limit: 대상 호스트별 동시 요청 수
+            per_proxy_limit: 프록시별 동시 요청 수
+            requests_per_second: 전역 요청 시작 속도 (0 이하면 제한 없음)
+            request_logger: 프록시 요청마다 호출할 로거 (log_proxy_request 시그니처)
+            hedge: True면 느린 URL 변형을 기다리지 않고 다음 변형을 동시에 시작 (False면 순차 시도)
+            hedge_quantile: 다음 변형을 시작하기까지 기다릴 응답 시간 분위
+            hedge_default: 응답 시간 기록이 없을 때 헤지 지연 (초)
+            latency_source: q -> 분위 응답 시간(초) (예: ProxyMonitor.latency_percentile, 0이면 자체 관측값 사용)
+            http2: True면 클라이언트가 HTTP/2로 협상 (h2 패키지 필요, httpx[http2])
+        """
+        self.logger = logging.getLogger(logger_name)
+        self.proxy_manager = proxy_manager
+        self.headers = headers or {}
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.per_proxy_limit = max(1, per_proxy_limit)
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.timeout = timeout
+        self.request_logger = request_logger
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_default = hedge_default
+        self.latency_source = latency_source
+        self.http2 = http2
+        # 이 엔진에서 관측한 200 응답 시간 (직접 연결 포함)
+        self.latency = LatencyHistogram()
+
+        # 이벤트 루프에 묶이는 객체는 run() 안에서 생성 (루프는 close()까지 재사용)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._proxy_slots: Dict[str, asyncio.Semaphore] = {}
+        self._proxy_in_flight: Dict[str, int] = {}
+        self._pace_lock: Optional[asyncio.Lock] = None
+        self._next_start = 0.0
+
+        self.stats = {
+            'requests': 0,
+            'proxy_requests': 0,
+            'direct_requests': 0,
+            'failures': 0,
+            'peak_in_flight': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'cancelled': 0,
+            'new_connection_requests': 0,
+            'reused_connection_requests': 0,
+            'new_connection_time': 0.0,
+            'reused_connection_time': 0.0,
+        }
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls, proxy_manager=None, headers: Optional[Dict[str, str]] = None,
+                 request_logger: Optional[Callable] = None, latency_source: Optional[Callable[[float], float]] = None,
+                 logger_name: str = "AsyncCrawlEngine") -> "AsyncCrawlEngine":
+        """
+        환경변수로 생성
+        - CRAWL_CONCURRENCY, CRAWL_PER_HOST, CRAWL_PER_PROXY, CRAWL_RPS: 동시 실행/속도 제한
+        - CRAWL_HEDGE(1이면 활성, 기본 비활성), CRAWL_HEDGE_QUANTILE, CRAWL_HEDGE_DEFAULT: 헤지 요청
+        - PROXY_HTTP2(true면 HTTP/2, 기본 false)
+        """
+        return cls(
+            proxy_manager=proxy_manager,
+            headers=headers,
+            max_concurrency=int(os.getenv('CRAWL_CONCURRENCY', '8')),
+            per_host_limit=int(os.getenv('CRAWL_PER_HOST', '4')),
+            per_proxy_limit=int(os.getenv('CRAWL_PER_PROXY', '2')),
+            requests_per_second=float(os.getenv('CRAWL_RPS', '2')),
+            request_logger=request_logger,
+            hedge=os.getenv('CRAWL_HEDGE', '0') == '1',
+            hedge_quantile=float(os.getenv('CRAWL_HEDGE_QUANTILE', '0.95')),
+            hedge_default=float(os.getenv('CRAWL_HEDGE_DEFAULT', '3')),
+            latency_source=latency_source,
+            http2=os.getenv('PROXY_HTTP2', 'false').lower() == 'true',
+            logger_name=logger_name
+        )
+
+    def run(self, items: Iterable, worker: Callable[["AsyncCrawlEngine", object], Awaitable]) -> List:
+        """
+        items 각각에 대해 worker(engine, item)를 동시에 실행하고 같은 순서로 결과 반환
+        (동기 코드에서 호출하는 진입점, 클라이언트는 다음 run()에서 재사용)
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self._run(list(items), worker))
+
+    def close(self):
+        """클라이언트와 이벤트 루프 종료 (크롤러 종료 시 한 번 호출)"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.run_until_complete(self.aclose())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _run(self, items: List, worker) -> List:
+        self._pace_lock = asyncio.Lock()
+        self._next_start = 0.0
+        task_slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(item):
+            async with task_slots:
+                return await worker(self, item)
+
+        return await asyncio.gather(*(run_one(item) for item in items))
+
+    async def fetch_first(self, urls: List[str],
+                          accept: Optional[Callable[[httpx.Response], bool]] = None) -> Tuple[Optional[httpx.Response], Optional[str]]:
+        """
+        URL 변형 중 먼저 도착한 사용 가능한 응답 반환 (프록시 우선, 모두 실패 시 직접 연결)
+
+        Args:
+            urls: 선호 순서의 URL 변형
+            accept: 200 응답 중 사용 가능한지 판단 (기본: 본문이 비어 있지 않음)
+
+        Returns:
+            (response, 'proxy' | 'direct') 또는 (None, None)
+        """
+        if self.proxy_manager:
+            response = await self._hedge(urls, self._fetch_via_proxies, accept)
+            if response is not None:
+                return response, 'proxy'
+
+            self.logger.info("Resetting failed proxies and retrying...")
+            self.proxy_manager.reset_failed_proxies()
+
+        response = await self._hedge(urls, self._fetch_direct, accept)
+        if response is not None:
+            return response, 'direct'
+
+        return None, None
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        다음 URL 변형을 시작하기 전 대기 시간 (초, 헤지 비활성이면 None = 끝날 때까지 대기)
+        latency_source -> 자체 관측 응답 시간 -> 기본값 순으로 분위 응답 시간 사용
+        """
+        if not self.hedge:
+            return None
+
+        delay = self.latency_source(self.hedge_quantile) if self.latency_source else 0.0
+        if not delay and self.latency.count >= self.HEDGE_MIN_SAMPLES:
+            delay = self.latency.percentile(self.hedge_quantile)
+        if not delay:
+            delay = self.hedge_default
+        return min(max(delay, self.HEDGE_MIN_DELAY), self.timeout)
+
+    async def fetch(self, url: str, proxy=None) -> httpx.Response:
+        """제한(전역 속도/호스트/프록시)을 지켜 요청 1건 실행"""
+        host = urllib.parse.urlsplit(url).netloc
+        host_slot = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+
+        async with host_slot:
+            await self._pace()
+            self._in_flight += 1
+            self.stats['requests'] += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self._in_flight)
+            connects = []
+
+            async def trace(event_name, info):
+                # httpcore 트레이스: 새 TCP 연결을 열 때만 connect_tcp 이벤트 발생
+                if event_name == 'connection.connect_tcp.complete':
+                    connects.append(event_name)
+
+            started = time.monotonic()
+            try:
+                response = await self._client_for(proxy).get(url, extensions={'trace': trace})
+            finally:
+                self._in_flight -= 1
+
+            elapsed = time.monotonic() - started
+            kind = 'new_connection' if connects else 'reused_connection'
+            self.stats[f'{kind}_requests'] += 1
+            self.stats[f'{kind}_time'] += elapsed
+            if response.status_code == 200:
+                self.latency.add(elapsed)
+            return response
+
+    async def aclose(self):
+        """프록시/직접 연결 클라이언트 모두 닫기"""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+        self._host_slots.clear()
+        self._proxy_slots.clear()
+
+    def get_stats(self) -> Dict:
+        """요청/헤지 통계와 커넥션 재사용 지표 (새 연결 요청과 재사용 요청의 평균 응답 시간 차이 = 핸드셰이크 절감 추정치)"""
+        stats = {**self.stats, 'clients': len(self._clients), 'http2': self.http2}
+        new_count = stats['new_connection_requests']
+        reused_count = stats['reused_connection_requests']
+
+        avg_new = stats['new_connection_time'] / new_count if new_count else 0.0
+        avg_reused = stats['reused_connection_time'] / reused_count if reused_count else 0.0
+        stats['avg_new_connection_ms'] = round(avg_new * 1000, 1)
+        stats['avg_reused_connection_ms'] = round(avg_reused * 1000, 1)
+        stats['handshake_savings_ms'] = round((avg_new - avg_reused) * 1000, 1) if new_count and reused_count else None
+        stats['reuse_rate'] = round(reused_count / (new_count + reused_count) * 100, 1) if new_count + reused_count else 0.0
+        return stats
+
+    # ---- 내부 처리 ----
+
+    async def _hedge(self, urls: List[str], attempt: Callable[[str], Awaitable[Optional[httpx.Response]]],
+                     accept: Optional[Callable[[httpx.Response], bool]]) -> Optional[httpx.Response]:
+        """
+        URL 변형 헤지 실행
+        - 첫 URL을 시작하고 hedge_delay 안에 응답이 없으면 다음 URL을 동시에 시작
+        - 시도가 실패로 끝나면 기다리지 않고 바로 다음 URL 시작
+        - 사용 가능한 응답이 오면 나머지 시도는 취소
+        """
+        pending: Dict[asyncio.Task, int] = {}
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            pending[asyncio.ensure_future(attempt(urls[next_index]))] = next_index
+            next_index += 1
+
+        launch()
+        try:
+            while pending:
+                delay = self.hedge_delay() if next_index < len(urls) else None
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    self.stats['hedges'] += 1
+                    self.logger.info(f"No response within {delay:.2f}s, hedging with {urls[next_index]}")
+                    launch()
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    response = task.result()
+                    if response is not None and (accept(response) if accept else bool(response.content)):
+                        if index > 0:
+                            self.stats['hedge_wins'] += 1
+                        return response
+
+                if next_index < len(urls):
+                    launch()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            self.stats['cancelled'] += len(pending)
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _fetch_via_proxies(self, url: str) -> Optional[httpx.Response]:
+        """활성 프록시 중 여유가 가장 많은 것부터 시도 (모든 프록시를 최대 2번)"""
+        max_attempts = len(self.proxy_manager.proxies) * 2
+
+        attempts = 0
+        while attempts < max_attempts:
+            proxy = self._pick_proxy()
+            if proxy is None:
+                # 모든 프록시가 쿨다운 중이면 이 요청만 가장 빠른 복귀 시각까지 대기
+                wait = self.proxy_manager.seconds_until_available()
+                if wait is None:
+                    self.logger.error("No active proxies available")
+                    return None
+                self.logger.info(f"All proxies cooling down, waiting {wait:.1f}s for {url}")
+                await asyncio.sleep(wait)
+                continue
+
+            attempts += 1
+            key = self._proxy_key(proxy)
+            slot = self._proxy_slots.setdefault(key, asyncio.Semaphore(self.per_proxy_limit))
+            started = time.time()
+            self._proxy_in_flight[key] = self._proxy_in_flight.get(key, 0) + 1
+            try:
+                async with slot:
+                    started = time.time()
+                    self.stats['proxy_requests'] += 1
+                    response = await self.fetch(url, proxy)
+            except httpx.HTTPError as e:
+                self.stats['failures'] += 1
+                self.logger.warning(f"Proxy request failed for {url} via {proxy.endpoint}: {e}")
+                self.proxy_manager.record_failure(proxy)
+                self._log_request(proxy, url, None, time.time() - started, False, str(e))
+                continue
+            finally:
+                self._proxy_in_flight[key] -= 1
+
+            success = response.status_code == 200
+            self._log_request(proxy, url, response.status_code, time.time() - started, success,
+                              None if success else f"HTTP {response.status_code}")
+            if success:
+                self.proxy_manager.record_success(proxy, time.time() - started)
+                return response
+
+            self.stats['failures'] += 1
+            self.proxy_manager.record_failure(proxy, response.status_code)
+
+        return None
+
+    async def _fetch_direct(self, url: str) -> Optional[httpx.Response]:
+        try:
+            self.stats['direct_requests'] += 1
+            response = await self.fetch(url)
+        except httpx.HTTPError as e:
+            self.stats['failures'] += 1
+            self.logger.warning(f"Direct request failed for {url}: {e}")
+            return None
+
+        if response.status_code == 200:
+            return response
+
+        self.stats['failures'] += 1
+        return None
+
+    def _pick_proxy(self):
+        """쿨다운이 끝난 활성 프록시 중 가중치 대비 진행 중 요청이 가장 적은 프록시 (건강한 프록시가 더 많이 받음)"""
+        active = self.proxy_manager.get_active_proxies()
+        if not active:
+            return None
+
+        def load(proxy):
+            in_flight = self._proxy_in_flight.get(self._proxy_key(proxy), 0)
+            return (in_flight + 1) / proxy_weight(proxy.success_rate, proxy.response_time), proxy.last_used or 0
+
+        return min(active, key=load)
+
+    async def _pace(self):
+        """요청 시작 시각을 min_interval 간격으로 배치 (전역 속도 제한)"""
+        if not self.min_interval:
+            return
+
+        async with self._pace_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self.min_interval
+
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    def _client_for(self, proxy) -> httpx.AsyncClient:
+        """프록시별 클라이언트 (keep-alive 커넥션 풀 재사용)"""
+        key = self._proxy_key(proxy) if proxy else 'direct'
+        client = self._clients.get(key)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.per_proxy_limit * 2 if proxy else self.max_concurrency * 2,
+                                  max_keepalive_connections=self.per_proxy_limit if proxy else self.max_concurrency)
+            proxy_url = self.proxy_manager.proxy_url(proxy) if proxy else None
+            transport = httpx.AsyncHTTPTransport(proxy=httpx.Proxy(proxy_url) if proxy_url else None, limits=limits,
+                                                 http2=self.http2)
+            client = httpx.AsyncClient(transport=transport, headers=self.headers, timeout=self.timeout,
+                                       follow_redirects=True)
+            self._clients[key] = client
+        return client
+
+    def _log_request(self, proxy, url, status_code, response_time, success, error_message):
+        if not self.request_logger:
+            return
+        self.request_logger(
+            proxy_endpoint=proxy.endpoint,
+            request_url=url,
+            status_code=status_code,
+            response_time=response_time,
+            success=success,
+            error_message=error_message,
+            session_id=proxy.session_id,
+            country=proxy.country
+        )
+
+    @staticmethod
+    def _proxy_key(proxy) -> str:
+        return f"{proxy.endpoint}#{proxy.session_id or ''}"
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Apollo State 추출 벤치마크
+- 저장된 naver_analysis_1.html로 기존 정규식 방식과 스트리밍 스캐너 비교
+- 처리 속도(MB/s)와 추출 결과 일치 여부 출력
+- 문자열 안에 '};'가 포함된 합성 페이지로 잘림 여부 확인
+- 전체 json.loads 디코딩과 선택적 디코딩(목록 엔티티만)의 CPU 시간/최대 메모리 비교
+
+사용법: python benchmark_apollo_extraction.py [html 파일] [반복 횟수]
+"""
+import os
+import re
+import sys
+import json
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from apollo_state import LIST_SUMMARY_PREFIX, decode_list_summaries, extract_apollo_json
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'naver_analysis_1.html')
+LEGACY_PATTERN = r'naver\.search\.ext\.nmb\.salt\.__APOLLO_STATE__\s*=\s*({.*?});'
+
+
+def extract_with_regex(page_source: str):
+    """기존 크롤러의 정규식 추출 방식"""
+    match = re.search(LEGACY_PATTERN, page_source, re.DOTALL)
+    return match.group(1) if match else None
+
+
+def measure(extract_fn, page_source: str, iterations: int):
+    """최소 소요 시간(초)과 마지막 결과 반환"""
+    best = float('inf')
+    result = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = extract_fn(page_source)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def decode_full(json_str: str):
+    """기존 방식: 전체 디코딩 후 모든 키를 순회해 목록 엔티티 수집"""
+    apollo_data = json.loads(json_str)
+    return [(key, value) for key, value in apollo_data.items() if key.startswith(LIST_SUMMARY_PREFIX)]
+
+
+def decode_selective(json_str: str):
+    """선택적 디코딩: 목록 엔티티와 ROOT_QUERY 순서만 디코딩"""
+    return decode_list_summaries(json_str).restaurants
+
+
+def peak_memory(decode_fn, json_str: str) -> int:
+    """디코딩 중 최대 할당 바이트"""
+    tracemalloc.start()
+    try:
+        decode_fn(json_str)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def is_valid_json(json_str) -> bool:
+    if json_str is None:
+        return False
+    try:
+        json.loads(json_str)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+def run_benchmark(html_path: str = DEFAULT_FIXTURE, iterations: int = 20):
+    """벤치마크 실행 및 결과 dict 반환"""
+    with open(html_path, 'r', encoding='utf-8') as f:
+        page_source = f.read()
+
+    page_mb = len(page_source.encode('utf-8')) / (1024 * 1024)
+    print(f"📄 {os.path.basename(html_path)}: {page_mb:.2f} MB, {iterations} iterations")
+    print("=" * 50)
+
+    results = {}
+    for label, extract_fn in [('regex', extract_with_regex), ('scanner', extract_apollo_json)]:
+        elapsed, json_str = measure(extract_fn, page_source, iterations)
+        results[label] = {
+            'ms': elapsed * 1000,
+            'mb_per_s': page_mb / elapsed if elapsed else float('inf'),
+            'length': len(json_str) if json_str else 0,
+            'valid_json': is_valid_json(json_str),
+            'json': json_str
+        }
+        print(f"{label:8s} {results[label]['ms']:8.3f} ms  {results[label]['mb_per_s']:8.1f} MB/s  "
+              f"length={results[label]['length']}  valid={results[label]['valid_json']}")
+
+    identical = (
+        results['regex']['valid_json'] and results['scanner']['valid_json'] and
+        json.loads(results['regex']['json']) == json.loads(results['scanner']['json'])
+    )
+    print(f"\n결과 일치: {'✅' if identical else '❌'}")
+    print(f"속도 향상: {results['regex']['ms'] / results['scanner']['ms']:.1f}x")
+
+    # 문자열 안의 '};' 처리 비교
+    tricky_page = (
+        '<script>naver.search.ext.nmb.salt.__APOLLO_STATE__ = '
+        '{"Restaurant:1":{"name":"세미콜론};식당","memo":"{\\"nested\\"}"}};'
+        'naver.search.ext.nmb.salt.__PLACE_STATE__ = {};</script>'
+    )
+    regex_ok = is_valid_json(extract_with_regex(tricky_page))
+    scanner_ok = is_valid_json(extract_apollo_json(tricky_page))
+    print(f"문자열 내 '}};' 처리 - regex: {'✅' if regex_ok else '❌ 잘림'}, scanner: {'✅' if scanner_ok else '❌ 잘림'}")
+
+    results['identical'] = identical
+    results['tricky'] = {'regex': regex_ok, 'scanner': scanner_ok}
+    results['decode'] = run_decode_benchmark(results['scanner']['json'], iterations)
+    return results
+
+
+def run_decode_benchmark(json_str: str, iterations: int = 20):
+    """전체 디코딩 vs 선택적 디코딩 비교"""
+    print(f"\n🧩 Apollo JSON 디코딩 ({len(json_str)} chars)")
+    print("=" * 50)
+
+    results = {}
+    for label, decode_fn in [('full', decode_full), ('selective', decode_selective)]:
+        elapsed, entries = measure(decode_fn, json_str, iterations)
+        results[label] = {
+            'ms': elapsed * 1000,
+            'peak_kb': peak_memory(decode_fn, json_str) / 1024,
+            'entries': entries
+        }
+        print(f"{label:10s} {results[label]['ms']:8.3f} ms  peak={results[label]['peak_kb']:8.1f} KB  "
+              f"entities={len(entries)}")
+
+    identical = results['full']['entries'] == results['selective']['entries']
+    print(f"\n결과 일치: {'✅' if identical else '❌'}")
+    print(f"CPU: {results['full']['ms'] / results['selective']['ms']:.1f}x, "
+          f"메모리: {results['full']['peak_kb'] / results['selective']['peak_kb']:.1f}x 감소")
+
+    results['identical'] = identical
+    return results
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURE
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    run_benchmark(path, count)
@@ -2,10 +2,14 @@ import requests
 import random
 import time
 import logging
+import threading
 from typing import List, Dict, Optional, Tuple
 import os
 from dataclasses import dataclass
 from enum import Enum
+from requests.adapters import HTTPAdapter
+
+from proxy_scheduler import ProxyScheduler, proxy_weight
 
 class ProxyStatus(Enum):
     ACTIVE = "active"
@@ -25,17 +29,42 @@ class ProxyConfig:
     fail_count: int = 0
     last_used: Optional[float] = None
     success_count: int = 0
+    available_after: float = 0.0  # 쿨다운 종료 시각 (time.time 기준)
+    success_rate: float = 1.0  # 성공률 이동 평균 (EWMA)
+    response_time: float = 0.0  # 최근 성공 응답 시간 (초)
 
 class BrightDataProxyManager:
     """Bright Data 프록시 풀 관리자"""
     
-    def __init__(self, config_list: List[Dict]):
+    def __init__(self, config_list: List[Dict], pool_size: Optional[int] = None, http2: Optional[bool] = None):
+        """
+        Args:
+            config_list: 프록시 설정 목록
+            pool_size: 프록시 세션별 커넥션 풀 크기 (기본 PROXY_POOL_SIZE 또는 10)
+            http2: True면 requests 대신 httpx HTTP/2 클라이언트 사용 (기본 PROXY_HTTP2 환경 변수, 없으면 false)
+        """
         self.logger = logging.getLogger("BrightDataProxyManager")
         self.proxies = []
         self.current_proxy_index = 0
         self.max_fail_count = 3
         self.rate_limit_delay = 60  # 1분
-        self.proxy_rotation_delay = 2  # 프록시 전환 시 2초 대기
+        self.proxy_rotation_delay = 2  # 실패한 프록시 쿨다운 2초
+        # 성공률/지연/쿨다운 가중치로 프록시 선택 (O(log n))
+        self.scheduler = ProxyScheduler()
+        
+        # 프록시별 세션 캐시 (커넥션 풀을 유지해 요청마다 TCP/TLS 핸드셰이크 반복 방지)
+        self.pool_size = pool_size if pool_size is not None else int(os.getenv('PROXY_POOL_SIZE', '10'))
+        self.http2 = http2 if http2 is not None else os.getenv('PROXY_HTTP2', 'false').lower() == 'true'
+        self._sessions: Dict[str, object] = {}
+        self._sessions_lock = threading.Lock()
+        self.connection_stats = {
+            'sessions_created': 0,
+            'sessions_invalidated': 0,
+            'new_connection_requests': 0,
+            'reused_connection_requests': 0,
+            'new_connection_time': 0.0,
+            'reused_connection_time': 0.0,
+        }
         
         # Bright Data 설정 로드
         self._load_proxy_configs(config_list)
@@ -52,22 +81,64 @@ class BrightDataProxyManager:
                     country=config.get('country', 'KR')
                 )
                 self.proxies.append(proxy_config)
+                self.scheduler.add(self._session_key(proxy_config), proxy_config)
                 self.logger.info(f"Loaded proxy: {proxy_config.endpoint}")
             except Exception as e:
                 self.logger.error(f"Failed to load proxy config: {e}")
     
-    def get_active_proxy(self) -> Optional[ProxyConfig]:
-        """사용 가능한 프록시 반환"""
-        active_proxies = [p for p in self.proxies if p.status == ProxyStatus.ACTIVE]
+    def get_active_proxies(self) -> List[ProxyConfig]:
+        """지금 바로 쓸 수 있는 프록시 목록 (ACTIVE이고 쿨다운이 끝난 프록시)"""
+        now = time.time()
+        
+        # 쿨다운이 끝난 RATE_LIMITED 프록시는 자동 복귀
+        for proxy in self.proxies:
+            if proxy.status == ProxyStatus.RATE_LIMITED and proxy.available_after <= now:
+                proxy.status = ProxyStatus.ACTIVE
+                self.logger.info(f"Proxy {proxy.endpoint} cooldown finished")
         
-        if not active_proxies:
-            self.logger.warning("No active proxies available")
+        return [p for p in self.proxies if p.status == ProxyStatus.ACTIVE and p.available_after <= now]
+    
+    def cool_down(self, proxy: ProxyConfig, seconds: float):
+        """프록시만 seconds 동안 쉬게 함 (다른 프록시 요청은 대기 없이 계속)"""
+        proxy.available_after = max(proxy.available_after, time.time() + seconds)
+        self._reschedule(proxy)
+    
+    def _reschedule(self, proxy: ProxyConfig):
+        """상태/성공률/쿨다운 변경을 스케줄러에 반영 (FAILED/BANNED는 선택 제외)"""
+        recoverable = proxy.status in (ProxyStatus.ACTIVE, ProxyStatus.RATE_LIMITED)
+        weight = proxy_weight(proxy.success_rate, proxy.response_time) if recoverable else 0.0
+        self.scheduler.update(self._session_key(proxy), weight=weight, available_at=proxy.available_after)
+    
+    def seconds_until_available(self) -> Optional[float]:
+        """
+        가장 빨리 쿨다운이 끝나는 프록시까지 남은 시간 (초)
+        쓸 수 있는 프록시가 있으면 0, 쿨다운으로 복귀할 프록시가 없으면(모두 FAILED/BANNED) None
+        """
+        recoverable = [p.available_after for p in self.proxies
+                       if p.status in (ProxyStatus.ACTIVE, ProxyStatus.RATE_LIMITED)]
+        if not recoverable:
             return None
+        return max(0.0, min(recoverable) - time.time())
+    
+    def get_active_proxy(self) -> Optional[ProxyConfig]:
+        """사용 가능한 프록시 반환 (성공률이 높고 빠른 프록시일수록 자주 선택)"""
+        for _ in range(len(self.proxies)):
+            proxy = self.scheduler.acquire()
+            if proxy is None:
+                break
+            
+            now = time.time()
+            if proxy.status == ProxyStatus.RATE_LIMITED and proxy.available_after <= now:
+                proxy.status = ProxyStatus.ACTIVE
+                self.logger.info(f"Proxy {proxy.endpoint} cooldown finished")
+            if proxy.status == ProxyStatus.ACTIVE and proxy.available_after <= now:
+                return proxy
             
-        # 로드 밸런싱: 사용 빈도가 낮은 프록시 우선 선택
-        active_proxies.sort(key=lambda p: (p.success_count, p.last_used or 0))
+            # 스케줄러를 거치지 않은 상태 변경은 다시 반영하고 재선택
+            self._reschedule(proxy)
         
-        return active_proxies[0]
+        self.logger.warning("No active proxies available")
+        return None
     
     def get_next_proxy(self) -> Optional[ProxyConfig]:
         """다음 프록시로 로테이션"""
@@ -84,16 +155,44 @@ class BrightDataProxyManager:
             
         return proxy
     
+    def get_session(self, proxy_config: ProxyConfig):
+        """프록시별로 캐시된 세션 반환 (없으면 생성, keep-alive 커넥션 재사용)"""
+        key = self._session_key(proxy_config)
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._create_http2_client(proxy_config) if self.http2 else self.create_session(proxy_config)
+                self._sessions[key] = session
+                self.connection_stats['sessions_created'] += 1
+        return session
+    
+    def invalidate_session(self, proxy_config: ProxyConfig):
+        """캐시된 세션을 닫고 제거 (다음 요청에서 새 커넥션으로 시작)"""
+        with self._sessions_lock:
+            session = self._sessions.pop(self._session_key(proxy_config), None)
+        if session is not None:
+            session.close()
+            self.connection_stats['sessions_invalidated'] += 1
+            self.logger.info(f"Invalidated session for proxy {proxy_config.endpoint}")
+    
+    def close(self):
+        """모든 캐시 세션 종료"""
+        with self._sessions_lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+    
     def create_session(self, proxy_config: ProxyConfig) -> requests.Session:
         """프록시를 사용하는 requests 세션 생성"""
         session = requests.Session()
         
-        # Bright Data 프록시 설정
-        proxy_url = f"http://{proxy_config.username}:{proxy_config.password}@{proxy_config.endpoint}"
+        # 같은 호스트(네이버) 요청이 커넥션을 재사용하도록 풀 크기 설정
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
         
-        # 세션 ID가 있으면 추가
-        if proxy_config.session_id:
-            proxy_url = f"http://{proxy_config.username}-session-{proxy_config.session_id}:{proxy_config.password}@{proxy_config.endpoint}"
+        # Bright Data 프록시 설정
+        proxy_url = self.proxy_url(proxy_config)
         
         session.proxies = {
             'http': proxy_url,
@@ -113,6 +212,76 @@ class BrightDataProxyManager:
         
         return session
     
+    def _create_http2_client(self, proxy_config: ProxyConfig):
+        """HTTP/2 httpx 클라이언트 (네이버 연결 하나에서 요청 다중화)"""
+        import httpx
+        
+        transport = httpx.HTTPTransport(
+            proxy=httpx.Proxy(self.proxy_url(proxy_config)),
+            http2=True,
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        )
+        template = self.create_session(proxy_config)
+        headers = dict(template.headers)
+        template.close()
+        return httpx.Client(transport=transport, headers=headers, follow_redirects=True)
+    
+    @staticmethod
+    def _session_key(proxy_config: ProxyConfig) -> str:
+        return f"{proxy_config.endpoint}#{proxy_config.session_id or ''}"
+    
+    @staticmethod
+    def _connection_count(session) -> Optional[int]:
+        """세션이 지금까지 연 TCP 연결 수 (urllib3 풀 기준, httpx 클라이언트면 None)"""
+        adapters = getattr(session, 'adapters', None)
+        if adapters is None:
+            return None
+        
+        total = 0
+        for adapter in set(adapters.values()):
+            for manager in [adapter.poolmanager, *adapter.proxy_manager.values()]:
+                for key in manager.pools.keys():
+                    pool = manager.pools.get(key)
+                    if pool is not None:
+                        total += pool.num_connections
+        return total
+    
+    def _record_connection(self, opened_before: Optional[int], session, elapsed: float):
+        """요청이 새 연결을 열었는지(핸드셰이크 발생) 재사용했는지 기록"""
+        if opened_before is None:
+            return
+        if self._connection_count(session) > opened_before:
+            self.connection_stats['new_connection_requests'] += 1
+            self.connection_stats['new_connection_time'] += elapsed
+        else:
+            self.connection_stats['reused_connection_requests'] += 1
+            self.connection_stats['reused_connection_time'] += elapsed
+    
+    def get_connection_stats(self) -> Dict:
+        """
+        커넥션 재사용 지표
+        - new/reused 요청별 평균 응답 시간과 그 차이(핸드셰이크 절감 추정치, ms)
+        """
+        stats = dict(self.connection_stats)
+        new_count = stats['new_connection_requests']
+        reused_count = stats['reused_connection_requests']
+        
+        avg_new = stats['new_connection_time'] / new_count if new_count else 0.0
+        avg_reused = stats['reused_connection_time'] / reused_count if reused_count else 0.0
+        stats['avg_new_connection_ms'] = round(avg_new * 1000, 1)
+        stats['avg_reused_connection_ms'] = round(avg_reused * 1000, 1)
+        stats['handshake_savings_ms'] = round((avg_new - avg_reused) * 1000, 1) if new_count and reused_count else None
+        stats['reuse_rate'] = round(reused_count / (new_count + reused_count) * 100, 1) if new_count + reused_count else 0.0
+        stats['cached_sessions'] = len(self._sessions)
+        return stats
+    
+    def proxy_url(self, proxy_config: ProxyConfig) -> str:
+        """인증 정보를 포함한 프록시 URL (세션 ID가 있으면 username에 추가)"""
+        username = proxy_config.username
+        if proxy_config.session_id:
+            username = f"{username}-session-{proxy_config.session_id}"
+        return f"http://{username}:{proxy_config.password}@{proxy_config.endpoint}"
+    
     def _get_random_user_agent(self) -> str:
         """랜덤 User-Agent 반환"""
         user_agents = [
@@ -136,11 +305,20 @@ class BrightDataProxyManager:
         for attempt in range(max_retries):
             proxy = self.get_active_proxy()
             if not proxy:
-                self.logger.error("No active proxies available")
-                break
+                # 모든 프록시가 쿨다운 중일 때만 가장 빠른 복귀 시각까지 대기
+                wait = self.seconds_until_available()
+                if wait is None:
+                    self.logger.error("No active proxies available")
+                    break
+                
+                self.logger.info(f"All proxies cooling down, waiting {wait:.1f}s")
+                time.sleep(wait)
+                proxy = self.get_active_proxy()
+                if not proxy:
+                    break
                 
             try:
-                session = self.create_session(proxy)
+                session = self.get_session(proxy)
                 
                 # 요청 실행
                 self.logger.info(f"Making request to {url} via proxy {proxy.endpoint}")
@@ -148,61 +326,83 @@ class BrightDataProxyManager:
                 # 타임아웃 설정
                 kwargs.setdefault('timeout', 30)
                 
+                opened_before = self._connection_count(session)
+                started = time.perf_counter()
                 if method.upper() == 'GET':
                     response = session.get(url, **kwargs)
                 elif method.upper() == 'POST':
                     response = session.post(url, **kwargs)
                 else:
                     raise ValueError(f"Unsupported method: {method}")
+                self._record_connection(opened_before, session, time.perf_counter() - started)
                 
                 # 성공적인 요청 처리
                 if response.status_code == 200:
-                    proxy.success_count += 1
-                    proxy.last_used = time.time()
-                    proxy.fail_count = 0  # 성공 시 실패 카운트 리셋
-                    
+                    self.record_success(proxy, response.elapsed.total_seconds())
                     self.logger.info(f"Request successful via proxy {proxy.endpoint}")
                     return response, proxy
                 
-                # 상태 코드별 처리
-                elif response.status_code == 429:  # Rate Limited
-                    self.logger.warning(f"Rate limited on proxy {proxy.endpoint}")
-                    proxy.status = ProxyStatus.RATE_LIMITED
-                    time.sleep(self.rate_limit_delay)
-                    
-                elif response.status_code in [403, 404, 503]:  # Potentially banned
-                    self.logger.warning(f"Proxy {proxy.endpoint} may be banned (status: {response.status_code})")
-                    self._mark_proxy_failed(proxy)
-                    
-                else:
-                    self.logger.warning(f"Unexpected status code {response.status_code} from proxy {proxy.endpoint}")
-                    self._mark_proxy_failed(proxy)
+                # 상태 코드별 처리 (대기 대신 해당 프록시에 쿨다운 기록)
+                self.record_failure(proxy, response.status_code)
                     
             except requests.exceptions.ProxyError as e:
                 self.logger.error(f"Proxy error with {proxy.endpoint}: {e}")
-                self._mark_proxy_failed(proxy)
+                self.record_failure(proxy)
                 
             except requests.exceptions.Timeout as e:
                 self.logger.error(f"Timeout with proxy {proxy.endpoint}: {e}")
-                self._mark_proxy_failed(proxy)
+                self.record_failure(proxy)
                 
             except Exception as e:
                 self.logger.error(f"Unexpected error with proxy {proxy.endpoint}: {e}")
-                self._mark_proxy_failed(proxy)
-            
-            # 프록시 전환 시 잠시 대기
-            time.sleep(self.proxy_rotation_delay)
+                self.record_failure(proxy)
         
         self.logger.error("All proxy attempts failed")
         return None, None
     
+    def record_success(self, proxy: ProxyConfig, response_time: Optional[float] = None):
+        """성공 기록 (실패 카운트 리셋, 성공률/응답 시간 갱신)"""
+        proxy.success_count += 1
+        proxy.last_used = time.time()
+        proxy.fail_count = 0
+        proxy.success_rate = proxy.success_rate * 0.9 + 0.1
+        if response_time is not None:
+            proxy.response_time = response_time
+        self._reschedule(proxy)
+    
+    def record_failure(self, proxy: ProxyConfig, status_code: Optional[int] = None):
+        """
+        실패 기록 (429는 RATE_LIMITED + rate_limit_delay 쿨다운, 그 외는 실패 카운트 증가)
+        status_code가 None이면 연결 오류/타임아웃
+        """
+        proxy.success_rate = proxy.success_rate * 0.9
+        
+        if status_code is None:
+            self._mark_proxy_failed(proxy)
+        elif status_code == 429:  # Rate Limited
+            self.logger.warning(f"Rate limited on proxy {proxy.endpoint}, cooling down {self.rate_limit_delay}s")
+            proxy.status = ProxyStatus.RATE_LIMITED
+            self.cool_down(proxy, self.rate_limit_delay)
+        elif status_code in [403, 404, 503]:  # Potentially banned
+            self.logger.warning(f"Proxy {proxy.endpoint} may be banned (status: {status_code})")
+            self._mark_proxy_failed(proxy)
+        else:
+            self.logger.warning(f"Unexpected status code {status_code} from proxy {proxy.endpoint}")
+            self._mark_proxy_failed(proxy)
+        
+        self._reschedule(proxy)
+    
     def _mark_proxy_failed(self, proxy: ProxyConfig):
         """프록시 실패 처리"""
         proxy.fail_count += 1
+        # 실패한 프록시만 잠시 제외 (전체 크롤러는 다른 프록시로 계속 진행)
+        self.cool_down(proxy, self.proxy_rotation_delay)
         
         if proxy.fail_count >= self.max_fail_count:
             proxy.status = ProxyStatus.FAILED
             self.logger.warning(f"Proxy {proxy.endpoint} marked as failed after {proxy.fail_count} failures")
+            # 끊겼거나 차단된 커넥션을 재사용하지 않도록 세션 폐기
+            self.invalidate_session(proxy)
         
     def reset_failed_proxies(self):
         """실패한 프록시들을 다시 활성화"""
@@ -210,6 +410,7 @@ class BrightDataProxyManager:
             if proxy.status in [ProxyStatus.FAILED, ProxyStatus.RATE_LIMITED]:
                 proxy.status = ProxyStatus.ACTIVE
                 proxy.fail_count = 0
+                self._reschedule(proxy)
                 self.logger.info(f"Reset proxy: {proxy.endpoint}")
     
     def get_proxy_stats(self) -> Dict:
@@ -219,7 +420,8 @@ class BrightDataProxyManager:
             'active': len([p for p in self.proxies if p.status == ProxyStatus.ACTIVE]),
             'failed': len([p for p in self.proxies if p.status == ProxyStatus.FAILED]),
             'rate_limited': len([p for p in self.proxies if p.status == ProxyStatus.RATE_LIMITED]),
-            'banned': len([p for p in self.proxies if p.status == ProxyStatus.BANNED])
+            'banned': len([p for p in self.proxies if p.status == ProxyStatus.BANNED]),
+            'cooling_down': len([p for p in self.proxies if p.available_after > time.time()])
         }
         
         # 각 프록시별 상세 정보
@@ -230,10 +432,12 @@ class BrightDataProxyManager:
                 'status': proxy.status.value,
                 'success_count': proxy.success_count,
                 'fail_count': proxy.fail_count,
-                'last_used': proxy.last_used
+                'last_used': proxy.last_used,
+                'available_in': max(0.0, proxy.available_after - time.time())
             })
         
         stats['proxies'] = proxy_details
+        stats['connections'] = self.get_connection_stats()
         return stats
 
 def create_bright_data_proxy_manager():
@@ -15,13 +15,22 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from supabase import create_client, Client
+from dom_access import DomAccess, SCROLL_STATUS_LOADED
 
 class CIDEnhancedNaverCrawler:
     """CID 기반 정확한 매칭을 지원하는 네이버 플레이스 크롤러"""
     
+    # 플레이스 아이템 선택자 (가이드 문서 선택자 + 대안 선택자)
+    PLACE_ITEM_SELECTORS = [
+        'li[data-nclick*="plc"]',
+        'li[data-place-id]',
+        '.place_list li',
+        'ul.list_place li',
+        '.search_list_item'
+    ]
+    
     def __init__(self, headless=True, delay_range=(2, 5)):
         self.delay_range = delay_range
         self.logger = self._setup_logging()
@@ -228,21 +237,7 @@ class CIDEnhancedNaverCrawler:
         
         while current_rank <= max_depth and scroll_attempts < max_scroll_attempts:
             # 현재 로드된 플레이스 아이템들 가져오기 (가이드 문서 선택자)
-            place_items = self.driver.find_elements(By.CSS_SELECTOR, 'li[data-nclick*="plc"]')
-            
-            if not place_items:
-                # 대안 선택자들
-                alternative_selectors = [
-                    'li[data-place-id]',
-                    '.place_list li',
-                    'ul.list_place li',
-                    '.search_list_item'
-                ]
-                
-                for selector in alternative_selectors:
-                    place_items = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if place_items:
-                        break
+            place_items = DomAccess(self.driver).find_all(self.PLACE_ITEM_SELECTORS)
             
             if not place_items:
                 self.logger.warning("No place items found")
@@ -325,15 +320,13 @@ class CIDEnhancedNaverCrawler:
     
     def _scroll_for_more_results(self) -> bool:
         """
-        페이지 스크롤하여 더 많은 결과 로드 (가이드 문서 방식)
+        페이지 스크롤하여 더 많은 결과 로드
+        (고정 3초 대기 대신 새 아이템 추가/목록 끝 표시를 MutationObserver로 감지)
         """
         try:
-            # ActionChains를 사용한 모바일 스크롤 (가이드 문서 구현)
-            actions = ActionChains(self.driver)
-            actions.scroll_by_amount(200, 20000).perform()  # 시작점에서 20000px 아래로 스크롤
-            
-            time.sleep(3)  # 로딩 대기
-            return True
+            outcome = DomAccess(self.driver).scroll_and_wait(self.PLACE_ITEM_SELECTORS, timeout=10)
+            self.logger.debug(f"Scroll {outcome['status']}: {outcome['before']} -> {outcome['after']} items in {outcome['elapsed_ms']} ms")
+            return outcome['status'] == SCROLL_STATUS_LOADED
             
         except Exception as e:
             self.logger.debug(f"Scroll failed: {e}")
@@ -414,8 +407,9 @@ class CIDEnhancedNaverCrawler:
                 if len(places_data) >= max_results:
                     break
                     
-                # 다음 페이지 로드를 위한 스크롤
-                self._scroll_for_more_results()
+                # 다음 페이지 로드를 위한 스크롤 (새 아이템이 없으면 종료)
+                if not self._scroll_for_more_results():
+                    break
             
             self.logger.info(f"Extracted {len(places_data)} places with CIDs")
             return places_data
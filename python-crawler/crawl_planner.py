@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+키워드 단위 크롤링 플래너
+- 동일한 검색 키워드를 공유하는 tracked_places를 하나의 그룹으로 묶음
+- 키워드당 SERP를 한 번만 요청하고 그 결과 목록으로 그룹 내 모든 플레이스 순위 산출
+- 일일 요청 한도(450)와 CAPTCHA 부담을 줄이기 위한 요청 수 절감
+"""
+import re
+import logging
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+from place_matcher import first_match_indices
+
+logger = logging.getLogger("CrawlPlanner")
+
+
+@dataclass
+class KeywordGroup:
+    """정규화된 키워드 하나에 묶인 추적 플레이스 그룹"""
+    keyword: str
+    normalized_keyword: str
+    places: List[Dict] = field(default_factory=list)
+
+    @property
+    def place_names(self) -> List[str]:
+        return [place['place_name'] for place in self.places]
+
+
+def normalize_keyword(keyword: str) -> str:
+    """키워드 정규화 (유니코드 NFC, 연속 공백 축약, 소문자 변환)"""
+    if not keyword:
+        return ''
+
+    normalized = unicodedata.normalize('NFC', keyword)
+    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    return normalized.lower()
+
+
+def plan_keyword_groups(tracked_places: List[Dict]) -> List[KeywordGroup]:
+    """
+    활성 tracked_places를 정규화된 키워드 기준으로 그룹화
+
+    그룹 순서와 그룹 내 플레이스 순서는 DB 조회 순서(최초 등장 순서)를 유지한다.
+    """
+    groups: Dict[str, KeywordGroup] = {}
+
+    for place in tracked_places:
+        keyword = place.get('search_keyword') or ''
+        normalized = normalize_keyword(keyword)
+
+        if not normalized:
+            logger.warning(f"Skipping tracked place without keyword: {place.get('id')}")
+            continue
+
+        group = groups.get(normalized)
+        if group is None:
+            group = KeywordGroup(keyword=keyword.strip(), normalized_keyword=normalized)
+            groups[normalized] = group
+
+        group.places.append(place)
+
+    return list(groups.values())
+
+
+def summarize_plan(groups: List[KeywordGroup]) -> Dict:
+    """플랜 요약 (요청 절감량 포함)"""
+    total_places = sum(len(group.places) for group in groups)
+
+    return {
+        'total_places': total_places,
+        'keyword_groups': len(groups),
+        'requests_saved': total_places - len(groups),
+        'largest_group': max((len(group.places) for group in groups), default=0)
+    }
+
+
+def rank_targets_in_list(
+    found_names: List[str],
+    target_names: List[str],
+    match_fn: Callable[[str, str], bool],
+    max_rank: int = 50
+) -> List[int]:
+    """
+    하나의 SERP 결과 목록에서 여러 대상의 순위를 산출
+
+    Args:
+        found_names: 광고를 제외한 순서대로의 플레이스명 목록
+        target_names: 찾을 플레이스명 목록
+        match_fn: (target_name, found_name) -> bool 매칭 함수
+        max_rank: 최대 검색 순위
+
+    Returns:
+        List[int]: target_names와 같은 순서의 순위 (찾지 못하면 -1)
+    """
+    indices = first_match_indices(found_names, target_names, match_fn, max_rank)
+    return [index + 1 if index >= 0 else -1 for index in indices]
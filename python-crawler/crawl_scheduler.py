@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+일일 예산 기반 우선순위 크롤링 스케줄러
+- 키워드 그룹(검색 1회)마다 가치 점수를 매겨 우선순위 큐 구성
+- 점수: 마지막 성공 순위 이후 경과 시간, 최근 순위 변동폭, period_end 임박도, 지난 실행 실패 여부
+- 남은 요청 예산(페이지 로드 단위)을 검색 1회의 예상 페이지 로드 수로 나눈 만큼 점수가 높은 검색부터 배정하고
+  나머지는 다음 실행으로 미룸
+- 배정한 검색마다 예상 완료 시각(ETA) 계산
+"""
+import os
+import heapq
+import logging
+import statistics
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from crawl_planner import KeywordGroup
+
+logger = logging.getLogger("CrawlScheduler")
+
+
+@dataclass
+class PlaceHistory:
+    """플레이스 하나의 최근 크롤링 이력"""
+    last_success: Optional[datetime] = None
+    ranks: List[int] = field(default_factory=list)  # 최신순
+    last_failed: bool = False
+
+
+@dataclass
+class ScheduledSearch:
+    """우선순위가 매겨진 키워드 검색 1회"""
+    group: KeywordGroup
+    priority: float
+    components: Dict[str, float]
+    eta: Optional[datetime] = None
+
+
+@dataclass
+class CrawlPlan:
+    """예산 안에서 실행할 검색(scheduled)과 미룬 검색(deferred)"""
+    scheduled: List[ScheduledSearch]
+    deferred: List[ScheduledSearch]
+    budget: int
+    seconds_per_search: float
+    created_at: datetime
+    loads_per_search: float = 1.0
+
+    @property
+    def estimated_completion(self) -> Optional[datetime]:
+        return self.scheduled[-1].eta if self.scheduled else None
+
+    def summary(self) -> Dict:
+        completion = self.estimated_completion
+        return {
+            'budget': self.budget,
+            'loads_per_search': round(self.loads_per_search, 2),
+            'scheduled': len(self.scheduled),
+            'deferred': len(self.deferred),
+            'places_covered': sum(len(item.group.places) for item in self.scheduled),
+            'places_deferred': sum(len(item.group.places) for item in self.deferred),
+            'seconds_per_search': round(self.seconds_per_search, 1),
+            'estimated_completion': completion.isoformat() if completion else None,
+        }
+
+
+def parse_time(value) -> Optional[datetime]:
+    """Supabase 타임스탬프 문자열을 aware datetime으로 (시간대가 없으면 UTC로 간주)"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def build_place_histories(rankings: Iterable[Dict], crawler_results: Iterable[Dict] = (),
+                          max_ranks: int = 10) -> Dict[str, PlaceHistory]:
+    """
+    rankings / crawler_results 행으로 플레이스별 이력 구성
+
+    rankings는 성공한 순위만 있으므로 마지막 성공 시각과 순위 변동에 사용하고,
+    crawler_results의 가장 최근 행으로 지난 실행 실패 여부를 판단한다.
+    """
+    histories: Dict[str, PlaceHistory] = {}
+
+    ranked = sorted(
+        (row for row in rankings if row.get('tracked_place_id') and parse_time(row.get('checked_at'))),
+        key=lambda row: parse_time(row['checked_at']),
+        reverse=True,
+    )
+    for row in ranked:
+        history = histories.setdefault(row['tracked_place_id'], PlaceHistory())
+        if history.last_success is None:
+            history.last_success = parse_time(row['checked_at'])
+        if len(history.ranks) < max_ranks and row.get('rank') is not None:
+            history.ranks.append(row['rank'])
+
+    latest: Dict[str, Dict] = {}
+    for row in crawler_results:
+        place_id = row.get('tracked_place_id')
+        crawled_at = parse_time(row.get('crawled_at'))
+        if not place_id or crawled_at is None:
+            continue
+        if place_id not in latest or crawled_at > parse_time(latest[place_id]['crawled_at']):
+            latest[place_id] = row
+
+    for place_id, row in latest.items():
+        histories.setdefault(place_id, PlaceHistory()).last_failed = not row.get('success', False)
+
+    return histories
+
+
+class CrawlScheduler:
+    """키워드 그룹 우선순위 큐로 남은 일일 예산 배분"""
+
+    def __init__(self, staleness_weight: float = 1.0, volatility_weight: float = 0.5,
+                 deadline_weight: float = 0.5, failure_weight: float = 0.75,
+                 staleness_horizon: float = 24.0, deadline_horizon: float = 7.0,
+                 max_rank: int = 50, search_seconds: float = 15.0, loads_per_search: float = 1.0):
+        """
+        Args:
+            *_weight: 각 점수 항목 가중치
+            staleness_horizon: 이 시간(시간 단위)이 지나면 경과 점수 1 (최대 3)
+            deadline_horizon: period_end까지 이 일수 이내면 임박도 점수 부여
+            max_rank: 순위권 밖(-1) 결과를 max_rank + 1위로 보고 변동폭 계산
+            search_seconds: 페이지 로드 1회의 로딩/파싱 예상 시간(초), 요청 간격에 더해 ETA 계산
+            loads_per_search: 검색 1회가 원장에서 차감하는 예상 페이지 로드 수
+                (검색 페이지 + 플레이스 목록 이동/직접 URL 시도, 1 이상)
+        """
+        self.weights = {
+            'staleness': staleness_weight,
+            'volatility': volatility_weight,
+            'deadline': deadline_weight,
+            'failure': failure_weight,
+        }
+        self.staleness_horizon = staleness_horizon
+        self.deadline_horizon = deadline_horizon
+        self.max_rank = max_rank
+        self.search_seconds = search_seconds
+        self.loads_per_search = max(1.0, loads_per_search)
+
+    @classmethod
+    def from_env(cls) -> "CrawlScheduler":
+        """
+        환경 변수로 생성
+
+        SCHEDULE_STALENESS_WEIGHT, SCHEDULE_VOLATILITY_WEIGHT, SCHEDULE_DEADLINE_WEIGHT,
+        SCHEDULE_FAILURE_WEIGHT, SCHEDULE_STALENESS_HOURS, SCHEDULE_DEADLINE_DAYS, CRAWL_SEARCH_SECONDS,
+        CRAWL_LOADS_PER_SEARCH (기본 2: Selenium 검색은 검색 페이지와 플레이스 목록 이동을 함께 차감)
+        """
+        return cls(
+            staleness_weight=float(os.getenv('SCHEDULE_STALENESS_WEIGHT', '1.0')),
+            volatility_weight=float(os.getenv('SCHEDULE_VOLATILITY_WEIGHT', '0.5')),
+            deadline_weight=float(os.getenv('SCHEDULE_DEADLINE_WEIGHT', '0.5')),
+            failure_weight=float(os.getenv('SCHEDULE_FAILURE_WEIGHT', '0.75')),
+            staleness_horizon=float(os.getenv('SCHEDULE_STALENESS_HOURS', '24')),
+            deadline_horizon=float(os.getenv('SCHEDULE_DEADLINE_DAYS', '7')),
+            search_seconds=float(os.getenv('CRAWL_SEARCH_SECONDS', '15')),
+            loads_per_search=float(os.getenv('CRAWL_LOADS_PER_SEARCH', '2')),
+        )
+
+    def place_components(self, place: Dict, history: Optional[PlaceHistory],
+                         now: datetime) -> Dict[str, float]:
+        """플레이스 하나의 항목별 점수 (각 0~1, 경과 시간만 최대 3)"""
+        history = history or PlaceHistory()
+
+        # 경과 시간: 한 번도 성공하지 못했으면 최대
+        if history.last_success is None:
+            staleness = 3.0
+        else:
+            hours = max((now - history.last_success).total_seconds() / 3600, 0.0)
+            staleness = min(hours / self.staleness_horizon, 3.0)
+
+        # 변동폭: 최근 순위 표준편차 s를 s / (s + 5)로 0~1에 매핑
+        ranks = [rank if rank and rank > 0 else self.max_rank + 1 for rank in history.ranks]
+        spread = statistics.pstdev(ranks) if len(ranks) >= 2 else 0.0
+        volatility = spread / (spread + 5.0)
+
+        # period_end 임박도: 마감 당일 1, deadline_horizon일 이전부터 선형 증가, 지난 기간은 0
+        deadline = 0.0
+        period_end = place.get('period_end')
+        if period_end:
+            try:
+                end = period_end if isinstance(period_end, date) else date.fromisoformat(str(period_end)[:10])
+                days_left = (end - now.date()).days
+                if 0 <= days_left <= self.deadline_horizon:
+                    deadline = 1.0 - days_left / (self.deadline_horizon + 1)
+            except ValueError:
+                logger.warning(f"Invalid period_end for tracked place {place.get('id')}: {period_end}")
+
+        return {
+            'staleness': staleness,
+            'volatility': volatility,
+            'deadline': deadline,
+            'failure': 1.0 if history.last_failed else 0.0,
+        }
+
+    def score_group(self, group: KeywordGroup, histories: Dict[str, PlaceHistory],
+                    now: datetime) -> ScheduledSearch:
+        """검색 1회로 그룹 내 모든 플레이스가 갱신되므로 플레이스 점수의 합을 그룹 점수로 사용"""
+        components = {name: 0.0 for name in self.weights}
+        for place in group.places:
+            for name, value in self.place_components(place, histories.get(place.get('id')), now).items():
+                components[name] += value
+
+        priority = sum(self.weights[name] * value for name, value in components.items())
+        return ScheduledSearch(group=group, priority=priority,
+                               components={name: round(value, 3) for name, value in components.items()})
+
+    def plan(self, groups: List[KeywordGroup], histories: Dict[str, PlaceHistory], budget: int,
+             request_interval: float = 0.0, now: Optional[datetime] = None) -> CrawlPlan:
+        """
+        점수가 높은 그룹부터 budget // loads_per_search개 배정 (동점이면 기존 DB 순서)
+
+        Args:
+            budget: 남은 요청 예산 (원장과 같은 페이지 로드 단위)
+            request_interval: 요청 사이 평균 대기 시간(초), search_seconds와 합쳐 페이지 로드 1회 소요 시간으로 사용
+        """
+        now = now or datetime.now(timezone.utc)
+        # 페이지 로드마다 요청 간격 대기와 로딩/파싱이 반복됨
+        seconds_per_search = (max(request_interval, 0.0) + self.search_seconds) * self.loads_per_search
+        searches = int(max(budget, 0) // self.loads_per_search)
+
+        queue = [(-item.priority, order, item)
+                 for order, item in enumerate(self.score_group(group, histories, now) for group in groups)]
+        heapq.heapify(queue)
+
+        scheduled: List[ScheduledSearch] = []
+        while queue and len(scheduled) < searches:
+            item = heapq.heappop(queue)[2]
+            item.eta = now + timedelta(seconds=seconds_per_search * (len(scheduled) + 1))
+            scheduled.append(item)
+
+        deferred = [heapq.heappop(queue)[2] for _ in range(len(queue))]
+        return CrawlPlan(scheduled=scheduled, deferred=deferred, budget=budget,
+                         seconds_per_search=seconds_per_search, created_at=now,
+                         loads_per_search=self.loads_per_search)
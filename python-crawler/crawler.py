@@ -5,14 +5,16 @@ import json
 import time
 import random
 import os
-import logging
+import asyncio
 from supabase import create_client, Client
+from supabase_bulk_writer import SupabaseBulkWriter
+from crawl_planner import plan_keyword_groups, rank_targets_in_list, summarize_plan
+from async_crawl_engine import AsyncCrawlEngine
 
 class NaverPlaceCrawler:
     """네이버 플레이스 모바일 크롤러 - iframe 방식 사용"""
     
     def __init__(self):
-        self.logger = logging.getLogger("NaverPlaceCrawler")
         # 모바일 User-Agent 사용
         self.headers = {
             "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1",
@@ -28,6 +30,8 @@ class NaverPlaceCrawler:
         else:
             self.supabase = None
             print("Warning: Supabase credentials not found")
+        
+        self.result_writer = SupabaseBulkWriter.from_env(self.supabase, "ResultWriter") if self.supabase else None
 
     def build_url(self, keyword):
         """검색어를 기반으로 네이버 모바일 지도 검색 URL을 생성"""
@@ -57,75 +61,11 @@ class NaverPlaceCrawler:
         }
         
         try:
-            # 검색 URL 생성
-            url = self.build_url(keyword)
-            print(f"검색 URL: {url}")
-            
-            # 세션 사용
-            session = requests.Session()
-            session.headers.update(self.headers)
-            
-            # 페이지 요청
-            response = session.get(url, timeout=10)
+            # 장소 목록 가져오기
+            place_items, error_message = self._fetch_place_items(keyword)
             
-            if response.status_code != 200:
-                result["message"] = f"페이지 요청 실패: 상태 코드 {response.status_code}"
-                print(result["message"])
-                return result
-            
-            # 첫 번째 접근: 직접 모바일 리스트 URL 시도
-            list_url = f"https://m.place.naver.com/restaurant/list?query={urllib.parse.quote(keyword)}&entry=plt"
-            print(f"리스트 URL: {list_url}")
-            
-            # 리스트 페이지 요청
-            list_response = session.get(list_url, timeout=10)
-            
-            if list_response.status_code != 200:
-                # 대체 방법: 데스크톱 iframe 방식
-                iframe_url = f"https://pcmap.place.naver.com/place/list?query={urllib.parse.quote(keyword)}"
-                print(f"대체 iframe URL: {iframe_url}")
-                
-                list_response = session.get(iframe_url, timeout=10)
-                
-                if list_response.status_code != 200:
-                    result["message"] = f"리스트 요청 실패: 상태 코드 {list_response.status_code}"
-                    print(result["message"])
-                    return result
-            
-            # HTML 파싱
-            soup = BeautifulSoup(list_response.text, "html.parser")
-            
-            # 장소 목록 찾기 - 다양한 선택자 시도
-            place_items = []
-            
-            # 모바일 선택자들
-            mobile_selectors = [
-                "li[data-index]",  # 가장 일반적인 모바일 선택자
-                "li.place_item",
-                "div.place_list li",
-                "ul.list_place li",
-                "li.UEzoS",  # 데스크톱 선택자도 시도
-                "li.VLTHu",
-                "div.Ryr1F#_pcmap_list_scroll_container > ul > li",
-                "ul._3l82D > li",
-                "ul._1s-8x > li",
-            ]
-            
-            for selector in mobile_selectors:
-                place_items = soup.select(selector)
-                if place_items:
-                    print(f"선택자 '{selector}'로 {len(place_items)}개 항목 발견")
-                    break
-            
-            if not place_items:
-                # 모든 li 태그 시도 (최후의 수단)
-                all_lis = soup.find_all("li")
-                place_items = [li for li in all_lis if li.get_text().strip()]
-                print(f"모든 li 태그에서 {len(place_items)}개 항목 발견")
-            
-            if not place_items:
-                result["message"] = "장소 목록을 찾을 수 없습니다."
-                print(result["message"])
+            if error_message:
+                result["message"] = error_message
                 return result
             
             # 장소 순위 찾기
@@ -188,6 +128,204 @@ class NaverPlaceCrawler:
         
         return result
 
+    def _fetch_place_items(self, keyword):
+        """검색 키워드의 장소 목록 요청 (place_items, 에러 메시지) 반환"""
+        # 검색 URL 생성
+        url = self.build_url(keyword)
+        print(f"검색 URL: {url}")
+        
+        # 세션 사용
+        session = requests.Session()
+        session.headers.update(self.headers)
+        
+        # 페이지 요청
+        response = session.get(url, timeout=10)
+        
+        if response.status_code != 200:
+            message = f"페이지 요청 실패: 상태 코드 {response.status_code}"
+            print(message)
+            return [], message
+        
+        # 첫 번째 접근: 직접 모바일 리스트 URL 시도
+        list_url, iframe_url = self.build_list_urls(keyword)
+        print(f"리스트 URL: {list_url}")
+        
+        # 리스트 페이지 요청
+        list_response = session.get(list_url, timeout=10)
+        
+        if list_response.status_code != 200:
+            # 대체 방법: 데스크톱 iframe 방식
+            print(f"대체 iframe URL: {iframe_url}")
+            
+            list_response = session.get(iframe_url, timeout=10)
+            
+            if list_response.status_code != 200:
+                message = f"리스트 요청 실패: 상태 코드 {list_response.status_code}"
+                print(message)
+                return [], message
+        
+        return self._parse_place_items(list_response.text)
+
+    def build_list_urls(self, keyword):
+        """장소 리스트 URL (모바일 리스트, 데스크톱 iframe 대체 URL)"""
+        encoded_keyword = urllib.parse.quote(keyword)
+        return [
+            f"https://m.place.naver.com/restaurant/list?query={encoded_keyword}&entry=plt",
+            f"https://pcmap.place.naver.com/place/list?query={encoded_keyword}"
+        ]
+
+    def _parse_place_items(self, html):
+        """리스트 HTML에서 장소 항목 추출 (place_items, 에러 메시지) 반환"""
+        soup = BeautifulSoup(html, "html.parser")
+        
+        # 장소 목록 찾기 - 다양한 선택자 시도
+        place_items = []
+        
+        # 모바일 선택자들
+        mobile_selectors = [
+            "li[data-index]",  # 가장 일반적인 모바일 선택자
+            "li.place_item",
+            "div.place_list li",
+            "ul.list_place li",
+            "li.UEzoS",  # 데스크톱 선택자도 시도
+            "li.VLTHu",
+            "div.Ryr1F#_pcmap_list_scroll_container > ul > li",
+            "ul._3l82D > li",
+            "ul._1s-8x > li",
+        ]
+        
+        for selector in mobile_selectors:
+            place_items = soup.select(selector)
+            if place_items:
+                print(f"선택자 '{selector}'로 {len(place_items)}개 항목 발견")
+                break
+        
+        if not place_items:
+            # 모든 li 태그 시도 (최후의 수단)
+            all_lis = soup.find_all("li")
+            place_items = [li for li in all_lis if li.get_text().strip()]
+            print(f"모든 li 태그에서 {len(place_items)}개 항목 발견")
+        
+        if not place_items:
+            message = "장소 목록을 찾을 수 없습니다."
+            print(message)
+            return [], message
+        
+        return place_items, None
+
+    def search_keyword_group(self, keyword, shop_names):
+        """
+        동일 키워드의 여러 상호명 순위를 한 번의 요청으로 검색
+        (shop_names와 같은 순서의 결과 리스트 반환)
+        """
+        results = self._new_group_results(keyword, shop_names)
+        
+        try:
+            place_items, error_message = self._fetch_place_items(keyword)
+            
+            if error_message:
+                for result in results:
+                    result["message"] = error_message
+                return results
+            
+            self._rank_group(keyword, results, place_items)
+                
+        except Exception as e:
+            for result in results:
+                result["message"] = f"오류 발생: {type(e).__name__} - {e}"
+            print(f"오류 발생: {type(e).__name__} - {e}")
+        
+        return results
+
+    async def _search_keyword_group_async(self, engine, group):
+        """search_keyword_group의 비동기 버전 (AsyncCrawlEngine 작업 단위)"""
+        results = self._new_group_results(group.keyword, group.place_names)
+        
+        try:
+            # 검색 페이지 요청 (쿠키 확보) 후 리스트 페이지 요청
+            response = await engine.fetch(self.build_url(group.keyword))
+            if response.status_code != 200:
+                message = f"페이지 요청 실패: 상태 코드 {response.status_code}"
+            else:
+                list_response, _ = await engine.fetch_first(self.build_list_urls(group.keyword))
+                message = None if list_response else "리스트 요청 실패"
+            
+            if message:
+                for result in results:
+                    result["message"] = message
+                print(f"{message}: '{group.keyword}'")
+                return results
+            
+            # HTML 파싱/순위 계산은 이벤트 루프 밖에서 실행
+            place_items, error_message = await asyncio.to_thread(self._parse_place_items, list_response.text)
+            if error_message:
+                for result in results:
+                    result["message"] = error_message
+                return results
+            
+            self._rank_group(group.keyword, results, place_items)
+            
+        except Exception as e:
+            for result in results:
+                result["message"] = f"오류 발생: {type(e).__name__} - {e}"
+            print(f"오류 발생: {type(e).__name__} - {e}")
+        
+        return results
+
+    def _new_group_results(self, keyword, shop_names):
+        """그룹 검색 결과 기본값 (shop_names 순서)"""
+        return [{
+            "keyword": keyword,
+            "shop_name": shop_name,
+            "rank": -1,
+            "success": False,
+            "message": "",
+            "search_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "found_shops": []
+        } for shop_name in shop_names]
+
+    def _rank_group(self, keyword, results, place_items):
+        """장소 목록 하나로 그룹의 모든 상호명 순위 채우기"""
+        # 광고를 제외한 상점 텍스트 목록 (순위 순서)
+        shop_texts = []
+        for item in place_items[:300]:  # 상위 300개까지 확인
+            text = item.get_text()
+            if any(ad_word in text for ad_word in ["광고", "AD", "Sponsored"]):
+                continue
+            shop_texts.append(text.strip().replace("\n", " ").strip())
+        
+        # 하나의 결과 목록으로 모든 상호명 순위 산출
+        ranks = rank_targets_in_list(
+            shop_texts,
+            [result["shop_name"] for result in results],
+            lambda shop_name, shop_text: self._is_place_match(shop_text, shop_name),
+            max_rank=len(shop_texts)
+        )
+        
+        for result, rank in zip(results, ranks):
+            shop_name = result["shop_name"]
+            
+            if rank > 0:
+                result["rank"] = rank
+                result["success"] = True
+                result["message"] = f"'{shop_name}'은(는) '{keyword}' 검색 결과에서 {rank}위입니다."
+                result["found_shops"] = [text[:30] for text in shop_texts[:min(rank, 10)]]
+            else:
+                result["found_shops"] = [text[:30] for text in shop_texts[:20]]
+                result["message"] = f"'{shop_name}'을(를) 상위 {len(shop_texts)}개 결과에서 찾을 수 없습니다."
+            
+            print(result["message"])
+        
+        return results
+
+    def _is_place_match(self, shop_text, shop_name):
+        """상점 텍스트와 상호명 부분 일치 여부 (대소문자, 공백 무시)"""
+        if shop_name.lower() in shop_text.lower():
+            return True
+        
+        # 예: "맥도날드상암DMC점" vs "맥도날드 상암DMC점"
+        return shop_name.replace(" ", "").lower() in shop_text.replace(" ", "").lower()
+
     def save_to_supabase(self, results, tracked_place_id=None):
         """결과를 Supabase에 저장"""
         if not self.supabase or not results:
@@ -209,7 +347,7 @@ class NaverPlaceCrawler:
                     'error_message': result['message'] if not result['success'] else None
                 }
                 
-                response = self.supabase.table('crawler_results').insert(insert_data).execute()
+                self.result_writer.add('crawler_results', insert_data)
                 
                 # rankings 테이블에도 저장 (성공한 경우만)
                 if tracked_place_id and result['success']:
@@ -218,15 +356,41 @@ class NaverPlaceCrawler:
                         'rank': result['rank'],
                         'checked_at': result['search_time']
                     }
-                    self.supabase.table('rankings').insert(ranking_data).execute()
+                    self.result_writer.add('rankings', ranking_data)
                     
-            print(f"Saved {len(results)} results to Supabase")
+            print(f"Queued {len(results)} results for Supabase")
             return True
             
         except Exception as e:
             print(f"Failed to save to Supabase: {str(e)}")
             return False
 
+    def _search_groups(self, groups):
+        """
+        키워드 그룹별 검색 결과를 groups 순서로 반환
+        (CRAWL_CONCURRENCY > 1이면 비동기 엔진으로 동시 실행, 1이면 순차 실행 + 요청 간 대기)
+        """
+        engine = AsyncCrawlEngine.from_env(headers=self.headers, logger_name="NaverPlaceAsyncEngine")
+        
+        if engine.max_concurrency > 1:
+            print(f"비동기 크롤링: {len(groups)}개 키워드, 동시 {engine.max_concurrency}개")
+            try:
+                results = engine.run(groups, self._search_keyword_group_async)
+                print(f"Async engine stats: {engine.get_stats()}")
+            finally:
+                engine.close()
+            yield from results
+            return
+        
+        for group in groups:
+            print(f"\n크롤링 시작: 키워드 '{group.keyword}' ({len(group.places)}개 플레이스)")
+            
+            # 검색 실행
+            yield self.search_keyword_group(group.keyword, group.place_names)
+            
+            # 요청 간격 (네이버 서버 부하 방지)
+            time.sleep(random.uniform(3, 7))
+
     def crawl_tracked_places(self):
         """등록된 tracked_places를 모두 크롤링"""
         if not self.supabase:
@@ -240,24 +404,21 @@ class NaverPlaceCrawler:
             
             print(f"Found {len(tracked_places)} active tracked places")
             
-            for place in tracked_places:
-                keyword = place['search_keyword']
-                place_name = place['place_name']
-                place_id = place['id']
-                
-                print(f"\n크롤링 시작: {place_name} (키워드: {keyword})")
-                
-                # 검색 실행
-                result = self.search_place_rank(keyword, place_name)
-                
+            # 키워드별 그룹화 (키워드당 요청 1회)
+            groups = plan_keyword_groups(tracked_places)
+            print(f"Crawl plan: {summarize_plan(groups)}")
+            
+            for group, results in zip(groups, self._search_groups(groups)):
                 # 결과 저장
-                self.save_to_supabase([result], place_id)
-                
-                # 요청 간격 (네이버 서버 부하 방지)
-                time.sleep(random.uniform(3, 7))
+                for place, result in zip(group.places, results):
+                    self.save_to_supabase([result], place['id'])
                 
         except Exception as e:
             print(f"Crawl tracked places failed: {str(e)}")
+        finally:
+            # 버퍼에 남은 결과 저장 후 지표 출력
+            self.result_writer.flush()
+            print(f"Result writer metrics: {self.result_writer.get_metrics()}")
 
 def main():
     """메인 실행 함수"""
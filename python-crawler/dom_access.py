@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+WebDriver DOM 접근 계층
+- implicit wait 0 전제: 없는 요소 조회는 즉시 빈 결과 반환 (선택자 1개 미스마다 10초 대기 제거)
+- 페이지가 실제로 로딩 중인 구간만 명시적 대기 (WebDriverWait)
+- 검색 1회 전체 시간 예산(SearchDeadline)을 초과하면 SearchDeadlineExceeded로 즉시 중단
+- 플레이스 목록은 execute_script 1회로 이름/CID/광고 여부/위치를 한꺼번에 추출
+- 무한 스크롤은 MutationObserver로 새 아이템/목록 끝 표시가 나타나는 즉시 반환 (고정 sleep 없음)
+- CAPTCHA 감지/Apollo State 조회는 JS 런타임에서 직접 (page_source로 DOM 전체를 전송하지 않음)
+"""
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from apollo_state import APOLLO_LIST_SUMMARIES_SCRIPT, ApolloListSummaries, list_summaries_from_script
+
+
+# 목록 아이템 선택: min_count개 이상 "보이는" 아이템(텍스트 10자 초과)이 있는 첫 선택자
+_PLACE_ITEMS_JS = """
+function visiblePlaceItems(itemSelectors, minCount) {
+    for (const selector of itemSelectors) {
+        let nodes;
+        try { nodes = document.querySelectorAll(selector); } catch (e) { continue; }
+        const items = [];
+        for (const node of nodes) {
+            const text = (node.innerText || '').trim();
+            if (text.length > 10 && node.getClientRects().length) items.push([node, text]);
+        }
+        if (items.length >= minCount) return items;
+    }
+    return [];
+}
+"""
+
+PLACE_ITEM_COUNT_SCRIPT = _PLACE_ITEMS_JS + """
+return visiblePlaceItems(arguments[0], arguments[1]).length;
+"""
+
+PLACE_ITEMS_SCRIPT = _PLACE_ITEMS_JS + """
+const [itemSelectors, minCount, nameSelectors, adSelector, adKeywords, nclickAdWords] = arguments;
+const cidPattern = /(?:place|restaurant|hairshop|hospital|accommodation)\\/(\\d+)|[?&](?:id|cid)=(\\d+)/;
+
+function placeName(node) {
+    for (const selector of nameSelectors) {
+        let el;
+        try { el = node.querySelector(selector); } catch (e) { continue; }
+        if (!el) continue;
+        const text = (el.innerText || el.textContent || '').trim();
+        if (text.length > 1 && !/^\\d+$/.test(text)) return text;
+    }
+    return null;
+}
+
+function placeCid(node) {
+    const direct = node.getAttribute('data-place-id') || node.getAttribute('data-cid') || node.getAttribute('data-id');
+    if (direct && /^\\d+$/.test(direct)) return direct;
+    const holder = node.querySelector('[data-place-id], [data-cid]');
+    if (holder) return holder.getAttribute('data-place-id') || holder.getAttribute('data-cid');
+    for (const link of node.querySelectorAll('a[href]')) {
+        const match = cidPattern.exec(link.getAttribute('href'));
+        if (match) return match[1] || match[2];
+    }
+    return null;
+}
+
+function isAd(node, text) {
+    try { if (adSelector && node.querySelector(adSelector)) return true; } catch (e) {}
+    const lower = text.toLowerCase();
+    if (adKeywords.some(keyword => lower.includes(keyword))) return true;
+    const nclick = (node.getAttribute('data-nclick') || '').toLowerCase();
+    return nclickAdWords.some(word => nclick.includes(word));
+}
+
+return visiblePlaceItems(itemSelectors, minCount).map(([node, text], index) => ({
+    position: index + 1,
+    name: placeName(node),
+    first_line: text.split('\\n').map(line => line.trim()).find(line => line) || '',
+    cid: placeCid(node),
+    is_ad: isAd(node, text)
+}));
+"""
+
+# 목록 끝 표시 (이 요소가 보이면 더 이상 로드할 아이템 없음)
+LIST_END_SELECTORS = [
+    "[class*='list_end']",
+    "[class*='end_of_list']",
+    "[class*='no_more']",
+    "[class*='last_page']"
+]
+
+SCROLL_STATUS_LOADED = 'loaded'
+SCROLL_STATUS_END = 'end'
+SCROLL_STATUS_TIMEOUT = 'timeout'
+
+# execute_async_script: 스크롤 후 아이템 수 증가 또는 목록 끝 표시가 생길 때 콜백
+SCROLL_AND_WAIT_SCRIPT = """
+const [itemSelector, endSelector, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+const countItems = () => document.querySelectorAll(itemSelector).length;
+const atEnd = () => {
+    if (!endSelector) return false;
+    const marker = document.querySelector(endSelector);
+    return !!(marker && marker.getClientRects().length);
+};
+const before = countItems();
+let finished = false;
+let observer = null;
+let timer = null;
+
+function finish(status) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timer);
+    done({status: status, before: before, after: countItems(), elapsed_ms: Math.round(performance.now() - started)});
+}
+
+function check() {
+    if (countItems() > before) finish('loaded');
+    else if (atEnd()) finish('end');
+}
+
+const items = document.querySelectorAll(itemSelector);
+const last = items[items.length - 1];
+
+observer = new MutationObserver(check);
+observer.observe(document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ['class']});
+timer = setTimeout(() => finish('timeout'), timeoutMs);
+
+// 중첩 스크롤 컨테이너는 마지막 아이템 기준으로, 문서는 맨 아래로 스크롤
+if (last) last.scrollIntoView({block: 'end'});
+window.scrollTo(0, document.body.scrollHeight);
+check();
+"""
+
+# CAPTCHA 감지: URL -> 요소 -> 보이는 텍스트 순으로 확인, 걸린 근거 반환 (없으면 null)
+CAPTCHA_PROBE_SCRIPT = """
+const [urlKeywords, textKeywords, selector] = arguments;
+const url = location.href.toLowerCase();
+const urlHit = urlKeywords.find(keyword => url.includes(keyword));
+if (urlHit) return 'url:' + urlHit;
+try { if (selector && document.querySelector(selector)) return 'element:' + selector; } catch (e) {}
+const text = ((document.body && document.body.innerText) || '').toLowerCase();
+const textHit = textKeywords.find(keyword => text.includes(keyword));
+return textHit ? 'text:' + textHit : null;
+"""
+
+
+class SearchDeadlineExceeded(TimeoutException):
+    """검색 1회의 시간 예산 초과"""
+
+
+class SearchDeadline:
+    """검색 1회 전체 시간 예산"""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget - self.elapsed())
+
+    def expired(self) -> bool:
+        return self.elapsed() >= self.budget
+
+    def clamp(self, timeout: float) -> float:
+        """대기 시간을 남은 예산 이내로 제한"""
+        return min(timeout, self.remaining())
+
+    def check(self, stage: str = ""):
+        """예산을 넘었으면 SearchDeadlineExceeded 발생"""
+        if self.expired():
+            where = f" during {stage}" if stage else ""
+            raise SearchDeadlineExceeded(f"Search time budget {self.budget:.0f}s exceeded{where} ({self.elapsed():.1f}s)")
+
+
+class DomAccess:
+    """implicit wait 없이 동작하는 요소 조회/명시적 대기 도우미"""
+
+    def __init__(self, driver, deadline: Optional[SearchDeadline] = None, poll_frequency: float = 0.25):
+        self.driver = driver
+        self.deadline = deadline
+        self.poll_frequency = poll_frequency
+
+    def find_all(self, selectors: Iterable[str], root=None, min_count: int = 1) -> List:
+        """min_count개 이상 찾은 첫 선택자의 요소 목록 (없으면 빈 리스트)"""
+        root = root if root is not None else self.driver
+        for selector in selectors:
+            try:
+                elements = root.find_elements(By.CSS_SELECTOR, selector)
+            except WebDriverException:
+                continue
+            if len(elements) >= min_count:
+                return elements
+        return []
+
+    def first_text(self, root, selectors: Iterable[str], accept: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """선택자 순서대로 첫 번째로 조건을 만족하는 요소 텍스트"""
+        for selector in selectors:
+            try:
+                elements = root.find_elements(By.CSS_SELECTOR, selector)
+                if not elements:
+                    continue
+                text = elements[0].text.strip()
+            except WebDriverException:
+                continue
+            if text and (accept is None or accept(text)):
+                return text
+        return None
+
+    def has_any(self, root, selectors: Iterable[str]) -> bool:
+        """선택자 중 하나라도 요소가 있는지 (CSS 선택자 목록을 한 번에 조회)"""
+        try:
+            return bool(root.find_elements(By.CSS_SELECTOR, ", ".join(selectors)))
+        except WebDriverException:
+            return False
+
+    def wait_until(self, condition: Callable, timeout: float, stage: str = ""):
+        """
+        condition(driver)이 참이 될 때까지 명시적 대기
+
+        Returns:
+            condition 결과 (시간 내 참이 되지 않으면 None)
+
+        Raises:
+            SearchDeadlineExceeded: 대기 중 검색 시간 예산을 모두 쓴 경우
+        """
+        if self.deadline:
+            self.deadline.check(stage)
+            timeout = self.deadline.clamp(timeout)
+
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            if self.deadline:
+                self.deadline.check(stage)
+            return None
+
+    def wait_for_any(self, selectors: Iterable[str], timeout: float, min_count: int = 1, stage: str = "") -> List:
+        """선택자 중 하나가 min_count개 이상 나타날 때까지 대기"""
+        selectors = list(selectors)
+        return self.wait_until(lambda driver: self.find_all(selectors, min_count=min_count) or False,
+                               timeout, stage) or []
+
+    def count_place_items(self, item_selectors: List[str], min_count: int = 3) -> int:
+        """보이는 플레이스 아이템 수 (execute_script 1회)"""
+        try:
+            return int(self.driver.execute_script(PLACE_ITEM_COUNT_SCRIPT, item_selectors, min_count) or 0)
+        except WebDriverException:
+            return 0
+
+    def extract_place_items(
+        self,
+        item_selectors: List[str],
+        name_selectors: List[str],
+        ad_selectors: List[str],
+        ad_keywords: List[str],
+        nclick_ad_words: Optional[List[str]] = None,
+        min_count: int = 3
+    ) -> List[Dict]:
+        """
+        보이는 플레이스 아이템 전체를 execute_script 1회로 추출
+
+        Returns:
+            [{'position': 1, 'name': str|None, 'first_line': str, 'cid': str|None, 'is_ad': bool}, ...]
+            (name은 이름 선택자로 찾지 못하면 None, position은 광고 포함 화면 순서)
+        """
+        try:
+            entries = self.driver.execute_script(
+                PLACE_ITEMS_SCRIPT, item_selectors, min_count, name_selectors,
+                ", ".join(ad_selectors), [keyword.lower() for keyword in ad_keywords], nclick_ad_words or []
+            )
+        except WebDriverException:
+            return []
+        return entries or []
+
+    def scroll_and_wait(
+        self,
+        item_selectors: List[str],
+        timeout: float = 7.5,
+        end_selectors: Optional[List[str]] = None,
+        stage: str = "scroll load"
+    ) -> Dict:
+        """
+        목록 끝까지 스크롤하고 새 아이템이 추가되거나 목록 끝 표시가 나타날 때까지 대기
+
+        Returns:
+            {'status': 'loaded'|'end'|'timeout', 'before': int, 'after': int, 'elapsed_ms': int}
+
+        Raises:
+            SearchDeadlineExceeded: 대기 중 검색 시간 예산을 모두 쓴 경우
+        """
+        if self.deadline:
+            self.deadline.check(stage)
+            timeout = self.deadline.clamp(timeout)
+
+        end_selectors = LIST_END_SELECTORS if end_selectors is None else end_selectors
+        # 기본 script timeout(30초) 안에서 끝나도록 제한
+        timeout_ms = int(min(timeout, 25) * 1000)
+
+        try:
+            outcome = self.driver.execute_async_script(
+                SCROLL_AND_WAIT_SCRIPT, ", ".join(item_selectors), ", ".join(end_selectors), timeout_ms
+            )
+        except WebDriverException:
+            outcome = None
+
+        outcome = outcome or {'status': SCROLL_STATUS_TIMEOUT, 'before': 0, 'after': 0, 'elapsed_ms': timeout_ms}
+        if outcome['status'] == SCROLL_STATUS_TIMEOUT and self.deadline:
+            self.deadline.check(stage)
+        return outcome
+
+    def detect_captcha(self, url_keywords: List[str], text_keywords: List[str],
+                       selectors: Optional[List[str]] = None) -> Optional[str]:
+        """
+        CAPTCHA 페이지 여부를 execute_script 1회로 확인
+
+        Returns:
+            감지 근거 ('url:...', 'element:...', 'text:...'), 아니면 None
+        """
+        return self.driver.execute_script(
+            CAPTCHA_PROBE_SCRIPT,
+            [keyword.lower() for keyword in url_keywords],
+            [keyword.lower() for keyword in text_keywords],
+            ", ".join(selectors or [])
+        )
+
+    def read_list_summaries(self) -> Optional[ApolloListSummaries]:
+        """JS 런타임의 Apollo State에서 목록 엔티티/순서만 읽기 (상태가 없으면 None)"""
+        return list_summaries_from_script(self.driver.execute_script(APOLLO_LIST_SUMMARIES_SCRIPT))
@@ -1,15 +1,18 @@
-import requests
 import urllib.parse
 from bs4 import BeautifulSoup
 import json
 import time
 import random
 import os
+import asyncio
 import logging
 from supabase import create_client, Client
 from bright_data_proxy_manager import create_bright_data_proxy_manager, BrightDataProxyManager
 from proxy_monitor import get_proxy_monitor, log_proxy_request
 from bright_data_api_config import setup_bright_data_from_api
+from supabase_bulk_writer import SupabaseBulkWriter
+from crawl_planner import plan_keyword_groups, rank_targets_in_list, summarize_plan
+from async_crawl_engine import AsyncCrawlEngine
 
 class EnhancedNaverPlaceCrawler:
     """Bright Data 프록시를 사용하는 향상된 네이버 플레이스 크롤러"""
@@ -59,8 +62,19 @@ class EnhancedNaverPlaceCrawler:
             self.supabase = None
             self.logger.warning("Supabase credentials not found")
         
+        # 결과는 버퍼링 후 배열 insert로 일괄 저장 (백그라운드 flush)
+        self.result_writer = SupabaseBulkWriter.from_env(self.supabase, "ResultWriter") if self.supabase else None
+        
         # 프록시 모니터 초기화
         self.proxy_monitor = get_proxy_monitor()
+        
+        # 비동기 요청 엔진 (헤지 지연은 프록시 모니터의 최근 1시간 p95 응답 시간)
+        self.request_engine = AsyncCrawlEngine.from_env(
+            proxy_manager=self.proxy_manager if self.use_proxy else None,
+            headers=self.default_headers,
+            request_logger=log_proxy_request if self.use_proxy else None,
+            latency_source=self.proxy_monitor.latency_percentile
+        )
 
     def build_url(self, keyword):
         """검색어를 기반으로 네이버 모바일 지도 검색 URL을 생성"""
@@ -73,81 +87,14 @@ class EnhancedNaverPlaceCrawler:
         ]
         return urls
 
-    def make_request_with_fallback(self, urls, **kwargs):
-        """프록시와 일반 요청을 모두 시도하는 요청 메서드"""
-        
-        # 1. 프록시 사용 시도
-        if self.use_proxy and self.proxy_manager:
-            for url in urls:
-                start_time = time.time()
-                try:
-                    self.logger.info(f"Trying proxy request to: {url}")
-                    response, proxy = self.proxy_manager.make_request(url, **kwargs)
-                    response_time = time.time() - start_time
-                    
-                    if response and response.status_code == 200:
-                        self.logger.info(f"Proxy request successful: {url}")
-                        # 성공 로깅
-                        log_proxy_request(
-                            proxy_endpoint=proxy.endpoint if proxy else "unknown",
-                            request_url=url,
-                            status_code=response.status_code,
-                            response_time=response_time,
-                            success=True,
-                            session_id=proxy.session_id if proxy else None,
-                            country=proxy.country if proxy else "KR"
-                        )
-                        return response, 'proxy'
-                    else:
-                        # 실패 로깅
-                        log_proxy_request(
-                            proxy_endpoint=proxy.endpoint if proxy else "unknown",
-                            request_url=url,
-                            status_code=response.status_code if response else None,
-                            response_time=response_time,
-                            success=False,
-                            error_message=f"HTTP {response.status_code}" if response else "No response",
-                            session_id=proxy.session_id if proxy else None,
-                            country=proxy.country if proxy else "KR"
-                        )
-                        
-                except Exception as e:
-                    response_time = time.time() - start_time
-                    self.logger.warning(f"Proxy request failed for {url}: {e}")
-                    # 에러 로깅
-                    log_proxy_request(
-                        proxy_endpoint="unknown",
-                        request_url=url,
-                        status_code=None,
-                        response_time=response_time,
-                        success=False,
-                        error_message=str(e)
-                    )
-                    continue
-            
-            # 프록시 실패 시 리셋 시도
-            self.logger.info("Resetting failed proxies and retrying...")
-            self.proxy_manager.reset_failed_proxies()
-        
-        # 2. 일반 요청 시도 (fallback)
-        self.logger.info("Falling back to direct requests")
-        session = requests.Session()
-        session.headers.update(self.default_headers)
-        
-        for url in urls:
-            try:
-                self.logger.info(f"Trying direct request to: {url}")
-                response = session.get(url, timeout=15, **kwargs)
-                
-                if response.status_code == 200:
-                    self.logger.info(f"Direct request successful: {url}")
-                    return response, 'direct'
-                    
-            except Exception as e:
-                self.logger.warning(f"Direct request failed for {url}: {e}")
-                continue
-        
-        return None, None
+    def make_request_with_fallback(self, urls):
+        """
+        URL 변형을 순서대로 요청 (프록시 우선, 모두 실패 시 직접 연결)
+        - CRAWL_HEDGE=1이면 선호 URL이 최근 p95 응답 시간 안에 응답하지 않을 때 다음 URL을 동시에 시작
+        - 엔진의 클라이언트는 검색 사이에도 유지되어 keep-alive 커넥션 재사용 (close()에서 종료)
+        """
+        # 작업 하나짜리 run: worker(engine, urls) = engine.fetch_first(urls)
+        return self.request_engine.run([urls], AsyncCrawlEngine.fetch_first)[0]
 
     def search_place_rank(self, keyword, shop_name):
         """
@@ -221,6 +168,113 @@ class EnhancedNaverPlaceCrawler:
         
         return result
 
+    def search_keyword_group(self, keyword, shop_names):
+        """
+        동일 키워드의 여러 상호명 순위를 한 번의 요청으로 검색
+        (shop_names와 같은 순서의 결과 리스트 반환)
+        """
+        results = self._new_group_results(keyword, shop_names)
+        
+        try:
+            urls = self.build_url(keyword)
+            self.logger.info(f"Searching {len(shop_names)} shops with keyword: '{keyword}'")
+            
+            # 키워드당 요청 1회
+            response, method = self.make_request_with_fallback(urls)
+            
+            for result in results:
+                result["request_method"] = method
+            
+            if not response:
+                for result in results:
+                    result["message"] = "모든 요청 방법이 실패했습니다."
+                self.logger.error("모든 요청 방법이 실패했습니다.")
+                return results
+            
+            self._rank_group_from_html(keyword, results, response.text)
+                
+        except Exception as e:
+            for result in results:
+                result["message"] = f"오류 발생: {type(e).__name__} - {e}"
+            self.logger.error(f"오류 발생: {type(e).__name__} - {e}")
+        
+        return results
+
+    async def _search_keyword_group_async(self, engine, group):
+        """search_keyword_group의 비동기 버전 (AsyncCrawlEngine 작업 단위, 같은 결과 dict 반환)"""
+        results = self._new_group_results(group.keyword, group.place_names)
+        
+        try:
+            response, method = await engine.fetch_first(self.build_url(group.keyword))
+            
+            for result in results:
+                result["request_method"] = method
+            
+            if not response:
+                for result in results:
+                    result["message"] = "모든 요청 방법이 실패했습니다."
+                self.logger.error(f"모든 요청 방법이 실패했습니다: '{group.keyword}'")
+                return results
+            
+            # HTML 파싱은 CPU 작업이므로 이벤트 루프 밖에서 실행
+            await asyncio.to_thread(self._rank_group_from_html, group.keyword, results, response.text)
+            
+        except Exception as e:
+            for result in results:
+                result["message"] = f"오류 발생: {type(e).__name__} - {e}"
+            self.logger.error(f"오류 발생: {type(e).__name__} - {e}")
+        
+        return results
+
+    def _new_group_results(self, keyword, shop_names):
+        """그룹 검색 결과 기본값 (shop_names 순서)"""
+        return [{
+            "keyword": keyword,
+            "shop_name": shop_name,
+            "rank": -1,
+            "success": False,
+            "message": "",
+            "search_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "found_shops": [],
+            "request_method": "unknown"
+        } for shop_name in shop_names]
+
+    def _rank_group_from_html(self, keyword, results, html):
+        """검색 결과 HTML 하나로 그룹의 모든 상호명 순위 채우기"""
+        soup = BeautifulSoup(html, "html.parser")
+        place_items = self._extract_place_items(soup)
+        
+        if not place_items:
+            for result in results:
+                result["message"] = "장소 목록을 찾을 수 없습니다."
+            self.logger.warning("장소 목록을 찾을 수 없습니다.")
+            return results
+        
+        # 하나의 결과 목록으로 모든 상호명 순위 산출
+        place_texts = self._collect_place_texts(place_items)
+        ranks = rank_targets_in_list(
+            place_texts,
+            [result["shop_name"] for result in results],
+            lambda shop_name, text: self._is_place_match(text, shop_name),
+            max_rank=len(place_texts)
+        )
+        
+        for result, rank in zip(results, ranks):
+            shop_name = result["shop_name"]
+            
+            if rank > 0:
+                result["rank"] = rank
+                result["success"] = True
+                result["found_shops"] = [text[:50] for text in place_texts[:min(rank, 20)]]
+                result["message"] = f"'{shop_name}'은(는) '{keyword}' 검색 결과에서 {rank}위입니다."
+            else:
+                result["found_shops"] = [text[:50] for text in place_texts[:20]]
+                result["message"] = f"'{shop_name}'을(를) 상위 {len(place_items)}개 결과에서 찾을 수 없습니다."
+            
+            self.logger.info(result["message"])
+        
+        return results
+
     def _extract_place_items(self, soup):
         """다양한 선택자로 장소 목록 추출"""
         place_items = []
@@ -265,9 +319,21 @@ class EnhancedNaverPlaceCrawler:
         return place_items
 
     def _find_place_rank(self, place_items, shop_name):
-        """장소 목록에서 상호명의 순위 찾기"""
-        rank = 0
-        found_shops = []
+        """장소 목록에서 상호명의 순위 찾기 (found_shops는 매칭 위치까지의 장소, 각 50자)"""
+        place_texts = self._collect_place_texts(place_items)
+        rank = rank_targets_in_list(
+            place_texts,
+            [shop_name],
+            lambda target, text: self._is_place_match(text, target),
+            max_rank=len(place_texts)
+        )[0]
+        
+        found_texts = place_texts[:rank] if rank > 0 else place_texts
+        return rank, [text[:50] for text in found_texts]
+
+    def _collect_place_texts(self, place_items):
+        """광고를 제외한 장소 텍스트 목록 (순위 순서)"""
+        place_texts = []
         
         for item in place_items[:500]:  # 상위 500개까지 확인
             text = item.get_text()
@@ -276,17 +342,9 @@ class EnhancedNaverPlaceCrawler:
             if any(ad_word in text for ad_word in ["광고", "AD", "Sponsored", "스폰서"]):
                 continue
             
-            rank += 1
-            
-            # 텍스트 정리
-            clean_text = text.replace("\n", " ").strip()
-            found_shops.append(clean_text[:50])  # 처음 50자만 저장
-            
-            # 매칭 시도
-            if self._is_place_match(clean_text, shop_name):
-                return rank, found_shops
+            place_texts.append(text.replace("\n", " ").strip())
         
-        return -1, found_shops
+        return place_texts
 
     def _is_place_match(self, text, shop_name):
         """텍스트와 상호명이 일치하는지 확인"""
@@ -333,7 +391,7 @@ class EnhancedNaverPlaceCrawler:
                     'request_method': result.get('request_method', 'unknown')
                 }
                 
-                response = self.supabase.table('crawler_results').insert(insert_data).execute()
+                self.result_writer.add('crawler_results', insert_data)
                 
                 # rankings 테이블에도 저장 (성공한 경우만)
                 if tracked_place_id and result['success']:
@@ -342,15 +400,46 @@ class EnhancedNaverPlaceCrawler:
                         'rank': result['rank'],
                         'checked_at': result['search_time']
                     }
-                    self.supabase.table('rankings').insert(ranking_data).execute()
+                    self.result_writer.add('rankings', ranking_data)
                     
-            self.logger.info(f"Saved {len(results)} results to Supabase")
+            self.logger.info(f"Queued {len(results)} results for Supabase")
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to save to Supabase: {str(e)}")
             return False
 
+    def _search_groups(self, groups):
+        """
+        키워드 그룹별 검색 결과를 groups 순서로 반환
+        - CRAWL_CONCURRENCY > 1: AsyncCrawlEngine으로 동시 실행 (전역 RPS/호스트별/프록시별 제한)
+        - CRAWL_CONCURRENCY = 1: 기존 순차 실행 + 요청 간 대기
+        """
+        engine = self.request_engine
+        
+        if engine.max_concurrency > 1:
+            self.logger.info(f"비동기 크롤링: {len(groups)}개 키워드, 동시 {engine.max_concurrency}개")
+            results = engine.run(groups, self._search_keyword_group_async)
+            self.logger.info(f"Async engine stats: {engine.get_stats()}")
+            yield from results
+            return
+        
+        for i, group in enumerate(groups, 1):
+            self.logger.info(f"\n[{i}/{len(groups)}] 크롤링 시작: 키워드 '{group.keyword}' ({len(group.places)}개 플레이스)")
+            
+            # 검색 실행
+            yield self.search_keyword_group(group.keyword, group.place_names)
+            
+            # 요청 간격 조정 (프록시 사용 여부에 따라)
+            if self.use_proxy:
+                delay = random.uniform(1, 3)  # 프록시 사용 시 짧은 대기
+            else:
+                delay = random.uniform(5, 10)  # 직접 요청 시 긴 대기
+            
+            if i < len(groups):  # 마지막이 아니면 대기
+                self.logger.info(f"다음 요청까지 {delay:.1f}초 대기...")
+                time.sleep(delay)
+
     def crawl_tracked_places(self):
         """등록된 tracked_places를 모두 크롤링"""
         if not self.supabase:
@@ -371,36 +460,25 @@ class EnhancedNaverPlaceCrawler:
             success_count = 0
             total_count = len(tracked_places)
             
-            for i, place in enumerate(tracked_places, 1):
-                keyword = place['search_keyword']
-                place_name = place['place_name']
-                place_id = place['id']
-                
-                self.logger.info(f"\n[{i}/{total_count}] 크롤링 시작: {place_name} (키워드: {keyword})")
-                
-                # 검색 실행
-                result = self.search_place_rank(keyword, place_name)
-                
+            # 키워드별 그룹화 (키워드당 요청 1회)
+            groups = plan_keyword_groups(tracked_places)
+            self.logger.info(f"크롤링 플랜: {summarize_plan(groups)}")
+            
+            for group, results in zip(groups, self._search_groups(groups)):
                 # 결과 저장
-                if self.save_to_supabase([result], place_id):
-                    if result['success']:
-                        success_count += 1
-                        self.logger.info(f"✅ 성공: {place_name} - {result['rank']}위")
-                    else:
-                        self.logger.warning(f"❌ 실패: {place_name} - {result['message']}")
-                
-                # 요청 간격 조정 (프록시 사용 여부에 따라)
-                if self.use_proxy:
-                    delay = random.uniform(1, 3)  # 프록시 사용 시 짧은 대기
-                else:
-                    delay = random.uniform(5, 10)  # 직접 요청 시 긴 대기
-                
-                if i < total_count:  # 마지막이 아니면 대기
-                    self.logger.info(f"다음 요청까지 {delay:.1f}초 대기...")
-                    time.sleep(delay)
+                for place, result in zip(group.places, results):
+                    place_name = place['place_name']
+                    
+                    if self.save_to_supabase([result], place['id']):
+                        if result['success']:
+                            success_count += 1
+                            self.logger.info(f"✅ 성공: {place_name} - {result['rank']}위")
+                        else:
+                            self.logger.warning(f"❌ 실패: {place_name} - {result['message']}")
             
             # 최종 결과 리포트
             self.logger.info(f"\n🎯 크롤링 완료: {success_count}/{total_count} 성공")
+            self.logger.info(f"🔌 요청 엔진/커넥션 재사용: {self.request_engine.get_stats()}")
             
             # 프록시 통계 출력 및 모니터링 리포트 생성
             if self.use_proxy and self.proxy_manager:
@@ -411,6 +489,7 @@ class EnhancedNaverPlaceCrawler:
                 monitor_stats = self.proxy_monitor.get_usage_stats(hours=1)  # 최근 1시간
                 monitor_report = self.proxy_monitor.export_usage_report(hours=1, format='text')
                 self.logger.info(f"\n{monitor_report}")
+                self.logger.info(f"📮 프록시 로그 전송: {self.proxy_monitor.get_shipper_stats()}")
                 
                 # 일일 요약 저장 (선택적)
                 if os.getenv('SAVE_DAILY_SUMMARY', 'false').lower() == 'true':
@@ -420,6 +499,16 @@ class EnhancedNaverPlaceCrawler:
             self.logger.error(f"Crawl tracked places failed: {str(e)}")
             import traceback
             traceback.print_exc()
+        finally:
+            # 버퍼에 남은 결과 저장 후 지표 출력
+            self.result_writer.flush()
+            self.logger.info(f"Result writer metrics: {self.result_writer.get_metrics()}")
+
+    def close(self):
+        """요청 엔진 커넥션과 결과 저장기 정리"""
+        self.request_engine.close()
+        if self.result_writer:
+            self.result_writer.close()
 
 def main():
     """메인 실행 함수"""
@@ -437,19 +526,22 @@ def main():
     # 환경변수로 모드 결정
     mode = os.getenv('CRAWLER_MODE', 'tracked')
     
-    if mode == 'test':
-        # 테스트 모드
-        keyword = os.getenv('TEST_KEYWORD', '서울 상암 맛집')
-        shop_name = os.getenv('TEST_SHOP_NAME', '맥도날드상암DMC점')
-        
-        print(f"🔍 테스트 크롤링 시작: {shop_name} (키워드: {keyword})")
-        result = crawler.search_place_rank(keyword, shop_name)
-        print(json.dumps(result, ensure_ascii=False, indent=2))
-        
-    else:
-        # 실제 크롤링 모드
-        print("🚀 실제 크롤링 시작")
-        crawler.crawl_tracked_places()
+    try:
+        if mode == 'test':
+            # 테스트 모드
+            keyword = os.getenv('TEST_KEYWORD', '서울 상암 맛집')
+            shop_name = os.getenv('TEST_SHOP_NAME', '맥도날드상암DMC점')
+            
+            print(f"🔍 테스트 크롤링 시작: {shop_name} (키워드: {keyword})")
+            result = crawler.search_place_rank(keyword, shop_name)
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+            
+        else:
+            # 실제 크롤링 모드
+            print("🚀 실제 크롤링 시작")
+            crawler.crawl_tracked_places()
+    finally:
+        crawler.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
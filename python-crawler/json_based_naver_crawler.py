@@ -17,6 +17,7 @@ from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from apollo_state import parse_apollo_state
 
 class JsonBasedNaverCrawler:
     """
@@ -169,16 +170,9 @@ class JsonBasedNaverCrawler:
     def _extract_apollo_state(self) -> Optional[Dict]:
         """Extract __APOLLO_STATE__ JSON data from page"""
         try:
-            # Look for __APOLLO_STATE__ in page source
-            page_source = self.driver.page_source
+            apollo_data = parse_apollo_state(self.driver.page_source)
             
-            # Find the JSON data
-            apollo_pattern = r'naver\.search\.ext\.nmb\.salt\.__APOLLO_STATE__\s*=\s*({.*?});'
-            match = re.search(apollo_pattern, page_source, re.DOTALL)
-            
-            if match:
-                json_str = match.group(1)
-                apollo_data = json.loads(json_str)
+            if apollo_data is not None:
                 self.stats['json_extractions'] += 1
                 self.logger.info("Successfully extracted Apollo State JSON data")
                 return apollo_data
@@ -186,9 +180,6 @@ class JsonBasedNaverCrawler:
                 self.logger.warning("Could not find __APOLLO_STATE__ in page source")
                 return None
                 
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON parsing error: {e}")
-            return None
         except Exception as e:
             self.logger.error(f"Apollo state extraction error: {e}")
             return None
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+AIMD 적응형 요청 속도 제어
+- 깨끗한 응답이 올 때마다 출구별 요청 속도를 조금씩 올림 (additive increase)
+- 출구는 요청 예산 원장과 같은 exit_key로 구분 (Bright Data 세션별로 따로 학습)
+- CAPTCHA 또는 최근 403/429 비율이 기준을 넘으면 해당 프록시 속도를 곱으로 줄임 (multiplicative decrease)
+- 조정한 속도는 RateLimiter의 프록시별(프록시가 없으면 전역) 버킷에 적용
+- 학습한 속도는 JSON 파일로 저장해 다음 실행에서 이어서 사용 (프록시 인증 정보는 저장하지 않음)
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, Optional
+
+from rate_limiter import RateLimiter
+from request_budget_ledger import exit_key
+
+
+def pacing_key(proxy: Optional[str]) -> str:
+    """저장용 출구 식별자 (원장의 exit_key와 동일: host:port[#세션 해시], 프록시가 없으면 direct)"""
+    return exit_key(proxy)
+
+
+class AdaptivePacer:
+    """CAPTCHA/차단 신호로 프록시별 요청 속도를 조정하는 AIMD 컨트롤러"""
+
+    BLOCK_STATUS_CODES = (403, 429)
+
+    def __init__(self, rate_limiter: RateLimiter, min_rate: float = 1 / 120, max_rate: float = 0.1,
+                 increase: float = 0.002, decrease: float = 0.5, error_threshold: float = 0.2,
+                 error_window: int = 20, captcha_pause: float = 300.0, state_path: Optional[str] = None,
+                 save_interval: float = 30.0, logger_name: str = "AdaptivePacer"):
+        """
+        Args:
+            rate_limiter: 속도를 조정할 제한기 (프록시별 버킷이 없으면 전역 속도 조정)
+            min_rate, max_rate: 초당 요청 수 하한/상한 (기본 상한은 기존 최소 간격인 10초에 1회,
+                더 빠르게 하려면 운영자가 PACING_MAX_RPS로 직접 올림)
+            increase: 깨끗한 응답 1건마다 올릴 초당 요청 수
+            decrease: 차단 신호 시 곱할 비율
+            error_threshold: 최근 error_window건 중 403/429 비율이 이 이상이면 감속
+            captcha_pause: CAPTCHA 후 해당 프록시를 쉬게 할 시간(초)
+            state_path: 학습한 속도 저장 파일 (None이면 저장 안 함)
+            save_interval: 자동 저장 최소 간격(초)
+        """
+        self.logger = logging.getLogger(logger_name)
+        self.rate_limiter = rate_limiter
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.error_threshold = error_threshold
+        self.error_window = error_window
+        self.captcha_pause = captcha_pause
+        self.state_path = state_path
+        self.save_interval = save_interval
+
+        self._lock = threading.Lock()
+        self._rates: Dict[str, float] = {}
+        self._errors: Dict[str, Deque[bool]] = {}
+        self._saved_rates: Dict[str, float] = self._load()
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+        self.stats = {
+            'increases': 0,
+            'decreases': 0,
+            'captchas': 0,
+            'blocked_responses': 0,
+        }
+
+    @classmethod
+    def from_env(cls, rate_limiter: RateLimiter, proxies: Iterable[str] = (),
+                 logger_name: str = "AdaptivePacer") -> Optional["AdaptivePacer"]:
+        """
+        환경 변수로 생성 (ADAPTIVE_PACING=0이면 None)
+
+        PACING_MIN_RPS, PACING_MAX_RPS, PACING_INCREASE, PACING_DECREASE,
+        PACING_ERROR_THRESHOLD, PACING_CAPTCHA_PAUSE, PACING_STATE_PATH
+        """
+        if os.getenv('ADAPTIVE_PACING', '1') == '0':
+            return None
+
+        pacer = cls(
+            rate_limiter,
+            min_rate=float(os.getenv('PACING_MIN_RPS', str(1 / 120))),
+            max_rate=float(os.getenv('PACING_MAX_RPS', '0.1')),
+            increase=float(os.getenv('PACING_INCREASE', '0.002')),
+            decrease=float(os.getenv('PACING_DECREASE', '0.5')),
+            error_threshold=float(os.getenv('PACING_ERROR_THRESHOLD', '0.2')),
+            captcha_pause=float(os.getenv('PACING_CAPTCHA_PAUSE', '300')),
+            state_path=os.getenv('PACING_STATE_PATH', os.path.join('logs', 'pacing_state.json')),
+            logger_name=logger_name,
+        )
+        pacer.register(proxies)
+        return pacer
+
+    def register(self, proxies: Iterable[Optional[str]]):
+        """
+        사용할 프록시를 등록하고 저장된 속도 적용
+
+        프록시별로 속도를 조정하면 전역 버킷은 상한 역할만 하므로,
+        CRAWL_MAX_RPS로 고정하지 않았다면 max_rate × 프록시 수로 넓힘.
+        """
+        proxies = list(proxies)
+        for proxy in proxies or [None]:
+            self._rate(proxy)
+
+        if proxies and self.rate_limiter.per_proxy_rate and not os.getenv('CRAWL_MAX_RPS'):
+            self.rate_limiter.set_global_rate(self.max_rate * len(proxies))
+
+    def current_rate(self, proxy: Optional[str] = None) -> float:
+        with self._lock:
+            return self._rate(proxy)
+
+    def record_success(self, proxy: Optional[str] = None):
+        """깨끗한 페이지: 속도를 increase만큼 올림"""
+        with self._lock:
+            key = pacing_key(proxy)
+            self._window(key).append(False)
+            rate = self._rate(proxy)
+            if rate < self.max_rate:
+                self._apply(proxy, rate + self.increase)
+                self.stats['increases'] += 1
+
+        self._maybe_save()
+
+    def record_captcha(self, proxy: Optional[str] = None):
+        """CAPTCHA: 즉시 감속하고 해당 프록시를 captcha_pause초 쉬게 함"""
+        with self._lock:
+            self.stats['captchas'] += 1
+            self._backoff(proxy, "CAPTCHA")
+
+        if self.captcha_pause > 0:
+            self.rate_limiter.penalize(proxy, self.captcha_pause)
+        self.save()
+
+    def record_status(self, proxy: Optional[str], status_code: Optional[int]):
+        """HTTP 응답 코드 기록: 200은 성공, 403/429 비율이 기준을 넘으면 감속"""
+        if status_code == 200:
+            self.record_success(proxy)
+            return
+        if status_code not in self.BLOCK_STATUS_CODES:
+            return
+
+        decreased = False
+        with self._lock:
+            self.stats['blocked_responses'] += 1
+            window = self._window(pacing_key(proxy))
+            window.append(True)
+
+            # 표본이 적을 때 한 번의 429로 과하게 줄이지 않도록 최소 5건 이후 판단
+            if len(window) >= 5 and sum(window) / len(window) >= self.error_threshold:
+                self._backoff(proxy, f"HTTP {status_code} rate {sum(window)}/{len(window)}")
+                decreased = True
+
+        if decreased:
+            self.save()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'rates': dict(self._rates)}
+
+    def save(self):
+        """학습한 속도를 state_path에 저장 (임시 파일에 쓴 뒤 교체)"""
+        if not self.state_path:
+            return
+
+        with self._lock:
+            rates = {**self._saved_rates, **self._rates}
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        directory = os.path.dirname(self.state_path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.pacing_', suffix='.json')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'rates': rates, 'updated_at': datetime.now().isoformat()}, f, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to save pacing state: {e}")
+
+    # ---- 내부 처리 ----
+
+    def _load(self) -> Dict[str, float]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                rates = json.load(f).get('rates', {})
+            self.logger.info(f"Loaded pacing state for {len(rates)} exits from {self.state_path}")
+            return {key: float(rate) for key, rate in rates.items()}
+        except (OSError, ValueError, AttributeError) as e:
+            self.logger.warning(f"Ignoring unreadable pacing state {self.state_path}: {e}")
+            return {}
+
+    def _rate(self, proxy: Optional[str]) -> float:
+        """락 안에서 호출: 현재 속도 (처음 보는 프록시는 저장된 속도나 제한기의 기본 속도로 시작)"""
+        key = pacing_key(proxy)
+        rate = self._rates.get(key)
+        if rate is None:
+            rate = self._saved_rates.get(key, self.rate_limiter.get_rate(proxy))
+            rate = min(max(rate, self.min_rate), self.max_rate)
+            self._rates[key] = rate
+            self.rate_limiter.set_rate(rate, proxy)
+        return rate
+
+    def _window(self, key: str) -> Deque[bool]:
+        window = self._errors.get(key)
+        if window is None:
+            window = self._errors[key] = deque(maxlen=self.error_window)
+        return window
+
+    def _apply(self, proxy: Optional[str], rate: float):
+        rate = min(max(rate, self.min_rate), self.max_rate)
+        self._rates[pacing_key(proxy)] = rate
+        self.rate_limiter.set_rate(rate, proxy)
+        self._dirty = True
+
+    def _backoff(self, proxy: Optional[str], reason: str):
+        old_rate = self._rate(proxy)
+        self._apply(proxy, old_rate * self.decrease)
+        self._window(pacing_key(proxy)).clear()
+        self.stats['decreases'] += 1
+        self.logger.warning(f"Backing off {pacing_key(proxy)} ({reason}): "
+                            f"{old_rate:.4f} -> {self._rates[pacing_key(proxy)]:.4f} req/s")
+
+    def _maybe_save(self):
+        if self._dirty and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
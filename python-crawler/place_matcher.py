@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+플레이스명 일괄 매칭 엔진
+- 브랜드 별칭 테이블을 하나의 정규식(자동자)으로 미리 컴파일
+- 정규화 문자열/바이그램/브랜드 집합을 이름별로 한 번만 계산해 캐시
+- SERP 목록 하나를 한 번 순회하며 여러 대상의 첫 매칭 위치를 산출
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, FrozenSet, Iterable, List, Optional, Sequence, TypeVar
+
+T = TypeVar('T')
+F = TypeVar('F')
+
+# 브랜드 별칭 테이블 (프랜차이즈 대응) - 같은 행의 별칭은 같은 브랜드로 본다
+BRAND_ALIASES = [
+    r'스타벅스|스벅',
+    r'맥도날드|맥날|McDonald',
+    r'교촌치킨|교촌|KyoChon',
+    r'롯데리아|Lotteria',
+    r'버거킹|BurgerKing',
+    r'파리바게뜨|Paris',
+    r'뚜레쥬르|Tous',
+    r'올리브영|Oliveyoung',
+    r'이마트|E-mart',
+    r'세븐일레븐|7-Eleven|711',
+    r'CU편의점|CU',
+    r'GS25|지에스25'
+]
+
+# 모든 위치에서 전방탐색으로 시도하므로 서로 겹치는 브랜드 출현도 수집된다
+# (같은 위치에서는 첫 번째 브랜드만 잡히므로, 브랜드마다 별칭 첫 글자가 달라야 한다)
+_BRAND_AUTOMATON = re.compile(
+    '(?=' + '|'.join(f'(?P<brand_{i}>{aliases})' for i, aliases in enumerate(BRAND_ALIASES)) + ')',
+    re.IGNORECASE
+)
+_NORMALIZE_PATTERN = re.compile(r'[^\w가-힣0-9]')
+
+CONTAINMENT_MIN_LENGTH = 3
+BIGRAM_MIN_LENGTH = 4
+BIGRAM_SIMILARITY_THRESHOLD = 0.6
+
+
+@dataclass(frozen=True)
+class NameForm:
+    """매칭에 필요한 이름별 사전 계산 결과"""
+    normalized: str
+    bigrams: FrozenSet[str]
+    brands: FrozenSet[str]
+
+
+def normalize_name(text: str) -> str:
+    """특수문자, 공백 제거 후 소문자 변환"""
+    return _NORMALIZE_PATTERN.sub('', text.lower())
+
+
+def _brands_in(text: str) -> FrozenSet[str]:
+    """text에 등장하는 브랜드 그룹 집합 (한 번의 스캔)"""
+    return frozenset(match.lastgroup for match in _BRAND_AUTOMATON.finditer(text))
+
+
+@lru_cache(maxsize=4096)
+def prepare_name(text: str) -> NameForm:
+    """이름을 정규화하고 바이그램/브랜드 집합을 계산 (캐시)"""
+    normalized = normalize_name(text)
+    bigrams = frozenset(normalized[i:i+2] for i in range(len(normalized) - 1))
+    return NameForm(normalized=normalized, bigrams=bigrams, brands=_brands_in(text))
+
+
+def forms_match(target: NameForm, found: NameForm) -> bool:
+    """사전 계산된 두 이름의 매칭 여부 (기존 _is_universal_match 규칙과 동일)"""
+    target_norm = target.normalized
+    found_norm = found.normalized
+
+    # 1. 정확한 매치
+    if target_norm == found_norm:
+        return True
+
+    # 2. 포함 관계 (3글자 이상)
+    if len(target_norm) >= CONTAINMENT_MIN_LENGTH and len(found_norm) >= CONTAINMENT_MIN_LENGTH:
+        if target_norm in found_norm or found_norm in target_norm:
+            return True
+
+    # 3. 브랜드명 매치 (같은 브랜드 그룹의 별칭)
+    if target.brands and not target.brands.isdisjoint(found.brands):
+        return True
+
+    # 4. Jaccard 유사도
+    if len(target_norm) >= BIGRAM_MIN_LENGTH and len(found_norm) >= BIGRAM_MIN_LENGTH:
+        if target.bigrams and found.bigrams:
+            intersection = len(target.bigrams & found.bigrams)
+            union = len(target.bigrams) + len(found.bigrams) - intersection
+            if intersection / union >= BIGRAM_SIMILARITY_THRESHOLD:
+                return True
+
+    return False
+
+
+def is_place_match(target_name: str, found_name: str) -> bool:
+    """단건 매칭 (이름별 계산 결과는 캐시 재사용)"""
+    if not target_name or not found_name:
+        return False
+    return forms_match(prepare_name(target_name), prepare_name(found_name))
+
+
+def first_match_indices(
+    found_items: Iterable[F],
+    targets: Sequence[T],
+    match_fn: Callable[[T, F], bool],
+    max_rank: Optional[int] = None
+) -> List[int]:
+    """
+    목록을 한 번 순회하며 대상별 첫 매칭 인덱스 산출 (모든 대상을 찾으면 조기 종료)
+
+    Args:
+        found_items: 순위 순서의 항목 (이름 또는 사전 계산된 NameForm, 비어 있으면 건너뜀)
+        targets: 찾을 대상 목록 (비어 있으면 매칭하지 않음)
+        match_fn: (target, found_item) -> bool
+        max_rank: 앞에서부터 확인할 최대 개수 (None이면 전체)
+
+    Returns:
+        List[int]: targets와 같은 순서의 0부터 시작하는 인덱스 (없으면 -1)
+    """
+    indices = [-1] * len(targets)
+    pending = {i for i, target in enumerate(targets) if target}
+    candidates = found_items if max_rank is None else islice(found_items, max_rank)
+
+    for position, found in enumerate(candidates):
+        if not pending:
+            break
+        if not found:
+            continue
+
+        for i in [i for i in pending if match_fn(targets[i], found)]:
+            indices[i] = position
+            pending.discard(i)
+
+    return indices
+
+
+class PlaceNameMatcher:
+    """여러 대상 플레이스명을 하나의 SERP 목록에 한 번에 매칭"""
+
+    def __init__(self, target_names: Sequence[str]):
+        self.target_names = list(target_names)
+        # 대상 이름은 매칭기 생성 시 한 번만 정규화
+        self.target_forms: List[Optional[NameForm]] = [
+            prepare_name(name) if name else None for name in self.target_names
+        ]
+
+    def first_match_indices(self, found_names: Sequence[str], max_rank: Optional[int] = None) -> List[int]:
+        """
+        목록을 한 번 순회하며 대상별 첫 매칭 인덱스 산출
+
+        Args:
+            found_names: 광고를 제외한 순서대로의 플레이스명 목록
+            max_rank: 앞에서부터 확인할 최대 개수 (None이면 전체)
+
+        Returns:
+            List[int]: target_names와 같은 순서의 0부터 시작하는 인덱스 (없으면 -1)
+        """
+        # 발견된 이름은 순회하면서 필요한 만큼만 정규화
+        found_forms = (prepare_name(name) if name else None for name in found_names)
+        return first_match_indices(found_forms, self.target_forms, forms_match, max_rank)
+
+    def ranks(self, found_names: Sequence[str], max_rank: int = 50) -> List[int]:
+        """대상별 1부터 시작하는 순위 (없으면 -1)"""
+        return [index + 1 if index >= 0 else -1 for index in self.first_match_indices(found_names, max_rank)]
@@ -6,16 +6,20 @@ IP 로테이션 및 프록시 관리 시스템
 - CAPTCHA 감지 및 대응
 - 요청 제한 관리
 """
+import os
 import time
 import random
 import logging
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import threading
 
+from proxy_scheduler import ProxyScheduler, proxy_weight
+
 @dataclass
 class ProxyInfo:
     """프록시 정보 클래스"""
@@ -29,16 +33,31 @@ class ProxyInfo:
     is_blocked: bool = False
     success_rate: float = 1.0
     response_time: float = 0.0
+    health_check_failed: bool = False  # 헬스 체크로 차단된 경우 (다음 체크 통과 시 해제)
 
 class ProxyManager:
     """프록시 관리자"""
     
-    def __init__(self, proxy_list: List[Dict] = None, max_requests_per_proxy: int = 400):
+    DEFAULT_PROBE_URL = 'http://httpbin.org/ip'
+    
+    def __init__(self, proxy_list: List[Dict] = None, max_requests_per_proxy: int = 400,
+                 probe_url: Optional[str] = None, health_check_workers: Optional[int] = None):
+        """
+        Args:
+            probe_url: 헬스 체크 요청 URL (기본 PROXY_PROBE_URL 또는 httpbin)
+            health_check_workers: 동시에 검사할 프록시 수 상한 (기본 PROXY_CHECK_WORKERS 또는 10)
+        """
         self.logger = logging.getLogger("ProxyManager")
         self.max_requests_per_proxy = max_requests_per_proxy
+        self.probe_url = probe_url or os.getenv('PROXY_PROBE_URL', self.DEFAULT_PROBE_URL)
+        self.health_check_workers = health_check_workers or int(os.getenv('PROXY_CHECK_WORKERS', '10'))
+        self._health_thread: Optional[threading.Thread] = None
+        self._health_stop = threading.Event()
         self.proxies: List[ProxyInfo] = []
         self.current_proxy_index = 0
         self.lock = threading.Lock()
+        # 성공률/지연/남은 할당량 가중치로 선택 (O(log n))
+        self.scheduler = ProxyScheduler()
         
         # 프록시 리스트 초기화
         if proxy_list:
@@ -61,33 +80,58 @@ class ProxyManager:
                     protocol=proxy_data.get('protocol', 'http')
                 )
                 self.proxies.append(proxy)
+                self.scheduler.add(self._proxy_key(proxy), proxy, weight=self._proxy_weight(proxy))
             except KeyError as e:
                 self.logger.error(f"Invalid proxy data: {proxy_data}, missing key: {e}")
         
         self.logger.info(f"Loaded {len(self.proxies)} proxies")
     
     def get_next_proxy(self) -> Optional[ProxyInfo]:
-        """다음 사용 가능한 프록시 반환"""
+        """다음 사용 가능한 프록시 반환 (가중치가 높은 프록시일수록 자주 선택)"""
         with self.lock:
             if not self.proxies:
                 return None
             
-            # 사용 가능한 프록시 찾기
-            attempts = 0
-            while attempts < len(self.proxies):
-                proxy = self.proxies[self.current_proxy_index]
+            # 스케줄러가 모르는 상태 변경(직접 수정 등)이 있으면 다시 스케줄하고 재선택
+            for _ in range(len(self.proxies)):
+                proxy = self.scheduler.acquire()
+                if proxy is None:
+                    break
                 
-                # 프록시 상태 확인
-                if self._is_proxy_available(proxy):
+                available = self._is_proxy_available(proxy)
+                self._reschedule(proxy)
+                if available:
                     return proxy
-                
-                # 다음 프록시로 이동
-                self.current_proxy_index = (self.current_proxy_index + 1) % len(self.proxies)
-                attempts += 1
             
             self.logger.warning("No available proxies found")
             return None
     
+    @staticmethod
+    def _proxy_key(proxy: ProxyInfo) -> str:
+        return f"{proxy.host}:{proxy.port}"
+    
+    def _proxy_weight(self, proxy: ProxyInfo) -> float:
+        quota_left = 1 - proxy.requests_made / self.max_requests_per_proxy if self.max_requests_per_proxy else 1.0
+        return proxy_weight(proxy.success_rate, proxy.response_time, quota_left)
+    
+    def _reschedule(self, proxy: ProxyInfo):
+        """차단(1시간)/할당량 소진(24시간)은 쿨다운으로, 나머지는 가중치로 반영"""
+        if proxy.is_blocked and (proxy.health_check_failed or not proxy.last_used):
+            # 연결 테스트에 실패한 프록시는 다음 헬스 체크를 통과할 때까지 선택 제외
+            self.scheduler.update(self._proxy_key(proxy), weight=0.0)
+            return
+        
+        available_at = 0.0
+        if proxy.last_used:
+            if proxy.is_blocked:
+                available_at = (proxy.last_used + timedelta(hours=1)).timestamp()
+            elif proxy.requests_made >= self.max_requests_per_proxy:
+                available_at = (proxy.last_used + timedelta(hours=24)).timestamp()
+        
+        # 쿨다운 중에는 할당량 가중치 대신 복귀 후 가중치(할당량 리셋)를 미리 반영
+        weight = proxy_weight(proxy.success_rate, proxy.response_time) if available_at else self._proxy_weight(proxy)
+        self.scheduler.update(self._proxy_key(proxy), weight=weight, available_at=available_at)
+    
     def _is_proxy_available(self, proxy: ProxyInfo) -> bool:
         """프록시 사용 가능 여부 확인"""
         # 차단된 프록시는 제외
@@ -126,6 +170,7 @@ class ProxyManager:
                 proxy.success_rate = proxy.success_rate * 0.9
             
             self.total_requests += 1
+            self._reschedule(proxy)
             
             self.logger.debug(f"Proxy {proxy.host}:{proxy.port} used. "
                             f"Requests: {proxy.requests_made}/{self.max_requests_per_proxy}, "
@@ -137,6 +182,7 @@ class ProxyManager:
             proxy.is_blocked = True
             proxy.last_used = datetime.now()
             self.blocked_requests += 1
+            self._reschedule(proxy)
             
             self.logger.warning(f"Proxy {proxy.host}:{proxy.port} marked as blocked")
     
@@ -148,7 +194,7 @@ class ProxyManager:
             return f"{proxy.protocol}://{proxy.host}:{proxy.port}"
     
     def test_proxy(self, proxy: ProxyInfo, timeout: int = 10) -> bool:
-        """프록시 연결 테스트"""
+        """프록시 연결 테스트 (성공 시 응답 시간을 response_time에 기록)"""
         try:
             proxy_url = self.get_proxy_url(proxy)
             proxies = {
@@ -158,15 +204,18 @@ class ProxyManager:
             
             start_time = time.time()
             response = requests.get(
-                'http://httpbin.org/ip',
+                self.probe_url,
                 proxies=proxies,
                 timeout=timeout
             )
             response_time = time.time() - start_time
             
             if response.status_code == 200:
-                data = response.json()
-                self.logger.info(f"Proxy {proxy.host}:{proxy.port} working. IP: {data.get('origin')}, Response time: {response_time:.2f}s")
+                try:
+                    origin = response.json().get('origin')
+                except ValueError:
+                    origin = None  # httpbin이 아닌 프로브 URL
+                self.logger.info(f"Proxy {proxy.host}:{proxy.port} working. IP: {origin}, Response time: {response_time:.2f}s")
                 proxy.response_time = response_time
                 return True
             else:
@@ -177,19 +226,60 @@ class ProxyManager:
             self.logger.error(f"Proxy {proxy.host}:{proxy.port} test failed: {e}")
             return False
     
-    def test_all_proxies(self) -> List[ProxyInfo]:
-        """모든 프록시 테스트"""
-        working_proxies = []
+    def test_all_proxies(self, timeout: int = 10, max_workers: Optional[int] = None) -> List[ProxyInfo]:
+        """
+        모든 프록시 동시 테스트 (최대 max_workers개씩, 전체 소요 시간 ≈ 가장 느린 묶음의 timeout)
         
-        for proxy in self.proxies:
-            if self.test_proxy(proxy):
-                working_proxies.append(proxy)
-            else:
-                proxy.is_blocked = True
+        실패한 프록시는 차단해 선택에서 제외하고, 헬스 체크로 차단됐던 프록시가 통과하면 해제
+        """
+        if not self.proxies:
+            return []
+        
+        workers = min(max_workers or self.health_check_workers, len(self.proxies))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ProxyHealthCheck") as executor:
+            results = list(executor.map(lambda proxy: self.test_proxy(proxy, timeout), self.proxies))
+        
+        working_proxies = []
+        with self.lock:
+            for proxy, working in zip(self.proxies, results):
+                if working:
+                    working_proxies.append(proxy)
+                    if proxy.health_check_failed:
+                        proxy.is_blocked = False
+                        proxy.health_check_failed = False
+                elif not proxy.is_blocked:
+                    proxy.is_blocked = True
+                    proxy.health_check_failed = True
+                self._reschedule(proxy)
         
         self.logger.info(f"Working proxies: {len(working_proxies)}/{len(self.proxies)}")
         return working_proxies
     
+    def start_health_checks(self, interval: Optional[float] = None, timeout: int = 10):
+        """백그라운드에서 interval초(기본 PROXY_CHECK_INTERVAL 또는 300)마다 test_all_proxies 실행"""
+        if self._health_thread and self._health_thread.is_alive():
+            return
+        
+        interval = interval if interval is not None else float(os.getenv('PROXY_CHECK_INTERVAL', '300'))
+        self._health_stop.clear()
+        
+        def run():
+            while not self._health_stop.wait(interval):
+                try:
+                    self.test_all_proxies(timeout=timeout)
+                except Exception as e:
+                    self.logger.error(f"Proxy health check failed: {e}")
+        
+        self._health_thread = threading.Thread(target=run, name="ProxyHealthChecker", daemon=True)
+        self._health_thread.start()
+        self.logger.info(f"Proxy health checks every {interval}s")
+    
+    def stop_health_checks(self):
+        self._health_stop.set()
+        if self._health_thread:
+            self._health_thread.join(timeout=5)
+            self._health_thread = None
+    
     def get_statistics(self) -> Dict:
         """프록시 사용 통계"""
         working_proxies = sum(1 for p in self.proxies if not p.is_blocked)
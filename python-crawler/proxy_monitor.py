@@ -1,11 +1,14 @@
 import os
 import json
 import time
+import atexit
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, Optional
 from dataclasses import dataclass, asdict
 from supabase import create_client, Client
+from supabase_bulk_writer import SupabaseBulkWriter
+from rolling_stats import RollingProxyStats, classify_error
 
 @dataclass
 class ProxyUsageRecord:
@@ -43,9 +46,23 @@ class ProxyMonitor:
                 self.log_to_supabase = False
                 self.logger.warning("Supabase credentials not found, disabling database logging")
         
-        # 메모리에 임시 저장할 사용 기록
-        self.usage_records: List[ProxyUsageRecord] = []
-        self.max_memory_records = 1000  # 메모리에 최대 1000개 기록 유지
+        # proxy_usage_logs는 백그라운드에서 배치 전송 (요청 경로에서 DB 대기 없음)
+        # 큐가 가득 차면 새 기록을 버려 크롤링 지연을 막음
+        self.log_shipper: Optional[SupabaseBulkWriter] = None
+        if self.log_to_supabase and self.supabase:
+            self.log_shipper = SupabaseBulkWriter(
+                self.supabase,
+                batch_size=int(os.getenv('PROXY_LOG_BATCH_SIZE', '50')),
+                flush_interval=float(os.getenv('PROXY_LOG_FLUSH_INTERVAL', '10')),
+                max_queue_size=int(os.getenv('PROXY_LOG_QUEUE_SIZE', '5000')),
+                overflow_policy=SupabaseBulkWriter.OVERFLOW_DROP_NEWEST,
+                logger_name="ProxyLogShipper"
+            )
+            # 프로세스 종료 시 남은 기록 전송
+            atexit.register(self.close)
+        
+        # 원본 기록 대신 시간 버킷 집계만 유지 (최대 7일, 프록시별 지연 히스토그램 포함)
+        self.rolling_stats = RollingProxyStats()
         
     def _setup_file_logging(self):
         """파일 로깅 설정"""
@@ -93,12 +110,13 @@ class ProxyMonitor:
             country=country
         )
         
-        # 메모리에 저장
-        self.usage_records.append(record)
-        
-        # 메모리 사용량 제한
-        if len(self.usage_records) > self.max_memory_records:
-            self.usage_records = self.usage_records[-self.max_memory_records:]
+        # 롤링 집계에 반영
+        self.rolling_stats.record(
+            proxy_endpoint,
+            success,
+            response_time,
+            None if success else classify_error(status_code, error_message)
+        )
         
         # 로깅
         log_message = (
@@ -119,108 +137,74 @@ class ProxyMonitor:
             self._save_to_supabase(record)
     
     def _save_to_supabase(self, record: ProxyUsageRecord):
-        """Supabase에 프록시 사용 기록 저장"""
-        if not self.supabase:
+        """proxy_usage_logs 전송 큐에 기록 추가 (즉시 반환)"""
+        if not self.log_shipper:
             return
         
-        try:
-            data = {
-                'proxy_endpoint': record.proxy_endpoint,
-                'request_url': record.request_url,
-                'status_code': record.status_code,
-                'response_time': record.response_time,
-                'success': record.success,
-                'error_message': record.error_message,
-                'session_id': record.session_id,
-                'country': record.country,
-                'created_at': record.timestamp
-            }
-            
-            # proxy_usage_logs 테이블에 저장 (테이블이 없으면 수동으로 생성 필요)
-            self.supabase.table('proxy_usage_logs').insert(data).execute()
-            
-        except Exception as e:
-            self.logger.error(f"Failed to save proxy usage to Supabase: {e}")
-    
-    def get_usage_stats(self, hours: int = 24) -> Dict:
-        """지정된 시간 내의 프록시 사용 통계"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        # 시간 필터링
-        recent_records = [
-            record for record in self.usage_records
-            if datetime.fromisoformat(record.timestamp) > cutoff_time
-        ]
-        
-        if not recent_records:
-            return {
-                'total_requests': 0,
-                'successful_requests': 0,
-                'failed_requests': 0,
-                'success_rate': 0.0,
-                'average_response_time': 0.0,
-                'proxy_stats': {},
-                'error_summary': {}
-            }
-        
-        # 기본 통계
-        total_requests = len(recent_records)
-        successful_requests = sum(1 for r in recent_records if r.success)
-        failed_requests = total_requests - successful_requests
-        success_rate = (successful_requests / total_requests) * 100 if total_requests > 0 else 0
+        data = {
+            'proxy_endpoint': record.proxy_endpoint,
+            'request_url': record.request_url,
+            'status_code': record.status_code,
+            'response_time': record.response_time,
+            'success': record.success,
+            'error_message': record.error_message,
+            'session_id': record.session_id,
+            'country': record.country,
+            'created_at': record.timestamp
+        }
         
-        # 응답 시간 통계
-        response_times = [r.response_time for r in recent_records if r.response_time > 0]
-        average_response_time = sum(response_times) / len(response_times) if response_times else 0
+        # proxy_usage_logs 테이블에 저장 (테이블이 없으면 수동으로 생성 필요)
+        if not self.log_shipper.add('proxy_usage_logs', data):
+            self.logger.debug("Proxy log queue full, dropping record")
+    
+    def get_shipper_stats(self) -> Dict:
+        """proxy_usage_logs 전송 지표 (큐 깊이, 전송/실패/버린 행 수)"""
+        if not self.log_shipper:
+            return {}
+        return self.log_shipper.get_metrics()
+    
+    def close(self, timeout: float = 10.0):
+        """남은 proxy_usage_logs 전송 후 전송 스레드 종료"""
+        if self.log_shipper:
+            self.log_shipper.close(timeout)
+    
+    def get_usage_stats(self, hours: float = 24) -> Dict:
+        """지정된 시간 내의 프록시 사용 통계 (최대 7일, 버킷 합산으로 계산)"""
+        overall, by_proxy = self.rolling_stats.snapshot(hours)
         
         # 프록시별 통계
         proxy_stats = {}
-        for record in recent_records:
-            endpoint = record.proxy_endpoint
-            if endpoint not in proxy_stats:
-                proxy_stats[endpoint] = {
-                    'total': 0,
-                    'success': 0,
-                    'failed': 0,
-                    'avg_response_time': 0.0
-                }
-            
-            proxy_stats[endpoint]['total'] += 1
-            if record.success:
-                proxy_stats[endpoint]['success'] += 1
-            else:
-                proxy_stats[endpoint]['failed'] += 1
-        
-        # 각 프록시의 응답 시간 계산
-        for endpoint in proxy_stats:
-            endpoint_records = [r for r in recent_records if r.proxy_endpoint == endpoint]
-            response_times = [r.response_time for r in endpoint_records if r.response_time > 0]
-            proxy_stats[endpoint]['avg_response_time'] = (
-                sum(response_times) / len(response_times) if response_times else 0
-            )
-            proxy_stats[endpoint]['success_rate'] = (
-                (proxy_stats[endpoint]['success'] / proxy_stats[endpoint]['total']) * 100
-                if proxy_stats[endpoint]['total'] > 0 else 0
-            )
-        
-        # 에러 요약
-        error_summary = {}
-        failed_records = [r for r in recent_records if not r.success and r.error_message]
-        for record in failed_records:
-            error_type = record.error_message[:100] if record.error_message else "Unknown error"
-            error_summary[error_type] = error_summary.get(error_type, 0) + 1
+        for endpoint, stats in by_proxy.items():
+            proxy_stats[endpoint] = {
+                'total': stats.total,
+                'success': stats.success,
+                'failed': stats.failed,
+                'avg_response_time': stats.latency.mean,
+                'success_rate': stats.success_rate,
+                'p50_response_time': round(stats.latency.percentile(0.50), 3),
+                'p95_response_time': round(stats.latency.percentile(0.95), 3),
+                'p99_response_time': round(stats.latency.percentile(0.99), 3)
+            }
         
         return {
             'period_hours': hours,
-            'total_requests': total_requests,
-            'successful_requests': successful_requests,
-            'failed_requests': failed_requests,
-            'success_rate': round(success_rate, 2),
-            'average_response_time': round(average_response_time, 2),
+            'total_requests': overall.total,
+            'successful_requests': overall.success,
+            'failed_requests': overall.failed,
+            'success_rate': round(overall.success_rate, 2),
+            'average_response_time': round(overall.latency.mean, 2),
+            'p50_response_time': round(overall.latency.percentile(0.50), 3),
+            'p95_response_time': round(overall.latency.percentile(0.95), 3),
+            'p99_response_time': round(overall.latency.percentile(0.99), 3),
             'proxy_stats': proxy_stats,
-            'error_summary': error_summary
+            # 에러 유형별 횟수 (timeout, proxy_error, http_403 등)
+            'error_summary': dict(overall.errors)
         }
     
+    def latency_percentile(self, q: float, hours: float = 1, proxy_endpoint: Optional[str] = None) -> float:
+        """최근 hours 시간의 q 분위 응답 시간 (초, 기록이 없으면 0)"""
+        return self.rolling_stats.window(hours, proxy_endpoint).latency.percentile(q)
+    
     def export_usage_report(self, hours: int = 24, format: str = 'json') -> str:
         """사용 통계 리포트 내보내기"""
         stats = self.get_usage_stats(hours)
@@ -239,6 +223,7 @@ class ProxyMonitor:
 - 실패한 요청: {stats['failed_requests']}
 - 성공률: {stats['success_rate']}%
 - 평균 응답 시간: {stats['average_response_time']}초
+- 응답 시간 p50/p95/p99: {stats['p50_response_time']}초 / {stats['p95_response_time']}초 / {stats['p99_response_time']}초
 
 🌐 프록시별 상세 통계:
 """
@@ -250,6 +235,7 @@ class ProxyMonitor:
   * 실패: {data['failed']}
   * 성공률: {data['success_rate']:.1f}%
   * 평균 응답시간: {data['avg_response_time']:.2f}초
+  * p95 응답시간: {data['p95_response_time']:.2f}초
 """
             
             if stats['error_summary']:
@@ -263,16 +249,8 @@ class ProxyMonitor:
             raise ValueError(f"Unsupported format: {format}")
     
     def cleanup_old_records(self, days: int = 7):
-        """오래된 기록 정리"""
-        cutoff_time = datetime.now() - timedelta(days=days)
-        
-        # 메모리에서 정리
-        self.usage_records = [
-            record for record in self.usage_records
-            if datetime.fromisoformat(record.timestamp) > cutoff_time
-        ]
-        
-        self.logger.info(f"Cleaned up records older than {days} days")
+        """오래된 기록 정리 (시간 버킷은 7일이 지나면 자동으로 교체되므로 별도 작업 없음)"""
+        self.logger.info(f"Rolling stats keep at most 7 days; nothing to clean for {days} days")
     
     def save_daily_summary(self):
         """일일 요약 저장"""
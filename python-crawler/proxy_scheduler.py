@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+가중치 기반 프록시 스케줄러
+- 스트라이드 스케줄링: 프록시마다 가상 시각(pass)을 두고 가장 작은 pass를 힙에서 선택
+- 선택된 프록시는 1/가중치만큼 pass가 늘어나 가중치에 비례해 트래픽 배분
+- 가중치 = EWMA 성공률, 응답 지연, 남은 요청 할당량으로 계산 (proxy_weight)
+- 쿨다운 중인 프록시는 별도 힙(available_at 순)에 두었다가 시각이 되면 선택 힙으로 복귀
+- 갱신된 항목은 버전 번호로 구분해 힙에서 지연 삭제 -> 선택/갱신 모두 O(log n)
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Hashable, Optional
+
+MIN_SUCCESS_RATE = 0.05
+MIN_WEIGHT = 0.02  # 성공률이 바닥이어도 약 2%는 선택돼 회복 여부를 확인
+
+
+def proxy_weight(success_rate: float, response_time: float = 0.0, quota_left: float = 1.0) -> float:
+    """
+    프록시 가중치
+
+    Args:
+        success_rate: EWMA 성공률 (0~1), 제곱해서 실패가 잦은 프록시를 강하게 감점
+        response_time: 최근 응답 시간(초), 1초면 가중치 절반
+        quota_left: 남은 요청 할당량 비율 (0 이하면 0 = 선택 제외)
+    """
+    if quota_left <= 0:
+        return 0.0
+    reliability = max(min(success_rate, 1.0), MIN_SUCCESS_RATE) ** 2
+    speed = 1.0 / (1.0 + max(response_time, 0.0))
+    return max(reliability * speed * min(quota_left, 1.0), MIN_WEIGHT)
+
+
+class _Entry:
+    __slots__ = ('item', 'weight', 'pass_', 'available_at', 'version')
+
+    def __init__(self, item, weight: float, available_at: float):
+        self.item = item
+        self.weight = weight
+        self.pass_ = 0.0
+        self.available_at = available_at
+        self.version = 0
+
+
+class ProxyScheduler:
+    """가중치 비례로 프록시를 고르는 스레드 안전 힙 (키는 프록시 식별 문자열 등)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._ready = []    # (pass, seq, version, key)
+        self._cooling = []  # (available_at, seq, version, key)
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def add(self, key: Hashable, item, weight: float = 1.0, available_at: float = 0.0):
+        """프록시 등록 (이미 있으면 update와 같음)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(item, weight, available_at)
+                entry.pass_ = self._virtual_time
+                self._push(key, entry, time.time())
+                return
+        self.update(key, weight=weight, available_at=available_at)
+
+    def update(self, key: Hashable, weight: Optional[float] = None, available_at: Optional[float] = None):
+        """
+        가중치/쿨다운 갱신
+
+        가중치만 바뀌면 힙은 그대로 두고 다음 선택 때의 보폭에만 반영.
+        쿨다운이 바뀌거나 가중치가 0과 양수 사이를 오가면 새 버전으로 다시 넣음.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+
+            was_scheduled = entry.weight > 0
+            if weight is not None:
+                entry.weight = weight
+            reschedule = (entry.weight > 0) != was_scheduled
+            if available_at is not None and available_at != entry.available_at:
+                entry.available_at = available_at
+                reschedule = True
+
+            if reschedule:
+                entry.version += 1
+                self._push(key, entry, time.time())
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def acquire(self, now: Optional[float] = None):
+        """가장 앞선(pass가 가장 작은) 사용 가능한 프록시 반환, 없으면 None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._promote(now)
+            while self._ready:
+                pass_, _, version, key = heapq.heappop(self._ready)
+                entry = self._entries.get(key)
+                if entry is None or entry.version != version:
+                    continue  # 지연 삭제된 항목
+
+                self._virtual_time = max(self._virtual_time, pass_)
+                entry.pass_ = pass_ + 1.0 / max(entry.weight, MIN_WEIGHT)
+                heapq.heappush(self._ready, (entry.pass_, next(self._seq), version, key))
+                return entry.item
+            return None
+
+    def seconds_until_ready(self, now: Optional[float] = None) -> Optional[float]:
+        """바로 쓸 수 있으면 0, 모두 쿨다운이면 가장 빠른 복귀까지 남은 초, 스케줄된 프록시가 없으면 None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._promote(now)
+            self._drop_stale(self._ready)
+            if self._ready:
+                return 0.0
+            self._drop_stale(self._cooling)
+            if self._cooling:
+                return max(0.0, self._cooling[0][0] - now)
+            return None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'scheduled': len(self._entries),
+                'heap_size': len(self._ready) + len(self._cooling),
+                'virtual_time': self._virtual_time,
+            }
+
+    # ---- 내부 처리 (락 안에서 호출) ----
+
+    def _push(self, key: Hashable, entry: _Entry, now: float):
+        if entry.weight <= 0:
+            return  # 할당량 소진 등: 가중치가 다시 양수가 될 때까지 선택 제외
+        if entry.available_at > now:
+            heapq.heappush(self._cooling, (entry.available_at, next(self._seq), entry.version, key))
+        else:
+            # 오래 쉬었던 프록시가 밀린 몫을 한꺼번에 가져가지 않도록 현재 가상 시각부터 시작
+            entry.pass_ = max(entry.pass_, self._virtual_time)
+            heapq.heappush(self._ready, (entry.pass_, next(self._seq), entry.version, key))
+        self._compact()
+
+    def _promote(self, now: float):
+        """쿨다운이 끝난 항목을 선택 힙으로 이동"""
+        while self._cooling and self._cooling[0][0] <= now:
+            _, _, version, key = heapq.heappop(self._cooling)
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version or entry.weight <= 0:
+                continue
+            entry.pass_ = max(entry.pass_, self._virtual_time)
+            heapq.heappush(self._ready, (entry.pass_, next(self._seq), version, key))
+
+    def _drop_stale(self, heap: list):
+        while heap:
+            key, version = heap[0][3], heap[0][2]
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version and entry.weight > 0:
+                return
+            heapq.heappop(heap)
+
+    def _compact(self):
+        """지연 삭제로 쌓인 항목이 많아지면 살아있는 항목만으로 힙 재구성 (분할 상환 O(1))"""
+        if len(self._ready) + len(self._cooling) <= 2 * len(self._entries) + 16:
+            return
+
+        def live(heap):
+            alive = []
+            for record in heap:
+                entry = self._entries.get(record[3])
+                if entry is not None and entry.version == record[2] and entry.weight > 0:
+                    alive.append(record)
+            heapq.heapify(alive)
+            return alive
+
+        self._ready = live(self._ready)
+        self._cooling = live(self._cooling)
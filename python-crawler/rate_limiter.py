@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+토큰 버킷 요청 속도 제한기
+- 전역 버킷 1개 + 프록시(출구 IP)별 버킷으로 요청 간격 관리
+- 여러 워커가 같은 제한기를 공유하면 각자 sleep하지 않고 빈 슬롯을 나눠 씀
+- 예약 방식: 토큰이 부족하면 음수로 빌려 쓰고 그만큼만 대기 -> 동시 호출도 순서대로 간격 확보
+- 지터: 요청마다 토큰 비용을 cost × U(1-jitter, 1+jitter)로 흔들어 간격을 불규칙하게 (평균 속도는 유지)
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 버킷"""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, cost: float, now: float) -> float:
+        """cost만큼 토큰을 가져가고, 토큰이 생길 때까지 기다려야 할 시간(초) 반환"""
+        if self.rate <= 0:
+            return 0.0
+        self.refill(now)
+        self.tokens -= cost
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def set_rate(self, rate: float, now: float):
+        """지금까지 쌓인 토큰은 이전 속도로 계산하고 이후부터 새 속도 적용"""
+        self.refill(now)
+        self.rate = rate
+
+
+class RateLimiter:
+    """전역 + 프록시별 토큰 버킷 (스레드 안전, 여러 크롤러/워커가 공유 가능)"""
+
+    def __init__(self, rate: float, per_proxy_rate: Optional[float] = None, burst: float = 1.0,
+                 jitter: float = 0.0, logger_name: str = "RateLimiter"):
+        """
+        Args:
+            rate: 전역 초당 요청 수 (0 이하면 제한 없음)
+            per_proxy_rate: 프록시별 초당 요청 수 (None이면 프록시별 제한 없음)
+            burst: 버킷 최대 크기 (쉬었다가 연속으로 보낼 수 있는 요청 수)
+            jitter: 토큰 비용 변동 폭 (0~1)
+        """
+        self.logger = logging.getLogger(logger_name)
+        self.per_proxy_rate = per_proxy_rate
+        self.burst = burst
+        self.jitter = min(max(jitter, 0.0), 1.0)
+
+        self._lock = threading.Lock()
+        self._global = TokenBucket(rate, burst)
+        self._per_proxy: Dict[Hashable, TokenBucket] = {}
+
+        self.stats = {
+            'acquired': 0,
+            'waited': 0,
+            'total_wait': 0.0,
+        }
+
+    @classmethod
+    def from_env(cls, delay_range: Tuple[float, float], proxy_count: int = 0,
+                 logger_name: str = "RateLimiter") -> "RateLimiter":
+        """
+        기존 delay_range(요청 사이 최소~최대 초)를 프록시별 속도와 지터로 환산
+
+        전역 속도는 CRAWL_MAX_RPS, 없으면 프록시별 속도 × 프록시 수 (프록시가 없으면 1개로 계산).
+        CRAWL_BURST로 버킷 크기 조정 (기본 1).
+        """
+        min_delay, max_delay = delay_range
+        mean_delay = (min_delay + max_delay) / 2
+        per_proxy_rate = 1.0 / mean_delay if mean_delay > 0 else 0.0
+        jitter = (max_delay - min_delay) / (max_delay + min_delay) if mean_delay > 0 else 0.0
+
+        max_rps = os.getenv('CRAWL_MAX_RPS')
+        rate = float(max_rps) if max_rps else per_proxy_rate * max(1, proxy_count)
+
+        return cls(
+            rate=rate,
+            per_proxy_rate=per_proxy_rate if proxy_count else None,
+            burst=float(os.getenv('CRAWL_BURST', '1')),
+            jitter=jitter,
+            logger_name=logger_name,
+        )
+
+    @property
+    def rate(self) -> float:
+        return self._global.rate
+
+    def get_rate(self, proxy: Optional[Hashable] = None) -> float:
+        """프록시별 제한이 있으면 해당 프록시 속도, 아니면 전역 속도"""
+        with self._lock:
+            return self._bucket(proxy).rate
+
+    def set_rate(self, rate: float, proxy: Optional[Hashable] = None):
+        """프록시별(없으면 전역) 속도 변경"""
+        with self._lock:
+            self._bucket(proxy).set_rate(rate, time.monotonic())
+
+    def set_global_rate(self, rate: float):
+        with self._lock:
+            self._global.set_rate(rate, time.monotonic())
+
+    def penalize(self, proxy: Optional[Hashable], seconds: float):
+        """해당 프록시(없으면 전역) 버킷에 seconds만큼 토큰을 빚지게 해 다음 요청을 늦춤"""
+        with self._lock:
+            bucket = self._bucket(proxy)
+            if bucket.rate > 0:
+                bucket.refill(time.monotonic())
+                bucket.tokens = min(bucket.tokens, 0.0) - seconds * bucket.rate
+
+    def reserve(self, proxy: Optional[Hashable] = None, cost: float = 1.0) -> float:
+        """슬롯을 예약하고 대기해야 할 시간(초) 반환 (대기는 호출자가 처리)"""
+        if self.jitter:
+            cost *= random.uniform(1 - self.jitter, 1 + self.jitter)
+
+        with self._lock:
+            now = time.monotonic()
+            wait = self._global.reserve(cost, now)
+            bucket = self._bucket(proxy)
+            if bucket is not self._global:
+                wait = max(wait, bucket.reserve(cost, now))
+
+            self.stats['acquired'] += 1
+            if wait > 0:
+                self.stats['waited'] += 1
+                self.stats['total_wait'] += wait
+        return wait
+
+    def acquire(self, proxy: Optional[Hashable] = None, cost: float = 1.0) -> float:
+        """요청 슬롯이 올 때까지 대기 후 실제 대기 시간 반환"""
+        wait = self.reserve(proxy, cost)
+        if wait > 0:
+            self.logger.debug(f"Rate limited: waiting {wait:.2f}s (proxy: {proxy})")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, proxy: Optional[Hashable] = None, cost: float = 1.0) -> float:
+        """acquire의 asyncio 버전 (이벤트 루프를 막지 않음)"""
+        wait = self.reserve(proxy, cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def _bucket(self, proxy: Optional[Hashable]) -> TokenBucket:
+        """락 안에서 호출: 프록시별 버킷 (프록시별 제한이 없으면 전역 버킷)"""
+        if proxy is None or not self.per_proxy_rate:
+            return self._global
+        bucket = self._per_proxy.get(proxy)
+        if bucket is None:
+            bucket = self._per_proxy[proxy] = TokenBucket(self.per_proxy_rate, self.burst)
+        return bucket
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'rate': self._global.rate,
+                'per_proxy_rate': self.per_proxy_rate,
+                'proxies': len(self._per_proxy),
+            }
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+출구 IP(프록시)별 일일 요청 예산 원장
+- 프로세스/워커/크롤러 종류와 관계없이 같은 원장을 공유해 하루 한도(기본 450회)를 함께 차감
+- 날짜는 한국 시간(KST) 기준, 출구는 프록시 host:port (프록시가 없으면 direct)
+  Bright Data처럼 username의 -session-<id>로 출구 IP가 갈리면 세션 ID 해시를 키에 포함
+- 크롤러는 네이버로 나가는 페이지 요청(HTTP 수집, 검색 페이지, 플레이스 목록 이동)마다 1회씩 차감
+- reserve()는 "사용량 + 요청 수 <= 한도"일 때만 원자적으로 차감 (동시 워커가 한도를 넘지 않음)
+- 기본은 SQLite 파일 (SQLite 파일 잠금으로 프로세스 간 직렬화), Supabase(Postgres) 함수도 지원
+  (Supabase 사용 시 supabase/migrations/009_request_budget_ledger.sql 적용 필요)
+"""
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import urllib.parse
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+KST = timezone(timedelta(hours=9))
+DEFAULT_DAILY_LIMIT = 450
+
+_SESSION_PATTERN = re.compile(r'-session-([^-:@]+)')
+
+
+class BudgetExhausted(Exception):
+    """검색 도중 현재 출구의 일일 예산이 소진됨"""
+
+
+def kst_day(now: Optional[datetime] = None) -> str:
+    """KST 기준 날짜 문자열 (YYYY-MM-DD)"""
+    return (now or datetime.now(KST)).astimezone(KST).date().isoformat()
+
+
+def seconds_until_next_kst_day(now: Optional[datetime] = None) -> float:
+    """다음 KST 자정(예산 초기화)까지 남은 초"""
+    now = (now or datetime.now(KST)).astimezone(KST)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=KST)
+    return (tomorrow - now).total_seconds()
+
+
+def exit_key(proxy: Optional[str]) -> str:
+    """
+    출구 키 (프록시 host:port, 인증 정보 제외) - 원장과 AdaptivePacer가 같은 키 사용
+
+    같은 슈퍼프록시 주소라도 username의 세션 ID가 다르면 출구 IP가 다르므로
+    host:port#<세션 ID 해시 8자리>로 구분 (세션 ID 원문은 저장하지 않음).
+    프록시 없이 직접 연결할 때는 REQUEST_LEDGER_DIRECT_KEY로 러너/서버별 출구 IP를 구분할 수 있음
+    """
+    if not proxy:
+        return os.getenv('REQUEST_LEDGER_DIRECT_KEY', 'direct')
+
+    parsed = urllib.parse.urlsplit(proxy if '://' in proxy else f"http://{proxy}")
+    if not parsed.hostname:
+        return proxy
+    key = f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname
+    match = _SESSION_PATTERN.search(parsed.username or '')
+    if match:
+        key += '#' + hashlib.sha256(match.group(1).encode()).hexdigest()[:8]
+    return key
+
+
+class SQLiteBudgetLedger:
+    """SQLite 파일 기반 원장 (같은 파일을 쓰는 모든 프로세스가 예산 공유)"""
+
+    def __init__(self, path: str, limit: int = DEFAULT_DAILY_LIMIT, timeout: float = 30.0,
+                 logger_name: str = "RequestBudgetLedger"):
+        self.logger = logging.getLogger(logger_name)
+        self.path = path
+        self.limit = limit
+        self.timeout = timeout
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            # WAL: 읽기(잔여 조회)가 쓰기(예약)를 막지 않음
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS request_budget (
+                    day TEXT NOT NULL,
+                    exit_key TEXT NOT NULL,
+                    used INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL,
+                    PRIMARY KEY (day, exit_key)
+                )
+            """)
+
+    def reserve(self, exit_key: str, count: int = 1, day: Optional[str] = None) -> bool:
+        """한도 안이면 count만큼 차감하고 True, 넘으면 차감 없이 False"""
+        day = day or kst_day()
+        with closing(self._connect()) as conn:
+            # 단일 UPSERT 문이라 SQLite 쓰기 잠금 안에서 조회와 차감이 함께 일어남
+            cursor = conn.execute("""
+                INSERT INTO request_budget (day, exit_key, used, updated_at)
+                SELECT ?, ?, ?, ? WHERE ? <= ?
+                ON CONFLICT (day, exit_key) DO UPDATE
+                SET used = used + excluded.used, updated_at = excluded.updated_at
+                WHERE request_budget.used + excluded.used <= ?
+            """, (day, exit_key, count, time.time(), count, self.limit, self.limit))
+            reserved = cursor.rowcount > 0
+
+        if not reserved:
+            self.logger.info(f"Daily budget exhausted for {exit_key} on {day} (limit {self.limit})")
+        return reserved
+
+    def release(self, exit_key: str, count: int = 1, day: Optional[str] = None):
+        """요청을 보내지 못한 예약 반환"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE request_budget SET used = MAX(used - ?, 0), updated_at = ? WHERE day = ? AND exit_key = ?",
+                (count, time.time(), day or kst_day(), exit_key),
+            )
+
+    def used(self, exit_key: str, day: Optional[str] = None) -> int:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT used FROM request_budget WHERE day = ? AND exit_key = ?", (day or kst_day(), exit_key)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self, exit_key: str, day: Optional[str] = None) -> int:
+        return max(self.limit - self.used(exit_key, day), 0)
+
+    def usage(self, day: Optional[str] = None) -> Dict[str, int]:
+        """해당 날짜의 출구별 사용량"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT exit_key, used FROM request_budget WHERE day = ? ORDER BY exit_key", (day or kst_day(),)
+            ).fetchall()
+        return dict(rows)
+
+    def _connect(self) -> sqlite3.Connection:
+        # autocommit 모드: 문장 하나가 트랜잭션 하나, 잠금 대기는 timeout까지
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+
+class SupabaseBudgetLedger:
+    """Supabase(Postgres) 원장 (여러 서버/GitHub Actions 실행이 같은 예산 공유)"""
+
+    def __init__(self, supabase, limit: int = DEFAULT_DAILY_LIMIT, logger_name: str = "RequestBudgetLedger"):
+        self.logger = logging.getLogger(logger_name)
+        self.supabase = supabase
+        self.limit = limit
+
+    def reserve(self, exit_key: str, count: int = 1, day: Optional[str] = None) -> bool:
+        day = day or kst_day()
+        response = self.supabase.rpc('reserve_request_budget', {
+            'p_day': day, 'p_exit_key': exit_key, 'p_count': count, 'p_limit': self.limit,
+        }).execute()
+        reserved = bool(response.data)
+
+        if not reserved:
+            self.logger.info(f"Daily budget exhausted for {exit_key} on {day} (limit {self.limit})")
+        return reserved
+
+    def release(self, exit_key: str, count: int = 1, day: Optional[str] = None):
+        self.supabase.rpc('release_request_budget', {
+            'p_day': day or kst_day(), 'p_exit_key': exit_key, 'p_count': count,
+        }).execute()
+
+    def used(self, exit_key: str, day: Optional[str] = None) -> int:
+        response = self.supabase.table('request_budget').select('used') \
+            .eq('day', day or kst_day()).eq('exit_key', exit_key).execute()
+        return response.data[0]['used'] if response.data else 0
+
+    def remaining(self, exit_key: str, day: Optional[str] = None) -> int:
+        return max(self.limit - self.used(exit_key, day), 0)
+
+    def usage(self, day: Optional[str] = None) -> Dict[str, int]:
+        response = self.supabase.table('request_budget').select('exit_key, used') \
+            .eq('day', day or kst_day()).execute()
+        return {row['exit_key']: row['used'] for row in response.data or []}
+
+
+def create_budget_ledger(supabase=None, limit: Optional[int] = None, logger_name: str = "RequestBudgetLedger"):
+    """
+    환경 변수로 원장 생성
+
+    REQUEST_LEDGER: sqlite(기본) / supabase / off
+    REQUEST_LEDGER_PATH: SQLite 파일 경로 (기본 logs/request_budget.sqlite3)
+    DAILY_REQUEST_LIMIT: 출구별 하루 한도 (기본 450)
+    """
+    backend = os.getenv('REQUEST_LEDGER', 'sqlite').lower()
+    limit = limit if limit is not None else int(os.getenv('DAILY_REQUEST_LIMIT', str(DEFAULT_DAILY_LIMIT)))
+
+    if backend == 'off':
+        return None
+    if backend == 'supabase':
+        if supabase is None:
+            logging.getLogger(logger_name).warning("REQUEST_LEDGER=supabase but no Supabase client, using SQLite")
+        else:
+            return SupabaseBudgetLedger(supabase, limit, logger_name)
+
+    path = os.getenv('REQUEST_LEDGER_PATH', os.path.join('logs', 'request_budget.sqlite3'))
+    return SQLiteBudgetLedger(path, limit, logger_name=logger_name)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Selenium 리소스 차단 정책 (CDP)
+- Chrome은 --disable-images / --disable-javascript 스위치를 무시하므로 CDP Network.setBlockedURLs로 차단
+- 이미지/폰트/미디어, 광고/분석 비콘을 차단하고 SERP·Apollo State에 필요한 호스트는 허용 목록으로 보호
+- performance 로그(Network.loadingFinished/loadingFailed)로 검색별 전송 바이트와 차단 건수 집계
+"""
+import os
+import json
+import fnmatch
+import logging
+import urllib.parse
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger("ResourcePolicy")
+
+# 검색 결과/Apollo State 수집에 필요 없는 리소스 (Chrome 와일드카드 패턴, URL 전체와 매칭)
+DEFAULT_BLOCKED_PATTERNS = [
+    # 이미지
+    '*.png', '*.png?*', '*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.gif', '*.gif?*',
+    '*.webp', '*.webp?*', '*.svg', '*.svg?*', '*.ico', '*.ico?*',
+    '*://search.pstatic.net/common/*',
+    '*://*.phinf.pstatic.net/*',
+    '*://ldb-phinf.pstatic.net/*',
+    # 폰트/미디어
+    '*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*', '*.otf', '*.otf?*',
+    '*.mp4', '*.mp4?*', '*.webm', '*.webm?*', '*.m3u8', '*.m3u8?*',
+    # 광고/분석 비콘
+    '*://lcs.naver.com/*',
+    '*://tivan.naver.com/*',
+    '*://nam.veta.naver.com/*',
+    '*://siape.veta.naver.com/*',
+    '*://adcr.naver.com/*',
+    '*://*.doubleclick.net/*',
+    '*://*.google-analytics.com/*',
+    '*://*.googletagmanager.com/*',
+    '*://*.facebook.net/*',
+]
+
+# 절대 차단하면 안 되는 요청 (문서/스크립트/XHR - 목록 렌더링과 Apollo State 생성에 필요)
+REQUIRED_URLS = [
+    'https://m.search.naver.com/search.naver?where=m&query=test',
+    'https://m.place.naver.com/list?query=test&entry=pll',
+    'https://m.place.naver.com/restaurant/list?query=test',
+    'https://ssl.pstatic.net/static.m/search/js/search.js',
+    'https://ssl.pstatic.net/static.m/search/css/search.css',
+    'https://pcmap-api.place.naver.com/graphql',
+    'https://m.place.naver.com/graphql',
+]
+
+
+class ResourcePolicy:
+    """CDP로 적용하는 URL 차단 목록 (허용 목록과 충돌하는 패턴은 생성 시 거부)"""
+
+    def __init__(self, blocked_patterns: Optional[Iterable[str]] = None, required_urls: Optional[Iterable[str]] = None):
+        self.blocked_patterns = list(DEFAULT_BLOCKED_PATTERNS if blocked_patterns is None else blocked_patterns)
+        self.required_urls = list(REQUIRED_URLS if required_urls is None else required_urls)
+
+        conflicts = [url for url in self.required_urls if self.blocks(url)]
+        if conflicts:
+            raise ValueError(f"Resource policy blocks required URLs: {conflicts}")
+
+    @classmethod
+    def from_env(cls) -> Optional["ResourcePolicy"]:
+        """
+        환경변수로 정책 생성
+        - RESOURCE_BLOCKING=0이면 None (차단 안 함)
+        - RESOURCE_BLOCK_EXTRA: 추가 차단 패턴 (쉼표 구분)
+        """
+        if os.getenv('RESOURCE_BLOCKING', '1') == '0':
+            return None
+
+        extra = [pattern.strip() for pattern in os.getenv('RESOURCE_BLOCK_EXTRA', '').split(',') if pattern.strip()]
+        return cls(DEFAULT_BLOCKED_PATTERNS + extra)
+
+    def blocks(self, url: str) -> bool:
+        """Chrome setBlockedURLs와 같은 방식('*'는 임의 문자열, URL 전체 매칭)으로 차단 여부 판단"""
+        return any(fnmatch.fnmatchcase(url, pattern) for pattern in self.blocked_patterns)
+
+    def configure_options(self, options):
+        """전송량 집계를 위해 performance 로그 수집 활성화 (webdriver.Chrome 생성 전에 호출)"""
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    def apply(self, driver):
+        """기동된 드라이버에 차단 목록 적용"""
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_patterns})
+        logger.debug(f"Blocked {len(self.blocked_patterns)} URL patterns via CDP")
+
+
+def summarize_network_log(entries: Iterable[Dict]) -> Dict:
+    """
+    performance 로그 항목에서 전송량 집계
+
+    Returns:
+        {'bytes': 실제 수신 바이트(압축 기준), 'requests': 완료 요청 수,
+         'blocked': 정책으로 차단된 요청 수, 'failed': 그 외 실패 수, 'by_host': {호스트: 바이트}}
+    """
+    summary = {'bytes': 0, 'requests': 0, 'blocked': 0, 'failed': 0, 'by_host': {}}
+    hosts: Dict[str, str] = {}
+
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+
+        method = message.get('method')
+        params = message.get('params', {})
+
+        if method == 'Network.requestWillBeSent':
+            hosts[params.get('requestId')] = urllib.parse.urlsplit(params.get('request', {}).get('url', '')).netloc
+        elif method == 'Network.loadingFinished':
+            size = int(params.get('encodedDataLength') or 0)
+            summary['bytes'] += size
+            summary['requests'] += 1
+            host = hosts.get(params.get('requestId'), '')
+            summary['by_host'][host] = summary['by_host'].get(host, 0) + size
+        elif method == 'Network.loadingFailed':
+            if params.get('blockedReason'):
+                summary['blocked'] += 1
+            else:
+                summary['failed'] += 1
+
+    return summary
+
+
+def collect_transfer_stats(driver) -> Optional[Dict]:
+    """
+    마지막 호출 이후의 네트워크 전송량 (performance 로그를 비우며 읽음)
+
+    performance 로그가 활성화되지 않은 드라이버면 None
+    """
+    try:
+        entries = driver.get_log('performance')
+    except Exception as e:
+        logger.debug(f"Performance log unavailable: {e}")
+        return None
+    return summarize_network_log(entries)
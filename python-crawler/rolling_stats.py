@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+프록시 사용량 롤링 집계
+- 원본 기록 없이 시간 버킷(분 60개 + 시간 168개) 단위로 성공/실패/에러 유형 집계
+- 버킷마다 병합 가능한 로그 스케일 지연 히스토그램 (p50/p95/p99)
+- 최대 7일 범위 조회가 버킷 수(최대 168개)로 제한된 상수 시간에 처리됨
+"""
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+MINUTE_SLOTS = 60
+HOUR_SLOTS = 24 * 7
+MAX_WINDOW_HOURS = HOUR_SLOTS
+
+# 히스토그램 버킷 간격 (연속 버킷 경계 비율, 상대 오차 약 ±5%)
+HISTOGRAM_GROWTH = 1.1
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+_MIN_LATENCY_MS = 1.0
+
+
+class LatencyHistogram:
+    """로그 스케일 버킷 지연 히스토그램 (같은 버킷 경계를 쓰므로 단순 합산으로 병합 가능)"""
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+
+    @staticmethod
+    def _bucket_of(seconds: float) -> int:
+        ms = max(seconds * 1000.0, _MIN_LATENCY_MS)
+        return int(math.log(ms / _MIN_LATENCY_MS) / _LOG_GROWTH)
+
+    @staticmethod
+    def _bucket_value(bucket: int) -> float:
+        """버킷 대표값 (초, 경계의 기하 평균)"""
+        lower = _MIN_LATENCY_MS * HISTOGRAM_GROWTH ** bucket
+        return lower * math.sqrt(HISTOGRAM_GROWTH) / 1000.0
+
+    def add(self, seconds: float):
+        bucket = self._bucket_of(seconds)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other: "LatencyHistogram"):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, q: float) -> float:
+        """q(0~1) 분위 지연 시간 (초, 데이터가 없으면 0)"""
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return self._bucket_value(bucket)
+        return self._bucket_value(max(self.counts))
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class StatsBucket:
+    """한 시간 구간의 집계"""
+    total: int = 0
+    success: int = 0
+    failed: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def add(self, success: bool, response_time: float, error_class: Optional[str]):
+        self.total += 1
+        if success:
+            self.success += 1
+        else:
+            self.failed += 1
+            if error_class:
+                self.errors[error_class] = self.errors.get(error_class, 0) + 1
+
+        if response_time > 0:
+            self.latency.add(response_time)
+
+    def merge(self, other: "StatsBucket"):
+        self.total += other.total
+        self.success += other.success
+        self.failed += other.failed
+        for error_class, count in other.errors.items():
+            self.errors[error_class] = self.errors.get(error_class, 0) + count
+        self.latency.merge(other.latency)
+
+    @property
+    def success_rate(self) -> float:
+        return (self.success / self.total) * 100 if self.total else 0.0
+
+
+class RollingCounters:
+    """분 단위(최근 1시간) + 시간 단위(최근 7일) 링 버킷"""
+
+    def __init__(self, minute_slots: int = MINUTE_SLOTS, hour_slots: int = HOUR_SLOTS):
+        self.minute_slots = minute_slots
+        self.hour_slots = hour_slots
+        self._minutes: Dict[int, StatsBucket] = {}
+        self._hours: Dict[int, StatsBucket] = {}
+
+    @staticmethod
+    def _slot(buckets: Dict[int, StatsBucket], index: int, capacity: int) -> StatsBucket:
+        bucket = buckets.get(index)
+        if bucket is None:
+            bucket = StatsBucket()
+            buckets[index] = bucket
+            # 새 버킷이 생길 때만 범위를 벗어난 버킷 정리 (분할 상환 O(1))
+            for old_index in [i for i in buckets if i <= index - capacity]:
+                del buckets[old_index]
+        return bucket
+
+    def add(self, success: bool, response_time: float, error_class: Optional[str], now: float):
+        minute = int(now // 60)
+        hour = int(now // 3600)
+        self._slot(self._minutes, minute, self.minute_slots).add(success, response_time, error_class)
+        self._slot(self._hours, hour, self.hour_slots).add(success, response_time, error_class)
+
+    def window(self, hours: float, now: float) -> StatsBucket:
+        """최근 hours 시간 집계 (1시간 이하는 분 버킷, 그 이상은 시간 버킷 단위)"""
+        result = StatsBucket()
+        minutes = int(math.ceil(hours * 60))
+
+        if minutes <= self.minute_slots:
+            current, buckets, span = int(now // 60), self._minutes, minutes
+        else:
+            current, buckets, span = int(now // 3600), self._hours, min(int(math.ceil(hours)), self.hour_slots)
+
+        for index in range(current - span + 1, current + 1):
+            bucket = buckets.get(index)
+            if bucket is not None:
+                result.merge(bucket)
+
+        return result
+
+
+class RollingProxyStats:
+    """프록시별 + 전체 롤링 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._overall = RollingCounters()
+        self._by_proxy: Dict[str, RollingCounters] = {}
+
+    def record(
+        self,
+        proxy_endpoint: str,
+        success: bool,
+        response_time: float,
+        error_class: Optional[str] = None,
+        now: Optional[float] = None
+    ):
+        now = time.time() if now is None else now
+        with self._lock:
+            counters = self._by_proxy.get(proxy_endpoint)
+            if counters is None:
+                counters = RollingCounters()
+                self._by_proxy[proxy_endpoint] = counters
+
+            counters.add(success, response_time, error_class, now)
+            self._overall.add(success, response_time, error_class, now)
+
+    def snapshot(self, hours: float, now: Optional[float] = None) -> Tuple[StatsBucket, Dict[str, StatsBucket]]:
+        """(전체 집계, 프록시별 집계) 반환 - 범위는 최대 7일"""
+        now = time.time() if now is None else now
+        hours = min(hours, MAX_WINDOW_HOURS)
+        with self._lock:
+            overall = self._overall.window(hours, now)
+            by_proxy = {
+                endpoint: counters.window(hours, now)
+                for endpoint, counters in self._by_proxy.items()
+            }
+        return overall, {endpoint: stats for endpoint, stats in by_proxy.items() if stats.total}
+
+    def window(self, hours: float, proxy_endpoint: Optional[str] = None, now: Optional[float] = None) -> StatsBucket:
+        """전체 또는 특정 프록시의 최근 hours 시간 집계"""
+        now = time.time() if now is None else now
+        hours = min(hours, MAX_WINDOW_HOURS)
+        with self._lock:
+            counters = self._overall if proxy_endpoint is None else self._by_proxy.get(proxy_endpoint)
+            return counters.window(hours, now) if counters else StatsBucket()
+
+
+def classify_error(status_code: Optional[int], error_message: Optional[str]) -> str:
+    """에러 메시지/상태 코드를 집계용 유형으로 분류"""
+    message = (error_message or '').lower()
+
+    if 'captcha' in message:
+        return 'captcha'
+    if status_code == 429 or 'rate limit' in message:
+        return 'rate_limited'
+    if 'timeout' in message or 'timed out' in message:
+        return 'timeout'
+    if 'proxy' in message:
+        return 'proxy_error'
+    if 'ssl' in message:
+        return 'ssl_error'
+    if 'connection' in message:
+        return 'connection_error'
+    if status_code and 400 <= status_code < 500:
+        return f'http_{status_code}'
+    if status_code and status_code >= 500:
+        return 'http_5xx'
+    return 'other'
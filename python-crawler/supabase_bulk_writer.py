@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Supabase 일괄 저장기
+- 결과 행을 테이블별로 버퍼링한 뒤 배열 insert 한 번으로 저장
+- 배치 크기 또는 시간 간격 도달 시 백그라운드 스레드에서 flush (크롤링 루프는 대기하지 않음)
+- 실패한 배치는 지수 백오프로 재시도, flush 지표 제공
+- 대기 큐 크기 제한과 초과 정책(drop_newest / block) 지원
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from typing import Dict, List, Optional
+
+
+OVERFLOW_DROP_NEWEST = 'drop_newest'
+OVERFLOW_BLOCK = 'block'
+
+
+class SupabaseBulkWriter:
+    """테이블별 행 버퍼 + 백그라운드 배열 insert"""
+
+    OVERFLOW_DROP_NEWEST = OVERFLOW_DROP_NEWEST
+    OVERFLOW_BLOCK = OVERFLOW_BLOCK
+
+    def __init__(
+        self,
+        supabase,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        max_queue_size: int = 0,
+        overflow_policy: str = OVERFLOW_BLOCK,
+        logger_name: str = "SupabaseBulkWriter"
+    ):
+        """
+        Args:
+            supabase: supabase Client
+            batch_size: 테이블별 배치 크기 (도달 시 즉시 flush)
+            flush_interval: 배치가 차지 않아도 flush하는 최대 간격 (초)
+            max_retries: 배치당 재시도 횟수
+            retry_backoff: 재시도 기본 대기 시간 (초, 시도마다 2배)
+            max_queue_size: 대기 큐 최대 항목 수 (0이면 무제한)
+            overflow_policy: 큐가 가득 찼을 때 정책
+                - drop_newest: 새 행을 버리고 즉시 반환 (호출자 지연 없음)
+                - block: 큐에 자리가 날 때까지 대기
+        """
+        if overflow_policy not in (self.OVERFLOW_DROP_NEWEST, self.OVERFLOW_BLOCK):
+            raise ValueError(f"Unsupported overflow policy: {overflow_policy}")
+
+        self.logger = logging.getLogger(logger_name)
+        self.supabase = supabase
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.overflow_policy = overflow_policy
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._buffers: Dict[str, List[Dict]] = {}
+        self._last_flush = time.monotonic()
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            'rows_queued': 0,
+            'rows_written': 0,
+            'rows_failed': 0,
+            'rows_dropped': 0,
+            'batches_written': 0,
+            'batches_failed': 0,
+            'retries': 0,
+            'flush_time_total': 0.0,
+            'last_flush_at': None,
+            'last_error': None
+        }
+
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=logger_name, daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_env(cls, supabase, logger_name: str = "SupabaseBulkWriter") -> "SupabaseBulkWriter":
+        """환경변수(SUPABASE_BATCH_SIZE, SUPABASE_FLUSH_INTERVAL)로 설정한 저장기 생성"""
+        return cls(
+            supabase,
+            batch_size=int(os.getenv('SUPABASE_BATCH_SIZE', '100')),
+            flush_interval=float(os.getenv('SUPABASE_FLUSH_INTERVAL', '5')),
+            logger_name=logger_name
+        )
+
+    def add(self, table: str, row: Dict) -> bool:
+        """행 추가"""
+        return self.add_many(table, [row])
+
+    def add_many(self, table: str, rows: List[Dict]) -> bool:
+        """
+        여러 행 추가
+
+        Returns:
+            bool: 큐에 들어갔으면 True, 초과 정책으로 버려졌으면 False
+        """
+        if self._closed:
+            raise RuntimeError("SupabaseBulkWriter is closed")
+        if not rows:
+            return True
+
+        # 백그라운드 스레드가 먼저 저장해도 지표가 음수가 되지 않도록 큐 투입 전에 집계
+        with self._metrics_lock:
+            self.metrics['rows_queued'] += len(rows)
+
+        item = ('rows', table, list(rows))
+        if self.overflow_policy == self.OVERFLOW_DROP_NEWEST:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                with self._metrics_lock:
+                    self.metrics['rows_queued'] -= len(rows)
+                    self.metrics['rows_dropped'] += len(rows)
+                return False
+        else:
+            self._queue.put(item)
+
+        return True
+
+    def queue_depth(self) -> int:
+        """백그라운드 스레드가 아직 꺼내지 않은 항목 수"""
+        return self._queue.qsize()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """버퍼된 모든 행을 저장하고 완료될 때까지 대기 (timeout 내 완료 여부 반환)"""
+        if self._closed:
+            return True
+
+        done = threading.Event()
+        self._queue.put(('flush', None, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """남은 행을 저장하고 백그라운드 스레드 종료"""
+        if self._closed:
+            return True
+
+        done = threading.Event()
+        self._queue.put(('stop', None, done))
+        self._closed = True
+        finished = done.wait(timeout)
+        self._worker.join(timeout)
+
+        self.logger.info(f"Bulk writer closed: {self.get_metrics()}")
+        return finished
+
+    def get_metrics(self) -> Dict:
+        """flush 지표 반환"""
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+
+        batches = metrics['batches_written'] + metrics['batches_failed']
+        metrics['avg_flush_time'] = metrics['flush_time_total'] / batches if batches else 0.0
+        metrics['pending_rows'] = metrics['rows_queued'] - metrics['rows_written'] - metrics['rows_failed']
+        metrics['queue_depth'] = self.queue_depth()
+        return metrics
+
+    def _run(self):
+        """백그라운드 루프: 큐에서 행을 모아 조건 충족 시 flush"""
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - self._last_flush))
+
+            try:
+                kind, table, payload = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_all()
+                continue
+
+            if kind == 'rows':
+                buffer = self._buffers.setdefault(table, [])
+                buffer.extend(payload)
+                while len(buffer) >= self.batch_size:
+                    self._write_batch(table, buffer[:self.batch_size])
+                    del buffer[:self.batch_size]
+            elif kind == 'flush':
+                self._flush_all()
+                payload.set()
+            elif kind == 'stop':
+                self._flush_all()
+                payload.set()
+                return
+
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_all()
+
+    def _flush_all(self):
+        """모든 테이블 버퍼 저장"""
+        for table, buffer in self._buffers.items():
+            while buffer:
+                self._write_batch(table, buffer[:self.batch_size])
+                del buffer[:self.batch_size]
+        self._last_flush = time.monotonic()
+
+    def _write_batch(self, table: str, rows: List[Dict]) -> bool:
+        """배열 insert 1회 (실패 시 재시도)"""
+        started = time.monotonic()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.supabase.table(table).insert(rows).execute()
+                self._record_flush(started, rows_written=len(rows))
+                self.logger.debug(f"Flushed {len(rows)} rows to {table}")
+                return True
+
+            except Exception as e:
+                self.logger.warning(f"Bulk insert to {table} failed (attempt {attempt + 1}): {e}")
+                with self._metrics_lock:
+                    self.metrics['last_error'] = str(e)
+                    if attempt < self.max_retries:
+                        self.metrics['retries'] += 1
+
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_backoff * (2 ** attempt))
+
+        self._record_flush(started, rows_failed=len(rows))
+        self.logger.error(f"Dropped batch of {len(rows)} rows for {table} after {self.max_retries} retries")
+        return False
+
+    def _record_flush(self, started: float, rows_written: int = 0, rows_failed: int = 0):
+        with self._metrics_lock:
+            self.metrics['rows_written'] += rows_written
+            self.metrics['rows_failed'] += rows_failed
+            self.metrics['batches_written' if rows_written else 'batches_failed'] += 1
+            self.metrics['flush_time_total'] += time.monotonic() - started
+            self.metrics['last_flush_at'] = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+브라우저 없는 Apollo State 수집기 테스트
+- 로컬 HTTP 서버로 저장된 naver_analysis_1.html 제공
+- Apollo State 추출 / CAPTCHA 페이지 구분 확인
+"""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from apollo_http_fetcher import ApolloHttpFetcher
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'naver_analysis_1.html')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """query에 'captcha'가 포함되면 차단 페이지, 아니면 저장된 검색 결과 반환"""
+
+    def do_GET(self):
+        if 'captcha' in self.path:
+            body = '<html><body>보안문자를 입력해 주세요 (captcha)</body></html>'.encode('utf-8')
+        else:
+            with open(FIXTURE_PATH, 'rb') as f:
+                body = f.read()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_fetch_apollo_state_from_local_server():
+    """로컬 서버에서 Apollo State를 브라우저 없이 추출"""
+    print("Testing HTTP Apollo State fetch")
+    print("=" * 30)
+
+    server = start_fixture_server()
+    fetcher = ApolloHttpFetcher(user_agents=["Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X)"])
+    fetcher.SEARCH_URL = f"http://127.0.0.1:{server.server_address[1]}/search.naver?query={{query}}"
+
+    try:
+        apollo_data, status = fetcher.fetch_apollo_state('강남 맛집')
+        print(f"Status: {status}, keys: {len(apollo_data or {})}")
+        assert status == ApolloHttpFetcher.STATUS_OK
+        restaurant_keys = [key for key in apollo_data if key.startswith('RestaurantListSummary:')]
+        assert len(restaurant_keys) == 5
+
+        apollo_data, status = fetcher.fetch_apollo_state('captcha')
+        print(f"Status: {status}")
+        assert apollo_data is None
+        assert status == ApolloHttpFetcher.STATUS_CAPTCHA
+
+        assert fetcher.stats['requests'] == 2
+        assert fetcher.stats['apollo_found'] == 1
+    finally:
+        fetcher.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_fetch_apollo_state_from_local_server()
+    print("\n✅ Apollo HTTP fetcher tests passed")
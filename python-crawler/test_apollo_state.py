@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Apollo State 스트리밍 추출기 테스트
+- 저장된 naver_analysis_1.html에서 기존 정규식과 동일한 결과
+- 문자열 안의 '};', 이스케이프된 따옴표, 닫히지 않은 객체 처리
+- 목록 엔티티만 선택적으로 디코딩한 결과가 전체 디코딩과 일치
+- JS 런타임에서 읽는 스크립트가 같은 목록 엔티티/순서를 반환 (Node.js가 있을 때)
+"""
+import os
+import sys
+import json
+import shutil
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from apollo_state import (APOLLO_LIST_SUMMARIES_SCRIPT, decode_list_summaries, extract_apollo_json, extract_list_summaries,
+                          find_json_object_span, list_summaries_from_script, parse_apollo_state)
+from benchmark_apollo_extraction import DEFAULT_FIXTURE, decode_full, extract_with_regex
+
+
+def test_matches_regex_on_fixture():
+    """저장된 검색 결과 페이지에서 정규식과 같은 JSON을 추출"""
+    print("Testing extraction on naver_analysis_1.html")
+    print("=" * 30)
+
+    with open(DEFAULT_FIXTURE, 'r', encoding='utf-8') as f:
+        page_source = f.read()
+
+    json_str = extract_apollo_json(page_source)
+    print(f"JSON length: {len(json_str)}")
+    assert json_str == extract_with_regex(page_source)
+
+    apollo_data = parse_apollo_state(page_source)
+    restaurant_keys = [key for key in apollo_data if key.startswith('RestaurantListSummary:')]
+    assert len(restaurant_keys) == 5
+
+
+def test_strings_and_edge_cases():
+    """문자열 내부 괄호/세미콜론과 비정상 입력 처리"""
+    print("Testing string-aware scanning")
+    print("=" * 30)
+
+    page = (
+        'var a = 1; naver.search.ext.nmb.salt.__APOLLO_STATE__={"name":"세미콜론};식당",'
+        '"quote":"\\"}\\\\","nested":{"list":[{"x":"{"}]}};var b = {};'
+    )
+    json_str = extract_apollo_json(page)
+    print(f"Extracted: {json_str}")
+    data = json.loads(json_str)
+    assert data['name'] == '세미콜론};식당'
+    assert data['quote'] == '"}\\'
+    assert data['nested']['list'][0]['x'] == '{'
+
+    # 정규식은 문자열 안의 '};'에서 잘린다
+    assert extract_with_regex(page) != json_str
+
+    assert extract_apollo_json('<html>no state</html>') is None
+    assert extract_apollo_json('naver.search.ext.nmb.salt.__APOLLO_STATE__ = {"a": {"b": 1}') is None
+    assert extract_apollo_json('naver.search.ext.nmb.salt.__APOLLO_STATE__ = {"a": "unterminated}') is None
+    assert find_json_object_span('x{}', 0) is None
+    assert find_json_object_span('x{}', 1) == (1, 3)
+
+
+def test_selective_decoding():
+    """목록 엔티티와 ROOT_QUERY 순서만 디코딩"""
+    print("Testing selective decoding")
+    print("=" * 30)
+
+    with open(DEFAULT_FIXTURE, 'r', encoding='utf-8') as f:
+        page_source = f.read()
+
+    summaries = extract_list_summaries(page_source)
+    print(f"List refs: {summaries.list_refs}")
+    print(f"Ad refs: {summaries.ad_refs}")
+
+    assert summaries.restaurants == decode_full(extract_apollo_json(page_source))
+    assert summaries.list_refs == [key for key, _ in summaries.restaurants]
+    assert len(summaries.ad_refs) == 5
+    assert all(ref.startswith('RestaurantAdSummary:') for ref in summaries.ad_refs)
+    assert summaries.list_position(summaries.list_refs[2]) == 3
+    assert summaries.list_position('RestaurantListSummary:none') == -1
+
+    # 문자열 값 안의 키 모양 텍스트와 참조(__ref)는 엔티티로 취급하지 않는다
+    json_str = (
+        '{"Panorama:1":{"memo":"{\\"RestaurantListSummary:fake\\":{}}"},'
+        '"RestaurantListSummary:2:2":{"id":"2","name":"둘째"},'
+        '"ROOT_QUERY":{"restaurantListFilter({})":{"items":[{"__ref":"Filter:1"}]},'
+        '"restaurantList({})":{"items":[{"__ref":"RestaurantListSummary:1:1"},{"__ref":"RestaurantListSummary:2:2"}]},'
+        '"adBusinesses({})":{"items":[{"__ref":"RestaurantAdSummary:9"}]}},'
+        '"RestaurantListSummary:1:1":{"id":"1","name":"첫째"}}'
+    )
+    summaries = decode_list_summaries(json_str)
+    assert [key for key, _ in summaries.restaurants] == ['RestaurantListSummary:2:2', 'RestaurantListSummary:1:1']
+    assert summaries.list_refs == ['RestaurantListSummary:1:1', 'RestaurantListSummary:2:2']
+    assert summaries.ad_refs == ['RestaurantAdSummary:9']
+
+    assert extract_list_summaries('<html>no state</html>') is None
+
+
+def test_js_runtime_summaries_match_selective_decoding():
+    """window의 Apollo State에서 읽은 결과가 page_source 선택적 디코딩과 동일"""
+    if shutil.which('node') is None:
+        print("Node.js not installed, skipping JS runtime test")
+        return
+
+    with open(DEFAULT_FIXTURE, 'r', encoding='utf-8') as f:
+        json_str = extract_apollo_json(f.read())
+
+    source = (
+        "global.window = {naver: {search: {ext: {nmb: {salt: {__APOLLO_STATE__: %s}}}}}};\n"
+        "console.log(JSON.stringify((function() { %s })()));" % (json_str, APOLLO_LIST_SUMMARIES_SCRIPT)
+    )
+    output = subprocess.run(['node', '-e', source], capture_output=True, text=True, encoding='utf-8', timeout=30)
+    assert output.returncode == 0, output.stderr
+
+    from_js = list_summaries_from_script(json.loads(output.stdout))
+    expected = decode_list_summaries(json_str)
+    print(f"JS runtime: {len(from_js.restaurants)} entities, {len(from_js.list_refs)} list refs, {len(from_js.ad_refs)} ad refs")
+    assert from_js == expected
+
+    # 상태가 없는 페이지
+    output = subprocess.run(['node', '-e', "global.window = {}; console.log(JSON.stringify((function() { %s })()));"
+                             % APOLLO_LIST_SUMMARIES_SCRIPT], capture_output=True, text=True, timeout=30)
+    assert list_summaries_from_script(json.loads(output.stdout)) is None
+
+
+if __name__ == "__main__":
+    test_matches_regex_on_fixture()
+    test_strings_and_edge_cases()
+    test_selective_decoding()
+    test_js_runtime_summaries_match_selective_decoding()
+    print("\n✅ Apollo state extractor tests passed")
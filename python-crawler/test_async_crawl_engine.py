@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 크롤 엔진 테스트
+- 호스트별/프록시별 동시 요청 제한과 전역 요청 속도
+- 처리량이 프록시 수에 비례하는지 (응답 지연을 흉내 내는 로컬 서버 사용)
+- 프록시 실패 시 다음 프록시, 모두 실패하면 직접 연결로 폴백
+- 헤지 요청(옵트인): 느린 URL 변형은 지연 분위가 지나면 다음 변형을 시작하고 먼저 온 응답 채택
+- run()을 여러 번 불러도 클라이언트 커넥션 유지, close()에서 종료
+"""
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from async_crawl_engine import AsyncCrawlEngine
+from bright_data_proxy_manager import BrightDataProxyManager
+
+
+class SlowServer:
+    """요청마다 delay만큼 지연 후 응답하고 최대 동시 처리 수를 기록 (프록시 역할도 겸함)"""
+
+    def __init__(self, name, delay=0.2, status=200, path_delays=None, path_status=None):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.path_delays = path_delays or {}
+        self.path_status = path_status or {}
+        self.in_flight = 0
+        self.peak = 0
+        self.paths = []
+        self.auth_headers = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.peak = max(server.peak, server.in_flight)
+                    server.paths.append(self.path)
+                    server.auth_headers.append(self.headers.get('Proxy-Authorization'))
+                    server.connections.add(self.client_address)
+                time.sleep(server.path_delays.get(self.path, server.delay))
+                with server.lock:
+                    server.in_flight -= 1
+                body = f"{server.name} {self.path}".encode()
+                try:
+                    self.send_response(server.path_status.get(self.path, server.status))
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 헤지로 취소된 요청
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def proxy_manager_for(*servers):
+    return BrightDataProxyManager([
+        {'endpoint': f"127.0.0.1:{server.port}", 'username': 'user', 'password': 'pass'} for server in servers
+    ])
+
+
+async def fetch_worker(engine, urls):
+    response, method = await engine.fetch_first(urls if isinstance(urls, list) else [urls])
+    return response.text if response else None, method
+
+
+def test_per_host_limit_and_result_order():
+    print("Testing async crawl engine")
+    print("=" * 30)
+
+    server = SlowServer("direct", delay=0.2)
+    engine = AsyncCrawlEngine(max_concurrency=8, per_host_limit=2, requests_per_second=0)
+
+    urls = [f"{server.url}/list?query={i}" for i in range(6)]
+    started = time.perf_counter()
+    results = engine.run(urls, fetch_worker)
+    elapsed = time.perf_counter() - started
+    print(f"6 requests, per-host limit 2: {elapsed:.2f}s, server peak {server.peak}, stats {engine.get_stats()}")
+
+    assert server.peak == 2
+    assert 0.55 <= elapsed < 1.5
+    assert [method for _, method in results] == ['direct'] * 6
+    assert [text.split()[1] for text, _ in results] == [f"/list?query={i}" for i in range(6)]
+    assert engine.get_stats()['clients'] == 1
+    engine.close()
+    assert engine.get_stats()['clients'] == 0
+
+    server.close()
+
+
+def test_clients_survive_sequential_runs():
+    """검색마다 run()을 따로 불러도 같은 keep-alive 커넥션을 재사용"""
+    server = SlowServer("keepalive", delay=0)
+    engine = AsyncCrawlEngine(requests_per_second=0)
+
+    for i in range(5):
+        (text, method), = engine.run([f"{server.url}/list?query={i}"], fetch_worker)
+        assert method == 'direct' and text.endswith(f"query={i}")
+
+    print(f"5 sequential runs used {len(server.connections)} connection(s), stats {engine.get_stats()}")
+    assert len(server.connections) == 1
+    stats = engine.get_stats()
+    assert (stats['new_connection_requests'], stats['reused_connection_requests']) == (1, 4)
+    assert stats['reuse_rate'] == 80.0
+    engine.close()
+    engine.close()  # 두 번 닫아도 안전
+
+    # PROXY_HTTP2=true: h2가 설치되어 있어야 클라이언트 생성 가능 (평문 HTTP는 HTTP/1.1로 응답)
+    os.environ['PROXY_HTTP2'] = 'true'
+    try:
+        http2_engine = AsyncCrawlEngine.from_env()
+    finally:
+        del os.environ['PROXY_HTTP2']
+    (text, _), = http2_engine.run([f"{server.url}/h2"], fetch_worker)
+    assert text == "keepalive /h2" and http2_engine.get_stats()['http2']
+    http2_engine.close()
+
+    server.close()
+
+
+def test_throughput_scales_with_proxy_pool():
+    """프록시별 1건 제한에서 프록시 2개면 1개일 때보다 약 2배 빠름"""
+    proxy_a, proxy_b = SlowServer("A", delay=0.2), SlowServer("B", delay=0.2)
+    urls = [f"http://m.place.naver.test/list?query={i}" for i in range(4)]
+
+    def crawl(*proxies):
+        engine = AsyncCrawlEngine(proxy_manager=proxy_manager_for(*proxies), per_host_limit=8,
+                                  per_proxy_limit=1, requests_per_second=0)
+        started = time.perf_counter()
+        results = engine.run(urls, fetch_worker)
+        return results, time.perf_counter() - started
+
+    _, single = crawl(proxy_a)
+    results, double = crawl(proxy_a, proxy_b)
+    print(f"1 proxy: {single:.2f}s, 2 proxies: {double:.2f}s")
+
+    assert proxy_a.peak == 1 and proxy_b.peak == 1
+    assert double < single * 0.75
+    assert all(method == 'proxy' for _, method in results)
+    assert {text.split()[0] for text, _ in results} == {"A", "B"}
+    # 프록시 서버는 절대 URL 요청과 인증 헤더를 받음
+    assert proxy_b.paths[0].startswith("http://m.place.naver.test/list?query=")
+    assert proxy_b.auth_headers[0] == "Basic dXNlcjpwYXNz"
+
+    proxy_a.close()
+    proxy_b.close()
+
+
+def test_failed_proxies_fall_back_to_direct():
+    """403을 주는 프록시는 실패 처리되고 직접 연결로 폴백, 로거는 시도마다 호출"""
+    bad_proxy = SlowServer("bad", delay=0, status=403)
+    target = SlowServer("target", delay=0)
+    logged = []
+
+    manager = proxy_manager_for(bad_proxy)
+    engine = AsyncCrawlEngine(proxy_manager=manager, requests_per_second=0,
+                              request_logger=lambda **record: logged.append(record))
+    (text, method), = engine.run([f"{target.url}/list"], fetch_worker)
+
+    assert method == 'direct' and text.startswith("target")
+    assert len(logged) == 2 and all(record['status_code'] == 403 for record in logged)
+    assert manager.get_proxy_stats()['active'] == 1  # 직접 연결 전에 reset_failed_proxies
+
+    bad_proxy.close()
+    target.close()
+
+
+def test_global_rate_limit():
+    """초당 10건 제한이면 5건 시작에 최소 0.4초"""
+    server = SlowServer("paced", delay=0)
+    engine = AsyncCrawlEngine(max_concurrency=5, per_host_limit=5, requests_per_second=10)
+
+    started = time.perf_counter()
+    engine.run([f"{server.url}/{i}" for i in range(5)], fetch_worker)
+    elapsed = time.perf_counter() - started
+    print(f"5 requests at 10 rps: {elapsed:.2f}s")
+    assert elapsed >= 0.38
+
+    server.close()
+
+
+def test_hedged_request_takes_first_usable_response():
+    """선호 URL이 hedge 지연 안에 응답하지 않으면 다음 URL을 시작하고, 먼저 온 응답 채택 후 나머지 취소"""
+    server = SlowServer("hedge", delay=0.05, path_delays={'/slow': 3.0})
+    engine = AsyncCrawlEngine(requests_per_second=0, hedge=True, hedge_default=0.2)
+
+    started = time.perf_counter()
+    (text, method), = engine.run([[f"{server.url}/slow", f"{server.url}/fast"]], fetch_worker)
+    elapsed = time.perf_counter() - started
+    print(f"Hedged fetch: {elapsed:.2f}s, stats {engine.get_stats()}")
+
+    assert text == "hedge /fast"
+    assert elapsed < 1.5
+    stats = engine.get_stats()
+    assert (stats['hedges'], stats['hedge_wins'], stats['cancelled']) == (1, 1, 1)
+
+    # 헤지를 끄면 느린 URL이 끝날 때까지 기다림 (기존 순차 동작)
+    sequential = AsyncCrawlEngine(requests_per_second=0, hedge=False)
+    assert sequential.hedge_delay() is None
+    (text, _), = sequential.run([[f"{server.url}/fast", f"{server.url}/slow"]], fetch_worker)
+    assert text == "hedge /fast"
+
+    server.close()
+
+
+def test_failed_variant_starts_next_immediately():
+    """앞 URL이 실패로 끝나면 hedge 지연을 기다리지 않고 다음 URL 시작"""
+    server = SlowServer("fallback", delay=0, path_status={'/gone': 500})
+    engine = AsyncCrawlEngine(requests_per_second=0, hedge=True, hedge_default=5.0)
+
+    started = time.perf_counter()
+    (text, _), = engine.run([[f"{server.url}/gone", f"{server.url}/list"]], fetch_worker)
+    assert text == "fallback /list"
+    assert time.perf_counter() - started < 1.0
+    assert engine.get_stats()['hedges'] == 0
+
+    server.close()
+
+
+def test_hedge_delay_sources():
+    """latency_source -> 자체 관측 p95 -> 기본값 순, 최소값과 timeout으로 제한"""
+    # 헤지는 옵트인 (환경 변수 없으면 비활성)
+    assert AsyncCrawlEngine().hedge_delay() is None
+    assert AsyncCrawlEngine.from_env().hedge is False
+
+    assert AsyncCrawlEngine(hedge=True, hedge_default=3.0).hedge_delay() == 3.0
+    assert AsyncCrawlEngine(hedge=True, latency_source=lambda q: 1.2).hedge_delay() == 1.2
+    assert AsyncCrawlEngine(hedge=True, latency_source=lambda q: 0.01).hedge_delay() == AsyncCrawlEngine.HEDGE_MIN_DELAY
+    assert AsyncCrawlEngine(hedge=True, latency_source=lambda q: 60, timeout=15).hedge_delay() == 15
+
+    engine = AsyncCrawlEngine(hedge=True, latency_source=lambda q: 0.0, hedge_default=3.0)
+    for _ in range(AsyncCrawlEngine.HEDGE_MIN_SAMPLES):
+        engine.latency.add(0.8)
+    assert 0.75 < engine.hedge_delay() < 0.85
+
+
+if __name__ == "__main__":
+    test_per_host_limit_and_result_order()
+    test_clients_survive_sequential_runs()
+    test_throughput_scales_with_proxy_pool()
+    test_failed_proxies_fall_back_to_direct()
+    test_global_rate_limit()
+    test_hedged_request_takes_first_usable_response()
+    test_failed_variant_starts_next_immediately()
+    test_hedge_delay_sources()
+    print("\n✅ Async crawl engine tests passed")
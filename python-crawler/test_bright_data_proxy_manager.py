@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+프록시 세션 캐시 테스트
+- 같은 프록시로 보낸 요청은 캐시된 세션의 keep-alive 커넥션 재사용
+- 새 연결 비용(핸드셰이크)을 흉내 내는 로컬 프록시로 요청당 절감 시간 측정
+- 프록시가 실패 처리되면 세션 폐기, HTTP/2 옵션은 httpx 클라이언트 사용
+- 429/실패 프록시는 쿨다운만 기록하고 요청은 곧바로 다른 프록시로, 모두 쿨다운일 때만 대기
+"""
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bright_data_proxy_manager import BrightDataProxyManager, ProxyStatus
+
+
+class HandshakeProxy:
+    """새 TCP 연결마다 handshake_delay만큼 지연되는 HTTP 프록시 (keep-alive 지원)"""
+
+    def __init__(self, handshake_delay=0.1, statuses=None):
+        self.connections = 0
+        self.requests = 0
+        self.statuses = list(statuses or [])  # 앞에서부터 하나씩 응답 코드로 사용, 다 쓰면 200
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                proxy.connections += 1
+                time.sleep(handshake_delay)
+                super().setup()
+
+            def do_GET(self):
+                proxy.requests += 1
+                body = b"ok"
+                self.send_response(proxy.statuses.pop(0) if proxy.statuses else 200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.endpoint = f"127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def manager_for(*proxies, **kwargs):
+    return BrightDataProxyManager([
+        {'endpoint': proxy.endpoint, 'username': 'user', 'password': 'pass'} for proxy in proxies
+    ], **kwargs)
+
+
+def test_session_reuse_saves_handshakes():
+    print("Testing per-proxy session cache")
+    print("=" * 30)
+
+    proxy = HandshakeProxy(handshake_delay=0.1)
+    manager = manager_for(proxy, http2=False)
+
+    for _ in range(5):
+        response, used = manager.make_request("http://m.place.naver.test/list?query=a")
+        assert response.status_code == 200
+
+    stats = manager.get_connection_stats()
+    print(f"Connection stats: {stats}")
+    assert proxy.connections == 1
+    assert stats['sessions_created'] == 1
+    assert (stats['new_connection_requests'], stats['reused_connection_requests']) == (1, 4)
+    assert stats['handshake_savings_ms'] > 50
+    assert stats['reuse_rate'] == 80.0
+
+    manager.close()
+    proxy.close()
+
+
+def test_failed_proxy_session_is_invalidated():
+    """FAILED로 바뀌면 세션을 닫고, 복구 후에는 새 세션(새 연결)으로 시작"""
+    proxy = HandshakeProxy(handshake_delay=0)
+    manager = manager_for(proxy, http2=False)
+    config = manager.proxies[0]
+
+    first = manager.get_session(config)
+    assert manager.get_session(config) is first
+
+    for _ in range(manager.max_fail_count):
+        manager.record_failure(config)
+    assert config.status == ProxyStatus.FAILED
+    assert manager.get_connection_stats()['sessions_invalidated'] == 1
+
+    manager.reset_failed_proxies()
+    assert manager.get_session(config) is not first
+    assert manager.get_connection_stats()['sessions_created'] == 2
+
+    manager.close()
+    proxy.close()
+
+
+def test_http2_option_uses_httpx_client():
+    proxy = HandshakeProxy(handshake_delay=0)
+    manager = manager_for(proxy, http2=True, pool_size=4)
+
+    response, _ = manager.make_request("http://m.place.naver.test/list?query=b")
+    assert response.status_code == 200 and response.text == "ok"
+
+    session = manager.get_session(manager.proxies[0])
+    assert type(session).__module__.startswith('httpx')
+    assert 'Mozilla' in session.headers['User-Agent']
+
+    manager.close()
+    proxy.close()
+
+
+def test_rate_limited_proxy_cools_down_without_blocking():
+    """429를 받은 프록시만 쿨다운, 같은 요청은 대기 없이 다음 프록시로"""
+    limited = HandshakeProxy(handshake_delay=0, statuses=[429])
+    healthy = HandshakeProxy(handshake_delay=0)
+    manager = manager_for(limited, healthy, http2=False)
+    manager.rate_limit_delay = 60
+    limited_config, healthy_config = manager.proxies
+
+    started = time.perf_counter()
+    response, used = manager.make_request("http://m.place.naver.test/list?query=c")
+    elapsed = time.perf_counter() - started
+    print(f"429 then healthy proxy: {elapsed:.2f}s")
+
+    assert response.status_code == 200 and used is healthy_config
+    assert elapsed < 1.0
+    assert limited_config.status == ProxyStatus.RATE_LIMITED
+    assert 55 < limited_config.available_after - time.time() <= 60
+    assert manager.get_active_proxies() == [healthy_config]
+    assert manager.seconds_until_available() == 0
+    assert manager.get_proxy_stats()['cooling_down'] == 1
+
+    # 쿨다운이 끝나면 다시 ACTIVE로 복귀
+    limited_config.available_after = time.time() - 1
+    assert limited_config in manager.get_active_proxies()
+    assert limited_config.status == ProxyStatus.ACTIVE
+
+    manager.close()
+    limited.close()
+    healthy.close()
+
+
+def test_waits_only_when_all_proxies_cooling():
+    """모든 프록시가 쿨다운이면 가장 빠른 복귀 시각까지만 대기"""
+    proxy = HandshakeProxy(handshake_delay=0, statuses=[429])
+    manager = manager_for(proxy, http2=False)
+    manager.rate_limit_delay = 0.3
+
+    started = time.perf_counter()
+    response, used = manager.make_request("http://m.place.naver.test/list?query=d")
+    elapsed = time.perf_counter() - started
+    print(f"Single rate-limited proxy: {elapsed:.2f}s")
+
+    assert response.status_code == 200 and proxy.requests == 2
+    assert 0.25 <= elapsed < 1.0
+    assert used.status == ProxyStatus.ACTIVE
+
+    # 복귀할 프록시가 없으면 대기하지 않고 None
+    used.status = ProxyStatus.BANNED
+    assert manager.seconds_until_available() is None
+    assert manager.make_request("http://m.place.naver.test/list?query=e") == (None, None)
+
+    manager.close()
+    proxy.close()
+
+
+if __name__ == "__main__":
+    test_session_reuse_saves_handshakes()
+    test_failed_proxy_session_is_invalidated()
+    test_http2_option_uses_httpx_client()
+    test_rate_limited_proxy_cools_down_without_blocking()
+    test_waits_only_when_all_proxies_cooling()
+    print("\n✅ Proxy session cache tests passed")
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+키워드 단위 크롤링 플래너 테스트
+- 정규화된 키워드 기준 그룹화
+- 하나의 결과 목록으로 여러 플레이스 순위 산출
+"""
+import os
+import sys
+import logging
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from crawl_planner import normalize_keyword, plan_keyword_groups, rank_targets_in_list, summarize_plan
+
+
+def simple_match(target_name, found_name):
+    return target_name.replace(" ", "") in found_name.replace(" ", "")
+
+
+def test_keyword_grouping():
+    """같은 키워드(공백/대소문자 차이 포함)는 하나의 그룹으로 묶인다"""
+    print("Testing keyword grouping")
+    print("=" * 30)
+
+    tracked_places = [
+        {'id': 1, 'search_keyword': '강남 맛집', 'place_name': '함수라 논현직영점'},
+        {'id': 2, 'search_keyword': '홍대 카페', 'place_name': '스타벅스'},
+        {'id': 3, 'search_keyword': ' 강남   맛집 ', 'place_name': '벽돌해피푸드'},
+        {'id': 4, 'search_keyword': 'Gangnam Pizza', 'place_name': '피자헛'},
+        {'id': 5, 'search_keyword': 'gangnam pizza', 'place_name': '도미노피자'},
+        {'id': 6, 'search_keyword': '', 'place_name': '키워드 없음'},
+    ]
+
+    groups = plan_keyword_groups(tracked_places)
+
+    for group in groups:
+        print(f"{group.keyword}: {group.place_names}")
+
+    assert [group.normalized_keyword for group in groups] == ['강남 맛집', '홍대 카페', 'gangnam pizza']
+    assert [place['id'] for place in groups[0].places] == [1, 3]
+    assert groups[0].keyword == '강남 맛집'
+    assert groups[2].place_names == ['피자헛', '도미노피자']
+
+    summary = summarize_plan(groups)
+    print(f"Plan summary: {summary}")
+    assert summary['total_places'] == 5
+    assert summary['keyword_groups'] == 3
+    assert summary['requests_saved'] == 2
+
+    assert normalize_keyword('  서울\t상암  맛집 ') == '서울 상암 맛집'
+
+
+def test_rank_targets_in_list():
+    """하나의 SERP 목록에서 대상별 첫 매칭 순위를 산출한다"""
+    print("Testing rank resolution")
+    print("=" * 30)
+
+    found_names = ['미나리밭오리사냥 강남역점', '함수라 논현직영점', '벽돌해피푸드 압구정점', '함수라 강남점']
+    targets = ['함수라', '벽돌해피푸드', '스타벅스']
+
+    ranks = rank_targets_in_list(found_names, targets, simple_match, max_rank=50)
+    print(f"Ranks: {dict(zip(targets, ranks))}")
+    assert ranks == [2, 3, -1]
+
+    # max_rank 밖의 결과는 순위로 인정하지 않는다
+    assert rank_targets_in_list(found_names, ['벽돌해피푸드'], simple_match, max_rank=2) == [-1]
+
+    # 빈 상호명은 어떤 결과와도 매칭하지 않는다
+    assert rank_targets_in_list(found_names, ['', '함수라'], simple_match) == [-1, 2]
+
+
+def test_single_and_group_ranking_agree():
+    """단건 검색(_find_place_rank)과 그룹 검색이 같은 목록 순회 헬퍼를 쓴다"""
+    from bs4 import BeautifulSoup
+    from enhanced_naver_crawler import EnhancedNaverPlaceCrawler
+
+    html = "<ul><li>광고 벽돌해피푸드 본점</li><li>함수라 논현직영점\n한식</li><li>벽돌해피푸드 압구정점</li></ul>"
+    crawler = EnhancedNaverPlaceCrawler.__new__(EnhancedNaverPlaceCrawler)
+    items = BeautifulSoup(html, "html.parser").find_all("li")
+
+    # 광고를 제외하고 순위를 세며, found_shops는 매칭 위치까지
+    assert crawler._find_place_rank(items, '벽돌해피푸드') == (2, ['함수라 논현직영점 한식', '벽돌해피푸드 압구정점'])
+    assert crawler._find_place_rank(items, '스타벅스')[0] == -1
+
+    results = [{"shop_name": name, "rank": -1, "success": False} for name in ('벽돌해피푸드', '함수라')]
+    crawler.logger = logging.getLogger("test")
+    crawler._rank_group_from_html('강남 맛집', results, html)
+    assert [result["rank"] for result in results] == [2, 1]
+
+
+if __name__ == "__main__":
+    test_keyword_grouping()
+    test_rank_targets_in_list()
+    test_single_and_group_ranking_agree()
+    print("\n✅ Crawl planner tests passed")
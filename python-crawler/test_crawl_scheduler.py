@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+우선순위 크롤링 스케줄러 테스트
+- rankings/crawler_results 행으로 플레이스 이력 구성
+- 경과 시간/순위 변동/period_end/지난 실패 점수로 예산을 높은 가치부터 배정
+- 예상 완료 시각 계산
+- 검색 1회의 페이지 로드 수만큼 예산 차감/ETA 증가
+"""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from crawl_planner import plan_keyword_groups
+from crawl_scheduler import CrawlScheduler, PlaceHistory, build_place_histories
+
+NOW = datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def hours_ago(hours):
+    return (NOW - timedelta(hours=hours)).isoformat()
+
+
+def test_build_place_histories():
+    print("Testing place history")
+    print("=" * 30)
+
+    rankings = [
+        {'tracked_place_id': 'a', 'rank': 5, 'checked_at': hours_ago(48)},
+        {'tracked_place_id': 'a', 'rank': 3, 'checked_at': hours_ago(2)},
+        {'tracked_place_id': 'b', 'rank': 10, 'checked_at': "2025-03-10T01:00:00Z"},
+    ]
+    crawler_results = [
+        {'tracked_place_id': 'a', 'success': False, 'crawled_at': hours_ago(30)},
+        {'tracked_place_id': 'a', 'success': True, 'crawled_at': hours_ago(2)},
+        {'tracked_place_id': 'c', 'success': False, 'crawled_at': "2025-03-10 03:00:00"},
+    ]
+
+    histories = build_place_histories(rankings, crawler_results)
+    assert histories['a'].last_success == NOW - timedelta(hours=2)
+    assert histories['a'].ranks == [3, 5]
+    assert not histories['a'].last_failed
+    assert histories['b'].last_success == datetime(2025, 3, 10, 1, 0, tzinfo=timezone.utc)
+    assert histories['c'].last_failed and histories['c'].last_success is None
+
+
+def test_budget_goes_to_highest_value_first():
+    scheduler = CrawlScheduler(search_seconds=10)
+    tracked_places = [
+        {'id': 'fresh', 'search_keyword': '강남 맛집', 'place_name': 'A'},
+        {'id': 'volatile', 'search_keyword': '홍대 카페', 'place_name': 'B'},
+        {'id': 'deadline', 'search_keyword': '종로 술집', 'place_name': 'C', 'period_end': '2025-03-11'},
+        {'id': 'failed', 'search_keyword': '판교 점심', 'place_name': 'D'},
+        {'id': 'never', 'search_keyword': '성수 빵집', 'place_name': 'E'},
+    ]
+    histories = {
+        'fresh': PlaceHistory(last_success=NOW - timedelta(hours=1), ranks=[4, 4, 4]),
+        'volatile': PlaceHistory(last_success=NOW - timedelta(hours=1), ranks=[3, 20, -1, 8]),
+        'deadline': PlaceHistory(last_success=NOW - timedelta(hours=1), ranks=[7, 7]),
+        'failed': PlaceHistory(last_success=NOW - timedelta(hours=1), ranks=[2, 2], last_failed=True),
+    }
+
+    plan = scheduler.plan(plan_keyword_groups(tracked_places), histories, budget=3, request_interval=20, now=NOW)
+    for item in plan.scheduled + plan.deferred:
+        print(f"{item.group.keyword}: {item.priority:.2f} {item.components}")
+    print(f"Plan: {plan.summary()}")
+
+    # 한 번도 성공 못 한 곳 > 지난 실패 > 마감 임박(내일) > 변동 큼 > 최근 갱신
+    assert [item.group.keyword for item in plan.scheduled] == ['성수 빵집', '판교 점심', '종로 술집']
+    assert [item.group.keyword for item in plan.deferred] == ['홍대 카페', '강남 맛집']
+    assert plan.deferred[0].priority > plan.deferred[1].priority
+
+    # ETA: 검색 1회 = 요청 간격 20초 + 검색 10초
+    assert plan.scheduled[0].eta == NOW + timedelta(seconds=30)
+    assert plan.estimated_completion == NOW + timedelta(seconds=90)
+    assert plan.summary()['places_deferred'] == 2
+
+
+def test_group_score_and_ties():
+    scheduler = CrawlScheduler()
+    tracked_places = [
+        {'id': 1, 'search_keyword': '강남 맛집', 'place_name': 'A'},
+        {'id': 2, 'search_keyword': '홍대 카페', 'place_name': 'B'},
+        {'id': 3, 'search_keyword': '홍대 카페', 'place_name': 'C'},
+        {'id': 4, 'search_keyword': '이태원 바', 'place_name': 'D', 'period_end': '2025-03-01'},
+    ]
+    stale = {place_id: PlaceHistory(last_success=NOW - timedelta(hours=24)) for place_id in (1, 2, 3, 4)}
+
+    # 검색 1회로 두 플레이스가 갱신되는 그룹이 먼저, 동점(기간 지난 곳 포함)은 DB 순서
+    plan = scheduler.plan(plan_keyword_groups(tracked_places), stale, budget=10, now=NOW)
+    assert [item.group.keyword for item in plan.scheduled] == ['홍대 카페', '강남 맛집', '이태원 바']
+    assert plan.scheduled[-1].components['deadline'] == 0.0
+    assert not plan.deferred
+
+    assert scheduler.plan(plan_keyword_groups(tracked_places), stale, budget=0, now=NOW).estimated_completion is None
+
+
+def test_budget_counts_page_loads():
+    # 검색 1회 = 페이지 로드 3회 -> 예산 10으로 검색 3회, 로드마다 간격 20초 + 10초
+    scheduler = CrawlScheduler(search_seconds=10, loads_per_search=3)
+    tracked_places = [{'id': i, 'search_keyword': f"키워드 {i}", 'place_name': str(i)} for i in range(5)]
+
+    plan = scheduler.plan(plan_keyword_groups(tracked_places), {}, budget=10, request_interval=20, now=NOW)
+    print(f"Plan: {plan.summary()}")
+    assert len(plan.scheduled) == 3 and len(plan.deferred) == 2
+    assert plan.scheduled[0].eta == NOW + timedelta(seconds=90)
+    assert plan.estimated_completion == NOW + timedelta(seconds=270)
+    assert plan.summary()['loads_per_search'] == 3
+
+    os.environ['CRAWL_LOADS_PER_SEARCH'] = "2.5"
+    try:
+        assert CrawlScheduler.from_env().loads_per_search == 2.5
+    finally:
+        del os.environ['CRAWL_LOADS_PER_SEARCH']
+    assert CrawlScheduler.from_env().loads_per_search == 2
+    assert CrawlScheduler(loads_per_search=0).loads_per_search == 1
+
+
+if __name__ == "__main__":
+    test_build_place_histories()
+    test_budget_goes_to_highest_value_first()
+    test_group_score_and_ties()
+    test_budget_counts_page_loads()
+    print("\n✅ Crawl scheduler tests passed")
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+DOM 접근 계층 테스트
+- 없는 요소 조회가 대기 없이 즉시 끝나는지
+- 명시적 대기와 검색 시간 예산 초과 처리
+- 실제 브라우저 대신 find_elements만 흉내 내는 가짜 요소 사용
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dom_access import DomAccess, SearchDeadline, SearchDeadlineExceeded
+
+
+class FakeElement:
+    """선택자 -> 자식 요소 목록 매핑으로 find_elements 흉내"""
+
+    def __init__(self, text="", children=None):
+        self.text = text
+        self.children = children or {}
+        self.queries = []
+
+    def find_elements(self, by, selector):
+        self.queries.append(selector)
+        found = []
+        for part in selector.split(", "):
+            found.extend(self.children.get(part, []))
+        return found
+
+
+def test_first_text_and_has_any():
+    """이름 선택자는 조건을 만족하는 첫 텍스트, 광고 선택자는 1회 조회"""
+    print("Testing zero-wait lookups")
+    print("=" * 30)
+
+    item = FakeElement(children={
+        ".place_name": [FakeElement("1")],
+        "strong": [FakeElement("  스타벅스 강남점 ")],
+        ".ad_badge": [FakeElement("광고")]
+    })
+    dom = DomAccess(driver=None)
+
+    started = time.perf_counter()
+    name = dom.first_text(item, [".place_bluelink", ".place_name", "strong"],
+                          accept=lambda text: not text.isdigit())
+    is_ad = dom.has_any(item, ["[class*='sponsor']", ".ad_badge", "[data-ad]"])
+    elapsed = time.perf_counter() - started
+
+    print(f"name={name}, is_ad={is_ad}, queries={item.queries}, {elapsed * 1000:.2f} ms")
+    assert name == "스타벅스 강남점"
+    assert is_ad
+    assert item.queries[-1] == "[class*='sponsor'], .ad_badge, [data-ad]"
+    assert not dom.has_any(FakeElement(), [".ad_badge"])
+    assert dom.first_text(FakeElement(), [".name"]) is None
+
+
+def test_wait_for_items_appearing():
+    """요소가 나타나면 대기 종료, 끝내 안 나타나면 빈 리스트"""
+    page = FakeElement()
+    dom = DomAccess(page, SearchDeadline(10), poll_frequency=0.05)
+
+    appear_at = time.monotonic() + 0.2
+
+    def find_elements(by, selector):
+        if selector == 'li.place_unit' and time.monotonic() >= appear_at:
+            return [FakeElement("a"), FakeElement("b"), FakeElement("c")]
+        return []
+
+    page.find_elements = find_elements
+    items = dom.wait_for_any(['li[data-nclick*="plc"]', 'li.place_unit'], timeout=3, min_count=3)
+    assert len(items) == 3
+
+    started = time.perf_counter()
+    assert dom.wait_for_any(['.missing'], timeout=0.2) == []
+    assert time.perf_counter() - started < 1
+
+
+def test_deadline_aborts_waits():
+    """예산을 넘기면 대기 시간이 남아 있어도 SearchDeadlineExceeded"""
+    deadline = SearchDeadline(0.2)
+    dom = DomAccess(FakeElement(), deadline, poll_frequency=0.05)
+
+    started = time.perf_counter()
+    try:
+        dom.wait_for_any(['.missing'], timeout=30, stage="place list load")
+        assert False, "expected SearchDeadlineExceeded"
+    except SearchDeadlineExceeded as e:
+        print(f"Aborted after {time.perf_counter() - started:.2f}s: {e}")
+        assert "place list load" in str(e)
+
+    assert time.perf_counter() - started < 1
+    assert deadline.expired() and deadline.remaining() == 0
+
+
+if __name__ == "__main__":
+    test_first_text_and_has_any()
+    test_wait_for_items_appearing()
+    test_deadline_aborts_waits()
+    print("\n✅ DOM access tests passed")
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+플레이스 목록 추출 스크립트 테스트
+- execute_script 1회로 이름/CID/광고 여부/위치를 모두 반환하는지
+- 스크롤 대기 스크립트가 새 아이템/목록 끝에서 즉시 반환하는지
+- Node.js가 있으면 최소 DOM 흉내 객체 위에서 실제 스크립트 실행 (없으면 건너뜀)
+"""
+import os
+import sys
+import json
+import shutil
+import subprocess
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dom_access import (DomAccess, SearchDeadline, SearchDeadlineExceeded, CAPTCHA_PROBE_SCRIPT, PLACE_ITEMS_SCRIPT,
+                        PLACE_ITEM_COUNT_SCRIPT, SCROLL_AND_WAIT_SCRIPT)
+
+# querySelector/querySelectorAll/getAttribute/innerText만 흉내 내는 DOM
+FAKE_DOM_JS = """
+function makeNode(spec) {
+    const node = {
+        innerText: spec.text || '',
+        attrs: spec.attrs || {},
+        children: (spec.children || []).map(makeNode),
+        matches: spec.matches || [],
+        getAttribute(name) { return name in this.attrs ? this.attrs[name] : null; },
+        getClientRects() { return spec.hidden ? [] : [1]; },
+        querySelectorAll(selector) {
+            const parts = selector.split(',').map(part => part.trim());
+            const found = [];
+            const walk = current => current.children.forEach(child => {
+                if (parts.some(part => child.matches.includes(part))) found.push(child);
+                walk(child);
+            });
+            walk(this);
+            return found;
+        },
+        querySelector(selector) { return this.querySelectorAll(selector)[0] || null; }
+    };
+    return node;
+}
+const document = makeNode(PAGE);
+const result = (function() { SCRIPT }).apply(null, ARGS);
+console.log(JSON.stringify(result));
+"""
+
+
+# 스크롤하면 load_after_ms 뒤에 아이템이 추가되거나(append) 목록 끝 표시가 나타나는 페이지
+SCROLL_PAGE_JS = """
+const observers = [];
+global.MutationObserver = class {
+    constructor(callback) { this.callback = callback; observers.push(this); }
+    observe() { this.active = true; }
+    disconnect() { this.active = false; }
+};
+const mutate = () => observers.filter(o => o.active).forEach(o => o.callback([]));
+const list = Array.from({length: 10}, () => ({getClientRects: () => [1], scrollIntoView() {}}));
+let endVisible = false;
+global.document = {
+    body: {scrollHeight: 5000},
+    querySelectorAll(selector) { return selector.includes('li') ? list : []; },
+    querySelector(selector) { return endVisible && selector.includes('list_end') ? {getClientRects: () => [1]} : null; }
+};
+global.window = {
+    scrollTo() {
+        setTimeout(() => {
+            if (MODE === 'append') for (let i = 0; i < 10; i++) list.push({getClientRects: () => [1]});
+            if (MODE === 'end') endVisible = true;
+            if (MODE !== 'idle') mutate();
+        }, LOAD_AFTER_MS);
+    }
+};
+const args = ARGS;
+args.push(result => console.log(JSON.stringify(result)));
+(function() { SCRIPT }).apply(null, args);
+"""
+
+
+def run_scroll_script(mode, load_after_ms, timeout_ms):
+    source = (SCROLL_PAGE_JS
+              .replace('MODE', json.dumps(mode))
+              .replace('LOAD_AFTER_MS', str(load_after_ms))
+              .replace('SCRIPT', SCROLL_AND_WAIT_SCRIPT)
+              .replace('ARGS', json.dumps(['li.place_unit', "[class*='list_end']", timeout_ms])))
+    output = subprocess.run(['node', '-e', source], capture_output=True, text=True, timeout=30)
+    assert output.returncode == 0, output.stderr
+    return json.loads(output.stdout)
+
+
+def leaf(text, *matches, **attrs):
+    return {'text': text, 'matches': list(matches), 'attrs': attrs}
+
+
+def item(name, href=None, ad=False, text_suffix=" · 한식 · 리뷰 120", **kwargs):
+    children = [leaf(name, '.place_bluelink')]
+    if href:
+        children.append(leaf('', 'a[href]', href=href))
+    if ad:
+        children.append(leaf('광고', '.ad_badge'))
+    return {'text': f"{name}{text_suffix}", 'matches': ['li.place_unit'], 'children': children, **kwargs}
+
+
+PAGE = {'children': [
+    item("광고식당 본점", href="https://m.place.naver.com/restaurant/111/home", ad=True),
+    item("스타벅스 강남점", href="https://m.place.naver.com/restaurant/1234567/home"),
+    {**item("숨김식당", hidden=True)},
+    item("교촌치킨 역삼점", attrs={'data-place-id': '7654321'}),
+    {'text': "이름없는 가게\n두번째 줄 정보", 'matches': ['li.place_unit'], 'children': []},
+]}
+
+
+def run_script(script, args):
+    source = (FAKE_DOM_JS
+              .replace('PAGE', json.dumps(PAGE, ensure_ascii=False))
+              .replace('SCRIPT', script)
+              .replace('ARGS', json.dumps(args, ensure_ascii=False)))
+    output = subprocess.run(['node', '-e', source], capture_output=True, text=True, timeout=30)
+    assert output.returncode == 0, output.stderr
+    return json.loads(output.stdout)
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="Node.js not installed")
+def test_script_extracts_all_fields_in_one_call():
+    print("Testing single-roundtrip place list script")
+    print("=" * 30)
+
+    args = [['li[data-nclick*="plc"]', 'li.place_unit'], 3, ['.place_bluelink', 'strong'],
+            "[data-ad], .ad_badge", ['광고', 'sponsored'], ['ad']]
+    entries = run_script(PLACE_ITEMS_SCRIPT, args)
+    for entry in entries:
+        print(entry)
+
+    assert [entry['position'] for entry in entries] == [1, 2, 3, 4]
+    assert [entry['name'] for entry in entries] == ["광고식당 본점", "스타벅스 강남점", "교촌치킨 역삼점", None]
+    assert [entry['cid'] for entry in entries] == ['111', '1234567', '7654321', None]
+    assert [entry['is_ad'] for entry in entries] == [True, False, False, False]
+    assert entries[3]['first_line'] == "이름없는 가게"
+
+    assert run_script(PLACE_ITEM_COUNT_SCRIPT, [['li.place_unit'], 3]) == 4
+    assert run_script(PLACE_ITEM_COUNT_SCRIPT, [['li.place_unit'], 5]) == 0
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="Node.js not installed")
+def test_scroll_script_resolves_on_mutation():
+    """새 아이템이 붙거나 목록 끝이 보이면 실제 로딩 시간만큼만 대기"""
+    print("Testing MutationObserver scroll")
+    print("=" * 30)
+
+    loaded = run_scroll_script('append', load_after_ms=150, timeout_ms=5000)
+    end = run_scroll_script('end', load_after_ms=100, timeout_ms=5000)
+    idle = run_scroll_script('idle', load_after_ms=0, timeout_ms=300)
+    print(f"loaded={loaded}, end={end}, idle={idle}")
+
+    assert loaded['status'] == 'loaded' and (loaded['before'], loaded['after']) == (10, 20)
+    assert 100 <= loaded['elapsed_ms'] < 1000
+    assert end['status'] == 'end' and end['elapsed_ms'] < 1000
+    assert idle['status'] == 'timeout' and idle['elapsed_ms'] >= 250
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="Node.js not installed")
+def test_captcha_probe_uses_url_element_and_visible_text():
+    """CAPTCHA 근거를 URL -> 요소 -> 보이는 텍스트 순으로 반환"""
+
+    def probe(url, body_text, captcha_element=False):
+        source = (
+            "global.location = {href: %s};\n"
+            "global.document = {body: {innerText: %s}, querySelector: () => %s};\n"
+            "console.log(JSON.stringify((function() { %s }).apply(null, %s)));"
+        ) % (json.dumps(url), json.dumps(body_text, ensure_ascii=False), '({})' if captcha_element else 'null',
+             CAPTCHA_PROBE_SCRIPT, json.dumps([['captcha'], ['보안문자', 'access denied'], "[id*='captcha']"],
+                                              ensure_ascii=False))
+        output = subprocess.run(['node', '-e', source], capture_output=True, text=True, timeout=30)
+        assert output.returncode == 0, output.stderr
+        return json.loads(output.stdout)
+
+    assert probe("https://nid.naver.com/CAPTCHA?x=1", "") == 'url:captcha'
+    assert probe("https://m.search.naver.com/", "", captcha_element=True) == "element:[id*='captcha']"
+    assert probe("https://m.search.naver.com/", "아래 보안문자를 입력해 주세요") == 'text:보안문자'
+    assert probe("https://m.search.naver.com/", "Access Denied") == 'text:access denied'
+    assert probe("https://m.search.naver.com/", "강남 맛집 검색 결과") is None
+
+
+def test_scroll_and_wait_respects_deadline():
+    """scroll_and_wait는 남은 검색 예산으로 대기 시간을 줄이고, 예산이 없으면 중단"""
+
+    class AsyncDriver:
+        def __init__(self):
+            self.timeouts = []
+
+        def execute_async_script(self, script, item_selector, end_selector, timeout_ms):
+            self.timeouts.append(timeout_ms)
+            return {'status': 'loaded', 'before': 10, 'after': 20, 'elapsed_ms': 120}
+
+    driver = AsyncDriver()
+    outcome = DomAccess(driver, SearchDeadline(2)).scroll_and_wait(['li.place_unit'], timeout=7.5)
+    assert outcome['status'] == 'loaded'
+    assert driver.timeouts[0] <= 2000
+
+    try:
+        DomAccess(driver, SearchDeadline(0)).scroll_and_wait(['li.place_unit'])
+        assert False, "expected SearchDeadlineExceeded"
+    except SearchDeadlineExceeded:
+        pass
+    assert len(driver.timeouts) == 1
+
+
+def test_extract_place_items_is_single_execute_script():
+    """DomAccess는 아이템 수와 관계없이 execute_script 1회만 호출"""
+
+    class RecordingDriver:
+        def __init__(self):
+            self.calls = []
+
+        def execute_script(self, script, *args):
+            self.calls.append(args)
+            return [{'position': 1, 'name': '스타벅스', 'first_line': '스타벅스', 'cid': '1', 'is_ad': False}]
+
+    driver = RecordingDriver()
+    entries = DomAccess(driver).extract_place_items(['li.place_unit'], ['.name'], ['.ad_badge', '[data-ad]'], ['광고', 'AD'])
+
+    assert len(driver.calls) == 1
+    assert driver.calls[0][3] == ".ad_badge, [data-ad]"
+    assert driver.calls[0][4] == ['광고', 'ad']
+    assert entries[0]['cid'] == '1'
+
+
+if __name__ == "__main__":
+    if shutil.which('node'):
+        test_script_extracts_all_fields_in_one_call()
+        test_scroll_script_resolves_on_mutation()
+        test_captcha_probe_uses_url_element_and_visible_text()
+    test_scroll_and_wait_respects_deadline()
+    test_extract_place_items_is_single_execute_script()
+    print("\n✅ Place list script tests passed")
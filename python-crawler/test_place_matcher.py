@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+플레이스명 일괄 매칭 엔진 테스트
+- 기존 _is_universal_match 규칙과 동일한 결과
+- SERP 목록 하나로 여러 대상의 첫 매칭 위치 산출
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from place_matcher import PlaceNameMatcher, is_place_match
+
+
+def legacy_universal_match(target_name, found_name):
+    """기존 UniversalNaverCrawler._is_universal_match 구현 (비교 기준)"""
+    if not target_name or not found_name:
+        return False
+
+    def normalize_text(text):
+        return re.sub(r'[^\w가-힣0-9]', '', text.lower())
+
+    target_norm = normalize_text(target_name)
+    found_norm = normalize_text(found_name)
+
+    if target_norm == found_norm:
+        return True
+
+    if len(target_norm) >= 3 and len(found_norm) >= 3:
+        if target_norm in found_norm or found_norm in target_norm:
+            return True
+
+    brand_patterns = [
+        r'(스타벅스|스벅)', r'(맥도날드|맥날|McDonald)', r'(교촌치킨|교촌|KyoChon)',
+        r'(롯데리아|Lotteria)', r'(버거킹|BurgerKing)', r'(파리바게뜨|Paris)',
+        r'(뚜레쥬르|Tous)', r'(올리브영|Oliveyoung)', r'(이마트|E-mart)',
+        r'(세븐일레븐|7-Eleven|711)', r'(CU편의점|CU)', r'(GS25|지에스25)'
+    ]
+    for pattern in brand_patterns:
+        if re.search(pattern, target_name, re.IGNORECASE) and re.search(pattern, found_name, re.IGNORECASE):
+            return True
+
+    if len(target_norm) >= 4 and len(found_norm) >= 4:
+        target_bigrams = set(target_norm[i:i+2] for i in range(len(target_norm)-1))
+        found_bigrams = set(found_norm[i:i+2] for i in range(len(found_norm)-1))
+        if target_bigrams and found_bigrams:
+            similarity = len(target_bigrams & found_bigrams) / len(target_bigrams | found_bigrams)
+            if similarity >= 0.6:
+                return True
+
+    return False
+
+
+NAMES = [
+    '스타벅스 강남역점', '스벅', 'Starbucks', '맥도날드상암DMC점', '맥날 홍대', 'McDonald Seoul',
+    '교촌치킨 논현점', 'KyoChon', '롯데리아', 'Lotteria 부산', '버거킹 역삼', 'burgerking',
+    '파리바게뜨 신사', 'PARIS croissant', '뚜레쥬르', 'tous les jours', '올리브영', 'oliveyoung',
+    '이마트 성수', 'e-mart', '세븐일레븐 삼성점', '7-Eleven', 'GS25 역삼점', '지에스25', 'CU편의점 강남',
+    'cu 역삼', '함수라 논현직영점', '함수라', '벽돌해피푸드 압구정점', '팔백집 강남점', '팔백집',
+    '미나리밭오리사냥 강남역점', '쿠우쿠우 강남점', 'Cucina', '', '  ', '가', '카페 드 파리',
+]
+
+
+def test_matches_legacy_rules():
+    """모든 이름 쌍에서 기존 규칙과 동일한 결과"""
+    print("Testing equivalence with legacy matcher")
+    print("=" * 30)
+
+    mismatches = [
+        (target, found) for target in NAMES for found in NAMES
+        if is_place_match(target, found) != legacy_universal_match(target, found)
+    ]
+    print(f"Pairs checked: {len(NAMES) ** 2}, mismatches: {mismatches}")
+    assert mismatches == []
+
+
+def test_batch_first_match():
+    """한 번의 순회로 대상별 첫 매칭 위치 산출"""
+    print("Testing batch matching")
+    print("=" * 30)
+
+    found_names = ['미나리밭오리사냥 강남역점', '함수라 논현직영점', '스타벅스 강남역점', '함수라 강남점']
+    targets = ['함수라', '스벅', '벽돌해피푸드', '', '함수라 논현직영점']
+
+    matcher = PlaceNameMatcher(targets)
+    indices = matcher.first_match_indices(found_names)
+    print(f"Indices: {dict(zip(targets, indices))}")
+    assert indices == [1, 2, -1, -1, 1]
+    assert matcher.ranks(found_names, max_rank=50) == [2, 3, -1, -1, 2]
+    assert matcher.ranks(found_names, max_rank=2) == [2, -1, -1, -1, 2]
+
+    # 루프 기반 단건 매칭과 같은 결과
+    expected = []
+    for target in targets:
+        expected.append(next((i for i, name in enumerate(found_names) if legacy_universal_match(target, name)), -1))
+    assert indices == expected
+
+
+def test_batch_speed():
+    """다수 대상 x 50위 목록에서 기존 방식보다 빠름"""
+    found_names = [f'{name} {i}호점' for i, name in enumerate(NAMES * 2) if name.strip()][:50]
+    targets = [f'없는가게{i} 본점' for i in range(30)] + ['팔백집']
+
+    started = time.perf_counter()
+    for _ in range(5):
+        legacy = [next((i for i, name in enumerate(found_names) if legacy_universal_match(t, name)), -1) for t in targets]
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(5):
+        batch = PlaceNameMatcher(targets).first_match_indices(found_names)
+    batch_time = time.perf_counter() - started
+
+    print(f"legacy: {legacy_time * 1000:.1f} ms, batch: {batch_time * 1000:.1f} ms")
+    assert batch == legacy
+    assert batch_time < legacy_time
+
+
+if __name__ == "__main__":
+    test_matches_legacy_rules()
+    test_batch_first_match()
+    test_batch_speed()
+    print("\n✅ Place matcher tests passed")
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 포워딩 프록시 테스트
+- 로컬 가짜 업스트림 프록시 2개를 띄워 평문 HTTP/CONNECT 전달 확인
+- 업스트림 교체 후 새 연결은 새 업스트림으로, 이전 터널은 끊김
+- 업스트림 인증 헤더 주입, 업스트림 장애 시 502
+"""
+import os
+import sys
+import time
+import socket
+import threading
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from proxy_forwarder import ProxyForwarder, Upstream
+
+
+class FakeUpstreamProxy:
+    """요청 헤더를 기록하고 자기 이름으로 응답하는 가짜 프록시 (CONNECT는 이름을 붙여 에코)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.requests = []
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(16)
+        self.url = f"http://127.0.0.1:{self.server.getsockname()[1]}"
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            buffer = b''
+            while b'\r\n\r\n' not in buffer:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    return
+                buffer += chunk
+            head = buffer.split(b'\r\n\r\n', 1)[0].decode()
+            self.requests.append(head)
+
+            if head.startswith('CONNECT'):
+                conn.sendall(b"HTTP/1.1 200 Connection established\r\n\r\n")
+                while True:
+                    data = conn.recv(4096)
+                    if not data:
+                        return
+                    conn.sendall(f"{self.name}:".encode() + data)
+            else:
+                body = self.name.encode()
+                conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body))
+
+    def close(self):
+        self.server.close()
+
+
+def http_get(proxy_url, url):
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({'http': proxy_url}))
+    with opener.open(url, timeout=5) as response:
+        return response.read().decode()
+
+
+def open_tunnel(proxy_url, target="m.search.naver.com:443"):
+    port = int(proxy_url.rsplit(':', 1)[1])
+    sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+    sock.sendall(f"CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n\r\n".encode())
+    response = b''
+    while b'\r\n\r\n' not in response:
+        response += sock.recv(4096)
+    return sock, response.split(b'\r\n', 1)[0].decode()
+
+
+def test_switch_upstream_without_restart():
+    print("Testing upstream switching forwarder")
+    print("=" * 30)
+
+    proxy_a = FakeUpstreamProxy("A")
+    proxy_b = FakeUpstreamProxy("B")
+
+    with ProxyForwarder(upstream=proxy_a.url) as forwarder:
+        listen_url = forwarder.proxy_url
+        assert http_get(listen_url, "http://example.com/page") == "A"
+        assert proxy_a.requests[0].startswith("GET http://example.com/page HTTP/1.1")
+        assert "Connection: close" in proxy_a.requests[0]
+
+        tunnel, status = open_tunnel(listen_url)
+        assert " 200 " in status
+        tunnel.sendall(b"ping")
+        assert tunnel.recv(4096) == b"A:ping"
+
+        started = time.perf_counter()
+        forwarder.set_upstream(proxy_b.url)
+        switch_ms = (time.perf_counter() - started) * 1000
+        print(f"Switch took {switch_ms:.3f} ms, stats: {forwarder.get_stats()}")
+
+        # 로컬 주소는 그대로, 새 연결은 B로
+        assert forwarder.proxy_url == listen_url
+        assert http_get(listen_url, "http://example.com/page") == "B"
+
+        # A로 열려 있던 터널은 끊겨 브라우저가 재연결하게 됨
+        tunnel.settimeout(2)
+        try:
+            assert tunnel.recv(4096) == b""
+        except ConnectionResetError:
+            pass
+        tunnel.close()
+
+        tunnel, status = open_tunnel(listen_url)
+        tunnel.sendall(b"ping")
+        assert tunnel.recv(4096) == b"B:ping"
+        tunnel.close()
+
+        stats = forwarder.get_stats()
+        assert stats['switches'] == 1
+        assert stats['dropped_on_switch'] == 1
+        assert stats['upstream'] == proxy_b.url
+
+    proxy_a.close()
+    proxy_b.close()
+
+
+def test_upstream_auth_and_failure():
+    """user:pass 업스트림은 Proxy-Authorization 주입, 연결 불가 업스트림은 502"""
+    upstream = FakeUpstreamProxy("auth")
+    authed_url = upstream.url.replace("http://", "http://user:p%40ss@")
+
+    assert Upstream.parse(authed_url).authorization == "Basic dXNlcjpwQHNz"
+    try:
+        Upstream.parse("socks5://127.0.0.1:1080")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+    with ProxyForwarder(upstream=authed_url) as forwarder:
+        tunnel, status = open_tunnel(forwarder.proxy_url)
+        tunnel.close()
+        assert "Proxy-Authorization: Basic dXNlcjpwQHNz" in upstream.requests[-1]
+
+        # 닫힌 포트로 교체하면 즉시 502
+        dead = socket.socket()
+        dead.bind(('127.0.0.1', 0))
+        dead_port = dead.getsockname()[1]
+        dead.close()
+        forwarder.set_upstream(f"http://127.0.0.1:{dead_port}")
+
+        tunnel, status = open_tunnel(forwarder.proxy_url)
+        tunnel.close()
+        assert " 502 " in status
+        assert forwarder.get_stats()['upstream_errors'] == 1
+
+    upstream.close()
+
+
+if __name__ == "__main__":
+    test_switch_upstream_without_restart()
+    test_upstream_auth_and_failure()
+    print("\n✅ Proxy forwarder tests passed")
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+프록시 헬스 체크 테스트
+- 로컬 가짜 프록시들을 프로브 URL 대상으로 동시에 검사 (순차 검사보다 빠른지)
+- 응답 시간을 ProxyInfo.response_time에 기록, 실패 프록시는 선택에서 제외
+- 백그라운드 주기 검사로 죽은 프록시 제외 및 복구 프록시 재투입
+"""
+import os
+import sys
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from proxy_manager import ProxyManager
+
+PROBE_URL = "http://probe.crawler.test/ip"
+
+
+class FakeProxy:
+    """delay 후 200(healthy) 또는 502로 응답하는 HTTP 프록시"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.healthy = True
+        self.paths = []
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                proxy.paths.append(self.path)
+                time.sleep(proxy.delay)
+                body = b'{"origin": "127.0.0.1"}'
+                self.send_response(200 if proxy.healthy else 502)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_parallel_health_check():
+    print("Testing parallel proxy health check")
+    print("=" * 30)
+
+    proxies = [FakeProxy(delay=0.3) for _ in range(8)]
+    dead_ports = [closed_port(), closed_port()]
+    manager = ProxyManager(
+        [{'host': '127.0.0.1', 'port': proxy.port} for proxy in proxies] +
+        [{'host': '127.0.0.1', 'port': port} for port in dead_ports],
+        probe_url=PROBE_URL, health_check_workers=10,
+    )
+
+    started = time.perf_counter()
+    working = manager.test_all_proxies(timeout=2)
+    elapsed = time.perf_counter() - started
+    print(f"Checked {len(manager.proxies)} proxies in {elapsed:.2f}s (sequential would be ~{0.3 * len(proxies):.1f}s+)")
+
+    assert len(working) == 8
+    assert elapsed < 1.2
+    assert proxies[0].paths == [PROBE_URL]
+    assert all(0.25 < proxy.response_time < 1.0 for proxy in working)
+
+    dead = [proxy for proxy in manager.proxies if proxy.port in dead_ports]
+    assert all(proxy.is_blocked for proxy in dead)
+    picked = {manager.get_next_proxy().port for _ in range(50)}
+    assert not picked & set(dead_ports)
+
+    # fan-out 상한: 2개씩이면 8개 검사에 최소 4묶음
+    limited = ProxyManager([{'host': '127.0.0.1', 'port': proxy.port} for proxy in proxies],
+                           probe_url=PROBE_URL, health_check_workers=2)
+    started = time.perf_counter()
+    limited.test_all_proxies(timeout=2)
+    assert time.perf_counter() - started >= 1.15
+
+    for proxy in proxies:
+        proxy.close()
+
+
+def test_background_health_checks():
+    good, flaky = FakeProxy(), FakeProxy()
+    manager = ProxyManager([{'host': '127.0.0.1', 'port': good.port}, {'host': '127.0.0.1', 'port': flaky.port}],
+                           probe_url=PROBE_URL)
+    flaky_info = manager.proxies[1]
+    manager.start_health_checks(interval=0.1, timeout=2)
+
+    try:
+        flaky.healthy = False
+        deadline = time.time() + 3
+        while not flaky_info.is_blocked and time.time() < deadline:
+            time.sleep(0.05)
+        assert flaky_info.is_blocked and flaky_info.health_check_failed
+        assert {manager.get_next_proxy().port for _ in range(10)} == {good.port}
+
+        # 다음 검사를 통과하면 다시 선택 대상
+        flaky.healthy = True
+        deadline = time.time() + 3
+        while flaky_info.is_blocked and time.time() < deadline:
+            time.sleep(0.05)
+        assert not flaky_info.is_blocked
+        assert flaky.port in {manager.get_next_proxy().port for _ in range(10)}
+    finally:
+        manager.stop_health_checks()
+        good.close()
+        flaky.close()
+
+
+if __name__ == "__main__":
+    test_parallel_health_check()
+    test_background_health_checks()
+    print("\n✅ Proxy health check tests passed")
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+가중치 기반 프록시 스케줄러 테스트
+- 가중치에 비례한 선택 비율, 쿨다운/할당량 소진 프록시 제외
+- 풀 크기가 커져도 선택 비용이 거의 늘지 않는지 (힙)
+- 여러 워커 스레드에서 동시에 선택해도 배분이 유지되는지
+- ProxyManager: 실패가 잦은 프록시에서 건강한 프록시로 트래픽 이동
+"""
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from proxy_scheduler import ProxyScheduler, proxy_weight, MIN_WEIGHT
+from proxy_manager import ProxyManager
+
+
+def test_selection_follows_weights():
+    print("Testing weighted proxy scheduler")
+    print("=" * 30)
+
+    scheduler = ProxyScheduler()
+    scheduler.add("fast", "fast", weight=1.0)
+    scheduler.add("slow", "slow", weight=0.25)
+
+    counts = Counter(scheduler.acquire() for _ in range(1000))
+    print(f"Selection counts: {dict(counts)}")
+    assert counts == {"fast": 800, "slow": 200}
+
+    # 가중치 변경은 다음 선택부터 반영
+    scheduler.update("slow", weight=1.0)
+    counts = Counter(scheduler.acquire() for _ in range(1000))
+    assert abs(counts["fast"] - counts["slow"]) <= 10
+
+
+def test_cooldown_and_exhausted_quota():
+    scheduler = ProxyScheduler()
+    now = time.time()
+    scheduler.add("a", "a", available_at=now + 30)
+    scheduler.add("b", "b")
+
+    assert {scheduler.acquire(now) for _ in range(5)} == {"b"}
+
+    # 할당량 소진(가중치 0)이면 선택 제외, 모두 쿨다운이면 가장 빠른 복귀까지 남은 시간
+    scheduler.update("b", weight=0.0)
+    assert scheduler.acquire(now) is None
+    assert 29 < scheduler.seconds_until_ready(now) <= 30
+
+    # 쿨다운이 끝나면 복귀, 그동안 밀린 몫을 몰아 받지 않음
+    assert scheduler.acquire(now + 31) == "a"
+    scheduler.update("b", weight=1.0)
+    counts = Counter(scheduler.acquire(now + 31) for _ in range(100))
+    assert abs(counts["a"] - counts["b"]) <= 2
+
+    scheduler.remove("a")
+    scheduler.remove("b")
+    assert scheduler.seconds_until_ready(now) is None
+
+    assert proxy_weight(1.0) == 1.0
+    assert proxy_weight(1.0, quota_left=0) == 0.0
+    assert proxy_weight(0.0, response_time=5.0) == MIN_WEIGHT
+
+
+def test_selection_cost_does_not_grow_with_pool():
+    """풀이 100배 커져도 선택 시간은 몇 배 이내 (선형 스캔이면 100배)"""
+    def time_acquires(pool_size, rounds=20000):
+        scheduler = ProxyScheduler()
+        for i in range(pool_size):
+            scheduler.add(i, i, weight=0.5 + (i % 7) / 10)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            scheduler.acquire()
+        return time.perf_counter() - started
+
+    small, large = time_acquires(100), time_acquires(10000)
+    print(f"20k acquires: 100 proxies {small:.3f}s, 10000 proxies {large:.3f}s")
+    assert large < small * 5
+
+    # 잦은 갱신에도 지연 삭제 항목이 무한히 쌓이지 않음
+    scheduler = ProxyScheduler()
+    for i in range(10):
+        scheduler.add(i, i)
+    for n in range(5000):
+        scheduler.update(n % 10, available_at=time.time() + (n % 3))
+    assert scheduler.get_stats()['heap_size'] <= 2 * 10 + 16 + 1
+
+
+def test_concurrent_workers():
+    scheduler = ProxyScheduler()
+    for name in "abcd":
+        scheduler.add(name, name)
+
+    picked = []
+    lock = threading.Lock()
+
+    def worker():
+        local = [scheduler.acquire() for _ in range(1000)]
+        with lock:
+            picked.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counts = Counter(picked)
+    assert sum(counts.values()) == 8000
+    assert all(count == 2000 for count in counts.values())
+
+
+def test_proxy_manager_shifts_traffic_to_healthy_proxies():
+    manager = ProxyManager([
+        {'host': '10.0.0.1', 'port': 8080},
+        {'host': '10.0.0.2', 'port': 8080},
+    ])
+    good, bad = manager.proxies
+
+    counts = Counter()
+    for _ in range(200):
+        proxy = manager.get_next_proxy()
+        counts[proxy.host] += 1
+        manager.mark_proxy_used(proxy, success=proxy is good, response_time=0.2)
+    print(f"Traffic after failures: {dict(counts)}, bad success rate {bad.success_rate:.3f}")
+
+    assert counts[good.host] > counts[bad.host] * 5
+
+    # 차단된 프록시는 1시간 동안 제외, 이후 자동 복귀
+    manager.mark_proxy_blocked(good)
+    assert {manager.get_next_proxy().host for _ in range(10)} == {bad.host}
+
+    good.last_used = datetime.now() - timedelta(hours=2)
+    manager.scheduler.update(manager._proxy_key(good), available_at=0.0)
+    assert good.host in {manager.get_next_proxy().host for _ in range(10)}
+    assert not good.is_blocked
+
+
+if __name__ == "__main__":
+    test_selection_follows_weights()
+    test_cooldown_and_exhausted_quota()
+    test_selection_cost_does_not_grow_with_pool()
+    test_concurrent_workers()
+    test_proxy_manager_shifts_traffic_to_healthy_proxies()
+    print("\n✅ Proxy scheduler tests passed")
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+토큰 버킷 속도 제한기 테스트
+- 순차/동시 호출 모두 전역 속도를 넘지 않음 (여러 스레드가 같은 제한기 공유)
+- 프록시별 버킷: 프록시가 늘면 전역 한도까지 처리량 증가
+- 지터는 간격만 흔들고 평균 속도는 유지, delay_range -> 속도/지터 환산
+- 크롤러 요청 횟수 구간(100/200/300회)이 모두 적용되는지
+"""
+import os
+import sys
+import time
+import logging
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from rate_limiter import RateLimiter
+
+
+def test_global_rate_sequential_and_concurrent():
+    print("Testing token bucket rate limiter")
+    print("=" * 30)
+
+    limiter = RateLimiter(rate=10)
+    started = time.perf_counter()
+    for _ in range(5):
+        limiter.acquire()
+    elapsed = time.perf_counter() - started
+    print(f"5 sequential acquires at 10/s: {elapsed:.2f}s")
+    assert 0.38 <= elapsed < 0.6
+
+    # 4개 스레드가 공유: 각자 sleep하지 않고 슬롯을 나눠 받아 전체 속도는 20/s
+    limiter = RateLimiter(rate=20)
+    starts = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            limiter.acquire()
+            with lock:
+                starts.append(time.perf_counter())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    print(f"20 concurrent acquires at 20/s: {elapsed:.2f}s, stats {limiter.get_stats()}")
+
+    starts.sort()
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert 0.9 <= elapsed < 1.3
+    assert min(gaps) > 0.03
+
+
+def test_per_proxy_buckets_raise_throughput():
+    """프록시별 10/s 제한: 프록시 2개를 번갈아 쓰면 1개일 때의 약 절반 시간"""
+    def crawl(proxies):
+        limiter = RateLimiter(rate=100, per_proxy_rate=10)
+        started = time.perf_counter()
+        for i in range(10):
+            limiter.acquire(proxy=proxies[i % len(proxies)])
+        return time.perf_counter() - started
+
+    single, double = crawl(["A"]), crawl(["A", "B"])
+    print(f"10 requests: 1 proxy {single:.2f}s, 2 proxies {double:.2f}s")
+    assert 0.85 <= single < 1.2
+    assert double < single * 0.6
+
+    # 전역 한도는 프록시 수와 무관하게 유지
+    limiter = RateLimiter(rate=5, per_proxy_rate=10)
+    waits = [limiter.reserve(proxy=name) for name in "ABCD"]
+    assert waits[-1] >= 0.59
+
+
+def test_jitter_keeps_average_rate():
+    limiter = RateLimiter(rate=10, jitter=0.5)
+    waits = [limiter.reserve() for _ in range(202)][1:]  # 첫 예약은 버킷에 남은 토큰 사용
+    gaps = [later - earlier for earlier, later in zip(waits[1:], waits[2:])]
+
+    assert all(0.05 - 1e-3 <= gap <= 0.15 + 1e-3 for gap in gaps)
+    assert max(gaps) - min(gaps) > 0.05
+    assert 18 < waits[-1] < 22  # 평균 0.1초 간격
+
+
+def test_from_env_converts_delay_range():
+    os.environ.pop('CRAWL_MAX_RPS', None)
+    limiter = RateLimiter.from_env((5, 15), proxy_count=3)
+    assert limiter.per_proxy_rate == 0.1
+    assert abs(limiter.rate - 0.3) < 1e-9
+    assert limiter.jitter == 0.5
+
+    assert RateLimiter.from_env((5, 15)).per_proxy_rate is None
+
+    os.environ['CRAWL_MAX_RPS'] = '0.2'
+    try:
+        assert RateLimiter.from_env((5, 15), proxy_count=3).rate == 0.2
+    finally:
+        os.environ.pop('CRAWL_MAX_RPS')
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.calls = []
+
+    def acquire(self, proxy=None, cost=1.0):
+        self.calls.append((proxy, cost))
+        return 0.0
+
+
+def test_crawler_request_count_tiers():
+    """_smart_delay/_enhanced_random_delay: 300회 초과 구간이 100회 구간에 가려지지 않음"""
+    from universal_naver_crawler import UniversalNaverCrawler
+    from updated_naver_crawler_2025 import Updated2025NaverCrawler
+
+    universal = UniversalNaverCrawler.__new__(UniversalNaverCrawler)
+    universal.rate_limiter = RecordingLimiter()
+    universal.use_proxy, universal.proxy_list, universal.current_proxy_index = True, ["http://p1:8080"], 0
+    universal.stats = {'total_searches': 0, 'successful_searches': 0}
+    for count in (50, 150, 250, 350):
+        universal.request_count = count
+        universal._smart_delay()
+    assert universal.rate_limiter.calls == [("http://p1:8080", cost) for cost in (1.0, 1.5, 2.0, 3.0)]
+
+    updated = Updated2025NaverCrawler.__new__(Updated2025NaverCrawler)
+    updated.rate_limiter = RecordingLimiter()
+    updated.use_proxy, updated.proxy_list, updated.current_proxy_index = False, [], 0
+    updated.delay_range = (5, 15)
+    updated.logger = logging.getLogger("test")
+    for count in (50, 150, 250, 350):
+        updated.request_count = count
+        updated._enhanced_random_delay()
+    updated.request_count = 0
+    updated._enhanced_random_delay(min_delay=2, max_delay=5)
+    assert [cost for _, cost in updated.rate_limiter.calls] == [1.0, 1.75, 2.5, 4.0, 0.35]
+
+
+if __name__ == "__main__":
+    test_global_rate_sequential_and_concurrent()
+    test_per_proxy_buckets_raise_throughput()
+    test_jitter_keeps_average_rate()
+    test_from_env_converts_delay_range()
+    test_crawler_request_count_tiers()
+    print("\n✅ Rate limiter tests passed")
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+리소스 차단 정책 테스트
+- 이미지/폰트/광고 비콘은 차단, SERP·Apollo State 요청은 허용
+- 허용 목록과 충돌하는 패턴은 생성 시 거부
+- performance 로그에서 전송 바이트/차단 건수 집계
+"""
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from resource_policy import ResourcePolicy, collect_transfer_stats, summarize_network_log
+
+
+class CdpDriver:
+    """execute_cdp_cmd/get_log만 흉내 내는 드라이버"""
+
+    def __init__(self, entries=None):
+        self.commands = []
+        self.entries = entries
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+        return {}
+
+    def get_log(self, log_type):
+        if self.entries is None:
+            raise ValueError("log type 'performance' not found")
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def log_entry(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}}), 'level': 'INFO'}
+
+
+def test_blocks_assets_but_not_required_urls():
+    print("Testing resource policy")
+    print("=" * 30)
+
+    policy = ResourcePolicy()
+    blocked = [
+        "https://search.pstatic.net/common/?src=https%3A%2F%2Fldb-phinf.pstatic.net%2Fa.jpg&type=f84_84",
+        "https://ldb-phinf.pstatic.net/20240101_1/photo.jpg",
+        "https://ssl.pstatic.net/static/fonts/NanumGothic.woff2",
+        "https://ssl.pstatic.net/static.m/search/img/sp_icon.png?v=3",
+        "https://lcs.naver.com/m?u=https%3A%2F%2Fm.search.naver.com",
+        "https://siape.veta.naver.com/fxshow?su=SU1",
+    ]
+    allowed = [
+        "https://m.search.naver.com/search.naver?where=m&query=%EA%B0%95%EB%82%A8+%EB%A7%9B%EC%A7%91",
+        "https://ssl.pstatic.net/static.m/search/js/search.js?v=20250501",
+        "https://pcmap-api.place.naver.com/graphql",
+    ]
+    for url in blocked:
+        assert policy.blocks(url), url
+    for url in allowed:
+        assert not policy.blocks(url), url
+
+    try:
+        ResourcePolicy(['*.png', '*.js?*', '*://m.search.naver.com/*'])
+        assert False, "expected ValueError"
+    except ValueError as e:
+        print(f"Rejected conflicting policy: {e}")
+        assert 'm.search.naver.com' in str(e)
+
+
+def test_apply_sends_blocklist_over_cdp():
+    """Network.enable 후 같은 패턴 목록을 setBlockedURLs로 전달"""
+    driver = CdpDriver()
+    policy = ResourcePolicy()
+    policy.apply(driver)
+
+    assert [command for command, _ in driver.commands] == ['Network.enable', 'Network.setBlockedURLs']
+    assert driver.commands[1][1]['urls'] == policy.blocked_patterns
+
+
+def test_from_env():
+    os.environ['RESOURCE_BLOCKING'] = '0'
+    assert ResourcePolicy.from_env() is None
+
+    os.environ['RESOURCE_BLOCKING'] = '1'
+    os.environ['RESOURCE_BLOCK_EXTRA'] = '*://example-tracker.com/*, '
+    try:
+        policy = ResourcePolicy.from_env()
+        assert policy.blocks("https://example-tracker.com/pixel")
+    finally:
+        del os.environ['RESOURCE_BLOCKING']
+        del os.environ['RESOURCE_BLOCK_EXTRA']
+
+
+def test_transfer_summary_from_performance_log():
+    """완료 요청은 encodedDataLength 합산, 정책 차단과 일반 실패는 따로 집계"""
+    entries = [
+        log_entry('Network.requestWillBeSent', requestId='1', request={'url': 'https://m.search.naver.com/search.naver?query=a'}),
+        log_entry('Network.loadingFinished', requestId='1', encodedDataLength=180000),
+        log_entry('Network.requestWillBeSent', requestId='2', request={'url': 'https://ssl.pstatic.net/static.m/search/js/search.js'}),
+        log_entry('Network.loadingFinished', requestId='2', encodedDataLength=45000.0),
+        log_entry('Network.requestWillBeSent', requestId='3', request={'url': 'https://ldb-phinf.pstatic.net/a.jpg'}),
+        log_entry('Network.loadingFailed', requestId='3', errorText='net::ERR_BLOCKED_BY_CLIENT', blockedReason='inspector'),
+        log_entry('Network.loadingFailed', requestId='4', errorText='net::ERR_TIMED_OUT'),
+        {'message': 'not json'},
+    ]
+    summary = summarize_network_log(entries)
+    print(f"Summary: {summary}")
+
+    assert summary['bytes'] == 225000
+    assert summary['requests'] == 2
+    assert summary['blocked'] == 1
+    assert summary['failed'] == 1
+    assert summary['by_host'] == {'m.search.naver.com': 180000, 'ssl.pstatic.net': 45000}
+
+    # 로그는 읽을 때 비워지므로 다음 검색은 0부터 집계
+    driver = CdpDriver(entries)
+    assert collect_transfer_stats(driver)['requests'] == 2
+    assert collect_transfer_stats(driver)['requests'] == 0
+    assert collect_transfer_stats(CdpDriver(None)) is None
+
+
+if __name__ == "__main__":
+    test_blocks_assets_but_not_required_urls()
+    test_apply_sends_blocklist_over_cdp()
+    test_from_env()
+    test_transfer_summary_from_performance_log()
+    print("\n✅ Resource policy tests passed")
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+프록시 롤링 집계 테스트
+- 시간 버킷 경계/만료, 프록시별 분리
+- 히스토그램 분위수 정확도와 병합
+- ProxyMonitor.get_usage_stats 출력 형식
+"""
+import os
+import sys
+import random
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from rolling_stats import LatencyHistogram, RollingProxyStats, classify_error
+from proxy_monitor import ProxyMonitor
+
+
+def test_histogram_percentiles_and_merge():
+    """분위수는 상대 오차 10% 이내, 병합 결과는 한 번에 넣은 것과 동일"""
+    print("Testing latency histogram")
+    print("=" * 30)
+
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(0, 0.8) for _ in range(5000)]
+
+    whole = LatencyHistogram()
+    left, right = LatencyHistogram(), LatencyHistogram()
+    for i, value in enumerate(samples):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    ordered = sorted(samples)
+    for q in (0.50, 0.95, 0.99):
+        exact = ordered[int(q * len(ordered)) - 1]
+        estimate = whole.percentile(q)
+        print(f"p{int(q * 100)}: exact={exact:.3f}s estimate={estimate:.3f}s")
+        assert abs(estimate - exact) / exact < 0.1
+        assert left.percentile(q) == estimate
+
+    assert left.count == whole.count == 5000
+    assert LatencyHistogram().percentile(0.95) == 0.0
+
+
+def test_rolling_windows():
+    """분/시간 버킷 범위 조회와 7일 경과 후 만료"""
+    print("Testing rolling windows")
+    print("=" * 30)
+
+    stats = RollingProxyStats()
+    now = 1_700_000_000.0
+
+    # 3시간 전 실패 2건, 30분 전 성공 3건, 방금 성공 1건
+    stats.record('proxy-a', False, 0.0, 'timeout', now=now - 3 * 3600)
+    stats.record('proxy-b', False, 2.0, 'http_403', now=now - 3 * 3600)
+    for _ in range(3):
+        stats.record('proxy-a', True, 1.0, now=now - 1800)
+    stats.record('proxy-b', True, 0.5, now=now)
+
+    overall, by_proxy = stats.snapshot(1, now=now)
+    print(f"1h: total={overall.total}, proxies={sorted(by_proxy)}")
+    assert (overall.total, overall.success, overall.failed) == (4, 4, 0)
+    assert by_proxy['proxy-a'].total == 3
+
+    overall, by_proxy = stats.snapshot(24, now=now)
+    assert (overall.total, overall.failed) == (6, 2)
+    assert overall.errors == {'timeout': 1, 'http_403': 1}
+    assert by_proxy['proxy-b'].errors == {'http_403': 1}
+
+    # 응답 시간 0(연결 실패)은 지연 분포에서 제외
+    assert overall.latency.count == 5
+
+    assert stats.window(24, 'proxy-a', now=now).total == 4
+    assert stats.window(24, 'unknown', now=now).total == 0
+
+    # 8일 뒤에는 모두 만료 (새 기록이 들어오면 오래된 버킷 정리)
+    later = now + 8 * 24 * 3600
+    stats.record('proxy-a', True, 1.0, now=later)
+    overall, _ = stats.snapshot(24 * 30, now=later)
+    assert overall.total == 1
+
+
+def test_classify_error():
+    assert classify_error(None, 'Read timed out') == 'timeout'
+    assert classify_error(None, 'ProxyError: Cannot connect to proxy') == 'proxy_error'
+    assert classify_error(429, 'Too Many Requests') == 'rate_limited'
+    assert classify_error(403, 'Forbidden') == 'http_403'
+    assert classify_error(502, None) == 'http_5xx'
+    assert classify_error(None, 'CAPTCHA detected') == 'captcha'
+
+
+def test_proxy_monitor_usage_stats():
+    """ProxyMonitor는 원본 기록 없이 집계로 통계/리포트 생성"""
+    monitor = ProxyMonitor(log_to_file=False, log_to_supabase=False)
+
+    for i in range(100):
+        monitor.record_request('brd.superproxy.io:22225', 'https://m.search.naver.com/', 200, 0.1 * (i + 1), True)
+    monitor.record_request('brd.superproxy.io:22225', 'https://m.search.naver.com/', None, 0, False, 'Connection reset')
+
+    stats = monitor.get_usage_stats(hours=1)
+    print(f"Stats: {stats}")
+    assert not hasattr(monitor, 'usage_records')
+    assert stats['total_requests'] == 101
+    assert stats['failed_requests'] == 1
+    assert stats['error_summary'] == {'connection_error': 1}
+    assert 4.5 < stats['p50_response_time'] < 5.5
+    assert 9.0 < stats['p95_response_time'] < 10.5
+    assert stats['proxy_stats']['brd.superproxy.io:22225']['total'] == 101
+    assert 9.0 < monitor.latency_percentile(0.95) < 10.5
+
+    report = monitor.export_usage_report(hours=1, format='text')
+    assert 'p50/p95/p99' in report
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles_and_merge()
+    test_rolling_windows()
+    test_classify_error()
+    test_proxy_monitor_usage_stats()
+    print("\n✅ Rolling stats tests passed")
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Supabase 일괄 저장기 테스트
+- 배치 크기/시간 기준 flush, 재시도, 지표 확인
+- 큐 크기 제한/초과 정책, ProxyMonitor 기록 경로의 비차단 동작
+- 실제 Supabase 대신 insert 호출을 기록하는 가짜 클라이언트 사용
+"""
+import os
+import sys
+import time
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from supabase_bulk_writer import SupabaseBulkWriter
+from proxy_monitor import ProxyMonitor
+
+
+class RecordingClient:
+    """table().insert().execute() 호출을 기록 (fail_times만큼 먼저 실패)"""
+
+    def __init__(self, fail_times=0, delay=0.0):
+        self.inserts = []
+        self.fail_times = fail_times
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        client = self
+
+        class Query:
+            def insert(self, rows):
+                self.rows = rows
+                return self
+
+            def execute(self):
+                time.sleep(client.delay)
+                with client.lock:
+                    if client.fail_times > 0:
+                        client.fail_times -= 1
+                        raise RuntimeError("temporary failure")
+                    client.inserts.append((name, list(self.rows)))
+
+        return Query()
+
+
+def test_batches_by_size_and_flush():
+    """배치 크기마다 배열 insert 1회, flush 시 나머지 저장"""
+    print("Testing batch size flush")
+    print("=" * 30)
+
+    client = RecordingClient()
+    writer = SupabaseBulkWriter(client, batch_size=10, flush_interval=60)
+
+    for i in range(25):
+        writer.add('crawler_results', {'rank': i})
+    for i in range(3):
+        writer.add('rankings', {'rank': i})
+
+    assert writer.flush(timeout=5)
+    metrics = writer.get_metrics()
+    print(f"Inserts: {[(table, len(rows)) for table, rows in client.inserts]}")
+    print(f"Metrics: {metrics}")
+
+    assert sorted(len(rows) for table, rows in client.inserts if table == 'crawler_results') == [5, 10, 10]
+    assert [len(rows) for table, rows in client.inserts if table == 'rankings'] == [3]
+    assert [row['rank'] for table, rows in client.inserts if table == 'crawler_results' for row in rows] == list(range(25))
+    assert metrics['rows_written'] == 28
+    assert metrics['batches_written'] == 4
+    assert metrics['pending_rows'] == 0
+
+    writer.close(timeout=5)
+
+
+def test_time_based_flush():
+    """배치가 차지 않아도 flush_interval 후 저장"""
+    client = RecordingClient()
+    writer = SupabaseBulkWriter(client, batch_size=100, flush_interval=0.2)
+
+    writer.add('crawler_results', {'rank': 1})
+    deadline = time.time() + 3
+    while not client.inserts and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert client.inserts == [('crawler_results', [{'rank': 1}])]
+    writer.close(timeout=5)
+
+
+def test_retry_and_drop():
+    """일시 실패는 재시도, 재시도 초과 시 배치 실패로 집계"""
+    client = RecordingClient(fail_times=2)
+    writer = SupabaseBulkWriter(client, batch_size=5, flush_interval=60, max_retries=2, retry_backoff=0.01)
+
+    writer.add_many('crawler_results', [{'rank': i} for i in range(5)])
+    assert writer.flush(timeout=5)
+    assert len(client.inserts) == 1
+    assert writer.get_metrics()['retries'] == 2
+
+    client.fail_times = 10
+    writer.add('rankings', {'rank': 1})
+    assert writer.close(timeout=5)
+
+    metrics = writer.get_metrics()
+    print(f"Metrics after failures: {metrics}")
+    assert metrics['rows_failed'] == 1
+    assert metrics['batches_failed'] == 1
+    assert metrics['last_error'] == "temporary failure"
+
+
+def test_bounded_queue_drops_newest():
+    """큐가 가득 차면 새 행을 버리고 호출자는 대기하지 않음"""
+    client = RecordingClient(delay=0.5)
+    writer = SupabaseBulkWriter(
+        client, batch_size=1, flush_interval=60, max_queue_size=3,
+        overflow_policy=SupabaseBulkWriter.OVERFLOW_DROP_NEWEST
+    )
+
+    started = time.perf_counter()
+    accepted = [writer.add('proxy_usage_logs', {'i': i}) for i in range(10)]
+    elapsed = time.perf_counter() - started
+
+    metrics = writer.get_metrics()
+    print(f"Accepted: {accepted.count(True)}, dropped: {metrics['rows_dropped']}, depth: {metrics['queue_depth']}")
+    assert elapsed < 0.2
+    assert accepted.count(False) == metrics['rows_dropped'] > 0
+    assert metrics['queue_depth'] <= 3
+
+    assert writer.close(timeout=10)
+    assert len(client.inserts) == accepted.count(True)
+
+
+def test_proxy_monitor_ships_in_background():
+    """느린 Supabase에서도 record_request는 즉시 반환, 종료 시 남은 기록 전송"""
+    print("Testing ProxyMonitor background shipping")
+    print("=" * 30)
+
+    client = RecordingClient(delay=0.3)
+    monitor = ProxyMonitor(log_to_file=False, log_to_supabase=False)
+    monitor.log_to_supabase = True
+    monitor.log_shipper = SupabaseBulkWriter(client, batch_size=50, flush_interval=60, max_queue_size=100,
+                                             overflow_policy=SupabaseBulkWriter.OVERFLOW_DROP_NEWEST)
+
+    started = time.perf_counter()
+    for i in range(20):
+        monitor.record_request('brd.superproxy.io:22225', f'https://m.search.naver.com/?q={i}', 200, 0.5, True)
+    elapsed = time.perf_counter() - started
+    print(f"20 records in {elapsed * 1000:.1f} ms, stats: {monitor.get_shipper_stats()}")
+    assert elapsed < 0.2
+
+    monitor.close()
+    assert [len(rows) for table, rows in client.inserts] == [20]
+    assert client.inserts[0][0] == 'proxy_usage_logs'
+    assert monitor.get_shipper_stats()['queue_depth'] == 0
+
+
+if __name__ == "__main__":
+    test_batches_by_size_and_flush()
+    test_time_based_flush()
+    test_retry_and_drop()
+    test_bounded_queue_drops_newest()
+    test_proxy_monitor_ships_in_background()
+    print("\n✅ Supabase bulk writer tests passed")
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+WebDriver 풀 테스트
+- 미리 기동, 프록시별 대여/로테이션, 헬스 체크 실패 교체
+- 페이지 수 한도 도달 시 재생성
+- 실제 Chrome 대신 생성 비용을 흉내 내는 가짜 드라이버 사용
+"""
+import os
+import sys
+import time
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from webdriver_pool import WebDriverPool, process_tree_rss_mb
+
+
+class FakeDriver:
+    """execute_script/quit만 흉내 내는 드라이버"""
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.alive = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeFactory:
+    """생성된 드라이버를 기록하는 팩토리 (startup_delay로 콜드 스타트 흉내)"""
+
+    def __init__(self, startup_delay=0.0):
+        self.startup_delay = startup_delay
+        self.created = []
+        self.lock = threading.Lock()
+
+    def __call__(self, proxy):
+        time.sleep(self.startup_delay)
+        driver = FakeDriver(proxy)
+        with self.lock:
+            self.created.append(driver)
+        return driver
+
+
+def test_warm_checkout_is_fast():
+    """미리 기동된 브라우저 대여는 콜드 스타트 비용 없이 즉시 반환"""
+    print("Testing warm checkout")
+    print("=" * 30)
+
+    factory = FakeFactory(startup_delay=0.3)
+    pool = WebDriverPool(factory, size=2)
+    pool.warm_up(background=False)
+    assert len(factory.created) == 2
+
+    started = time.perf_counter()
+    pooled = pool.acquire()
+    elapsed = time.perf_counter() - started
+    print(f"Warm checkout: {elapsed * 1000:.1f} ms, stats: {pool.get_stats()}")
+    assert elapsed < 0.1
+    assert pool.get_stats()['warm_hits'] == 1
+
+    pool.release(pooled)
+    pool.close()
+    assert all(driver.quit_called for driver in factory.created)
+
+
+def test_proxy_rotation_is_checkout():
+    """로테이션은 재기동 없이 다른 프록시에 묶인 브라우저로 교체"""
+    factory = FakeFactory()
+    proxies = ['http://proxy-a:8000', 'http://proxy-b:8000']
+    pool = WebDriverPool(factory, proxies=proxies, size=2)
+    pool.warm_up(background=False)
+    assert sorted(driver.proxy for driver in factory.created) == proxies
+
+    pooled = pool.acquire(proxy='http://proxy-a:8000')
+    assert pooled.proxy == 'http://proxy-a:8000'
+
+    rotated = pool.swap(pooled, proxy='http://proxy-b:8000')
+    print(f"Rotated {pooled.proxy} -> {rotated.proxy}")
+    assert rotated.proxy == 'http://proxy-b:8000'
+    assert len(factory.created) == 2
+    assert not pooled.in_use
+
+    pool.close()
+
+
+def test_requested_proxy_is_never_substituted():
+    """proxy를 지정하면 다른 프록시의 브라우저로 대신하지 않음 (기동 중이면 대기, 풀이 작으면 교체)"""
+    # 요청한 프록시의 브라우저가 아직 기동 중이면 다른 유휴 브라우저 대신 기동 완료를 기다림
+    factory = FakeFactory()
+    pool = WebDriverPool(factory, proxies=['p0', 'p1'], size=2)
+    pooled = pool.acquire(proxy='p0')
+    factory.startup_delay = 0.2
+    pool.warm_up()  # p1 기동 시작
+    rotated = pool.swap(pooled, proxy='p1')
+    assert rotated.proxy == 'p1'
+    assert pool.get_stats()['size'] == 2
+    pool.close()
+
+    # 풀 크기보다 프록시가 많으면 다른 프록시의 유휴 브라우저를 내리고 요청한 프록시로 기동
+    factory = FakeFactory()
+    pool = WebDriverPool(factory, proxies=['p0', 'p1', 'p2'], size=2)
+    pool.warm_up(background=False)
+    assert sorted(driver.proxy for driver in factory.created) == ['p0', 'p1']
+    pooled = pool.acquire(proxy='p2', timeout=5)
+    print(f"Requested p2 on a full pool: got {pooled.proxy}, stats: {pool.get_stats()}")
+    assert pooled.proxy == 'p2'
+    assert pool.get_stats()['size'] == 2
+    assert sum(driver.quit_called for driver in factory.created) == 1
+
+    # 모든 브라우저가 대여 중이면 다른 프록시 브라우저를 빌려주지 않고 반납을 기다렸다가 교체
+    other = pool.acquire(timeout=5)
+    missing = 'p0' if other.proxy == 'p1' else 'p1'
+    try:
+        pool.acquire(proxy=missing, timeout=0.1)
+        assert False, "expected TimeoutError"
+    except TimeoutError:
+        pass
+    threading.Timer(0.1, pool.release, args=(pooled,)).start()
+    assert pool.acquire(proxy=missing, timeout=5).proxy == missing
+    pool.close()
+
+
+def test_default_size_follows_proxies():
+    """WEBDRIVER_POOL_SIZE가 없으면 프록시 수만큼만 유지 (프록시가 없으면 미리 띄우는 브라우저 없음)"""
+    factory = FakeFactory()
+    pool = WebDriverPool.from_env(factory)
+    pool.acquire()
+    pool.warm_up(background=False)
+    assert pool.size == 1 and len(factory.created) == 1
+    pool.close()
+
+    assert WebDriverPool.from_env(factory, proxies=['http://proxy-a:8000', 'http://proxy-b:8000']).size == 2
+
+
+def test_unhealthy_and_recycled_drivers_are_replaced():
+    """죽은 브라우저는 대여 시 교체, 페이지 한도 초과 시 반납과 함께 재생성"""
+    factory = FakeFactory()
+    pool = WebDriverPool(factory, size=1, max_pages=3, max_rss_mb=0)
+    pool.warm_up(background=False)
+
+    factory.created[0].alive = False
+    pooled = pool.acquire(timeout=5)
+    assert pooled.driver is not factory.created[0]
+    assert factory.created[0].quit_called
+    assert pool.stats['health_failures'] == 1
+
+    for _ in range(3):
+        pool.record_page(pooled)
+    assert pool.needs_recycle(pooled)
+    pool.release(pooled)
+
+    replacement = pool.acquire(timeout=5)
+    print(f"Stats after recycle: {pool.get_stats()}")
+    assert replacement.driver is not pooled.driver
+    assert replacement.pages_served == 0
+    assert pool.stats['recycled'] == 1
+
+    pool.close()
+
+
+def test_acquire_waits_for_release():
+    """풀이 모두 대여 중이면 반납될 때까지 대기, 시간 초과 시 TimeoutError"""
+    pool = WebDriverPool(FakeFactory(), size=1)
+    pooled = pool.acquire()
+
+    try:
+        pool.acquire(timeout=0.1)
+        assert False, "expected TimeoutError"
+    except TimeoutError:
+        pass
+
+    threading.Timer(0.1, pool.release, args=(pooled,)).start()
+    assert pool.acquire(timeout=5) is pooled
+    pool.close()
+
+
+def test_failing_factory_respects_timeout():
+    """드라이버 기동이 계속 실패하면 재시도 간격을 두고 연속 실패 한도 또는 timeout에서 중단"""
+    calls = []
+
+    def broken_factory(proxy):
+        calls.append(proxy)
+        raise RuntimeError("chromedriver not found")
+
+    pool = WebDriverPool(broken_factory, size=1, max_start_failures=3, start_backoff=0.05)
+    started = time.monotonic()
+    try:
+        pool.acquire(timeout=5)
+        assert False, "expected TimeoutError"
+    except TimeoutError:
+        pass
+    assert len(calls) == 3
+    assert 0.15 <= time.monotonic() - started < 1.0  # 0.05 + 0.1초 백오프
+    assert pool.get_stats()['create_errors'] == 3
+
+    # timeout이 먼저 끝나면 백오프 중에도 중단
+    calls.clear()
+    pool = WebDriverPool(broken_factory, size=1, max_start_failures=100, start_backoff=0.2)
+    started = time.monotonic()
+    try:
+        pool.acquire(timeout=1)
+        assert False, "expected TimeoutError"
+    except TimeoutError:
+        pass
+    print(f"Factory calls before timeout: {len(calls)}")
+    assert time.monotonic() - started < 1.5
+    assert len(calls) <= 3
+    pool.close()
+
+
+def test_process_tree_rss():
+    """현재 프로세스 RSS는 0보다 크고, 없는 pid는 0"""
+    assert process_tree_rss_mb(os.getpid()) > 0
+    assert process_tree_rss_mb(None) == 0.0
+
+
+if __name__ == "__main__":
+    test_warm_checkout_is_fast()
+    test_proxy_rotation_is_checkout()
+    test_requested_proxy_is_never_substituted()
+    test_default_size_follows_proxies()
+    test_unhealthy_and_recycled_drivers_are_replaced()
+    test_acquire_waits_for_release()
+    test_failing_factory_respects_timeout()
+    test_process_tree_rss()
+    print("\n✅ WebDriver pool tests passed")
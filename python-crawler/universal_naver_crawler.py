@@ -6,7 +6,6 @@
 - 대량 배치 처리 최적화
 """
 import time
-import re
 import random
 import os
 import logging
@@ -23,6 +22,18 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from supabase import create_client, Client
+from supabase_bulk_writer import SupabaseBulkWriter
+from crawl_planner import plan_keyword_groups, summarize_plan
+from apollo_http_fetcher import ApolloHttpFetcher
+from apollo_state import ApolloListSummaries, parse_apollo_state
+from place_matcher import PlaceNameMatcher, is_place_match
+from webdriver_pool import WebDriverPool
+from proxy_forwarder import ProxyForwarder
+from resource_policy import ResourcePolicy, collect_transfer_stats
+from dom_access import DomAccess, SearchDeadline, SearchDeadlineExceeded, SCROLL_STATUS_LOADED
+from rate_limiter import RateLimiter
+from pacing_controller import AdaptivePacer
+from request_budget_ledger import BudgetExhausted, create_budget_ledger, exit_key
 
 class UniversalNaverCrawler:
     """
@@ -30,9 +41,15 @@ class UniversalNaverCrawler:
     - 모든 지역/업종 지원
     - 완전 동적 처리
     - 배치 최적화
+    - HTTP 우선 수집 (Selenium은 Apollo State가 없을 때만 폴백)
     """
     
-    def __init__(self, headless=True, delay_range=(5, 15), use_proxy=False, proxy_list=None):
+    def __init__(self, headless=True, delay_range=(5, 15), use_proxy=False, proxy_list=None, use_http_fetch=True,
+                 read_state_via_js=True, rate_limiter=None):
+        self.headless = headless
+        self.use_http_fetch = use_http_fetch
+        # True면 Apollo State/CAPTCHA를 JS 런타임에서 직접 읽음 (page_source 미사용, JS 활성화 필요)
+        self.read_state_via_js = read_state_via_js
         self.delay_range = delay_range
         self.use_proxy = use_proxy
         self.proxy_list = proxy_list or []
@@ -43,6 +60,15 @@ class UniversalNaverCrawler:
         
         self.logger = self._setup_logging()
         
+        # 요청 간격은 전역/프록시별 토큰 버킷으로 관리 (여러 크롤러가 같은 rate_limiter를 공유하면 함께 제한)
+        self.rate_limiter = rate_limiter or RateLimiter.from_env(
+            delay_range, proxy_count=len(self.proxy_list) if use_proxy else 0, logger_name="UniversalRateLimiter"
+        )
+        # CAPTCHA/403/429 신호로 프록시별 속도를 조정하고 학습값을 저장 (ADAPTIVE_PACING=0이면 고정 속도)
+        self.pacer = AdaptivePacer.from_env(
+            self.rate_limiter, proxies=self.proxy_list if use_proxy else [], logger_name="UniversalPacer"
+        )
+        
         # 2025년 5월 최신 User-Agent 풀 (setup_driver보다 먼저 정의)
         self.user_agents = [
             "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
@@ -53,7 +79,35 @@ class UniversalNaverCrawler:
         ]
         
         self.driver = None
-        self.setup_driver(headless)
+        self.pooled_driver = None
+        
+        # 검색 1회 전체 시간 예산 (초과 시 해당 검색만 실패 처리)
+        self.search_time_budget = float(os.getenv('SEARCH_TIME_BUDGET', '90'))
+        self.search_deadline = SearchDeadline(self.search_time_budget)
+        
+        # CDP 리소스 차단 정책 (이미지/폰트/광고 비콘 차단, RESOURCE_BLOCKING=0이면 비활성)
+        self.resource_policy = ResourcePolicy.from_env()
+        
+        # Chrome은 로컬 포워더만 바라보고 로테이션은 업스트림만 교체 (PROXY_FORWARDER=0이면 브라우저 교체 방식)
+        self.proxy_forwarder = None
+        if self.use_proxy and self.proxy_list and os.getenv('PROXY_FORWARDER', '1') != '0':
+            self.proxy_forwarder = ProxyForwarder(
+                upstream=self._current_proxy(), logger_name="UniversalProxyForwarder"
+            ).start()
+        
+        # 미리 기동한 브라우저 풀 (포워더가 없으면 프록시별 바인딩, 로테이션은 재기동 대신 대여)
+        self.driver_pool = WebDriverPool.from_env(
+            self._create_driver,
+            proxies=self.proxy_list if self.use_proxy and not self.proxy_forwarder else None,
+            logger_name="UniversalWebDriverPool"
+        )
+        
+        # HTTP 수집기 사용 시 WebDriver는 폴백이 필요할 때 지연 기동
+        self.http_fetcher = None
+        if self.use_http_fetch:
+            self.http_fetcher = ApolloHttpFetcher(user_agents=self.user_agents, proxy=self._current_proxy())
+        else:
+            self._ensure_driver()
         
         # Supabase 설정
         url = os.getenv('SUPABASE_URL')
@@ -64,12 +118,27 @@ class UniversalNaverCrawler:
             self.supabase = None
             self.logger.warning("Supabase credentials not found")
         
+        # 결과 일괄 저장기
+        self.result_writer = SupabaseBulkWriter.from_env(self.supabase, "ResultWriter") if self.supabase else None
+        
+        # 프로세스/워커가 함께 쓰는 출구별 KST 일일 예산 (REQUEST_LEDGER=off면 객체 내 카운터만 사용)
+        self.budget_ledger = create_budget_ledger(self.supabase, logger_name="UniversalBudgetLedger")
+        if self.budget_ledger:
+            self.daily_request_limit = self.budget_ledger.limit
+        self._reserved_exit = None  # 검색 시작 시 예약했지만 아직 쓰지 않은 출구
+        
         # 성능 통계
         self.stats = {
             'total_searches': 0,
             'successful_searches': 0,
             'failed_searches': 0,
             'captcha_encounters': 0,
+            'http_fetches': 0,
+            'selenium_fallbacks': 0,
+            'deadline_exceeded': 0,
+            'browser_bytes': 0,
+            'browser_requests': 0,
+            'blocked_requests': 0,
             'avg_response_time': 0.0,
             'search_history': []
         }
@@ -83,7 +152,14 @@ class UniversalNaverCrawler:
         return logging.getLogger("UniversalNaverCrawler")
     
     def setup_driver(self, headless, proxy=None):
-        """Chrome WebDriver 설정"""
+        """풀을 거치지 않고 Chrome WebDriver 직접 기동"""
+        self.driver = self._create_driver(proxy, headless)
+    
+    def _create_driver(self, proxy=None, headless=None):
+        """Chrome WebDriver 생성 (WebDriverPool 팩토리)"""
+        if headless is None:
+            headless = self.headless
+        
         options = Options()
         
         if headless:
@@ -100,8 +176,8 @@ class UniversalNaverCrawler:
         # 성능 최적화
         options.add_argument('--disable-extensions')
         options.add_argument('--disable-plugins')
-        options.add_argument('--disable-images')
-        options.add_argument('--disable-javascript')
+        if not self.read_state_via_js:
+            options.add_argument('--disable-javascript')
         
         # 랜덤 User-Agent
         user_agent = random.choice(self.user_agents)
@@ -113,18 +189,27 @@ class UniversalNaverCrawler:
         options.add_argument(f'--window-size={width},{height}')
         
         # 프록시 설정
-        if proxy and self.use_proxy:
+        if self.proxy_forwarder:
+            options.add_argument(f'--proxy-server={self.proxy_forwarder.proxy_url}')
+        elif proxy and self.use_proxy:
             options.add_argument(f'--proxy-server={proxy}')
         
         try:
-            self.driver = webdriver.Chrome(options=options)
-            self.driver.execute_script("""
+            if self.resource_policy:
+                self.resource_policy.configure_options(options)
+            
+            driver = webdriver.Chrome(options=options)
+            if self.resource_policy:
+                self.resource_policy.apply(driver)
+            driver.execute_script("""
                 Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
                 Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
                 Object.defineProperty(navigator, 'languages', {get: () => ['ko-KR', 'ko', 'en-US', 'en']});
             """)
-            self.driver.implicitly_wait(10)
+            # 요소 미스마다 대기하지 않도록 implicit wait 비활성화 (대기는 DomAccess에서 명시적으로)
+            driver.implicitly_wait(0)
             self.logger.info(f"WebDriver initialized")
+            return driver
             
         except Exception as e:
             self.logger.error(f"Failed to initialize WebDriver: {e}")
@@ -143,6 +228,7 @@ class UniversalNaverCrawler:
             dict: 검색 결과
         """
         search_start_time = time.time()
+        self.search_deadline = SearchDeadline(self.search_time_budget)
         
         # 요청 제한 확인
         if not self._check_daily_limit():
@@ -167,33 +253,30 @@ class UniversalNaverCrawler:
         try:
             self.logger.info(f"Searching [{self.request_count}]: '{target_place_name}' in '{keyword}' (max rank: {max_rank})")
             
-            # 네이버 모바일 검색 URL 구성 (2025년 최적화)
-            encoded_keyword = urllib.parse.quote(keyword)
-            search_url = f"https://m.search.naver.com/search.naver?where=m&sm=top_sly.hst&fbm=0&acr=1&ie=utf8&query={encoded_keyword}"
-            
-            self.driver.get(search_url)
-            self._smart_delay()
-            
-            # CAPTCHA 감지
-            if self._detect_captcha():
-                self.stats['captcha_encounters'] += 1
-                result["message"] = "CAPTCHA detected - IP rotation needed"
-                self.logger.warning("CAPTCHA detected!")
-                
-                if self.use_proxy and len(self.proxy_list) > 1:
-                    self._rotate_proxy()
-                
+            # 1. 브라우저 없이 HTTP로 Apollo State 수집
+            restaurants, error_message = self._fetch_restaurants_http(keyword)
+            if error_message:
+                result["message"] = error_message
                 return result
             
-            # 플레이스 섹션으로 이동
-            if not self._navigate_to_place_list():
-                result["message"] = "플레이스 섹션을 찾을 수 없습니다."
-                return result
+            if restaurants:
+                rank_result = self._find_target_restaurant_in_json(restaurants, target_place_name, max_rank)
+            else:
+                # 2. Apollo State가 없을 때만 Selenium 폴백
+                error_message = self._load_search_page(keyword)
+                if error_message:
+                    result["message"] = error_message
+                    return result
+                
+                # 순위 검색 실행
+                rank_result = self._find_place_rank_universal(target_place_name, max_rank)
             
-            # 순위 검색 실행
-            rank_result = self._find_place_rank_universal(target_place_name, max_rank)
             result.update(rank_result)
             
+            transfer = self._record_transfer()
+            if transfer:
+                result["transfer"] = transfer
+            
             # 검색 시간 기록
             search_duration = time.time() - search_start_time
             result["search_duration"] = round(search_duration, 2)
@@ -220,13 +303,148 @@ class UniversalNaverCrawler:
             if len(self.stats['search_history']) > 100:
                 self.stats['search_history'] = self.stats['search_history'][-100:]
                 
+        except SearchDeadlineExceeded as e:
+            result["message"] = str(e)
+            self.logger.warning(f"⏱️ {e}")
+            self.stats['deadline_exceeded'] += 1
+            self.stats['failed_searches'] += 1
+        except BudgetExhausted as e:
+            result["message"] = "Daily request limit reached"
+            self.logger.warning(f"Search stopped: {e}")
+            self.stats['failed_searches'] += 1
         except Exception as e:
             result["message"] = f"오류 발생: {type(e).__name__} - {e}"
             self.logger.error(f"❌ Error in search: {e}")
             self.stats['failed_searches'] += 1
+        finally:
+            self._release_unused_budget()
         
         return result
     
+    def search_keyword_group(self, keyword: str, target_place_names: List[str], max_rank: int = 50) -> List[Dict]:
+        """
+        동일 키워드의 여러 플레이스 순위를 SERP 1회 요청으로 검색
+        
+        Args:
+            keyword (str): 검색 키워드
+            target_place_names (List[str]): 찾을 플레이스명 목록
+            max_rank (int): 최대 검색 순위 (기본 50위)
+            
+        Returns:
+            List[Dict]: target_place_names와 같은 순서의 검색 결과
+        """
+        search_start_time = time.time()
+        self.search_deadline = SearchDeadline(self.search_time_budget)
+        
+        # 요청 제한 확인 (그룹 전체가 요청 1회)
+        if not self._check_daily_limit():
+            return [self._create_error_result(keyword, name, "Daily request limit reached") for name in target_place_names]
+        
+        self.request_count += 1
+        self.stats['total_searches'] += len(target_place_names)
+        
+        results = [{
+            "keyword": keyword,
+            "shop_name": target_place_name,
+            "rank": -1,
+            "success": False,
+            "message": "",
+            "search_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "found_shops": [],
+            "request_count": self.request_count,
+            "search_region": self._extract_region(keyword),
+            "search_category": self._extract_category(keyword)
+        } for target_place_name in target_place_names]
+        
+        try:
+            self.logger.info(f"Group searching [{self.request_count}]: {len(target_place_names)} places in '{keyword}' (max rank: {max_rank})")
+            
+            # HTTP 수집 우선, 실패 시 Selenium 폴백
+            restaurants, error_message = self._fetch_restaurants_http(keyword)
+            
+            if not error_message and not restaurants:
+                error_message = self._load_search_page(keyword)
+                if not error_message:
+                    restaurants = self._extract_restaurants_from_page()
+            
+            if error_message:
+                for result in results:
+                    result["message"] = error_message
+                self.stats['failed_searches'] += len(results)
+                return results
+            
+            # 결과 목록은 한 번만 수집하고 모든 대상에 재사용
+            if restaurants:
+                found_names = [restaurant.get('name', '') for restaurant in restaurants]
+                method = "JSON method"
+            else:
+                self.logger.info("JSON parsing failed, falling back to HTML parsing")
+                found_names = self._collect_place_names_html_fallback(target_place_names, max_rank)
+                method = "HTML fallback"
+            
+            # 목록을 한 번 순회하며 모든 대상의 첫 매칭 순위 산출
+            ranks = PlaceNameMatcher(target_place_names).ranks(found_names, max_rank)
+            search_duration = time.time() - search_start_time
+            transfer = self._record_transfer()
+            
+            for result, rank in zip(results, ranks):
+                target_place_name = result["shop_name"]
+                
+                if rank > 0:
+                    result.update({
+                        "rank": rank,
+                        "success": True,
+                        "message": f"'{target_place_name}' found at rank {rank} ({method})",
+                        "found_shops": found_names[:min(rank, 15)]
+                    })
+                    self.stats['successful_searches'] += 1
+                else:
+                    result.update({
+                        "found_shops": found_names[:20],
+                        "message": f"'{target_place_name}' not found in top {min(len(found_names), max_rank)} results ({method})"
+                    })
+                    self.stats['failed_searches'] += 1
+                
+                result["search_duration"] = round(search_duration, 2)
+                if transfer:
+                    result["transfer"] = transfer
+                
+                self.stats['search_history'].append({
+                    'keyword': keyword,
+                    'target': target_place_name,
+                    'success': result['success'],
+                    'rank': result['rank'],
+                    'duration': search_duration,
+                    'timestamp': result['search_time']
+                })
+            
+            if len(self.stats['search_history']) > 100:
+                self.stats['search_history'] = self.stats['search_history'][-100:]
+            
+            found_count = sum(1 for result in results if result['success'])
+            self.logger.info(f"✅ Resolved {found_count}/{len(results)} places for '{keyword}' in {search_duration:.2f}s")
+            
+        except SearchDeadlineExceeded as e:
+            for result in results:
+                result["message"] = str(e)
+            self.logger.warning(f"⏱️ {e}")
+            self.stats['deadline_exceeded'] += 1
+            self.stats['failed_searches'] += len(results)
+        except BudgetExhausted as e:
+            for result in results:
+                result["message"] = "Daily request limit reached"
+            self.logger.warning(f"Group search stopped: {e}")
+            self.stats['failed_searches'] += len(results)
+        except Exception as e:
+            for result in results:
+                result["message"] = f"오류 발생: {type(e).__name__} - {e}"
+            self.logger.error(f"❌ Error in group search: {e}")
+            self.stats['failed_searches'] += len(results)
+        finally:
+            self._release_unused_budget()
+        
+        return results
+    
     def batch_search(self, search_tasks: List[Dict], batch_size: int = 10) -> List[Dict]:
         """
         배치 검색 (대량 처리 최적화)
@@ -258,14 +476,15 @@ class UniversalNaverCrawler:
                 results.append(result)
                 processed += 1
                 
-                # CAPTCHA 발생 시 배치 중단
+                # CAPTCHA 발생 시 배치 중단 (적응형 속도 제어 중이면 해당 프록시만 감속/휴식 처리됨)
                 if "CAPTCHA detected" in result.get('message', ''):
                     self.logger.error("CAPTCHA detected. Pausing batch processing.")
-                    time.sleep(300)  # 5분 대기
+                    if not self.pacer:
+                        time.sleep(300)  # 5분 대기
                     break
                 
                 # 일일 한도 도달 시 중단
-                if self.request_count >= self.daily_request_limit:
+                if self._requests_remaining() <= 0:
                     self.logger.info("Daily limit reached. Stopping batch.")
                     break
                 
@@ -275,11 +494,10 @@ class UniversalNaverCrawler:
             batch_duration = time.time() - batch_start_time
             self.logger.info(f"Batch completed in {batch_duration:.2f}s. Processed: {processed}/{len(search_tasks)}")
             
-            # 배치 간 긴 지연 (IP 보호)
+            # 배치 간 긴 지연 (IP 보호, 요청 3건 분량의 간격이라 학습된 속도에 따라 달라짐)
             if i + batch_size < len(search_tasks):
-                inter_batch_delay = random.uniform(30, 60)
+                inter_batch_delay = self.rate_limiter.acquire(proxy=self._current_proxy(), cost=3.0)
                 self.logger.info(f"Inter-batch delay: {inter_batch_delay:.1f}s")
-                time.sleep(inter_batch_delay)
                 
                 # IP 로테이션 (선택적)
                 if self.use_proxy and len(self.proxy_list) > 1:
@@ -341,12 +559,63 @@ class UniversalNaverCrawler:
             self.last_reset_date = today
             self.logger.info("Daily request counter reset")
         
+        if self.budget_ledger:
+            if not self._reserve_budget():
+                self.logger.warning(f"Daily request limit ({self.daily_request_limit}) reached on all exits")
+                return False
+            return True
+        
         if self.request_count >= self.daily_request_limit:
             self.logger.warning(f"Daily request limit ({self.daily_request_limit}) reached")
             return False
         
         return True
     
+    def _reserve_budget(self) -> bool:
+        """공유 원장에서 현재 출구의 예산 1회 예약 (소진되면 예산이 남은 프록시로 로테이션)"""
+        attempts = len(self.proxy_list) if self.use_proxy and self.proxy_list else 1
+        for attempt in range(attempts):
+            key = exit_key(self._current_proxy())
+            if self.budget_ledger.reserve(key):
+                self._reserved_exit = key
+                return True
+            if attempt + 1 < attempts:
+                self._rotate_proxy()
+        return False
+    
+    def _spend_request(self):
+        """
+        네이버로 페이지 요청을 보내기 직전 호출 (원장 사용 시)
+        
+        검색 시작 때 예약한 1회를 먼저 쓰고, 같은 검색의 추가 요청(Selenium 폴백, 목록 이동)은
+        현재 출구에서 새로 예약. 검색 도중에는 브라우저를 바꾸지 않도록 로테이션 없이 BudgetExhausted.
+        """
+        if not self.budget_ledger:
+            return
+        
+        key = exit_key(self._current_proxy())
+        reserved, self._reserved_exit = self._reserved_exit, None
+        if reserved == key:
+            return
+        if reserved is not None:
+            # 예약 후 출구가 바뀌었으면 예전 출구 몫은 돌려주고 현재 출구에서 차감
+            self.budget_ledger.release(reserved)
+        if not self.budget_ledger.reserve(key):
+            raise BudgetExhausted(f"Daily request budget exhausted for {key}")
+    
+    def _release_unused_budget(self):
+        """요청을 보내기 전에 끝난 검색의 예약 반환"""
+        reserved, self._reserved_exit = self._reserved_exit, None
+        if reserved is not None and self.budget_ledger:
+            self.budget_ledger.release(reserved)
+    
+    def _requests_remaining(self) -> int:
+        """오늘 남은 요청 수 (원장 사용 시 모든 출구의 잔여 합계)"""
+        if not self.budget_ledger:
+            return self.daily_request_limit - self.request_count
+        exits = self.proxy_list if self.use_proxy and self.proxy_list else [None]
+        return sum(self.budget_ledger.remaining(exit_key(proxy)) for proxy in exits)
+    
     def _rotate_proxy(self):
         """프록시 로테이션"""
         if not self.proxy_list:
@@ -357,26 +626,160 @@ class UniversalNaverCrawler:
         
         self.logger.info(f"Rotating to proxy: {new_proxy}")
         
-        if self.driver:
-            self.driver.quit()
+        if self.http_fetcher:
+            self.http_fetcher.set_proxy(new_proxy)
+        
+        # 포워더 사용 시 업스트림만 교체하고 브라우저는 그대로 유지
+        if self.proxy_forwarder:
+            self.proxy_forwarder.set_upstream(new_proxy)
+        # WebDriver는 이미 대여한 경우에만 다른 프록시의 대기 브라우저로 교체
+        elif self.pooled_driver:
+            self.pooled_driver = self.driver_pool.swap(self.pooled_driver, proxy=self._current_proxy())
+            self.driver = self.pooled_driver.driver
         
-        self.setup_driver(headless=True, proxy=new_proxy)
+        if not self.pooled_driver and not self.http_fetcher:
+            self._ensure_driver()
+    
+    CAPTCHA_URL_KEYWORDS = ['captcha', 'block', 'verify', 'robot']
+    CAPTCHA_TEXT_KEYWORDS = ['captcha', '보안문자', '자동입력', '로봇', 'verify', '인증', 'block', '차단']
     
     def _detect_captcha(self) -> bool:
         """CAPTCHA 감지"""
         try:
+            if self.read_state_via_js:
+                # URL/보이는 텍스트를 브라우저 안에서 확인 (DOM 전송 없음)
+                reason = self._dom().detect_captcha(self.CAPTCHA_URL_KEYWORDS, self.CAPTCHA_TEXT_KEYWORDS)
+                if reason:
+                    self.logger.debug(f"CAPTCHA marker: {reason}")
+                return bool(reason)
+            
             current_url = self.driver.current_url.lower()
-            if any(keyword in current_url for keyword in ['captcha', 'block', 'verify', 'robot']):
+            if any(keyword in current_url for keyword in self.CAPTCHA_URL_KEYWORDS):
                 return True
             
             page_text = self.driver.page_source.lower()
-            captcha_keywords = ['captcha', '보안문자', '자동입력', '로봇', 'verify', '인증', 'block', '차단']
-            
-            return any(keyword in page_text for keyword in captcha_keywords)
+            return any(keyword in page_text for keyword in self.CAPTCHA_TEXT_KEYWORDS)
             
         except Exception:
             return False
     
+    def _current_proxy(self) -> Optional[str]:
+        """현재 사용 중인 프록시"""
+        if self.use_proxy and self.proxy_list:
+            return self.proxy_list[self.current_proxy_index]
+        return None
+    
+    def _pool_proxy(self) -> Optional[str]:
+        """풀에서 대여할 브라우저의 프록시 (포워더 사용 시 모든 브라우저가 같은 로컬 주소를 씀)"""
+        return None if self.proxy_forwarder else self._current_proxy()
+    
+    def _ensure_driver(self):
+        """Selenium 폴백이 필요할 때만 풀에서 WebDriver 대여 (한도 초과 시 교체)"""
+        if self.pooled_driver and self.driver_pool.needs_recycle(self.pooled_driver):
+            self.driver_pool.release(self.pooled_driver)
+            self.pooled_driver = None
+        
+        if self.pooled_driver is None:
+            self.pooled_driver = self.driver_pool.acquire(proxy=self._pool_proxy())
+            self.driver = self.pooled_driver.driver
+            # 다음 로테이션/교체에 대비해 나머지 자리를 백그라운드에서 채움
+            self.driver_pool.warm_up()
+    
+    def _fetch_restaurants_http(self, keyword: str) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        HTTP로 검색 페이지를 받아 레스토랑 목록 추출
+        
+        Returns:
+            (restaurants, error_message): restaurants가 None이면 Selenium 폴백 필요
+        """
+        if not self.http_fetcher:
+            return None, None
+        
+        self.stats['http_fetches'] += 1
+        self._spend_request()
+        # 목록 엔티티만 선택적으로 디코딩 (전체 Apollo State dict는 만들지 않음)
+        summaries, status = self.http_fetcher.fetch_list_summaries(keyword)
+        self._smart_delay()
+        
+        if status == ApolloHttpFetcher.STATUS_CAPTCHA:
+            self.stats['captcha_encounters'] += 1
+            self.logger.warning("CAPTCHA detected (HTTP)!")
+            if self.pacer:
+                self.pacer.record_captcha(self._current_proxy())
+            
+            if self.use_proxy and len(self.proxy_list) > 1:
+                self._rotate_proxy()
+            
+            return None, "CAPTCHA detected - IP rotation needed"
+        
+        if self.pacer:
+            if status == ApolloHttpFetcher.STATUS_HTTP_ERROR:
+                self.pacer.record_status(self._current_proxy(), self.http_fetcher.last_status_code)
+            else:
+                self.pacer.record_success(self._current_proxy())
+        
+        if summaries:
+            restaurants = self._parse_restaurant_data_from_summaries(summaries)
+            if restaurants:
+                self.logger.info("Using HTTP Apollo State (browser-free)")
+                return restaurants, None
+        
+        self.stats['selenium_fallbacks'] += 1
+        self.logger.info(f"HTTP Apollo State unavailable ({status}), falling back to Selenium")
+        return None, None
+    
+    def _record_transfer(self) -> Optional[Dict]:
+        """이번 검색에서 브라우저가 받은 바이트/요청/차단 수 집계 (브라우저를 안 썼으면 None)"""
+        if not self.driver or not self.resource_policy:
+            return None
+        
+        transfer = collect_transfer_stats(self.driver)
+        if not transfer or not transfer['requests']:
+            return None
+        
+        self.stats['browser_bytes'] += transfer['bytes']
+        self.stats['browser_requests'] += transfer['requests']
+        self.stats['blocked_requests'] += transfer['blocked']
+        self.logger.info(f"📦 Transfer: {transfer['bytes'] / 1024:.0f} KB in {transfer['requests']} requests, "
+                         f"{transfer['blocked']} blocked")
+        
+        return {key: transfer[key] for key in ('bytes', 'requests', 'blocked')}
+    
+    def _load_search_page(self, keyword: str) -> Optional[str]:
+        """검색 페이지 로드 후 플레이스 리스트로 이동 (실패 시 에러 메시지 반환)"""
+        self._ensure_driver()
+        
+        # 네이버 모바일 검색 URL 구성 (2025년 최적화)
+        encoded_keyword = urllib.parse.quote(keyword)
+        search_url = f"https://m.search.naver.com/search.naver?where=m&sm=top_sly.hst&fbm=0&acr=1&ie=utf8&query={encoded_keyword}"
+        
+        self._spend_request()
+        self.driver.get(search_url)
+        self.driver_pool.record_page(self.pooled_driver)
+        self.search_deadline.check("search page load")
+        self._smart_delay()
+        
+        # CAPTCHA 감지
+        if self._detect_captcha():
+            self.stats['captcha_encounters'] += 1
+            self.logger.warning("CAPTCHA detected!")
+            if self.pacer:
+                self.pacer.record_captcha(self._current_proxy())
+            
+            if self.use_proxy and len(self.proxy_list) > 1:
+                self._rotate_proxy()
+            
+            return "CAPTCHA detected - IP rotation needed"
+        
+        if self.pacer:
+            self.pacer.record_success(self._current_proxy())
+        
+        # 플레이스 섹션으로 이동
+        if not self._navigate_to_place_list():
+            return "플레이스 섹션을 찾을 수 없습니다."
+        
+        return None
+    
     def _navigate_to_place_list(self) -> bool:
         """플레이스 리스트로 이동"""
         try:
@@ -393,9 +796,13 @@ class UniversalNaverCrawler:
                     for element in elements:
                         href = element.get_attribute('href') or ''
                         if 'place' in href:
+                            self._spend_request()
                             self.driver.execute_script("arguments[0].click();", element)
                             self._smart_delay()
+                            self._wait_for_place_items()
                             return True
+                except (SearchDeadlineExceeded, BudgetExhausted):
+                    raise
                 except:
                     continue
             
@@ -409,12 +816,16 @@ class UniversalNaverCrawler:
                 
                 if query:
                     place_url = f"https://m.place.naver.com/list?query={query}&entry=pll"
+                    self._spend_request()
                     self.driver.get(place_url)
                     self._smart_delay()
+                    self._wait_for_place_items()
                     return True
             
             return False
             
+        except (SearchDeadlineExceeded, BudgetExhausted):
+            raise
         except Exception as e:
             self.logger.error(f"Error navigating to place list: {e}")
             return False
@@ -430,62 +841,92 @@ class UniversalNaverCrawler:
         
         try:
             # 먼저 JSON 기반 파싱 시도
-            json_data = self._extract_apollo_state()
-            if json_data:
+            restaurants = self._extract_restaurants_from_page()
+            if restaurants:
                 self.logger.info("Using JSON-based parsing (2025 method)")
-                restaurants = self._parse_restaurant_data_from_json(json_data)
-                if restaurants:
-                    return self._find_target_restaurant_in_json(restaurants, target_place_name, max_rank)
+                return self._find_target_restaurant_in_json(restaurants, target_place_name, max_rank)
             
             # JSON 실패 시 기존 HTML 방식으로 폴백
             self.logger.info("JSON parsing failed, falling back to HTML parsing")
             return self._find_place_rank_html_fallback(target_place_name, max_rank)
             
+        except SearchDeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"Error in universal rank search: {e}")
             result["message"] = f"Search error: {e}"
             return result
     
+    def _extract_restaurants_from_page(self) -> List[Dict]:
+        """현재 페이지의 Apollo State에서 레스토랑 목록 추출 (없으면 빈 리스트)"""
+        if self.read_state_via_js:
+            summaries = self._extract_list_summaries()
+            return self._parse_restaurant_data_from_summaries(summaries) if summaries else []
+        
+        json_data = self._extract_apollo_state()
+        return self._parse_restaurant_data_from_json(json_data) if json_data else []
+    
+    def _extract_list_summaries(self) -> Optional[ApolloListSummaries]:
+        """JS 런타임의 __APOLLO_STATE__에서 목록 엔티티만 읽기 (page_source 미사용)"""
+        try:
+            summaries = self._dom().read_list_summaries()
+            
+            if summaries is not None:
+                self.logger.info(f"Read Apollo State from JS runtime ({len(summaries.restaurants)} list entities)")
+            else:
+                self.logger.warning("Could not find __APOLLO_STATE__ in JS runtime")
+            return summaries
+            
+        except Exception as e:
+            self.logger.error(f"Apollo state read error: {e}")
+            return None
+    
     def _extract_apollo_state(self) -> Optional[Dict]:
         """Extract __APOLLO_STATE__ JSON data from page"""
         try:
-            page_source = self.driver.page_source
-            apollo_pattern = r'naver\.search\.ext\.nmb\.salt\.__APOLLO_STATE__\s*=\s*({.*?});'
-            match = re.search(apollo_pattern, page_source, re.DOTALL)
+            apollo_data = parse_apollo_state(self.driver.page_source)
             
-            if match:
-                json_str = match.group(1)
-                apollo_data = json.loads(json_str)
+            if apollo_data is not None:
                 self.logger.info("Successfully extracted Apollo State JSON data")
                 return apollo_data
             else:
                 self.logger.warning("Could not find __APOLLO_STATE__ in page source")
                 return None
                 
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON parsing error: {e}")
-            return None
         except Exception as e:
             self.logger.error(f"Apollo state extraction error: {e}")
             return None
     
     def _parse_restaurant_data_from_json(self, apollo_data: Dict) -> List[Dict]:
         """Parse restaurant data from Apollo state JSON"""
+        entries = [
+            (key, value) for key, value in apollo_data.items()
+            if key.startswith('RestaurantListSummary:') and isinstance(value, dict)
+        ]
+        return self._build_restaurant_list(entries)
+    
+    def _parse_restaurant_data_from_summaries(self, summaries: ApolloListSummaries) -> List[Dict]:
+        """Parse restaurant data from selectively decoded list summaries"""
+        return self._build_restaurant_list(summaries.restaurants, summaries.list_refs)
+    
+    def _build_restaurant_list(self, entries: List[Tuple[str, Dict]], list_refs: Optional[List[str]] = None) -> List[Dict]:
+        """(apollo_key, 엔티티) 목록을 레스토랑 정보로 변환"""
         restaurants = []
+        list_positions = {ref: i for i, ref in enumerate(list_refs or [], 1)}
         
         try:
-            for key, value in apollo_data.items():
-                if key.startswith('RestaurantListSummary:') and isinstance(value, dict):
-                    restaurant_info = {
-                        'id': value.get('id', ''),
-                        'name': value.get('name', ''),
-                        'category': value.get('category', ''),
-                        'address': value.get('commonAddress', ''),
-                        'distance': value.get('distance', ''),
-                        'review_count': value.get('visitorReviewCount', ''),
-                        'apollo_key': key
-                    }
-                    restaurants.append(restaurant_info)
+            for key, value in entries:
+                restaurant_info = {
+                    'id': value.get('id', ''),
+                    'name': value.get('name', ''),
+                    'category': value.get('category', ''),
+                    'address': value.get('commonAddress', ''),
+                    'distance': value.get('distance', ''),
+                    'review_count': value.get('visitorReviewCount', ''),
+                    'apollo_key': key,
+                    'list_position': list_positions.get(key, -1)
+                }
+                restaurants.append(restaurant_info)
             
             # Sort by distance (Naver's default ordering)
             restaurants.sort(key=lambda x: self._parse_distance(x.get('distance', '999km')))
@@ -540,7 +981,7 @@ class UniversalNaverCrawler:
         return result
     
     def _find_place_rank_html_fallback(self, target_place_name: str, max_rank: int) -> Dict:
-        """HTML 기반 폴백 방식 (기존 로직)"""
+        """HTML 기반 폴백 방식 (화면 목록을 스크립트 1회로 추출해 순위 산출)"""
         result = {
             "rank": -1,
             "success": False,
@@ -550,44 +991,41 @@ class UniversalNaverCrawler:
         
         current_rank = 1
         found_shops = []
+        processed = 0
         scroll_count = 0
         max_scrolls = min(max_rank // 10, 15)
         
         while scroll_count < max_scrolls and current_rank <= max_rank:
-            place_items = self._get_place_items_2025()
+            self.search_deadline.check("HTML fallback")
+            entries = self._get_place_entries_2025()
             
-            if not place_items:
+            if not entries:
                 break
             
-            for item in place_items[len(found_shops):]:
-                try:
-                    place_info = self._extract_place_info_2025(item)
-                    if not place_info:
-                        continue
-                    
-                    place_name = place_info['name']
-                    is_ad = place_info.get('is_ad', False)
-                    
-                    if not is_ad:
-                        found_shops.append(place_name)
-                        
-                        if self._is_universal_match(target_place_name, place_name):
-                            result.update({
-                                "rank": current_rank,
-                                "success": True,
-                                "message": f"'{target_place_name}' found at rank {current_rank} (HTML fallback)",
-                                "found_shops": found_shops[:15]
-                            })
-                            return result
-                        
-                        current_rank += 1
-                        
-                        if current_rank > max_rank:
-                            break
-                
-                except Exception as e:
-                    self.logger.debug(f"Error processing item: {e}")
+            # 이전 스크롤에서 처리한 위치 이후 아이템만 처리
+            for entry in entries[processed:]:
+                if entry['is_ad']:
                     continue
+                
+                place_name = entry['name']
+                found_shops.append(place_name)
+                
+                if self._is_universal_match(target_place_name, place_name):
+                    result.update({
+                        "rank": current_rank,
+                        "success": True,
+                        "message": f"'{target_place_name}' found at rank {current_rank} (HTML fallback)",
+                        "found_shops": found_shops[:15]
+                    })
+                    if entry.get('cid'):
+                        result["cid"] = entry['cid']
+                    return result
+                
+                current_rank += 1
+                
+                if current_rank > max_rank:
+                    break
+            processed = len(entries)
             
             if not self._scroll_with_loading_wait():
                 break
@@ -602,184 +1040,121 @@ class UniversalNaverCrawler:
         
         return result
     
-    def _get_place_items_2025(self) -> List:
-        """2025년 5월 최신 플레이스 아이템 선택자 (폴백용)"""
-        selectors = [
-            'li[data-nclick*="plc"]',
-            'li.place_unit',
-            'li[data-place-id]',
-            'ul.list_place li',
-            '.place_list li'
-        ]
-        
-        for selector in selectors:
-            try:
-                items = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                valid_items = [item for item in items if item.text.strip() and len(item.text.strip()) > 10]
-                
-                if valid_items and len(valid_items) >= 3:
-                    return valid_items
-                    
-            except Exception:
-                continue
+    def _collect_place_names_html_fallback(self, target_place_names: List[str], max_rank: int) -> List[str]:
+        """HTML 폴백으로 광고 제외 플레이스명 수집 (모든 대상을 찾으면 조기 종료)"""
+        found_shops = []
+        pending_targets = list(target_place_names)
+        processed = 0
+        scroll_count = 0
+        max_scrolls = min(max_rank // 10, 15)
         
-        return []
-    
-    def _extract_place_info_2025(self, item) -> Optional[Dict]:
-        """2025년 5월 플레이스 정보 추출"""
-        try:
-            # 플레이스명 선택자들
-            name_selectors = [
-                ".place_bluelink",
-                ".place_name", 
-                ".name",
-                "a[href*='place'] span",
-                "strong",
-                "h3"
-            ]
+        while scroll_count < max_scrolls and len(found_shops) < max_rank:
+            self.search_deadline.check("HTML fallback")
+            entries = self._get_place_entries_2025()
             
-            place_name = None
-            for selector in name_selectors:
-                try:
-                    element = item.find_element(By.CSS_SELECTOR, selector)
-                    text = element.text.strip()
-                    if text and len(text) > 1 and not text.isdigit():
-                        place_name = text
-                        break
-                except:
-                    continue
-            
-            if not place_name:
-                # 전체 텍스트에서 추출
-                full_text = item.text.strip()
-                if full_text:
-                    lines = [line.strip() for line in full_text.split('\n') if line.strip()]
-                    if lines:
-                        place_name = lines[0]
-            
-            if not place_name or len(place_name) < 2:
-                return None
+            if not entries:
+                break
             
-            # 광고 감지
-            is_ad = self._is_advertisement_2025(item)
+            for entry in entries[processed:]:
+                if entry['is_ad']:
+                    continue
+                
+                place_name = entry['name']
+                found_shops.append(place_name)
+                
+                pending_targets = [
+                    target for target in pending_targets
+                    if not self._is_universal_match(target, place_name)
+                ]
+                
+                if not pending_targets or len(found_shops) >= max_rank:
+                    return found_shops
+            processed = len(entries)
             
-            return {
-                'name': place_name,
-                'is_ad': is_ad
-            }
+            if not self._scroll_with_loading_wait():
+                break
             
-        except Exception:
-            return None
+            scroll_count += 1
+            self._smart_delay(factor=0.3)
+        
+        return found_shops
     
-    def _is_advertisement_2025(self, item) -> bool:
-        """2025년 5월 광고 감지"""
-        try:
-            # CSS 기반 감지
-            ad_patterns = [
-                "[class*='ad']", "[class*='sponsor']", "[class*='promotion']",
-                ".ad_marker", ".ad_badge", "[data-ad]"
-            ]
-            
-            for pattern in ad_patterns:
-                if item.find_elements(By.CSS_SELECTOR, pattern):
-                    return True
-            
-            # 텍스트 기반 감지
-            item_text = item.text.lower()
-            ad_keywords = ['광고', 'ad', 'sponsored', 'promotion', '홍보', '협찬']
-            
-            return any(keyword in item_text for keyword in ad_keywords)
-            
-        except Exception:
-            return False
+    PLACE_ITEM_SELECTORS = [
+        'li[data-nclick*="plc"]',
+        'li.place_unit',
+        'li[data-place-id]',
+        'ul.list_place li',
+        '.place_list li'
+    ]
     
-    def _is_universal_match(self, target_name: str, found_name: str) -> bool:
-        """범용 매칭 로직 (모든 지역/업종 대응)"""
-        if not target_name or not found_name:
-            return False
-        
-        def normalize_text(text):
-            # 특수문자, 공백 제거 후 소문자 변환
-            normalized = re.sub(r'[^\w가-힣0-9]', '', text.lower())
-            return normalized
-        
-        target_norm = normalize_text(target_name)
-        found_norm = normalize_text(found_name)
-        
-        # 1. 정확한 매치
-        if target_norm == found_norm:
-            return True
-        
-        # 2. 포함 관계 (3글자 이상)
-        if len(target_norm) >= 3 and len(found_norm) >= 3:
-            if target_norm in found_norm or found_norm in target_norm:
-                return True
-        
-        # 3. 브랜드명 매치 (프랜차이즈 대응)
-        brand_patterns = [
-            r'(스타벅스|스벅)',
-            r'(맥도날드|맥날|McDonald)',
-            r'(교촌치킨|교촌|KyoChon)',
-            r'(롯데리아|Lotteria)',
-            r'(버거킹|BurgerKing)',
-            r'(파리바게뜨|Paris)',
-            r'(뚜레쥬르|Tous)',
-            r'(올리브영|Oliveyoung)',
-            r'(이마트|E-mart)',
-            r'(세븐일레븐|7-Eleven|711)',
-            r'(CU편의점|CU)',
-            r'(GS25|지에스25)'
-        ]
-        
-        for pattern in brand_patterns:
-            if re.search(pattern, target_name, re.IGNORECASE) and re.search(pattern, found_name, re.IGNORECASE):
-                return True
+    PLACE_NAME_SELECTORS = [
+        ".place_bluelink",
+        ".place_name", 
+        ".name",
+        "a[href*='place'] span",
+        "strong",
+        "h3"
+    ]
+    
+    AD_SELECTORS = [
+        "[class*='ad']", "[class*='sponsor']", "[class*='promotion']",
+        ".ad_marker", ".ad_badge", "[data-ad]"
+    ]
+    
+    AD_KEYWORDS = ['광고', 'ad', 'sponsored', 'promotion', '홍보', '협찬']
+    
+    def _dom(self) -> DomAccess:
+        """현재 WebDriver와 검색 시간 예산에 묶인 DOM 접근 도우미"""
+        return DomAccess(self.driver, self.search_deadline)
+    
+    def _wait_for_place_items(self, timeout: float = 10) -> List:
+        """플레이스 목록이 렌더링될 때까지 명시적 대기"""
+        return self._dom().wait_for_any(self.PLACE_ITEM_SELECTORS, timeout, min_count=3, stage="place list load")
+    
+    def _get_place_entries_2025(self) -> List[Dict]:
+        """
+        보이는 플레이스 아이템의 이름/CID/광고 여부/위치를 execute_script 1회로 수집 (폴백용)
         
-        # 4. Jaccard 유사도 (고급 매칭)
-        if len(target_norm) >= 4 and len(found_norm) >= 4:
-            target_bigrams = set(target_norm[i:i+2] for i in range(len(target_norm)-1))
-            found_bigrams = set(found_norm[i:i+2] for i in range(len(found_norm)-1))
-            
-            if target_bigrams and found_bigrams:
-                intersection = target_bigrams.intersection(found_bigrams)
-                union = target_bigrams.union(found_bigrams)
-                similarity = len(intersection) / len(union)
-                
-                if similarity >= 0.6:  # 60% 이상 유사
-                    return True
+        Returns:
+            [{'position', 'name', 'cid', 'is_ad'}, ...] - 이름을 알 수 없는 아이템은 제외
+        """
+        entries = self._dom().extract_place_items(
+            self.PLACE_ITEM_SELECTORS, self.PLACE_NAME_SELECTORS, self.AD_SELECTORS, self.AD_KEYWORDS
+        )
         
-        return False
+        place_entries = []
+        for entry in entries:
+            # 이름 선택자로 못 찾으면 아이템 텍스트 첫 줄 사용
+            name = entry.get('name') or entry.get('first_line')
+            if name and len(name) >= 2:
+                place_entries.append({**entry, 'name': name})
+        return place_entries
+    
+    def _is_universal_match(self, target_name: str, found_name: str) -> bool:
+        """범용 매칭 로직 (모든 지역/업종 대응, 이름별 계산 결과 캐시)"""
+        return is_place_match(target_name, found_name)
     
     def _scroll_with_loading_wait(self) -> bool:
-        """로딩 대기 포함 스크롤"""
+        """로딩 대기 포함 스크롤 (새 아이템 추가 또는 목록 끝 표시 즉시 반환)"""
         try:
-            initial_items = len(self._get_place_items_2025())
-            
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
-            for _ in range(15):  # 최대 7.5초 대기
-                time.sleep(0.5)
-                current_items = len(self._get_place_items_2025())
-                
-                if current_items > initial_items:
-                    return True
-            
-            return False
+            outcome = self._dom().scroll_and_wait(self.PLACE_ITEM_SELECTORS, timeout=7.5)
+            self.logger.debug(f"Scroll {outcome['status']}: {outcome['before']} -> {outcome['after']} items in {outcome['elapsed_ms']} ms")
+            return outcome['status'] == SCROLL_STATUS_LOADED
             
+        except SearchDeadlineExceeded:
+            raise
         except Exception:
             return False
     
     def _smart_delay(self, factor: float = 1.0):
-        """지능형 지연 (요청 횟수와 성공률 고려)"""
-        base_min, base_max = self.delay_range
-        
-        # 요청 횟수에 따른 지연 증가
-        if self.request_count > 100:
-            factor *= 1.5
+        """지능형 요청 간격 (요청 횟수와 성공률에 따라 토큰 비용 증가, 실제 대기는 토큰 버킷이 결정)"""
+        # 요청 횟수에 따른 간격 증가 (큰 구간부터 확인해야 200/300회 구간이 적용됨)
+        if self.request_count > 300:
+            factor *= 3.0
         elif self.request_count > 200:
             factor *= 2.0
-        elif self.request_count > 300:
-            factor *= 3.0
+        elif self.request_count > 100:
+            factor *= 1.5
         
         # 성공률에 따른 지연 조정
         if self.stats['total_searches'] > 5:
@@ -787,11 +1162,7 @@ class UniversalNaverCrawler:
             if success_rate < 0.5:  # 성공률 50% 미만 시 지연 증가
                 factor *= 1.5
         
-        min_delay = base_min * factor
-        max_delay = base_max * factor
-        
-        delay = random.uniform(min_delay, max_delay)
-        time.sleep(delay)
+        self.rate_limiter.acquire(proxy=self._current_proxy(), cost=factor)
     
     def _create_error_result(self, keyword: str, shop_name: str, message: str) -> Dict:
         """에러 결과 생성"""
@@ -811,7 +1182,7 @@ class UniversalNaverCrawler:
         return {
             **self.stats,
             'success_rate': (self.stats['successful_searches'] / self.stats['total_searches'] * 100) if self.stats['total_searches'] > 0 else 0,
-            'requests_remaining': self.daily_request_limit - self.request_count,
+            'requests_remaining': self._requests_remaining(),
             'current_date': datetime.now().date().isoformat()
         }
     
@@ -841,7 +1212,7 @@ class UniversalNaverCrawler:
                     'search_duration': result.get('search_duration', 0)
                 }
                 
-                self.supabase.table('crawler_results').insert(insert_data).execute()
+                self.result_writer.add('crawler_results', insert_data)
                 
                 if tracked_place_id and result['success']:
                     ranking_data = {
@@ -849,9 +1220,9 @@ class UniversalNaverCrawler:
                         'rank': result['rank'],
                         'checked_at': result['search_time']
                     }
-                    self.supabase.table('rankings').insert(ranking_data).execute()
+                    self.result_writer.add('rankings', ranking_data)
                     
-            self.logger.info(f"Saved {len(results)} results to Supabase")
+            self.logger.info(f"Queued {len(results)} results for Supabase")
             return True
             
         except Exception as e:
@@ -870,29 +1241,49 @@ class UniversalNaverCrawler:
             
             self.logger.info(f"Found {len(tracked_places)} active tracked places")
             
-            for place in tracked_places:
-                keyword = place['search_keyword']
-                place_name = place['place_name']
-                place_id = place['id']
+            # 키워드별 그룹화 (키워드당 SERP 1회 요청)
+            groups = plan_keyword_groups(tracked_places)
+            self.logger.info(f"Crawl plan: {summarize_plan(groups)}")
+            
+            for group in groups:
+                results = self.search_keyword_group(group.keyword, group.place_names)
                 
-                result = self.search_place_rank(keyword, place_name)
-                self.save_to_supabase(result, place_id)
+                for place, result in zip(group.places, results):
+                    self.save_to_supabase(result, place['id'])
                 
-                if "CAPTCHA detected" in result.get('message', ''):
+                if any("CAPTCHA detected" in result.get('message', '') for result in results):
                     break
                 
-                if self.request_count >= self.daily_request_limit:
+                if self._requests_remaining() <= 0:
                     break
                 
         except Exception as e:
             self.logger.error(f"Crawl tracked places failed: {e}")
+        finally:
+            # 버퍼에 남은 결과 저장 후 지표 출력
+            self.result_writer.flush()
+            self.logger.info(f"Result writer metrics: {self.result_writer.get_metrics()}")
     
     def close(self):
         """리소스 정리"""
         try:
-            if self.driver:
-                self.driver.quit()
-                self.logger.info(f"WebDriver closed. Final stats: {self.get_statistics()}")
+            if self.http_fetcher:
+                self.http_fetcher.close()
+            
+            if self.result_writer:
+                self.result_writer.close()
+            
+            self.driver_pool.close()
+            self.pooled_driver = None
+            self.driver = None
+            
+            if self.proxy_forwarder:
+                self.proxy_forwarder.close()
+            
+            if self.pacer:
+                self.pacer.save()
+            
+            self.logger.info(f"Crawler closed. Final stats: {self.get_statistics()}")
         except Exception as e:
             self.logger.error(f"Error closing WebDriver: {e}")
 
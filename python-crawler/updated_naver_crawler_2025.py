@@ -23,6 +23,16 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.proxy import Proxy, ProxyType
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from supabase import create_client, Client
+from supabase_bulk_writer import SupabaseBulkWriter
+from crawl_planner import plan_keyword_groups, rank_targets_in_list, summarize_plan
+from crawl_scheduler import CrawlScheduler, build_place_histories
+from webdriver_pool import WebDriverPool
+from proxy_forwarder import ProxyForwarder
+from resource_policy import ResourcePolicy, collect_transfer_stats
+from dom_access import DomAccess, SearchDeadline, SearchDeadlineExceeded, SCROLL_STATUS_LOADED
+from rate_limiter import RateLimiter
+from pacing_controller import AdaptivePacer
+from request_budget_ledger import BudgetExhausted, create_budget_ledger, exit_key, seconds_until_next_kst_day
 
 class Updated2025NaverCrawler:
     """
@@ -32,7 +42,7 @@ class Updated2025NaverCrawler:
     - CAPTCHA 회피 전략
     """
     
-    def __init__(self, headless=True, delay_range=(5, 15), use_proxy=False, proxy_list=None):
+    def __init__(self, headless=True, delay_range=(5, 15), use_proxy=False, proxy_list=None, rate_limiter=None):
         self.delay_range = delay_range
         self.use_proxy = use_proxy
         self.proxy_list = proxy_list or []
@@ -41,20 +51,23 @@ class Updated2025NaverCrawler:
         self.daily_request_limit = 450  # 안전 마진을 두고 450개로 제한
         self.last_reset_date = datetime.now().date()
         
+        self.headless = headless
         self.logger = self._setup_logging()
-        self.driver = None
-        self.setup_driver(headless)
         
-        # Supabase 설정
-        url = os.getenv('SUPABASE_URL')
-        key = os.getenv('SUPABASE_SERVICE_KEY') 
-        if url and key:
-            self.supabase: Client = create_client(url, key)
-        else:
-            self.supabase = None
-            self.logger.warning("Supabase credentials not found")
+        # 전역/프록시별 토큰 버킷 (delay_range는 프록시 1개 기준 요청 간격, 공유 시 워커 간 함께 제한)
+        self.rate_limiter = rate_limiter or RateLimiter.from_env(
+            delay_range, proxy_count=len(self.proxy_list) if use_proxy else 0, logger_name="Updated2025RateLimiter"
+        )
+        # CAPTCHA가 나면 해당 프록시만 감속, 깨끗한 페이지가 이어지면 가속 (학습값은 다음 실행에 재사용)
+        self.pacer = AdaptivePacer.from_env(
+            self.rate_limiter, proxies=self.proxy_list if use_proxy else [], logger_name="Updated2025Pacer"
+        )
         
-        # 사용자 에이전트 풀 (2025년 5월 기준 최신)
+        # 검색 1회 전체 시간 예산 (느린 페이지는 수 분간 붙잡지 않고 실패 처리)
+        self.search_time_budget = float(os.getenv('SEARCH_TIME_BUDGET', '120'))
+        self.search_deadline = SearchDeadline(self.search_time_budget)
+        
+        # 사용자 에이전트 풀 (2025년 5월 기준 최신, WebDriver 생성보다 먼저 정의)
         self.user_agents = [
             "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1",
             "Mozilla/5.0 (iPhone; CPU iPhone OS 17_3 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3 Mobile/15E148 Safari/604.1",
@@ -63,6 +76,44 @@ class Updated2025NaverCrawler:
             "Mozilla/5.0 (Linux; Android 14; SM-G998B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36",
             "Mozilla/5.0 (Linux; Android 13; Pixel 7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Mobile Safari/537.36"
         ]
+        
+        # CDP로 이미지/폰트/광고 비콘 차단 (명령줄 스위치는 Chrome이 무시함)
+        self.resource_policy = ResourcePolicy.from_env()
+        
+        # 로컬 포워더를 거치면 로테이션은 업스트림 교체만으로 끝남 (PROXY_FORWARDER=0이면 비활성)
+        self.proxy_forwarder = None
+        if self.use_proxy and self.proxy_list and os.getenv('PROXY_FORWARDER', '1') != '0':
+            self.proxy_forwarder = ProxyForwarder(
+                upstream=self._current_proxy(), logger_name="Updated2025ProxyForwarder"
+            ).start()
+        
+        # 미리 기동한 브라우저 풀에서 대여 (포워더가 없으면 로테이션은 대기 브라우저로 교체)
+        self.driver_pool = WebDriverPool.from_env(
+            self._create_driver,
+            proxies=self.proxy_list if self.use_proxy and not self.proxy_forwarder else None,
+            logger_name="Updated2025WebDriverPool"
+        )
+        self.pooled_driver = self.driver_pool.acquire(proxy=self._pool_proxy())
+        self.driver = self.pooled_driver.driver
+        self.driver_pool.warm_up()
+        
+        # Supabase 설정
+        url = os.getenv('SUPABASE_URL')
+        key = os.getenv('SUPABASE_SERVICE_KEY') 
+        if url and key:
+            self.supabase: Client = create_client(url, key)
+        else:
+            self.supabase = None
+            self.logger.warning("Supabase credentials not found")
+        
+        self.result_writer = SupabaseBulkWriter.from_env(self.supabase, "ResultWriter") if self.supabase else None
+        
+        # 다른 실행/워커와 공유하는 출구별 KST 일일 예산 (REQUEST_LEDGER=off면 객체 내 카운터만 사용)
+        self.budget_ledger = create_budget_ledger(self.supabase, logger_name="Updated2025BudgetLedger")
+        if self.budget_ledger:
+            self.daily_request_limit = self.budget_ledger.limit
+        self._reserved_exit = None  # 검색 시작 시 예약했지만 아직 쓰지 않은 출구
+        
     
     def _setup_logging(self):
         """로깅 설정"""
@@ -82,6 +133,17 @@ class Updated2025NaverCrawler:
             self.last_reset_date = today
             self.logger.info("Daily request counter reset")
         
+        if self.budget_ledger:
+            if self._reserve_budget():
+                return True
+            
+            # 모든 출구의 예산 소진: 다음 KST 자정까지 대기
+            wait_seconds = seconds_until_next_kst_day()
+            self.logger.warning(f"Daily request limit ({self.daily_request_limit}) reached on all exits. "
+                                f"Waiting {wait_seconds/3600:.1f} hours until reset...")
+            time.sleep(min(wait_seconds, 3600))  # 최대 1시간만 대기
+            return False
+        
         if self.request_count >= self.daily_request_limit:
             self.logger.warning(f"Daily request limit ({self.daily_request_limit}) reached. Switching IP or waiting...")
             
@@ -98,6 +160,51 @@ class Updated2025NaverCrawler:
         
         return True
     
+    def _reserve_budget(self) -> bool:
+        """공유 원장에서 현재 출구의 예산 1회 예약 (소진되면 예산이 남은 프록시로 로테이션)"""
+        attempts = len(self.proxy_list) if self.use_proxy and self.proxy_list else 1
+        for attempt in range(attempts):
+            key = exit_key(self._current_proxy())
+            if self.budget_ledger.reserve(key):
+                self._reserved_exit = key
+                return True
+            if attempt + 1 < attempts:
+                self._rotate_proxy()
+        return False
+    
+    def _spend_request(self):
+        """
+        네이버로 페이지 요청을 보내기 직전 호출 (원장 사용 시)
+        
+        검색 시작 때 예약한 1회를 먼저 쓰고, 같은 검색의 추가 페이지 로드(목록 이동, 직접 URL 시도)는
+        현재 출구에서 새로 예약. 검색 도중에는 로테이션 없이 BudgetExhausted.
+        """
+        if not self.budget_ledger:
+            return
+        
+        key = exit_key(self._current_proxy())
+        reserved, self._reserved_exit = self._reserved_exit, None
+        if reserved == key:
+            return
+        if reserved is not None:
+            # 예약 후 출구가 바뀌었으면 예전 출구 몫은 돌려주고 현재 출구에서 차감
+            self.budget_ledger.release(reserved)
+        if not self.budget_ledger.reserve(key):
+            raise BudgetExhausted(f"Daily request budget exhausted for {key}")
+    
+    def _release_unused_budget(self):
+        """요청을 보내기 전에 끝난 검색의 예약 반환"""
+        reserved, self._reserved_exit = self._reserved_exit, None
+        if reserved is not None and self.budget_ledger:
+            self.budget_ledger.release(reserved)
+    
+    def _requests_remaining(self) -> int:
+        """오늘 남은 요청 수 (원장 사용 시 모든 출구의 잔여 합계)"""
+        if not self.budget_ledger:
+            return self.daily_request_limit - self.request_count
+        exits = self.proxy_list if self.use_proxy and self.proxy_list else [None]
+        return sum(self.budget_ledger.remaining(exit_key(proxy)) for proxy in exits)
+    
     def _rotate_proxy(self):
         """프록시 로테이션"""
         if not self.proxy_list:
@@ -108,15 +215,41 @@ class Updated2025NaverCrawler:
         
         self.logger.info(f"Rotating to proxy: {new_proxy}")
         
-        # WebDriver 재시작
-        if self.driver:
-            self.driver.quit()
+        if self.proxy_forwarder:
+            self.proxy_forwarder.set_upstream(new_proxy)
+            return True
         
-        self.setup_driver(headless=True, proxy=new_proxy)
+        # WebDriver 재시작 대신 다른 프록시에 묶인 대기 브라우저 대여
+        self.pooled_driver = self.driver_pool.swap(self.pooled_driver, proxy=new_proxy)
+        self.driver = self.pooled_driver.driver
         return True
     
+    def _current_proxy(self) -> Optional[str]:
+        """현재 사용 중인 프록시"""
+        if self.use_proxy and self.proxy_list:
+            return self.proxy_list[self.current_proxy_index]
+        return None
+    
+    def _pool_proxy(self) -> Optional[str]:
+        """브라우저 풀 대여 기준 프록시 (포워더 사용 시 None)"""
+        return None if self.proxy_forwarder else self._current_proxy()
+    
+    def _recycle_driver_if_needed(self):
+        """페이지 수/메모리 한도를 넘은 브라우저는 반납 후 새로 대여"""
+        if self.driver_pool.needs_recycle(self.pooled_driver):
+            self.driver_pool.release(self.pooled_driver)
+            self.pooled_driver = self.driver_pool.acquire(proxy=self._pool_proxy())
+            self.driver = self.pooled_driver.driver
+    
     def setup_driver(self, headless, proxy=None):
-        """Chrome WebDriver 설정 (2025년 5월 최적화)"""
+        """풀을 거치지 않고 Chrome WebDriver 직접 기동"""
+        self.driver = self._create_driver(proxy, headless)
+    
+    def _create_driver(self, proxy=None, headless=None):
+        """Chrome WebDriver 생성 (2025년 5월 최적화, WebDriverPool 팩토리)"""
+        if headless is None:
+            headless = self.headless
+        
         options = Options()
         
         if headless:
@@ -135,8 +268,7 @@ class Updated2025NaverCrawler:
         options.add_argument('--allow-running-insecure-content')
         options.add_argument('--disable-extensions')
         options.add_argument('--disable-plugins')
-        options.add_argument('--disable-images')  # 이미지 로딩 비활성화로 속도 향상
-        options.add_argument('--disable-javascript')  # 일부 JS 비활성화
+        # JS는 활성화 유지 (CAPTCHA/목록 확인을 브라우저 안에서 스크립트로 수행)
         
         # 랜덤 User-Agent 선택
         user_agent = random.choice(self.user_agents)
@@ -153,25 +285,34 @@ class Updated2025NaverCrawler:
         options.add_argument(f'--window-size={width},{height}')
         
         # 프록시 설정
-        if proxy and self.use_proxy:
+        if self.proxy_forwarder:
+            options.add_argument(f'--proxy-server={self.proxy_forwarder.proxy_url}')
+        elif proxy and self.use_proxy:
             options.add_argument(f'--proxy-server={proxy}')
         
         # 추가 헤더 설정
         options.add_argument('--accept-lang=ko-KR,ko;q=0.9,en;q=0.8')
         
         try:
-            self.driver = webdriver.Chrome(options=options)
+            if self.resource_policy:
+                self.resource_policy.configure_options(options)
+            
+            driver = webdriver.Chrome(options=options)
+            if self.resource_policy:
+                self.resource_policy.apply(driver)
             
             # 추가 봇 탐지 우회 스크립트
-            self.driver.execute_script("""
+            driver.execute_script("""
                 Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
                 Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
                 Object.defineProperty(navigator, 'languages', {get: () => ['ko-KR', 'ko', 'en-US', 'en']});
                 window.chrome = {runtime: {}};
             """)
             
-            self.driver.implicitly_wait(10)
+            # implicit wait 0: 대기는 DomAccess의 명시적 대기로만 수행
+            driver.implicitly_wait(0)
             self.logger.info(f"Chrome WebDriver initialized with User-Agent: {user_agent}")
+            return driver
             
         except Exception as e:
             self.logger.error(f"Failed to initialize WebDriver: {e}")
@@ -194,6 +335,7 @@ class Updated2025NaverCrawler:
             }
         
         self.request_count += 1
+        self.search_deadline = SearchDeadline(self.search_time_budget)
         
         result = {
             "keyword": keyword,
@@ -209,74 +351,189 @@ class Updated2025NaverCrawler:
         try:
             self.logger.info(f"Starting search [{self.request_count}/{self.daily_request_limit}]: '{shop_name}' with keyword '{keyword}'")
             
-            # 2025년 5월 기준 네이버 모바일 검색 URL
-            search_url = f"https://m.search.naver.com/search.naver?where=m&sm=top_sly.hst&fbm=0&acr=1&ie=utf8&query={keyword}"
-            
-            self.driver.get(search_url)
-            self._enhanced_random_delay()
-            
-            # CAPTCHA 감지
-            if self._detect_captcha():
-                result["message"] = "CAPTCHA detected - need to rotate IP"
-                self.logger.warning("CAPTCHA detected!")
-                
-                if self.use_proxy:
-                    self._rotate_proxy()
-                
-                return result
-            
-            # 플레이스 섹션으로 이동
-            if not self._navigate_to_place_list_2025():
-                result["message"] = "플레이스 섹션을 찾을 수 없습니다."
+            # 검색 페이지 로드 + CAPTCHA 감지 + 플레이스 섹션 이동
+            error_message = self._load_search_page_2025(keyword)
+            if error_message:
+                result["message"] = error_message
                 return result
             
             # 2025년 5월 업데이트된 순위 검색
             rank_result = self._find_place_rank_2025(shop_name)
             result.update(rank_result)
             
+            transfer = self._record_transfer()
+            if transfer:
+                result["transfer"] = transfer
+            
             if result["success"]:
                 self.logger.info(f"Found '{shop_name}' at rank {result['rank']}")
             else:
                 self.logger.warning(f"Could not find '{shop_name}'")
                 
+        except SearchDeadlineExceeded as e:
+            result["message"] = str(e)
+            self.logger.warning(f"Search aborted: {e}")
+        except BudgetExhausted as e:
+            result["message"] = "Daily request limit reached"
+            self.logger.warning(f"Search stopped: {e}")
         except Exception as e:
             result["message"] = f"오류 발생: {type(e).__name__} - {e}"
             self.logger.error(f"Error in search_place_rank: {e}")
+        finally:
+            self._release_unused_budget()
         
         return result
     
-    def _detect_captcha(self) -> bool:
-        """CAPTCHA 감지"""
+    def search_keyword_group(self, keyword: str, shop_names: List[str]) -> List[Dict]:
+        """
+        동일 키워드의 여러 상호명 순위를 SERP 1회 요청으로 검색
+        (shop_names와 같은 순서의 결과 리스트 반환)
+        """
+        # 일일 요청 제한 확인 (그룹 전체가 요청 1회)
+        if not self._check_daily_limit():
+            return [{
+                "keyword": keyword,
+                "shop_name": shop_name,
+                "rank": -1,
+                "success": False,
+                "message": "Daily request limit reached",
+                "search_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "found_shops": []
+            } for shop_name in shop_names]
+        
+        self.request_count += 1
+        self.search_deadline = SearchDeadline(self.search_time_budget)
+        
+        results = [{
+            "keyword": keyword,
+            "shop_name": shop_name,
+            "rank": -1,
+            "success": False,
+            "message": "",
+            "search_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "found_shops": [],
+            "request_count": self.request_count
+        } for shop_name in shop_names]
+        
         try:
-            # URL 기반 감지
-            current_url = self.driver.current_url.lower()
-            if any(keyword in current_url for keyword in ['captcha', 'block', 'verify', 'robot']):
-                return True
+            self.logger.info(f"Starting group search [{self.request_count}/{self.daily_request_limit}]: {len(shop_names)} shops with keyword '{keyword}'")
             
-            # 페이지 텍스트 기반 감지
-            page_text = self.driver.page_source.lower()
-            captcha_keywords = [
-                'captcha', '보안문자', '자동입력', '로봇', 'robot',
-                'verify', '인증', 'block', '차단', 'access denied'
-            ]
+            error_message = self._load_search_page_2025(keyword)
+            if error_message:
+                for result in results:
+                    result["message"] = error_message
+                return results
             
-            for keyword in captcha_keywords:
-                if keyword in page_text:
-                    return True
+            # 결과 목록은 한 번만 수집하고 모든 상호명에 재사용
+            found_shops = self._collect_place_names_2025(shop_names)
+            ranks = rank_targets_in_list(found_shops, shop_names, self._is_match_2025, max_rank=50)
+            transfer = self._record_transfer()
             
-            # 특정 요소 기반 감지
-            captcha_selectors = [
-                "[class*='captcha']",
-                "[id*='captcha']", 
-                "[class*='verify']",
-                "[class*='robot']"
-            ]
+            for result, rank in zip(results, ranks):
+                shop_name = result["shop_name"]
+                
+                if rank > 0:
+                    result.update({
+                        "rank": rank,
+                        "success": True,
+                        "message": f"'{shop_name}'은(는) '{keyword}' 검색 결과에서 {rank}위입니다.",
+                        "found_shops": found_shops[:min(rank, 10)]
+                    })
+                    self.logger.info(f"Found '{shop_name}' at rank {rank}")
+                else:
+                    result.update({
+                        "found_shops": found_shops[:20],
+                        "message": f"'{shop_name}'을(를) 상위 {min(len(found_shops), 50)}개 결과에서 찾을 수 없습니다."
+                    })
+                    self.logger.warning(f"Could not find '{shop_name}'")
+                
+                if transfer:
+                    result["transfer"] = transfer
+                    
+        except SearchDeadlineExceeded as e:
+            for result in results:
+                result["message"] = str(e)
+            self.logger.warning(f"Group search aborted: {e}")
+        except BudgetExhausted as e:
+            for result in results:
+                result["message"] = "Daily request limit reached"
+            self.logger.warning(f"Group search stopped: {e}")
+        except Exception as e:
+            for result in results:
+                result["message"] = f"오류 발생: {type(e).__name__} - {e}"
+            self.logger.error(f"Error in search_keyword_group: {e}")
+        finally:
+            self._release_unused_budget()
+        
+        return results
+    
+    def _record_transfer(self) -> Optional[Dict]:
+        """검색 1회 동안 브라우저가 받은 바이트와 차단된 요청 수"""
+        if not self.resource_policy:
+            return None
+        
+        transfer = collect_transfer_stats(self.driver)
+        if not transfer or not transfer['requests']:
+            return None
+        
+        self.logger.info(f"📦 Transfer: {transfer['bytes'] / 1024:.0f} KB in {transfer['requests']} requests, "
+                         f"{transfer['blocked']} blocked")
+        return {key: transfer[key] for key in ('bytes', 'requests', 'blocked')}
+    
+    def _load_search_page_2025(self, keyword: str) -> Optional[str]:
+        """검색 페이지 로드 후 플레이스 리스트로 이동 (실패 시 에러 메시지 반환)"""
+        # 2025년 5월 기준 네이버 모바일 검색 URL
+        search_url = f"https://m.search.naver.com/search.naver?where=m&sm=top_sly.hst&fbm=0&acr=1&ie=utf8&query={keyword}"
+        
+        self._recycle_driver_if_needed()
+        self._spend_request()
+        self.driver.get(search_url)
+        self.driver_pool.record_page(self.pooled_driver)
+        self.search_deadline.check("search page load")
+        self._enhanced_random_delay()
+        
+        # CAPTCHA 감지
+        if self._detect_captcha():
+            self.logger.warning("CAPTCHA detected!")
+            if self.pacer:
+                self.pacer.record_captcha(self._current_proxy())
             
-            for selector in captcha_selectors:
-                if self.driver.find_elements(By.CSS_SELECTOR, selector):
-                    return True
+            if self.use_proxy:
+                self._rotate_proxy()
             
-            return False
+            return "CAPTCHA detected - need to rotate IP"
+        
+        if self.pacer:
+            self.pacer.record_success(self._current_proxy())
+        
+        # 플레이스 섹션으로 이동
+        if not self._navigate_to_place_list_2025():
+            return "플레이스 섹션을 찾을 수 없습니다."
+        
+        return None
+    
+    # CAPTCHA 감지 근거 (URL 키워드 / 보이는 텍스트 키워드 / 요소 선택자)
+    CAPTCHA_URL_KEYWORDS = ['captcha', 'block', 'verify', 'robot']
+    CAPTCHA_TEXT_KEYWORDS = [
+        'captcha', '보안문자', '자동입력', '로봇', 'robot',
+        'verify', '인증', 'block', '차단', 'access denied'
+    ]
+    CAPTCHA_SELECTORS = [
+        "[class*='captcha']",
+        "[id*='captcha']", 
+        "[class*='verify']",
+        "[class*='robot']"
+    ]
+    
+    def _detect_captcha(self) -> bool:
+        """CAPTCHA 감지 (page_source 전송 없이 execute_script 1회)"""
+        try:
+            reason = self._dom().detect_captcha(
+                self.CAPTCHA_URL_KEYWORDS, self.CAPTCHA_TEXT_KEYWORDS, self.CAPTCHA_SELECTORS
+            )
+            if reason:
+                self.logger.debug(f"CAPTCHA marker: {reason}")
+            return bool(reason)
             
         except Exception:
             return False
@@ -307,11 +564,17 @@ class Updated2025NaverCrawler:
                             
                             if 'place' in href and ('더보기' in text or 'more' in text or len(text) == 0):
                                 self.logger.info(f"Clicking place more button: {href}")
+                                self._spend_request()
                                 self.driver.execute_script("arguments[0].click();", element)
                                 self._enhanced_random_delay()
+                                self._wait_for_place_items()
                                 return True
+                        except (SearchDeadlineExceeded, BudgetExhausted):
+                            raise
                         except:
                             continue
+                except (SearchDeadlineExceeded, BudgetExhausted):
+                    raise
                 except:
                     continue
             
@@ -334,57 +597,95 @@ class Updated2025NaverCrawler:
                     for place_url in place_urls:
                         try:
                             self.logger.info(f"Trying direct URL: {place_url}")
+                            self._spend_request()
                             self.driver.get(place_url)
                             self._enhanced_random_delay()
                             
-                            # 2025년 5월 업데이트된 선택자로 플레이스 아이템 확인
-                            if self._get_place_items_2025():
+                            # 2025년 5월 업데이트된 선택자로 플레이스 아이템 확인 (렌더링 명시적 대기)
+                            if self._wait_for_place_items():
                                 return True
+                        except (SearchDeadlineExceeded, BudgetExhausted):
+                            raise
                         except:
                             continue
             
             return False
             
+        except (SearchDeadlineExceeded, BudgetExhausted):
+            raise
         except Exception as e:
             self.logger.error(f"Error navigating to place list: {e}")
             return False
     
-    def _get_place_items_2025(self) -> List:
-        """2025년 5월 업데이트된 플레이스 아이템 선택자"""
-        # 2025년 5월 기준 최신 선택자들 (우선순위 순)
-        selectors_2025 = [
-            'li[data-nclick*="plc"]',  # 🎯 메인 선택자 (2025년 5월 업데이트)
-            'li.place_unit',           # 백업 선택자 1
-            'li[data-place-id]',       # 백업 선택자 2
-            'ul.list_place li',        # 백업 선택자 3
-            '.place_list li',          # 백업 선택자 4
-            'li.place_item',           # 백업 선택자 5
-        ]
+    # 2025년 5월 기준 최신 플레이스 아이템 선택자들 (우선순위 순)
+    PLACE_ITEM_SELECTORS = [
+        'li[data-nclick*="plc"]',  # 🎯 메인 선택자 (2025년 5월 업데이트)
+        'li.place_unit',           # 백업 선택자 1
+        'li[data-place-id]',       # 백업 선택자 2
+        'ul.list_place li',        # 백업 선택자 3
+        '.place_list li',          # 백업 선택자 4
+        'li.place_item',           # 백업 선택자 5
+    ]
+    
+    # 2025년 5월 기준 플레이스명 선택자들
+    PLACE_NAME_SELECTORS = [
+        ".place_bluelink",         # 메인 선택자
+        ".place_name",             # 백업 1
+        ".name",                   # 백업 2
+        "a[href*='place'] span",   # 백업 3
+        "strong",                  # 백업 4
+        "h3",                      # 백업 5
+        ".title"                   # 백업 6
+    ]
+    
+    # 2025년 5월 기준 광고 패턴들
+    AD_SELECTORS = [
+        "[class*='ad']",
+        "[class*='sponsor']",
+        "[class*='promotion']",
+        ".ad_marker",
+        ".ad_badge",
+        "[data-ad]",
+        "[data-sponsor]"
+    ]
+    
+    def _dom(self) -> DomAccess:
+        """현재 WebDriver와 검색 시간 예산에 묶인 DOM 접근 도우미"""
+        return DomAccess(self.driver, self.search_deadline)
+    
+    def _wait_for_place_items(self, timeout: float = 10) -> List:
+        """플레이스 목록이 렌더링될 때까지 명시적 대기"""
+        return self._dom().wait_for_any(self.PLACE_ITEM_SELECTORS, timeout, min_count=3, stage="place list load")
+    
+    # 2025년 패턴 기반 텍스트/속성 광고 키워드
+    AD_KEYWORDS = ['광고', 'ad', 'sponsored', 'promotion', '홍보', '협찬', 'pr', '스폰서']
+    NCLICK_AD_WORDS = ['ad', 'sponsor', 'promotion']
+    
+    def _get_place_entries_2025(self) -> List[Dict]:
+        """
+        2025년 5월 플레이스 아이템의 이름/CID/광고 여부/위치를 execute_script 1회로 수집
+        (아이템별 WebDriver 왕복 없이 화면에 보이는 목록 전체를 한 번에 가져옴)
+        """
+        entries = self._dom().extract_place_items(
+            self.PLACE_ITEM_SELECTORS, self.PLACE_NAME_SELECTORS, self.AD_SELECTORS,
+            self.AD_KEYWORDS, self.NCLICK_AD_WORDS
+        )
+        if not entries:
+            self.logger.warning("No place items found with any 2025 selectors")
+            return []
         
-        for selector in selectors_2025:
-            try:
-                items = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                # 텍스트가 있는 실제 아이템만 필터링
-                valid_items = []
-                for item in items:
-                    try:
-                        text = item.text.strip()
-                        if text and len(text) > 10:  # 최소 10자 이상의 텍스트가 있어야 유효
-                            valid_items.append(item)
-                    except:
-                        continue
-                
-                if valid_items and len(valid_items) >= 3:  # 최소 3개 이상의 유효한 아이템
-                    self.logger.info(f"Found {len(valid_items)} items with selector: {selector}")
-                    return valid_items
-                    
-            except Exception as e:
-                self.logger.debug(f"Error with selector {selector}: {e}")
-                continue
+        place_entries = []
+        for entry in entries:
+            name = entry.get('name')
+            if not name:
+                # 선택자로 찾지 못한 경우 첫 번째 줄에서 가장 긴 텍스트 추출
+                words = (entry.get('first_line') or '').split()
+                name = max(words, key=len) if words else None
+            if name and len(name) >= 2:
+                place_entries.append({**entry, 'name': name})
         
-        self.logger.warning("No place items found with any 2025 selectors")
-        return []
+        self.logger.info(f"Found {len(place_entries)} place items")
+        return place_entries
     
     def _find_place_rank_2025(self, target_shop_name: str) -> Dict:
         """2025년 5월 업데이트 반영 순위 검색"""
@@ -397,50 +698,45 @@ class Updated2025NaverCrawler:
         
         current_rank = 1
         found_shops = []
+        processed = 0
         scroll_count = 0
         max_scrolls = 8  # 스크롤 횟수 제한
         
         while scroll_count < max_scrolls and current_rank <= 50:  # 상위 50개까지만
-            # 2025년 5월 업데이트된 플레이스 아이템 가져오기
-            place_items = self._get_place_items_2025()
+            self.search_deadline.check("place list scan")
+            # 2025년 5월 업데이트된 플레이스 목록 (스크립트 1회)
+            entries = self._get_place_entries_2025()
             
-            if not place_items:
-                self.logger.warning("No place items found")
+            if not entries:
                 break
             
             # 새로운 아이템들만 처리
-            for item in place_items[len(found_shops):]:
-                try:
-                    place_info = self._extract_place_info_2025(item)
-                    if not place_info:
-                        continue
-                    
-                    place_name = place_info['name']
-                    is_ad = place_info.get('is_ad', False)
-                    
-                    # 광고가 아닌 경우만 순위에 포함
-                    if not is_ad:
-                        found_shops.append(place_name)
-                        
-                        # 유연한 매칭 (2025년 업데이트)
-                        if self._is_match_2025(target_shop_name, place_name):
-                            result.update({
-                                "rank": current_rank,
-                                "success": True,
-                                "message": f"'{target_shop_name}'은(는) '{self._get_search_keyword()}' 검색 결과에서 {current_rank}위입니다.",
-                                "found_shops": found_shops[:10]
-                            })
-                            return result
-                        
-                        current_rank += 1
-                        
-                        # 50위까지만 확인
-                        if current_rank > 50:
-                            break
-                
-                except Exception as e:
-                    self.logger.debug(f"Error processing place item: {e}")
+            for entry in entries[processed:]:
+                # 광고가 아닌 경우만 순위에 포함
+                if entry['is_ad']:
                     continue
+                
+                place_name = entry['name']
+                found_shops.append(place_name)
+                
+                # 유연한 매칭 (2025년 업데이트)
+                if self._is_match_2025(target_shop_name, place_name):
+                    result.update({
+                        "rank": current_rank,
+                        "success": True,
+                        "message": f"'{target_shop_name}'은(는) '{self._get_search_keyword()}' 검색 결과에서 {current_rank}위입니다.",
+                        "found_shops": found_shops[:10]
+                    })
+                    if entry.get('cid'):
+                        result["cid"] = entry['cid']
+                    return result
+                
+                current_rank += 1
+                
+                # 50위까지만 확인
+                if current_rank > 50:
+                    break
+            processed = len(entries)
             
             # 더 많은 결과를 위한 스크롤
             if not self._scroll_with_loading_wait():
@@ -457,94 +753,46 @@ class Updated2025NaverCrawler:
         
         return result
     
-    def _extract_place_info_2025(self, item) -> Optional[Dict]:
-        """2025년 5월 업데이트된 플레이스 정보 추출"""
-        try:
-            # 2025년 5월 기준 플레이스명 선택자들
-            name_selectors_2025 = [
-                ".place_bluelink",         # 메인 선택자
-                ".place_name",             # 백업 1
-                ".name",                   # 백업 2
-                "a[href*='place'] span",   # 백업 3
-                "strong",                  # 백업 4
-                "h3",                      # 백업 5
-                ".title"                   # 백업 6
-            ]
-            
-            place_name = None
-            for selector in name_selectors_2025:
-                try:
-                    element = item.find_element(By.CSS_SELECTOR, selector)
-                    text = element.text.strip()
-                    if text and len(text) > 1 and not text.isdigit():
-                        place_name = text
-                        break
-                except:
-                    continue
-            
-            # 선택자로 찾지 못한 경우 전체 텍스트에서 추출
-            if not place_name:
-                full_text = item.text.strip()
-                if full_text:
-                    lines = [line.strip() for line in full_text.split('\n') if line.strip()]
-                    if lines:
-                        # 첫 번째 줄에서 가장 긴 텍스트 추출
-                        place_name = max(lines[0].split(), key=len) if lines[0] else None
-            
-            if not place_name or len(place_name) < 2:
-                return None
-            
-            # 2025년 5월 업데이트된 광고 감지
-            is_ad = self._is_advertisement_2025(item)
-            
-            return {
-                'name': place_name,
-                'is_ad': is_ad
-            }
-            
-        except Exception as e:
-            self.logger.debug(f"Error extracting place info: {e}")
-            return None
-    
-    def _is_advertisement_2025(self, item) -> bool:
-        """2025년 5월 업데이트된 광고 감지"""
-        try:
-            # 2025년 5월 기준 광고 패턴들
-            ad_patterns_2025 = [
-                "[class*='ad']",
-                "[class*='sponsor']",
-                "[class*='promotion']",
-                ".ad_marker",
-                ".ad_badge",
-                "[data-ad]",
-                "[data-sponsor]"
-            ]
-            
-            # CSS 선택자 기반 감지
-            for pattern in ad_patterns_2025:
-                if item.find_elements(By.CSS_SELECTOR, pattern):
-                    return True
-            
-            # 텍스트 기반 감지 (2025년 패턴)
-            item_text = item.text.lower()
-            ad_keywords_2025 = [
-                '광고', 'ad', 'sponsored', 'promotion', 
-                '홍보', '협찬', 'pr', '스폰서'
-            ]
+    def _collect_place_names_2025(self, target_shop_names: List[str], max_rank: int = 50) -> List[str]:
+        """광고 제외 플레이스명 수집 (모든 대상을 찾으면 조기 종료)"""
+        found_shops = []
+        pending_targets = list(target_shop_names)
+        processed = 0
+        scroll_count = 0
+        max_scrolls = 8  # 스크롤 횟수 제한
+        
+        while scroll_count < max_scrolls and len(found_shops) < max_rank:
+            self.search_deadline.check("place list scan")
+            entries = self._get_place_entries_2025()
             
-            for keyword in ad_keywords_2025:
-                if keyword in item_text:
-                    return True
+            if not entries:
+                break
             
-            # data-nclick 속성에서 광고 감지
-            nclick_attr = item.get_attribute('data-nclick')
-            if nclick_attr and any(ad_word in nclick_attr.lower() for ad_word in ['ad', 'sponsor', 'promotion']):
-                return True
+            # 새로운 아이템들만 처리
+            for entry in entries[processed:]:
+                if entry['is_ad']:
+                    continue
+                
+                place_name = entry['name']
+                found_shops.append(place_name)
+                
+                pending_targets = [
+                    target for target in pending_targets
+                    if not self._is_match_2025(target, place_name)
+                ]
+                
+                if not pending_targets or len(found_shops) >= max_rank:
+                    return found_shops
+            processed = len(entries)
             
-            return False
+            # 더 많은 결과를 위한 스크롤
+            if not self._scroll_with_loading_wait():
+                break
             
-        except Exception:
-            return False
+            scroll_count += 1
+            self._enhanced_random_delay(min_delay=2, max_delay=5)
+        
+        return found_shops
     
     def _is_match_2025(self, target_name: str, found_name: str) -> bool:
         """2025년 업데이트된 유연한 매칭 로직"""
@@ -595,47 +843,37 @@ class Updated2025NaverCrawler:
         return False
     
     def _scroll_with_loading_wait(self) -> bool:
-        """로딩 대기가 포함된 스크롤"""
+        """로딩 대기가 포함된 스크롤 (MutationObserver로 새 아이템/목록 끝을 감지하는 즉시 반환)"""
         try:
-            # 현재 아이템 개수 저장
-            initial_items = len(self._get_place_items_2025())
-            
-            # 스크롤 실행
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
-            # 로딩 대기 (최대 10초)
-            for _ in range(20):  # 0.5초씩 20번 = 10초
-                time.sleep(0.5)
-                current_items = len(self._get_place_items_2025())
-                
-                if current_items > initial_items:
-                    self.logger.debug(f"New items loaded: {initial_items} -> {current_items}")
-                    return True
+            # 최대 10초, 검색 시간 예산 이내
+            outcome = self._dom().scroll_and_wait(self.PLACE_ITEM_SELECTORS, timeout=10)
+            if outcome['status'] == SCROLL_STATUS_LOADED:
+                self.logger.debug(f"New items loaded: {outcome['before']} -> {outcome['after']} ({outcome['elapsed_ms']} ms)")
+                return True
             
-            return False  # 새 아이템이 로드되지 않음
+            return False  # 목록 끝이거나 새 아이템이 로드되지 않음
             
+        except SearchDeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.debug(f"Scroll failed: {e}")
             return False
     
     def _enhanced_random_delay(self, min_delay=None, max_delay=None):
-        """향상된 랜덤 지연 (CAPTCHA 회피)"""
-        if min_delay is None or max_delay is None:
-            min_delay, max_delay = self.delay_range
-        
-        # 기본 지연
-        delay = random.uniform(min_delay, max_delay)
+        """향상된 요청 간격 (CAPTCHA 회피, 간격을 토큰 비용으로 환산해 토큰 버킷에서 대기)"""
+        base_delay = sum(self.delay_range) / 2
+        delay = (min_delay + max_delay) / 2 if min_delay is not None and max_delay is not None else base_delay
         
-        # 요청 횟수에 따른 추가 지연 (CAPTCHA 회피)
-        if self.request_count > 100:
-            delay += random.uniform(5, 10)  # 100회 이후 5-10초 추가
+        # 요청 횟수에 따른 추가 간격 (큰 구간부터 확인해야 200/300회 구간이 적용됨)
+        if self.request_count > 300:
+            delay += 30  # 300회 이후 평균 30초 추가
         elif self.request_count > 200:
-            delay += random.uniform(10, 20)  # 200회 이후 10-20초 추가
-        elif self.request_count > 300:
-            delay += random.uniform(20, 40)  # 300회 이후 20-40초 추가
+            delay += 15  # 200회 이후 평균 15초 추가
+        elif self.request_count > 100:
+            delay += 7.5  # 100회 이후 평균 7.5초 추가
         
-        self.logger.debug(f"Waiting {delay:.2f} seconds...")
-        time.sleep(delay)
+        waited = self.rate_limiter.acquire(proxy=self._current_proxy(), cost=delay / base_delay)
+        self.logger.debug(f"Waited {waited:.2f} seconds...")
     
     def _get_search_keyword(self) -> str:
         """현재 URL에서 검색 키워드 추출"""
@@ -676,7 +914,7 @@ class Updated2025NaverCrawler:
                     'request_count': result.get('request_count', self.request_count)  # 요청 횟수 추가
                 }
                 
-                self.supabase.table('crawler_results').insert(insert_data).execute()
+                self.result_writer.add('crawler_results', insert_data)
                 
                 # rankings 테이블에도 저장 (성공한 경우만)
                 if tracked_place_id and result['success']:
@@ -685,17 +923,35 @@ class Updated2025NaverCrawler:
                         'rank': result['rank'],
                         'checked_at': result['search_time']
                     }
-                    self.supabase.table('rankings').insert(ranking_data).execute()
+                    self.result_writer.add('rankings', ranking_data)
                     
-            self.logger.info(f"Saved {len(results)} results to Supabase")
+            self.logger.info(f"Queued {len(results)} results for Supabase")
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to save to Supabase: {e}")
             return False
     
+    def _load_place_histories(self, place_ids: List, lookback_days: int = 14) -> Dict:
+        """최근 rankings/crawler_results로 플레이스별 이력 조회 (실패 시 이력 없이 스케줄링)"""
+        since = (datetime.now() - timedelta(days=lookback_days)).isoformat()
+        rankings, crawler_results = [], []
+        
+        try:
+            # in 필터 URL이 너무 길어지지 않도록 나눠서 조회
+            for start in range(0, len(place_ids), 100):
+                chunk = place_ids[start:start + 100]
+                rankings += self.supabase.table('rankings').select('tracked_place_id, rank, checked_at') \
+                    .in_('tracked_place_id', chunk).gte('checked_at', since).execute().data or []
+                crawler_results += self.supabase.table('crawler_results').select('tracked_place_id, success, crawled_at') \
+                    .in_('tracked_place_id', chunk).gte('crawled_at', since).execute().data or []
+        except Exception as e:
+            self.logger.warning(f"Failed to load crawl history, scheduling without it: {e}")
+        
+        return build_place_histories(rankings, crawler_results)
+    
     def crawl_tracked_places(self):
-        """등록된 tracked_places를 모두 크롤링 (개선된 버전)"""
+        """등록된 tracked_places를 우선순위 순으로 크롤링하고 실행한 스케줄(CrawlPlan) 반환"""
         if not self.supabase:
             self.logger.error("Supabase not configured")
             return
@@ -707,45 +963,71 @@ class Updated2025NaverCrawler:
             
             self.logger.info(f"Found {len(tracked_places)} active tracked places")
             
-            if len(tracked_places) > self.daily_request_limit - self.request_count:
-                self.logger.warning(f"Too many places to crawl today. Limiting to {self.daily_request_limit - self.request_count}")
-                tracked_places = tracked_places[:self.daily_request_limit - self.request_count]
+            # 키워드별 그룹화 (키워드당 요청 1회)
+            groups = plan_keyword_groups(tracked_places)
+            self.logger.info(f"Crawl plan: {summarize_plan(groups)}")
             
-            for i, place in enumerate(tracked_places, 1):
-                keyword = place['search_keyword']
-                place_name = place['place_name']
-                place_id = place['id']
-                
-                self.logger.info(f"크롤링 [{i}/{len(tracked_places)}]: {place_name} (키워드: {keyword})")
+            # 남은 예산을 가치가 높은 검색부터 배정 (경과 시간/순위 변동/기간 마감/지난 실패)
+            # 예산은 원장과 같은 페이지 로드 단위이므로 검색 1회당 예상 로드 수(CRAWL_LOADS_PER_SEARCH)로 나눠 배정
+            histories = self._load_place_histories([place['id'] for place in tracked_places if place.get('id')])
+            interval = 1 / self.rate_limiter.rate if self.rate_limiter.rate > 0 else sum(self.delay_range) / 2
+            plan = CrawlScheduler.from_env().plan(groups, histories, self._requests_remaining(), interval)
+            self.logger.info(f"Crawl schedule: {plan.summary()}")
+            if plan.deferred:
+                self.logger.warning(f"Too many keywords to crawl today. Deferring {len(plan.deferred)} lowest-priority keywords "
+                                    f"({plan.loads_per_search:g} page loads per search)")
+            for item in plan.scheduled:
+                self.logger.debug(f"Scheduled '{item.group.keyword}' priority={item.priority:.2f} "
+                                  f"{item.components} eta={item.eta.isoformat()}")
+            groups = [item.group for item in plan.scheduled]
+            
+            for i, group in enumerate(groups, 1):
+                self.logger.info(f"크롤링 [{i}/{len(groups)}]: 키워드 '{group.keyword}' ({len(group.places)}개 플레이스)")
                 
                 # 검색 실행
-                result = self.search_place_rank(keyword, place_name)
+                results = self.search_keyword_group(group.keyword, group.place_names)
                 
                 # 결과 저장
-                self.save_to_supabase(result, place_id)
+                for place, result in zip(group.places, results):
+                    self.save_to_supabase(result, place['id'])
                 
                 # CAPTCHA 발생 시 중단
-                if "CAPTCHA detected" in result.get('message', ''):
+                if any("CAPTCHA detected" in result.get('message', '') for result in results):
                     self.logger.error("CAPTCHA detected. Stopping crawling session.")
                     break
                 
                 # 일일 한도 도달 시 중단  
-                if self.request_count >= self.daily_request_limit:
+                if self._requests_remaining() <= 0:
                     self.logger.info("Daily request limit reached. Stopping.")
                     break
                 
                 # 향상된 지연
                 self._enhanced_random_delay()
+            
+            return plan
                 
         except Exception as e:
             self.logger.error(f"Crawl tracked places failed: {e}")
+        finally:
+            # 버퍼에 남은 결과 저장 후 지표 출력
+            self.result_writer.flush()
+            self.logger.info(f"Result writer metrics: {self.result_writer.get_metrics()}")
     
     def close(self):
         """리소스 정리"""
         try:
-            if self.driver:
-                self.driver.quit()
-                self.logger.info(f"WebDriver closed. Total requests made: {self.request_count}")
+            if self.result_writer:
+                self.result_writer.close()
+            
+            self.driver_pool.close()
+            self.pooled_driver = None
+            self.driver = None
+            
+            if self.proxy_forwarder:
+                self.proxy_forwarder.close()
+            if self.pacer:
+                self.pacer.save()
+            self.logger.info(f"WebDriver closed. Total requests made: {self.request_count}")
         except Exception as e:
             self.logger.error(f"Error closing WebDriver: {e}")
 
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Chrome WebDriver 풀
+- N개의 브라우저를 미리 띄워 두고(프록시별로 바인딩 가능) 검색에 대여
+- 대여 시 헬스 체크, M페이지 처리 또는 RSS 임계치 초과 시 재생성
+- 프록시 로테이션은 Chrome 재부팅 대신 다른 프록시에 묶인 브라우저 대여로 처리
+"""
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+try:
+    import psutil  # 선택 의존성 (없으면 /proc에서 RSS 계산)
+except ImportError:
+    psutil = None
+
+
+def process_tree_rss_mb(pid: Optional[int]) -> float:
+    """pid와 모든 자식 프로세스의 RSS 합 (MB, 측정 불가 시 0)"""
+    if not pid:
+        return 0.0
+
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / (1024 * 1024)
+        except psutil.Error:
+            return 0.0
+
+    # psutil이 없으면 Linux /proc 사용
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+            with open(f'/proc/{current}/task/{current}/children') as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+@dataclass
+class PooledDriver:
+    """풀에서 관리하는 브라우저 1개"""
+    driver: object
+    proxy: Optional[str]
+    created_at: float = field(default_factory=time.time)
+    pages_served: int = 0
+    in_use: bool = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        """chromedriver 프로세스 pid (브라우저는 그 자식 프로세스)"""
+        try:
+            return self.driver.service.process.pid
+        except AttributeError:
+            return None
+
+
+class WebDriverPool:
+    """미리 기동한 WebDriver를 대여/반납/재생성하는 풀 (스레드 안전)"""
+
+    def __init__(
+        self,
+        driver_factory: Callable[[Optional[str]], object],
+        proxies: Optional[List[Optional[str]]] = None,
+        size: int = 2,
+        max_pages: int = 50,
+        max_rss_mb: float = 1024,
+        max_start_failures: int = 3,
+        start_backoff: float = 2.0,
+        logger_name: str = "WebDriverPool"
+    ):
+        """
+        Args:
+            driver_factory: proxy를 받아 새 WebDriver를 만드는 함수
+            proxies: 브라우저를 바인딩할 프록시 목록 (None이면 프록시 없음)
+            size: 유지할 브라우저 수
+            max_pages: 브라우저 하나가 처리할 최대 페이지 수 (초과 시 재생성)
+            max_rss_mb: 브라우저 프로세스 트리 RSS 임계치 (초과 시 재생성)
+            max_start_failures: acquire 한 번에서 연속 기동 실패 허용 횟수 (초과 시 TimeoutError)
+            start_backoff: 기동 실패 후 재시도 전 대기 시간 (초, 실패할 때마다 2배)
+        """
+        self.logger = logging.getLogger(logger_name)
+        self.driver_factory = driver_factory
+        self.proxies = list(proxies) if proxies else [None]
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.max_start_failures = max(1, max_start_failures)
+        self.start_backoff = start_backoff
+
+        self._lock = threading.Condition()
+        self._drivers: List[PooledDriver] = []
+        self._starting: List[Optional[str]] = []  # 기동 중인 브라우저의 프록시
+        self._next_proxy_index = 0
+        self._closed = False
+
+        self.stats = {
+            'created': 0,
+            'recycled': 0,
+            'health_failures': 0,
+            'checkouts': 0,
+            'warm_hits': 0,
+            'create_errors': 0
+        }
+
+    @classmethod
+    def from_env(cls, driver_factory: Callable[[Optional[str]], object], proxies: Optional[List[Optional[str]]] = None,
+                 logger_name: str = "WebDriverPool") -> "WebDriverPool":
+        """
+        환경변수(WEBDRIVER_POOL_SIZE, WEBDRIVER_MAX_PAGES, WEBDRIVER_MAX_RSS_MB, WEBDRIVER_START_RETRIES)로 설정한 풀 생성
+
+        WEBDRIVER_POOL_SIZE 기본값은 바인딩할 프록시 수 (프록시가 없거나 하나면 브라우저 1개만 유지)
+        """
+        return cls(
+            driver_factory,
+            proxies=proxies,
+            size=int(os.getenv('WEBDRIVER_POOL_SIZE', str(max(1, len(proxies or []))))),
+            max_pages=int(os.getenv('WEBDRIVER_MAX_PAGES', '50')),
+            max_rss_mb=float(os.getenv('WEBDRIVER_MAX_RSS_MB', '1024')),
+            max_start_failures=int(os.getenv('WEBDRIVER_START_RETRIES', '3')),
+            logger_name=logger_name
+        )
+
+    def warm_up(self, background: bool = True):
+        """빈 자리만큼 브라우저를 미리 기동 (background=False면 완료까지 대기)"""
+        with self._lock:
+            missing = self.size - len(self._drivers) - len(self._starting)
+            proxies = [self._take_next_proxy() for _ in range(max(0, missing))]
+            self._starting.extend(proxies)
+
+        threads = [threading.Thread(target=self._start_driver, args=(proxy,), daemon=True) for proxy in proxies]
+        for thread in threads:
+            thread.start()
+        if not background:
+            for thread in threads:
+                thread.join()
+
+    def acquire(self, proxy: Optional[str] = None, exclude_proxy: Optional[str] = None, timeout: float = 120) -> PooledDriver:
+        """
+        유휴 브라우저 대여 (헬스 체크 통과한 것만)
+
+        Args:
+            proxy: 이 프록시에 묶인 브라우저만 대여 (기동 중이면 대기, 풀이 가득 차면 다른 프록시의 유휴 브라우저를 교체)
+            exclude_proxy: 이 프록시가 아닌 브라우저 우선 (프록시 로테이션용)
+            timeout: 유휴 브라우저를 기다릴 최대 시간 (초)
+        """
+        deadline = time.monotonic() + timeout
+        start_failures = 0
+
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("WebDriverPool is closed")
+
+                pooled = self._pick_idle(proxy, exclude_proxy, strict=True)
+                if pooled is None and proxy is not None and proxy not in self._starting:
+                    # 요청한 프록시의 브라우저가 없고 기동 중도 아니면 다른 프록시의 유휴 브라우저 자리를 비움
+                    retired = self._retire_idle_for(proxy)
+                    if retired is not None:
+                        self._lock.release()
+                        try:
+                            self._quit(retired)
+                        finally:
+                            self._lock.acquire()
+                        continue
+                waiting_for_start = proxy is not None and proxy in self._starting
+                if pooled is None and not waiting_for_start and len(self._drivers) + len(self._starting) < self.size:
+                    # 조건에 맞는 유휴 브라우저가 없고 자리가 남으면 새로 기동
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError("No idle WebDriver available")
+                    start_proxy = proxy if proxy is not None else self._take_next_proxy(exclude_proxy)
+                    self._starting.append(start_proxy)
+                    self._lock.release()
+                    try:
+                        started = self._start_driver(start_proxy)
+                    finally:
+                        self._lock.acquire()
+
+                    if not started:
+                        # chromedriver 고장 등으로 계속 실패하면 재기동을 반복하지 않고 중단
+                        start_failures += 1
+                        if start_failures >= self.max_start_failures:
+                            raise TimeoutError(f"WebDriver failed to start {start_failures} times in a row")
+                        backoff = min(self.start_backoff * 2 ** (start_failures - 1), deadline - time.monotonic())
+                        if backoff > 0:
+                            self._lock.wait(backoff)
+                    continue
+
+                if pooled is None and proxy is None:
+                    pooled = self._pick_idle(proxy, exclude_proxy, strict=False)
+                if pooled is None:
+                    # 요청한 프록시의 브라우저가 기동되거나 반납될 때까지 대기
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("No idle WebDriver available")
+                    self._lock.wait(remaining)
+                    continue
+
+                pooled.in_use = True
+
+            if self._is_healthy(pooled):
+                with self._lock:
+                    self.stats['checkouts'] += 1
+                    if pooled.pages_served == 0:
+                        self.stats['warm_hits'] += 1
+                return pooled
+
+            self.stats['health_failures'] += 1
+            self.logger.warning(f"Unhealthy WebDriver (proxy: {pooled.proxy}), replacing")
+            self._discard(pooled)
+            self.warm_up()
+
+    def record_page(self, pooled: PooledDriver):
+        """대여한 브라우저로 페이지를 하나 처리했음을 기록"""
+        pooled.pages_served += 1
+
+    def needs_recycle(self, pooled: PooledDriver) -> bool:
+        """페이지 수 또는 메모리 임계치 초과 여부"""
+        if pooled.pages_served >= self.max_pages:
+            return True
+        return self.max_rss_mb > 0 and process_tree_rss_mb(pooled.pid) > self.max_rss_mb
+
+    def release(self, pooled: PooledDriver, healthy: bool = True):
+        """브라우저 반납 (임계치 초과/비정상이면 폐기 후 백그라운드에서 보충)"""
+        if not healthy or self.needs_recycle(pooled):
+            self.stats['recycled'] += 1
+            self.logger.info(f"Recycling WebDriver after {pooled.pages_served} pages (proxy: {pooled.proxy})")
+            self._discard(pooled)
+            if not self._closed:
+                self.warm_up()
+            return
+
+        with self._lock:
+            pooled.in_use = False
+            self._lock.notify()
+
+    def swap(self, pooled: Optional[PooledDriver], proxy: Optional[str] = None) -> PooledDriver:
+        """현재 브라우저를 반납하고 다른 프록시의 브라우저 대여 (프록시 로테이션)"""
+        current_proxy = pooled.proxy if pooled else None
+        if pooled:
+            self.release(pooled)
+        return self.acquire(proxy=proxy, exclude_proxy=current_proxy)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'size': len(self._drivers),
+                'idle': sum(1 for pooled in self._drivers if not pooled.in_use),
+                'starting': len(self._starting)
+            }
+
+    def close(self):
+        """모든 브라우저 종료"""
+        with self._lock:
+            self._closed = True
+            drivers = list(self._drivers)
+            self._drivers.clear()
+            self._lock.notify_all()
+
+        for pooled in drivers:
+            self._quit(pooled)
+        self.logger.info(f"WebDriver pool closed: {self.stats}")
+
+    def _take_next_proxy(self, exclude_proxy: Optional[str] = None) -> Optional[str]:
+        """라운드로빈으로 다음 프록시 선택 (lock 보유 상태에서 호출)"""
+        for _ in range(len(self.proxies)):
+            proxy = self.proxies[self._next_proxy_index % len(self.proxies)]
+            self._next_proxy_index += 1
+            if proxy != exclude_proxy or len(self.proxies) == 1:
+                return proxy
+        return self.proxies[0]
+
+    def _retire_idle_for(self, proxy: Optional[str]) -> Optional[PooledDriver]:
+        """
+        풀이 가득 찼을 때 proxy용 자리를 만들기 위해 다른 프록시의 유휴 브라우저를 풀에서 제거 (lock 보유 상태에서 호출)
+
+        제거한 브라우저를 반환하며 quit은 호출자가 lock 밖에서 처리
+        """
+        if len(self._drivers) + len(self._starting) < self.size:
+            return None
+        if any(pooled.proxy == proxy for pooled in self._drivers):
+            return None  # 같은 프록시 브라우저가 대여 중이면 반납을 기다림
+        idle = [pooled for pooled in self._drivers if not pooled.in_use and pooled.proxy != proxy]
+        if not idle:
+            return None
+        retired = max(idle, key=lambda pooled: pooled.pages_served)
+        self._drivers.remove(retired)
+        self.stats['recycled'] += 1
+        self.logger.info(f"Retiring idle WebDriver (proxy: {retired.proxy}) to start one for {proxy}")
+        return retired
+
+    def _pick_idle(self, proxy: Optional[str], exclude_proxy: Optional[str], strict: bool) -> Optional[PooledDriver]:
+        """유휴 브라우저 선택 (strict=False면 프록시 조건을 만족하는 것이 없을 때 아무거나, proxy 지정 시에는 쓰지 않음)"""
+        idle = [pooled for pooled in self._drivers if not pooled.in_use]
+
+        candidates = idle
+        if proxy is not None:
+            candidates = [pooled for pooled in idle if pooled.proxy == proxy]
+        if exclude_proxy is not None:
+            candidates = [pooled for pooled in candidates if pooled.proxy != exclude_proxy]
+        if not candidates and not strict:
+            candidates = [pooled for pooled in idle if pooled.proxy != exclude_proxy] or idle
+
+        # 적게 사용된 브라우저 우선
+        return min(candidates, key=lambda pooled: pooled.pages_served) if candidates else None
+
+    def _start_driver(self, proxy: Optional[str]) -> bool:
+        """브라우저 1개 기동 후 풀에 추가 (_starting 예약분 해제, 기동 실패 시 False)"""
+        pooled = None
+        try:
+            started = time.monotonic()
+            driver = self.driver_factory(proxy)
+            pooled = PooledDriver(driver=driver, proxy=proxy)
+            self.logger.info(f"WebDriver warmed in {time.monotonic() - started:.1f}s (proxy: {proxy})")
+        except Exception as e:
+            self.stats['create_errors'] += 1
+            self.logger.error(f"Failed to start pooled WebDriver: {e}")
+
+        with self._lock:
+            self._starting.remove(proxy)
+            if pooled is not None:
+                if self._closed:
+                    self._lock.release()
+                    try:
+                        self._quit(pooled)
+                    finally:
+                        self._lock.acquire()
+                else:
+                    self._drivers.append(pooled)
+                    self.stats['created'] += 1
+            self._lock.notify_all()
+        return pooled is not None
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            process = getattr(getattr(pooled.driver, 'service', None), 'process', None)
+            if process is not None and process.poll() is not None:
+                return False
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _discard(self, pooled: PooledDriver):
+        with self._lock:
+            if pooled in self._drivers:
+                self._drivers.remove(pooled)
+            self._lock.notify_all()
+        self._quit(pooled)
+
+    def _quit(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            self.logger.debug(f"Error quitting WebDriver: {e}")
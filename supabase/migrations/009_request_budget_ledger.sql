@@ -0,0 +1,52 @@
+-- 출구 IP(프록시)별 일일 요청 예산 원장
+-- 여러 크롤러 워커/GitHub Actions 실행이 같은 KST 일일 한도를 함께 차감 (python-crawler/request_budget_ledger.py)
+
+-- 1. 원장 테이블 (day는 KST 날짜, exit_key는 프록시 host:port 또는 direct)
+CREATE TABLE IF NOT EXISTS request_budget (
+    day DATE NOT NULL,
+    exit_key VARCHAR(255) NOT NULL,
+    used INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (day, exit_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_request_budget_day ON request_budget(day);
+
+-- 2. 예약: 사용량 + p_count <= p_limit일 때만 차감 (행 잠금으로 동시 호출에도 한도 초과 없음)
+CREATE OR REPLACE FUNCTION reserve_request_budget(p_day DATE, p_exit_key TEXT, p_count INTEGER, p_limit INTEGER)
+RETURNS BOOLEAN AS $$
+DECLARE
+  reserved INTEGER;
+BEGIN
+  IF p_count > p_limit THEN
+    RETURN FALSE;
+  END IF;
+
+  INSERT INTO request_budget (day, exit_key, used, updated_at)
+  VALUES (p_day, p_exit_key, p_count, NOW())
+  ON CONFLICT (day, exit_key) DO UPDATE
+  SET used = request_budget.used + EXCLUDED.used, updated_at = NOW()
+  WHERE request_budget.used + EXCLUDED.used <= p_limit;
+
+  GET DIAGNOSTICS reserved = ROW_COUNT;
+  RETURN reserved > 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. 반환: 요청을 보내지 못한 예약 되돌리기
+CREATE OR REPLACE FUNCTION release_request_budget(p_day DATE, p_exit_key TEXT, p_count INTEGER)
+RETURNS void AS $$
+BEGIN
+  UPDATE request_budget
+  SET used = GREATEST(used - p_count, 0), updated_at = NOW()
+  WHERE day = p_day AND exit_key = p_exit_key;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. 크롤러(service_role)만 사용, 일반 사용자 접근 차단
+ALTER TABLE request_budget ENABLE ROW LEVEL SECURITY;
+
+REVOKE EXECUTE ON FUNCTION reserve_request_budget(DATE, TEXT, INTEGER, INTEGER) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION release_request_budget(DATE, TEXT, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION reserve_request_budget(DATE, TEXT, INTEGER, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION release_request_budget(DATE, TEXT, INTEGER) TO service_role;